@@ -0,0 +1,143 @@
+"""Copie d'un pack officiel dans les decks d'un utilisateur (`copy-to-user/`).
+
+La copie ne recopie plus les cartes : le deck créé hérite de celles du pack
+(`content.deck_overlay`). Restent ici :
+- le nom libre (« Pack », « Pack (2) », …), choisi d'après les noms existants
+  de l'utilisateur, lus en une requête, au lieu d'un `exists()` par essai ;
+- la matérialisation des decks hérités d'un pack qui va être supprimé : leurs
+  cartes deviennent des `DeckCard` propres, en un `INSERT … SELECT` pour tous
+  les decks à la fois, dans l'ordre du pack et sans les cartes exclues ;
+- l'opération inverse pour les copies faites avant l'héritage
+  (`adopt_legacy_copies`, appelée par `content.pack_sync`).
+
+Le SQL (ON CONFLICT) est commun à Postgres et SQLite (3.24+).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from learning.upserts import quoted_column, typed_param
+
+
+def free_deck_name(user_id: int, base_name: str) -> str:
+    """Premier nom libre parmi `base_name`, `base_name (2)`, `base_name (3)`…"""
+    from .models import Deck
+
+    taken = set(
+        Deck.objects.filter(
+            user_id=user_id, type=Deck.DeckType.USER, name__startswith=base_name
+        ).values_list("name", flat=True)
+    )
+    name, idx = base_name, 2
+    while name in taken:
+        name = f"{base_name} ({idx})"
+        idx += 1
+    return name
+
+
+def materialize_inherited_decks(pack_id: int) -> int:
+    """Recopie les cartes de `pack_id` dans les decks qui en héritent ; renvoie les lignes écrites.
+
+    Les decks passent ensuite pour des copies ordinaires (`cards_inherited`
+    faux, exclusions effacées) : le pack peut disparaître sans les vider.
+    """
+    from .models import Deck, DeckCard, DeckCardExclusion
+
+    derived = Deck.objects.filter(source_pack_id=pack_id, cards_inherited=True)
+    table = connection.ops.quote_name(DeckCard._meta.db_table)
+    decks = connection.ops.quote_name(Deck._meta.db_table)
+    exclusions = connection.ops.quote_name(DeckCardExclusion._meta.db_table)
+
+    values = {"is_optional": False, "notes": "", "added_at": timezone.now()}
+    select_sql, params = [], []
+    for name, value in values.items():
+        sql, param = typed_param(DeckCard, name, value)
+        select_sql.append(sql)
+        params.append(param)
+
+    deck = quoted_column(DeckCard, "deck")
+    microarticle = quoted_column(DeckCard, "microarticle")
+    sort_order = quoted_column(DeckCard, "sort_order")
+    columns = [quoted_column(DeckCard, name) for name in values]
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Les ajouts propres d'un deck hérité sont déjà rangés après les cartes
+        # du pack : l'ordre `sort_order` du pack reste valable tel quel.
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}, {deck}, {microarticle}, {sort_order}) "
+            f"SELECT {', '.join(select_sql)}, d.id, src.{microarticle}, src.{sort_order} "
+            f"FROM {table} src "
+            f"INNER JOIN {decks} d ON d.{quoted_column(Deck, 'source_pack')} = src.{deck} "
+            f"AND d.{quoted_column(Deck, 'cards_inherited')} = %s "
+            f"WHERE src.{deck} = %s AND NOT EXISTS ("
+            f"SELECT 1 FROM {exclusions} x WHERE x.{quoted_column(DeckCardExclusion, 'deck')} = d.id "
+            f"AND x.{quoted_column(DeckCardExclusion, 'microarticle')} = src.{microarticle}) "
+            f"ON CONFLICT DO NOTHING",
+            [*params, True, pack_id],
+        )
+        written = cursor.rowcount
+        DeckCardExclusion.objects.filter(deck__in=derived).delete()
+        derived.update(cards_inherited=False)
+    return written
+
+
+def adopt_legacy_copies(pack_id: int, deck_ids: list[int], changed_ids: Iterable[int] = ()) -> int:
+    """Passe en decks hérités les copies `deck_ids` de `pack_id` ; renvoie le nombre de decks.
+
+    Une copie ne recevait que les cartes du pack publiées au moment de la copie.
+    Une carte du pack absente d'une copie n'en a donc été retirée par
+    l'utilisateur que si elle était déjà dans le pack (`DeckCard.added_at`) et
+    publiée (`first_published_at`) à la création de la copie : elle devient une
+    exclusion, sauf si elle est dans `changed_ids` (cartes que le pack a gagnées
+    ou perdues depuis la dernière propagation). Les autres, ajoutées ou publiées
+    après la copie, ne sont pas exclues : la copie en hérite. Les lignes propres
+    qui doublent une carte du pack, ou qui portent une carte que le pack vient
+    de perdre, sont supprimées : restent les ajouts de l'utilisateur.
+    """
+    from wagtail.models import Page
+
+    from .models import Deck, DeckCard, DeckCardExclusion
+
+    if not deck_ids:
+        return 0
+    changed_ids = list(changed_ids)
+    table = connection.ops.quote_name(DeckCard._meta.db_table)
+    decks = connection.ops.quote_name(Deck._meta.db_table)
+    exclusions = connection.ops.quote_name(DeckCardExclusion._meta.db_table)
+    pages = connection.ops.quote_name(Page._meta.db_table)
+    deck = quoted_column(DeckCard, "deck")
+    microarticle = quoted_column(DeckCard, "microarticle")
+    excluded_at_sql, excluded_at = typed_param(DeckCardExclusion, "excluded_at", timezone.now())
+
+    changed_sql = ""
+    if changed_ids:
+        changed_sql = f"AND src.{microarticle} NOT IN ({', '.join(['%s'] * len(changed_ids))}) "
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {exclusions} ({quoted_column(DeckCardExclusion, 'deck')}, "
+            f"{quoted_column(DeckCardExclusion, 'microarticle')}, "
+            f"{quoted_column(DeckCardExclusion, 'excluded_at')}) "
+            f"SELECT d.id, src.{microarticle}, {excluded_at_sql} "
+            f"FROM {table} src INNER JOIN {decks} d ON d.id IN ({', '.join(['%s'] * len(deck_ids))}) "
+            f"INNER JOIN {pages} p ON p.id = src.{microarticle} "
+            f"WHERE src.{deck} = %s {changed_sql}"
+            f"AND src.{quoted_column(DeckCard, 'added_at')} <= d.{quoted_column(Deck, 'created_at')} "
+            f"AND p.{quoted_column(Page, 'first_published_at')} <= d.{quoted_column(Deck, 'created_at')} "
+            f"AND NOT EXISTS ("
+            f"SELECT 1 FROM {table} own WHERE own.{deck} = d.id "
+            f"AND own.{microarticle} = src.{microarticle}) "
+            f"ON CONFLICT DO NOTHING",
+            [excluded_at, *deck_ids, pack_id, *changed_ids],
+        )
+        # DELETE brut : `QuerySet.delete()` enverrait un signal par ligne.
+        dropped_sql = f"OR {microarticle} IN ({', '.join(['%s'] * len(changed_ids))})" if changed_ids else ""
+        cursor.execute(
+            f"DELETE FROM {table} WHERE {deck} IN ({', '.join(['%s'] * len(deck_ids))}) "
+            f"AND ({microarticle} IN (SELECT {microarticle} FROM {table} WHERE {deck} = %s) {dropped_sql})",
+            [*deck_ids, pack_id, *changed_ids],
+        )
+        Deck.objects.filter(pk__in=deck_ids).update(cards_inherited=True)
+    return len(deck_ids)
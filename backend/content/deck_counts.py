@@ -0,0 +1,79 @@
+"""Compteur dénormalisé des cartes visibles d'un deck (`Deck.live_cards_count`).
+
+Les listes de decks et les payloads de progression lisent cette colonne au lieu
+de compter, pour chaque deck, ses `DeckCard` dont la fiche est live et publique.
+Comme `content.memberships`, le compteur n'est pas incrémenté : il est recalculé
+depuis `DeckCard` pour les seuls decks touchés, en un `UPDATE` quel que soit
+leur nombre. Un appel en trop ne fausse rien.
+
+Deux sources de changement :
+- les écritures sur les cartes d'un deck : ajouts unitaires par `post_save`,
+  écritures groupées et retraits par appel explicite (`deck_cards_changed`
+  pour les decks utilisateur, `pack_cards_changed` pour un pack et les decks
+  qui en héritent) ;
+- la visibilité d'une fiche (publication, dépublication, suppression,
+  déplacement, restriction d'accès), propagée à tous les decks qui la
+  contiennent par `content.signals`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from django.db.models import Case, Count, Exists, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+
+def sync_deck_card_counts(decks) -> int:
+    """Recalcule `live_cards_count` des `decks` (queryset de `Deck` ou ids)."""
+    from .models import Deck, DeckCard, DeckCardExclusion, MicroArticlePage
+
+    if not hasattr(decks, "model"):
+        decks = Deck.objects.filter(pk__in=list(decks))
+
+    def live(deck_ref, *filters):
+        rows = (
+            DeckCard.objects.filter(
+                *filters,
+                deck_id=deck_ref,
+                microarticle_id__in=MicroArticlePage.objects.live().public().values("id"),
+            )
+            .order_by()
+            .values("deck_id")
+            .annotate(n=Count("id"))
+            .values("n")
+        )
+        return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+    # Deck hérité (`content.deck_overlay`) : cartes du pack non exclues, plus
+    # les siennes ; les deux ensembles sont disjoints.
+    not_excluded = ~Exists(
+        DeckCardExclusion.objects.filter(
+            deck_id=OuterRef(OuterRef("pk")), microarticle_id=OuterRef("microarticle_id")
+        )
+    )
+    inherited = Case(
+        When(cards_inherited=True, then=live(OuterRef("source_pack_id"), not_excluded)),
+        default=Value(0),
+    )
+    return Deck.objects.filter(pk__in=decks.values("pk")).update(
+        live_cards_count=live(OuterRef("pk")) + inherited
+    )
+
+
+def decks_containing(page_ids: Iterable[int]):
+    """Decks (tous types, héritiers de pack compris) qui contiennent au moins une des fiches `page_ids`."""
+    from .models import Deck
+
+    return Deck.objects.filter(
+        Q(deck_cards__microarticle_id__in=page_ids)
+        | Q(cards_inherited=True, source_pack__deck_cards__microarticle_id__in=page_ids)
+    )
+
+
+def page_visibility_changed(page) -> int:
+    """Recalcule les decks touchés par un changement de visibilité de `page` et de sa descendance."""
+    from .models import MicroArticlePage
+
+    pages = MicroArticlePage.objects.descendant_of(page, inclusive=True).values("id")
+    return sync_deck_card_counts(decks_containing(pages))
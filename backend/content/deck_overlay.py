@@ -0,0 +1,190 @@
+"""Decks utilisateur copiés d'un pack sans recopier ses cartes (copy-on-write).
+
+`copy-to-user/` ne duplique plus les `DeckCard` du pack : le deck créé est marqué
+`cards_inherited` et lit la liste de son `source_pack`. Seul l'écart de
+l'utilisateur est stocké :
+- ajout : un `DeckCard` du deck lui-même, rangé après les cartes du pack ;
+- retrait d'une carte du pack : une `DeckCardExclusion` ;
+- remise d'une carte retirée : l'exclusion est supprimée.
+
+Une carte du pack n'a jamais de `DeckCard` propre dans un deck hérité
+(`content.pack_sync.pack_cards_changed` supprime le doublon quand le pack la
+gagne après coup) : les deux sources sont disjointes, un compte est une somme.
+
+Les decks copiés avant ce mécanisme gardent leurs lignes (`cards_inherited`
+faux) et se lisent comme tout deck, jusqu'au premier changement de leur pack :
+`content.pack_sync` les reprend alors en decks hérités. Avant la suppression
+d'un pack, ses decks hérités sont recopiés en lignes
+(`content.deck_copy.materialize_inherited_decks`).
+
+Ordre d'un deck hérité : cartes du pack dans l'ordre du pack, puis ajouts.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from django.db import models
+from django.db.models import Case, IntegerField, Q, Value, When
+
+
+def _inherited_q(deck_id: int, pack_id: int) -> Q:
+    from .models import DeckCardExclusion
+
+    excluded = DeckCardExclusion.objects.filter(deck_id=deck_id).values("microarticle_id")
+    return Q(deck_id=pack_id) & ~Q(microarticle_id__in=excluded)
+
+
+def _inherits(deck) -> bool:
+    return bool(deck.cards_inherited and deck.source_pack_id)
+
+
+def deck_cards(deck):
+    """`DeckCard` visibles dans `deck` (propres et hérités), dans l'ordre du deck."""
+    from .models import Deck, DeckCard
+
+    if _inherits(deck):
+        own_last = Case(When(deck_id=deck.id, then=Value(1)), default=Value(0), output_field=IntegerField())
+        return (
+            DeckCard.objects.filter(Q(deck_id=deck.id) | _inherited_q(deck.id, deck.source_pack_id))
+            .alias(own_last=own_last)
+            .order_by("own_last", "sort_order", "id")
+        )
+    qs = DeckCard.objects.filter(deck_id=deck.id)
+    if deck.type == Deck.DeckType.OFFICIAL or deck.source_pack_id:
+        return qs.order_by("sort_order", "id")
+    return qs.order_by("-added_at")
+
+
+def deck_card_ids(deck) -> list[int]:
+    return list(deck_cards(deck).values_list("microarticle_id", flat=True))
+
+
+def cards_of_decks(decks):
+    """`DeckCard` visibles dans les decks du queryset `decks`, sans ordre ni dédoublonnage.
+
+    Une requête pour lister les decks hérités, dont chacun ajoute un terme au filtre.
+    """
+    from .models import DeckCard
+
+    q = Q(deck__in=decks)
+    for deck_id, pack_id in decks.filter(cards_inherited=True, source_pack__isnull=False).values_list(
+        "id", "source_pack_id"
+    ):
+        q |= _inherited_q(deck_id, pack_id)
+    return DeckCard.objects.filter(q)
+
+
+def user_deck_pairs(user_id: int, microarticle_ids: Iterable[int] | None = None) -> set[tuple[int, int]]:
+    """Couples `(deck_id, microarticle_id)` des decks utilisateur de `user_id`."""
+    return {(deck_id, mid) for _, deck_id, mid in users_deck_pairs([user_id], microarticle_ids)}
+
+
+def users_deck_pairs(
+    user_ids: Iterable[int], microarticle_ids: Iterable[int] | None = None
+) -> set[tuple[int, int, int]]:
+    """Triplets `(user_id, deck_id, microarticle_id)` des decks utilisateur de `user_ids`.
+
+    Au plus quatre requêtes quel que soit le nombre d'utilisateurs : lignes
+    propres, decks hérités, cartes de leurs packs, exclusions.
+    """
+    from .models import Deck, DeckCard, DeckCardExclusion
+
+    user_ids = list(user_ids)
+    own = DeckCard.objects.filter(deck__user_id__in=user_ids, deck__type=Deck.DeckType.USER)
+    inherited = Deck.objects.filter(
+        user_id__in=user_ids, type=Deck.DeckType.USER, cards_inherited=True, source_pack__isnull=False
+    )
+    if microarticle_ids is not None:
+        microarticle_ids = list(microarticle_ids)
+        own = own.filter(microarticle_id__in=microarticle_ids)
+
+    triples = set(own.values_list("deck__user_id", "deck_id", "microarticle_id"))
+    owner_and_pack_by_deck_id = {
+        deck_id: (user_id, pack_id)
+        for deck_id, user_id, pack_id in inherited.values_list("id", "user_id", "source_pack_id")
+    }
+    if not owner_and_pack_by_deck_id:
+        return triples
+
+    pack_ids = {pack_id for _, pack_id in owner_and_pack_by_deck_id.values()}
+    pack_cards = DeckCard.objects.filter(deck_id__in=pack_ids)
+    exclusions = DeckCardExclusion.objects.filter(deck_id__in=list(owner_and_pack_by_deck_id))
+    if microarticle_ids is not None:
+        pack_cards = pack_cards.filter(microarticle_id__in=microarticle_ids)
+        exclusions = exclusions.filter(microarticle_id__in=microarticle_ids)
+
+    cards_by_pack_id: dict[int, set[int]] = {}
+    for pack_id, microarticle_id in pack_cards.values_list("deck_id", "microarticle_id"):
+        cards_by_pack_id.setdefault(pack_id, set()).add(microarticle_id)
+    excluded = set(exclusions.values_list("deck_id", "microarticle_id"))
+    for deck_id, (user_id, pack_id) in owner_and_pack_by_deck_id.items():
+        for microarticle_id in cards_by_pack_id.get(pack_id, ()):
+            if (deck_id, microarticle_id) not in excluded:
+                triples.add((user_id, deck_id, microarticle_id))
+    return triples
+
+
+def next_sort_order(deck) -> int:
+    """Position d'une carte ajoutée en fin de `deck` (après les cartes héritées)."""
+    max_sort = deck_cards(deck).order_by().aggregate(models.Max("sort_order")).get("sort_order__max")
+    return int(max_sort) + 1 if max_sort is not None else 0
+
+
+def add_cards(deck, microarticle_ids: Iterable[int]) -> list[int]:
+    """Ajoute à `deck` celles des fiches qui n'y sont pas ; renvoie les fiches ajoutées.
+
+    Dans un deck hérité, une carte du pack est remise (exclusion supprimée)
+    plutôt que dupliquée. Un deck issu d'un pack range les ajouts à la fin.
+    """
+    from .models import DeckCard, DeckCardExclusion
+
+    ids = list(dict.fromkeys(microarticle_ids))
+    present = set(deck_cards(deck).filter(microarticle_id__in=ids).values_list("microarticle_id", flat=True))
+    to_add = [mid for mid in ids if mid not in present]
+    if not to_add:
+        return []
+
+    restored: set[int] = set()
+    if _inherits(deck):
+        restored = set(
+            DeckCard.objects.filter(deck_id=deck.source_pack_id, microarticle_id__in=to_add).values_list(
+                "microarticle_id", flat=True
+            )
+        )
+        if restored:
+            DeckCardExclusion.objects.filter(deck_id=deck.id, microarticle_id__in=restored).delete()
+
+    next_sort = next_sort_order(deck) if deck.source_pack_id else None
+    objs = []
+    for mid in to_add:
+        if mid in restored:
+            continue
+        obj = DeckCard(deck_id=deck.id, microarticle_id=mid)
+        if next_sort is not None:
+            obj.sort_order = next_sort
+            next_sort += 1
+        objs.append(obj)
+    if objs:
+        DeckCard.objects.bulk_create(objs)
+    return to_add
+
+
+def remove_cards(deck, microarticle_ids: Iterable[int]) -> list[int]:
+    """Retire de `deck` les fiches `microarticle_ids` ; renvoie celles qui y étaient."""
+    from .models import DeckCard, DeckCardExclusion
+
+    ids = list(dict.fromkeys(microarticle_ids))
+    present = set(deck_cards(deck).filter(microarticle_id__in=ids).values_list("microarticle_id", flat=True))
+    if not present:
+        return []
+    own = DeckCard.objects.filter(deck_id=deck.id, microarticle_id__in=present)
+    if _inherits(deck):
+        # Les deux sources sont disjointes : ce qui n'est pas propre vient du pack.
+        inherited = present - set(own.values_list("microarticle_id", flat=True))
+        DeckCardExclusion.objects.bulk_create(
+            [DeckCardExclusion(deck_id=deck.id, microarticle_id=mid) for mid in inherited],
+            ignore_conflicts=True,
+        )
+    own.delete()
+    return [mid for mid in ids if mid in present]
@@ -0,0 +1,267 @@
+"""Export et import en flux des cartes d'un deck (JSON, CSV, texte Anki).
+
+Export : les cartes visibles du deck (`content.deck_overlay.deck_cards`) sont
+lues par `QuerySet.iterator(chunk_size=…)`, un curseur côté serveur sous
+Postgres, et chaque ligne part dans la réponse (`StreamingHttpResponse`) dès
+qu'elle est formatée. La mémoire ne dépend pas de la taille du deck.
+
+Import : le fichier téléversé est lu au fil de l'eau (ligne à ligne, ou objet par
+objet pour le JSON). Les fiches citées sont résolues puis ajoutées par tranches
+de `IMPORT_CHUNK_SIZE`, une transaction par tranche.
+
+Anki : pas de `.apkg`, qui est une base SQLite zippée qu'il faudrait construire
+entière avant l'envoi. L'export produit le fichier texte qu'Anki importe tel
+quel (Fichier › Importer, 2.1.55+), avec ses en-têtes `#separator`, `#html`,
+`#notetype`, `#deck`, `#guid column` et `#tags column`. Le guid
+(`pharmapocket:<id>`) permet de réimporter ce fichier ici.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import re
+from collections.abc import Iterable, Iterator
+
+from django.db import transaction
+
+from .deck_overlay import add_cards, deck_cards
+from .memberships import deck_cards_changed
+from .visibility import live_public_ids
+
+EXPORT_FORMATS = ("json", "csv", "anki")
+EXPORT_CHUNK_SIZE = 500
+IMPORT_CHUNK_SIZE = 500
+
+CSV_COLUMNS = [
+    "id",
+    "slug",
+    "title",
+    "answer_express",
+    "takeaway",
+    "tags",
+    "position",
+    "is_optional",
+    "notes",
+]
+ANKI_GUID_PREFIX = "pharmapocket:"
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv; charset=utf-8",
+    "anki": "text/plain; charset=utf-8",
+}
+EXTENSIONS = {"json": "json", "csv": "csv", "anki": "txt"}
+
+
+class _Echo:
+    """Tampon de `csv.writer` qui rend la ligne au lieu de la garder."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _card_rows(deck) -> Iterator[dict]:
+    visible = live_public_ids()
+    rows = (
+        deck_cards(deck)
+        .select_related("microarticle")
+        .prefetch_related("microarticle__tags")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    position = 0
+    for row in rows:
+        if row.microarticle_id not in visible:
+            continue
+        page = row.microarticle
+        yield {
+            "id": page.id,
+            "slug": page.slug,
+            "title": page.title,
+            "answer_express": page.answer_express,
+            "takeaway": page.takeaway,
+            "tags": sorted(tag.name for tag in page.tags.all()),
+            "position": position,
+            "is_optional": bool(row.is_optional),
+            "notes": row.notes,
+        }
+        position += 1
+
+
+def _export_json(deck) -> Iterator[str]:
+    header = {"id": deck.id, "name": deck.name, "description": deck.description, "type": deck.type}
+    # Une carte par ligne : l'import relit le fichier sans le charger entier.
+    yield '{"deck": ' + json.dumps(header, ensure_ascii=False) + ', "cards": ['
+    separator = "\n"
+    for card in _card_rows(deck):
+        yield separator + json.dumps(card, ensure_ascii=False)
+        separator = ",\n"
+    yield "\n]}\n"
+
+
+def _export_csv(deck) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for card in _card_rows(deck):
+        card["tags"] = ", ".join(card["tags"])
+        yield writer.writerow([card[column] for column in CSV_COLUMNS])
+
+
+def _export_anki(deck) -> Iterator[str]:
+    deck_name = " ".join(deck.name.split())
+    yield (
+        "#separator:tab\n#html:true\n#notetype:Basic\n"
+        f"#deck:{deck_name}\n#guid column:1\n#tags column:4\n"
+    )
+    writer = csv.writer(_Echo(), delimiter="\t", lineterminator="\n")
+    for card in _card_rows(deck):
+        back = card["answer_express"]
+        if card["takeaway"]:
+            back = f"{back}<hr>{card['takeaway']}" if back else card["takeaway"]
+        # Anki sépare les tags par des espaces.
+        tags = " ".join("_".join(tag.split()) for tag in card["tags"])
+        yield writer.writerow([f"{ANKI_GUID_PREFIX}{card['id']}", card["title"], back, tags])
+
+
+def export_deck(deck, fmt: str) -> Iterator[str]:
+    """Morceaux de texte du fichier `fmt` (voir `EXPORT_FORMATS`) pour `deck`."""
+    return {"json": _export_json, "csv": _export_csv, "anki": _export_anki}[fmt](deck)
+
+
+def _reference(value) -> int | str | None:
+    """Id (entier) ou slug (texte) d'une fiche citée dans un fichier importé."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value if value > 0 else None
+    value = str(value or "").strip()
+    if value.startswith(ANKI_GUID_PREFIX):
+        value = value[len(ANKI_GUID_PREFIX) :]
+    if value.isdigit():
+        return int(value) or None
+    return value or None
+
+
+_JSON_CARDS_START = re.compile(r'"cards"\s*:\s*\[')
+_JSON_READ_SIZE = 64 * 1024
+
+
+def _json_refs(text: io.TextIOBase) -> Iterator[int | str | None]:
+    # Décodage incrémental du tableau `cards` : un objet à la fois, le tampon
+    # ne garde que le texte pas encore décodé. Un fichier sans tableau `cards`,
+    # ou dont le tableau est illisible ou tronqué, lève `ValueError`.
+    decoder = json.JSONDecoder()
+    buffer, started = "", False
+    while True:
+        chunk = text.read(_JSON_READ_SIZE)
+        buffer += chunk
+        if not started:
+            match = _JSON_CARDS_START.search(buffer)
+            if match is None:
+                if not chunk:
+                    raise ValueError("no `cards` array in the JSON file")
+                continue
+            buffer, started = buffer[match.end() :], True
+        while True:
+            buffer = buffer.lstrip().lstrip(",").lstrip()
+            if not buffer or buffer.startswith("]"):
+                break
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if not chunk:
+                    raise
+                # Objet coupé en fin de tampon : la suite arrive au prochain bloc.
+                break
+            if end == len(buffer) and chunk:
+                # Un nombre coupé en fin de tampon se décoderait tronqué.
+                break
+            buffer = buffer[end:]
+            if isinstance(item, dict):
+                yield _reference(item.get("id") or item.get("slug"))
+            else:
+                yield _reference(item)
+        if buffer.startswith("]"):
+            return
+        if not chunk:
+            raise ValueError("unterminated `cards` array in the JSON file")
+
+
+def _csv_refs(text: io.TextIOBase) -> Iterator[int | str | None]:
+    for row in csv.DictReader(text):
+        yield _reference(row.get("id") or row.get("slug"))
+
+
+def _anki_refs(text: io.TextIOBase) -> Iterator[int | str | None]:
+    separator, guid_column = "\t", None
+    separators = {"tab": "\t", "comma": ",", "semicolon": ";", "pipe": "|", "space": " "}
+    lines = iter(text)
+    for line in lines:
+        if not line.startswith("#"):
+            lines = _prepend(line, lines)
+            break
+        key, _, value = line[1:].strip().partition(":")
+        if key == "separator":
+            separator = separators.get(value.lower(), value[:1] or "\t")
+        elif key == "guid column" and value.isdigit():
+            guid_column = int(value) - 1
+    if guid_column is None:
+        # Sans colonne guid, rien ne relie une note à une fiche.
+        for _ in lines:
+            yield None
+        return
+    for row in csv.reader(lines, delimiter=separator):
+        yield _reference(row[guid_column]) if len(row) > guid_column else None
+
+
+def _prepend(first: str, rest: Iterator[str]) -> Iterator[str]:
+    yield first
+    yield from rest
+
+
+def import_refs(upload, fmt: str) -> Iterator[int | str | None]:
+    """Fiches citées par le fichier téléversé, dans l'ordre ; `None` pour une ligne illisible.
+
+    Un fichier illisible dans son ensemble (encodage, JSON invalide) lève `ValueError`
+    ou `csv.Error` pendant l'itération.
+    """
+    raw = upload.file if hasattr(upload, "file") else upload
+    text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+    return {"json": _json_refs, "csv": _csv_refs, "anki": _anki_refs}[fmt](text)
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_cards(deck, refs: Iterable[int | str | None], *, chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """Ajoute à `deck` (deck utilisateur) les fiches `refs` ; renvoie les compteurs du bulk-add."""
+    from .models import MicroArticlePage
+
+    visible = live_public_ids()
+    added = already = not_found = 0
+    for chunk in _chunks(refs, chunk_size):
+        slugs = {ref for ref in chunk if isinstance(ref, str)}
+        id_by_slug = {}
+        if slugs:
+            id_by_slug = dict(MicroArticlePage.objects.filter(slug__in=slugs).values_list("slug", "id"))
+        ids = []
+        for ref in chunk:
+            page_id = id_by_slug.get(ref) if isinstance(ref, str) else ref
+            if page_id is None or page_id not in visible:
+                not_found += 1
+            else:
+                ids.append(page_id)
+        with transaction.atomic():
+            new_ids = add_cards(deck, ids)
+            if new_ids:
+                deck_cards_changed(deck.user_id, new_ids, deck_ids=[deck.id])
+        added += len(new_ids)
+        already += len(ids) - len(new_ids)
+    return {"added": added, "already_present": already, "not_found": not_found}
@@ -43,6 +43,7 @@ from .models import (
     Subject,
     SubjectCard,
 )
+from .sort_keys import next_sort_key
 
 # Clés acceptées à la racine d'une carte. Toute autre clé est ignorée avec un
 # avertissement : c'est le signal le plus utile quand le LLM invente un champ.
@@ -890,12 +891,11 @@ def _import_one(
                 label = _clean_str(subject_payload.get("label"))[:120]
                 link = SubjectCard.objects.filter(subject=subject, microarticle=page).first()
                 if link is None:
-                    last = SubjectCard.objects.filter(subject=subject).order_by("-sort_order").first()
                     SubjectCard.objects.create(
                         subject=subject,
                         microarticle=page,
                         label=label,
-                        sort_order=(last.sort_order + 1) if last else 0,
+                        sort_order=next_sort_key(SubjectCard.objects.filter(subject=subject)),
                     )
                 elif link.label != label:
                     # Réimport : le libellé peut changer, pas la position.
@@ -0,0 +1,67 @@
+"""Réespace les clés d'ordre des cartes de packs et de sujets qui n'ont plus d'écart.
+
+    python manage.py respace_sort_keys
+    python manage.py respace_sort_keys --min-gap 16 --every 3600
+
+Un déplacement (`cards/move/`) prend la clé médiane entre deux voisines ; à
+force de déplacements au même endroit, l'écart s'épuise et la requête suivante
+doit réespacer la liste entière. Ce passage le fait en tâche de fond pour les
+listes dont un écart est sous `--min-gap`, et pour celles écrites avant
+l'espacement (clés 0, 1, 2… ou nulles). Voir `content.sort_keys`. L'ordre des
+cartes ne change pas : relancer est sans risque.
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from content.models import Deck, DeckCard, SubjectCard
+from content.sort_keys import SORT_MIN_GAP, respace_tight_lists
+
+
+class Command(BaseCommand):
+    help = "Réespace les clés d'ordre (sort_order) des packs et sujets dont les écarts sont épuisés."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-gap",
+            type=int,
+            default=SORT_MIN_GAP,
+            help=f"Écart en dessous duquel une liste est réespacée (défaut {SORT_MIN_GAP}).",
+        )
+        parser.add_argument(
+            "--every",
+            type=float,
+            default=None,
+            help="Tourne en boucle et repasse toutes les N secondes.",
+        )
+
+    def handle(self, *args, **options):
+        if options["min_gap"] < 2:
+            raise CommandError("--min-gap doit valoir au moins 2.")
+        if options["every"] is not None and options["every"] <= 0:
+            raise CommandError("--every doit être positif.")
+
+        while True:
+            self._run_once(options["min_gap"])
+            if options["every"] is None:
+                return
+            time.sleep(options["every"])
+
+    def _run_once(self, min_gap: int) -> None:
+        started = time.perf_counter()
+        packs, pack_rows = respace_tight_lists(
+            DeckCard.objects.filter(deck__type=Deck.DeckType.OFFICIAL), "deck", min_gap=min_gap
+        )
+        subjects, subject_rows = respace_tight_lists(SubjectCard.objects.all(), "subject", min_gap=min_gap)
+        if not packs and not subjects:
+            self.stdout.write("Aucune liste à réespacer.")
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{packs:,} packs ({pack_rows:,} cartes) et {subjects:,} sujets ({subject_rows:,} cartes) "
+                f"réespacés en {time.perf_counter() - started:.1f} s."
+            )
+        )
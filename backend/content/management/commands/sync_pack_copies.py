@@ -0,0 +1,68 @@
+"""Propage aux copies utilisateur les cartes ajoutées ou retirées des packs.
+
+    python manage.py sync_pack_copies
+    python manage.py sync_pack_copies --batch-size 200 --every 30
+
+Vide la file `PendingPackChange` remplie par les écritures sur les packs
+(back-office, bulk-add Wagtail, édition du snippet) ; voir `content.pack_sync`.
+Sans `--every`, un seul passage (cron) ; avec, la commande tourne en worker et
+repasse toutes les `--every` secondes. Relancer est sans risque : une carte
+n'est retirée de la file qu'une fois propagée.
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from content.pack_sync import PACK_SYNC_BATCH_SIZE, sync_pending_packs
+
+
+class Command(BaseCommand):
+    help = "Propage les changements de cartes des packs officiels à leurs copies utilisateur."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=PACK_SYNC_BATCH_SIZE,
+            help=f"Utilisateurs par transaction (défaut {PACK_SYNC_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--every",
+            type=float,
+            default=None,
+            help="Tourne en boucle et repasse toutes les N secondes.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size doit être positif.")
+        if options["every"] is not None and options["every"] <= 0:
+            raise CommandError("--every doit être positif.")
+
+        while True:
+            self._run_once(options["batch_size"])
+            if options["every"] is None:
+                return
+            time.sleep(options["every"])
+
+    def _run_once(self, batch_size: int) -> None:
+        report = sync_pending_packs(
+            batch_size=batch_size,
+            progress=lambda pack_id, r: self.stdout.write(
+                f"  pack {pack_id} : {r.decks:,} decks, {r.adopted:,} anciennes copies reprises, "
+                f"{r.users:,} utilisateurs ({r.elapsed:.1f} s)"
+            ),
+        )
+        if not report.packs:
+            self.stdout.write("Aucun changement de pack en attente.")
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report.packs:,} packs propagés à {report.decks:,} decks "
+                f"({report.adopted:,} anciennes copies reprises, {report.users:,} utilisateurs) "
+                f"en {report.elapsed:.1f} s, {report.decks_per_second:,.0f} decks/s."
+            )
+        )
@@ -0,0 +1,136 @@
+"""Appartenance dénormalisée carte ↔ decks d'un utilisateur (`UserCardMembership`).
+
+Toute écriture sur les cartes d'un deck utilisateur (ajout, retrait, ajout
+groupé, copie de pack, suppression de deck) doit finir par
+`deck_cards_changed(user_id, microarticle_ids)`, et toute écriture sur les
+cartes d'un pack par `content.pack_sync.pack_cards_changed` (copies du pack,
+voir `content.deck_overlay`). Les compteurs ne sont pas incrémentés à la
+volée : ils sont recalculés depuis `DeckCard` et les exclusions pour les seules
+cartes touchées, en un nombre fixe de requêtes quel que soit leur nombre. Deux requêtes
+concurrentes convergent donc vers la même valeur, et un appel en trop ne coûte
+rien de plus qu'un appel utile. Le compteur de cartes visibles des seuls decks
+touchés (`content.deck_counts`) est recalculé dans la foulée, et la carte
+« fiche → decks » mémorisée de l'utilisateur (`card_deck_ids`) est effacée.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+
+from learning.counts import invalidate_srs_counts
+
+from .deck_counts import decks_containing, sync_deck_card_counts
+from .deck_overlay import user_deck_pairs, users_deck_pairs
+
+CARD_DECKS_CACHE_PREFIX = "content:card-decks:v1"
+CARD_DECKS_CACHE_TTL = 60 * 60 * 24
+
+
+def _card_decks_key(user_id: int) -> str:
+    return f"{CARD_DECKS_CACHE_PREFIX}:{user_id}"
+
+
+def sync_card_memberships(user_id: int, microarticle_ids: Iterable[int] | None = None) -> None:
+    """Recalcule les lignes de `user_id` pour `microarticle_ids` (toutes si `None`)."""
+    sync_users_card_memberships([user_id], microarticle_ids)
+
+
+def sync_users_card_memberships(
+    user_ids: Iterable[int], microarticle_ids: Iterable[int] | None = None
+) -> None:
+    """Comme `sync_card_memberships`, pour plusieurs utilisateurs à la fois.
+
+    Le nombre de requêtes ne dépend ni du nombre d'utilisateurs ni du nombre
+    de cartes : les appelants découpent en lots pour borner la transaction.
+    """
+    from .models import UserCardMembership
+
+    user_ids = list(user_ids)
+    rows = UserCardMembership.objects.filter(user_id__in=user_ids)
+    if microarticle_ids is not None:
+        microarticle_ids = set(microarticle_ids)
+        if not microarticle_ids:
+            return
+        rows = rows.filter(microarticle_id__in=microarticle_ids)
+
+    # Cartes propres et cartes héritées d'un pack (`content.deck_overlay`).
+    counts = Counter((user_id, mid) for user_id, _, mid in users_deck_pairs(user_ids, microarticle_ids))
+
+    with transaction.atomic():
+        stale = [
+            pk
+            for pk, user_id, microarticle_id in rows.values_list("pk", "user_id", "microarticle_id")
+            if (user_id, microarticle_id) not in counts
+        ]
+        if stale:
+            UserCardMembership.objects.filter(pk__in=stale).delete()
+        UserCardMembership.objects.bulk_create(
+            [
+                UserCardMembership(user_id=user_id, microarticle_id=microarticle_id, deck_count=n)
+                for (user_id, microarticle_id), n in counts.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["user", "microarticle"],
+            update_fields=["deck_count"],
+        )
+
+
+def card_deck_ids(user_id: int) -> dict[int, list[int]]:
+    """Ids des decks utilisateur de `user_id` contenant chaque fiche, par fiche.
+
+    Une seule lecture des decks de l'utilisateur (`user_deck_pairs`), puis
+    mémorisée jusqu'à la prochaine écriture (`deck_cards_changed`).
+    """
+    key = _card_decks_key(user_id)
+    decks = cache.get(key)
+    if decks is None:
+        decks = {}
+        for deck_id, microarticle_id in sorted(user_deck_pairs(user_id)):
+            decks.setdefault(microarticle_id, []).append(deck_id)
+        cache.set(key, decks, CARD_DECKS_CACHE_TTL)
+    return decks
+
+
+def invalidate_card_decks(*user_ids: int) -> None:
+    """Efface la carte « fiche → decks » des utilisateurs donnés, puis de nouveau au commit.
+
+    Une lecture concurrente d'avant le commit la remettrait en cache depuis les
+    lignes d'avant l'écriture, pour toute la durée de `CARD_DECKS_CACHE_TTL`.
+    """
+    if user_ids:
+        keys = [_card_decks_key(user_id) for user_id in user_ids]
+        cache.delete_many(keys)
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def deck_cards_changed(
+    user_id: int,
+    microarticle_ids: Iterable[int] | None = None,
+    *,
+    deck_ids: Iterable[int] | None = None,
+) -> None:
+    """À appeler après une écriture sur les cartes des decks de `user_id`.
+
+    Seuls les decks `deck_ids` sont recomptés. Sans `deck_ids`, ce sont les
+    decks utilisateur qui contiennent encore une des fiches `microarticle_ids`
+    (tous si `None`) : un retrait doit donc nommer ses decks.
+    """
+    from .models import Deck
+
+    if microarticle_ids is not None:
+        microarticle_ids = list(microarticle_ids)
+    sync_card_memberships(user_id, microarticle_ids)
+    invalidate_card_decks(user_id)
+    if deck_ids is None:
+        decks = Deck.objects.filter(user_id=user_id, type=Deck.DeckType.USER)
+        if microarticle_ids is not None:
+            decks = decks.filter(pk__in=decks_containing(microarticle_ids).values("pk"))
+        sync_deck_card_counts(decks)
+    elif deck_ids := list(deck_ids):
+        sync_deck_card_counts(deck_ids)
+    invalidate_srs_counts(user_id)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0031_alter_pathologythumboverride_accent_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deck',
+            name='srs_scheduler',
+            field=models.CharField(blank=True, choices=[('leitner', 'Leitner'), ('sm2', 'SM-2')], default='', help_text="Algorithme de révision des cartes revues depuis ce deck. Vide : celui de l'utilisateur.", max_length=16),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0032_deck_srs_scheduler'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCardMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('deck_count', models.PositiveIntegerField(default=0)),
+                ('microarticle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_memberships', to='content.microarticlepage')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='card_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'microarticle'), name='uniq_user_card_membership')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+"""Amorce `UserCardMembership` à partir des `DeckCard` des decks utilisateur.
+
+Une ligne par (utilisateur, carte), `deck_count` étant le nombre de decks de
+l'utilisateur qui contiennent la carte. Ensuite, la table est tenue à jour par
+`content.memberships`.
+"""
+
+from django.db import migrations
+from django.db.models import Count
+
+BATCH_SIZE = 2000
+
+
+def backfill_memberships(apps, schema_editor):
+    DeckCard = apps.get_model("content", "DeckCard")
+    UserCardMembership = apps.get_model("content", "UserCardMembership")
+
+    rows = (
+        DeckCard.objects.filter(deck__type="user", deck__user__isnull=False)
+        .values_list("deck__user_id", "microarticle_id")
+        .annotate(deck_count=Count("id"))
+        .order_by("deck__user_id", "microarticle_id")
+    )
+
+    batch = []
+    for user_id, microarticle_id, deck_count in rows.iterator():
+        batch.append(
+            UserCardMembership(user_id=user_id, microarticle_id=microarticle_id, deck_count=deck_count)
+        )
+        if len(batch) >= BATCH_SIZE:
+            UserCardMembership.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        UserCardMembership.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0033_usercardmembership"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_memberships, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+"""Ajoute `Deck.live_cards_count` et l'amorce depuis `DeckCard`.
+
+Une fiche compte si elle est live et qu'aucune restriction d'accès ne porte sur
+elle ou l'un de ses ancêtres (équivalent de `live().public()`). Ensuite, la
+colonne est tenue à jour par `content.deck_counts`.
+"""
+
+from collections import Counter
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def backfill_live_cards_count(apps, schema_editor):
+    Deck = apps.get_model("content", "Deck")
+    DeckCard = apps.get_model("content", "DeckCard")
+    MicroArticlePage = apps.get_model("content", "MicroArticlePage")
+    PageViewRestriction = apps.get_model("wagtailcore", "PageViewRestriction")
+
+    restricted = tuple(PageViewRestriction.objects.values_list("page__path", flat=True))
+    visible = {
+        page_id
+        for page_id, path in MicroArticlePage.objects.filter(live=True).values_list("id", "path")
+        if not path.startswith(restricted)
+    }
+
+    counts = Counter(
+        deck_id
+        for deck_id, microarticle_id in DeckCard.objects.values_list("deck_id", "microarticle_id").iterator()
+        if microarticle_id in visible
+    )
+    decks = [Deck(id=deck_id, live_cards_count=n) for deck_id, n in counts.items()]
+    Deck.objects.bulk_update(decks, ["live_cards_count"], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0034_backfill_usercardmembership"),
+        ("wagtailcore", "0096_referenceindex_referenceindex_source_object_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="deck",
+            name="live_cards_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_live_cards_count, migrations.RunPython.noop),
+    ]
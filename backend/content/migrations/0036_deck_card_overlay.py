@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-19 01:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0035_deck_live_cards_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deck',
+            name='cards_inherited',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.CreateModel(
+            name='DeckCardExclusion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('excluded_at', models.DateTimeField(auto_now_add=True)),
+                ('deck', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='card_exclusions', to='content.deck')),
+                ('microarticle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deck_exclusions', to='content.microarticlepage')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('deck', 'microarticle'), name='uniq_deck_card_exclusion')],
+            },
+        ),
+    ]
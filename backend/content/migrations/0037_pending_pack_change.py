@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 02:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0036_deck_card_overlay'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingPackChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('microarticle_id', models.PositiveIntegerField()),
+                ('queued_at', models.DateTimeField(auto_now_add=True)),
+                ('pack', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_changes', to='content.deck')),
+            ],
+        ),
+    ]
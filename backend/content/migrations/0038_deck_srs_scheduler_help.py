@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 03:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0037_pending_pack_change'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='deck',
+            name='srs_scheduler',
+            field=models.CharField(blank=True, choices=[('leitner', 'Leitner'), ('sm2', 'SM-2')], default='', help_text="Algorithme de révision des cartes du deck, sauf celles d'un deck mieux classé qui en impose un autre. Vide : celui de l'utilisateur.", max_length=16),
+        ),
+    ]
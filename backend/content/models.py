@@ -29,6 +29,8 @@ from wagtail.snippets.models import register_snippet
 from wagtail.snippets.widgets import AdminSnippetChooser
 from wagtail.admin.widgets import AdminPageChooser
 
+from learning.srs import SCHEDULER_CHOICES
+
 from .blocks import ImageWithCaptionBlock, LandingCardBlock, LandingStepBlock, Mechanism3StepsBlock, ReferenceBlock
 from .forms import CategoryNodeForm
 from .serializers import MicroArticleCardField
@@ -950,6 +952,23 @@ class Deck(ClusterableModel):
         on_delete=models.SET_NULL,
         related_name="copied_user_decks",
     )
+    # Copie sans recopie (`content.deck_overlay`) : les cartes du deck sont
+    # celles de `source_pack`, moins ses `DeckCardExclusion`, plus ses propres
+    # `DeckCard` (ajouts de l'utilisateur).
+    cards_inherited = models.BooleanField(default=False, editable=False)
+    srs_scheduler = models.CharField(
+        max_length=16,
+        choices=SCHEDULER_CHOICES,
+        blank=True,
+        default="",
+        help_text=(
+            "Algorithme de révision des cartes du deck, sauf celles d'un deck mieux classé "
+            "qui en impose un autre. Vide : celui de l'utilisateur."
+        ),
+    )
+    # Cartes du deck dont la fiche est live et publique, tenu à jour par
+    # `content.deck_counts` : les listes le lisent au lieu de compter.
+    live_cards_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -1129,6 +1148,78 @@ class DeckCard(Orderable):
         ]
 
 
+class DeckCardExclusion(models.Model):
+    """Carte du pack source retirée par l'utilisateur d'un deck `cards_inherited`."""
+
+    deck = models.ForeignKey(
+        "content.Deck",
+        on_delete=models.CASCADE,
+        related_name="card_exclusions",
+    )
+    microarticle = models.ForeignKey(
+        "content.MicroArticlePage",
+        on_delete=models.CASCADE,
+        related_name="deck_exclusions",
+    )
+    excluded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["deck", "microarticle"],
+                name="uniq_deck_card_exclusion",
+            )
+        ]
+
+
+class PendingPackChange(models.Model):
+    """Carte d'un pack ajoutée ou retirée, pas encore propagée à ses copies.
+
+    File de `content.pack_sync`, vidée par `manage.py sync_pack_copies`.
+    """
+
+    pack = models.ForeignKey(
+        "content.Deck",
+        on_delete=models.CASCADE,
+        related_name="pending_changes",
+    )
+    # Pas de clé étrangère : la fiche retirée peut avoir été supprimée depuis.
+    # Pas d'unicité non plus : une carte remise en file pendant une propagation
+    # garde sa ligne, le worker ne supprimant que celles qu'il a lues.
+    microarticle_id = models.PositiveIntegerField()
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+
+class UserCardMembership(models.Model):
+    """Cartes présentes dans au moins un deck utilisateur, par utilisateur.
+
+    Dénormalisation de `DeckCard` (decks `USER` uniquement) : le scope SRS
+    « tous mes decks » devient une jointure sur cette table au lieu de remonter
+    Deck → DeckCard → distinct. Tenue à jour par `content.memberships`, que
+    toute vue modifiant les cartes d'un deck utilisateur doit appeler.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="card_memberships",
+    )
+    microarticle = models.ForeignKey(
+        "content.MicroArticlePage",
+        on_delete=models.CASCADE,
+        related_name="user_memberships",
+    )
+    deck_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "microarticle"],
+                name="uniq_user_card_membership",
+            )
+        ]
+
+
 class UserDeckProgress(models.Model):
     class ProgressMode(models.TextChoices):
         ORDERED = "ordered", "Ordered"
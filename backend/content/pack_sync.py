@@ -0,0 +1,147 @@
+"""Propagation des écritures d'un pack à ses copies utilisateur.
+
+Une écriture sur les cartes d'un pack (`pack_cards_changed`) ne fait à chaud
+que ce qui garde les lectures justes : compteur du pack, doublons retirés des
+decks hérités, et les cartes touchées mises en file (`PendingPackChange`). Le
+reste revient au worker `manage.py sync_pack_copies`, qui vide la file pack
+par pack :
+- les copies faites avant l'héritage (`cards_inherited` faux) deviennent des
+  decks hérités (`content.deck_copy.adopt_legacy_copies`) : les cartes que
+  l'utilisateur en avait retirées restent retirées, sous forme d'exclusions ;
+  celles que le pack a gagnées (ajout ou publication) après la copie y entrent ;
+- compteurs de cartes, appartenances et caches des propriétaires de toutes les
+  copies sont recalculés par lots d'utilisateurs, chaque lot en un nombre fixe
+  de requêtes quel que soit le nombre de decks.
+
+Le diff du pack est l'ensemble des cartes en file, calculé une fois pour
+toutes ses copies. Entre l'écriture et le passage du worker, un deck hérité
+liste déjà les cartes du pack ; ses compteurs, les appartenances, la carte
+« fiche → decks » mémorisée et le scope SRS « tous mes decks » de son
+propriétaire sont en retard.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from django.db import transaction
+
+from learning.counts import invalidate_srs_counts
+
+from .deck_copy import adopt_legacy_copies
+from .deck_counts import sync_deck_card_counts
+from .memberships import invalidate_card_decks, sync_users_card_memberships
+
+PACK_SYNC_BATCH_SIZE = 500
+
+
+@dataclass
+class PackSyncReport:
+    """Bilan d'une propagation, additionnable d'un pack à l'autre."""
+
+    packs: int = 0
+    decks: int = 0
+    adopted: int = 0
+    users: int = 0
+    elapsed: float = 0.0
+
+    def __iadd__(self, other: PackSyncReport) -> PackSyncReport:
+        self.packs += other.packs
+        self.decks += other.decks
+        self.adopted += other.adopted
+        self.users += other.users
+        self.elapsed += other.elapsed
+        return self
+
+    @property
+    def decks_per_second(self) -> float:
+        return self.decks / self.elapsed if self.elapsed else 0.0
+
+
+def _batches(items: list[int], size: int):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def pack_cards_changed(pack_id: int, microarticle_ids: Iterable[int]) -> None:
+    """À appeler après une écriture sur les cartes `microarticle_ids` du pack `pack_id`.
+
+    Seul le compteur du pack est juste au retour. Pour les copies, compteurs,
+    appartenances et caches des propriétaires (`card_deck_ids`, compteurs SRS)
+    ne sont recalculés et invalidés qu'au passage du worker `sync_pack_copies` :
+    jusque-là, ils décrivent le pack d'avant l'écriture.
+    """
+    from .models import Deck, DeckCard, PendingPackChange
+
+    microarticle_ids = list(dict.fromkeys(microarticle_ids))
+    # Un ajout propre que le pack vient de gagner serait listé deux fois
+    # (`content.deck_overlay`) : il est retiré tout de suite, pas au passage du worker.
+    in_pack = DeckCard.objects.filter(deck_id=pack_id, microarticle_id__in=microarticle_ids)
+    DeckCard.objects.filter(
+        deck__source_pack_id=pack_id,
+        deck__cards_inherited=True,
+        deck__type=Deck.DeckType.USER,
+        microarticle_id__in=in_pack.values("microarticle_id"),
+    ).delete()
+    sync_deck_card_counts([pack_id])
+    PendingPackChange.objects.bulk_create(
+        [PendingPackChange(pack_id=pack_id, microarticle_id=mid) for mid in microarticle_ids]
+    )
+
+
+def sync_pack_copies(
+    pack_id: int, microarticle_ids: Iterable[int], *, batch_size: int = PACK_SYNC_BATCH_SIZE
+) -> PackSyncReport:
+    """Propage aux copies de `pack_id` le changement des cartes `microarticle_ids`.
+
+    Une transaction par lot de `batch_size` utilisateurs : un lot interrompu
+    est repris tel quel au passage suivant, chaque étape recalculant depuis
+    les cartes au lieu d'appliquer un delta.
+    """
+    from .models import Deck
+
+    started = time.perf_counter()
+    microarticle_ids = list(microarticle_ids)
+    copies = Deck.objects.filter(source_pack_id=pack_id, type=Deck.DeckType.USER)
+    user_ids = list(copies.order_by("user_id").values_list("user_id", flat=True).distinct())
+
+    report = PackSyncReport(packs=1)
+    for batch in _batches(user_ids, batch_size):
+        batch_copies = copies.filter(user_id__in=batch)
+        with transaction.atomic():
+            legacy_ids = list(batch_copies.filter(cards_inherited=False).values_list("id", flat=True))
+            report.adopted += adopt_legacy_copies(pack_id, legacy_ids, microarticle_ids)
+            report.decks += sync_deck_card_counts(batch_copies)
+            sync_users_card_memberships(batch, microarticle_ids)
+        invalidate_card_decks(*batch)
+        invalidate_srs_counts(*batch)
+        report.users += len(batch)
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def sync_pending_packs(
+    pack_ids: Iterable[int] | None = None, *, batch_size: int = PACK_SYNC_BATCH_SIZE, progress=None
+) -> PackSyncReport:
+    """Vide la file `PendingPackChange` (des seuls `pack_ids` si donnés).
+
+    `progress(pack_id, report)` est appelé après chaque pack. Une carte remise
+    en file pendant la propagation reste en file pour le passage suivant.
+    """
+    from .models import PendingPackChange
+
+    pending = PendingPackChange.objects.all()
+    if pack_ids is not None:
+        pending = pending.filter(pack_id__in=list(pack_ids))
+
+    total = PackSyncReport()
+    for pack_id in list(pending.order_by("pack_id").values_list("pack_id", flat=True).distinct()):
+        changes = dict(pending.filter(pack_id=pack_id).values_list("id", "microarticle_id"))
+        report = sync_pack_copies(pack_id, set(changes.values()), batch_size=batch_size)
+        PendingPackChange.objects.filter(id__in=list(changes)).delete()
+        total += report
+        if progress is not None:
+            progress(pack_id, report)
+    return total
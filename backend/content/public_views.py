@@ -11,7 +11,9 @@ from taggit.models import Tag
 
 from .domains import resolved_domain_map
 from .models import CategoryMaladies, CategoryMedicament, CategoryPharmacologie, CategoryTheme
+from .tags import SORT_NAME, SORT_POPULAR, search_tag_directory
 from .serializers import (
+    TagDirectoryEntrySerializer,
     TagPayloadSerializer,
     TaxonomyResolveResponseSerializer,
     TaxonomyTreeResponseSerializer,
@@ -154,3 +156,37 @@ class TagListView(APIView):
         return Response(
             [{"id": t.id, "name": t.name, "slug": t.slug} for t in qs]
         )
+
+
+class TagDirectoryView(APIView):
+    """Tags utilisés par les cartes publiées, avec leur nombre de cartes.
+
+    Servi depuis l'annuaire en cache (`content.tags`) : la recherche est un
+    préfixe de mot, insensible aux accents (`?q=diab` trouve « Diabète »).
+    """
+
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        operation_id="tag_directory",
+        parameters=[
+            OpenApiParameter(name="q", type=str),
+            OpenApiParameter(name="sort", type=str, enum=[SORT_POPULAR, SORT_NAME]),
+            OpenApiParameter(name="limit", type=int),
+        ],
+        responses=TagDirectoryEntrySerializer(many=True),
+    )
+    def get(self, request):
+        sort = request.query_params.get("sort") or SORT_POPULAR
+        if sort not in (SORT_POPULAR, SORT_NAME):
+            return Response({"detail": "sort must be 'popular' or 'name'."}, status=400)
+
+        try:
+            limit = int(request.query_params.get("limit") or 50)
+        except ValueError:
+            limit = 50
+        limit = max(1, min(limit, 500))
+
+        return Response(
+            search_tag_directory(request.query_params.get("q"), sort=sort, limit=limit)
+        )
@@ -19,6 +19,7 @@ from .outputs import (
     SubjectDetailCardSerializer,
     SubjectRecapCardSerializer,
     SubjectSummarySerializer,
+    TagDirectoryEntrySerializer,
     TagPayloadSerializer,
     image_payload,
 )
@@ -31,6 +32,7 @@ from .responses import (
     AdminTaxonomyNodeSerializer,
     AdminThumbOverrideSerializer,
     BulkAddResponseSerializer,
+    CardDecksMapSerializer,
     CardDecksUpdateResponseSerializer,
     CopyDeckResponseSerializer,
     CountUpdateResponseSerializer,
@@ -68,6 +70,7 @@ __all__ = [
     "SubjectDetailCardSerializer",
     "SubjectRecapCardSerializer",
     "SubjectSummarySerializer",
+    "TagDirectoryEntrySerializer",
     "TagPayloadSerializer",
     "image_payload",
     "AdminCardImportReportSerializer",
@@ -78,6 +81,7 @@ __all__ = [
     "AdminTaxonomyNodeSerializer",
     "AdminThumbOverrideSerializer",
     "BulkAddResponseSerializer",
+    "CardDecksMapSerializer",
     "CardDecksUpdateResponseSerializer",
     "CopyDeckResponseSerializer",
     "CountUpdateResponseSerializer",
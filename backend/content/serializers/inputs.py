@@ -18,6 +18,9 @@ from rest_framework import serializers
 from wagtail.images import get_image_model
 from wagtail.images.fields import WagtailImageField
 
+from learning.srs import SCHEDULER_CHOICES
+
+from ..deck_transfer import EXPORT_FORMATS
 from ..models import (
     CardType,
     CategoryMaladies,
@@ -26,8 +29,10 @@ from ..models import (
     MicroArticlePage,
     PathologyThumbOverride,
     Subject,
+    SubjectCard,
     UserDeckProgress,
 )
+from ..visibility import is_live_public
 
 # `Deck.name` et `Subject.name` : longueurs reprises des modèles pour renvoyer un
 # 400 lisible là où la base aurait levé une erreur de troncature (500).
@@ -248,6 +253,12 @@ class DeckPatchSerializer(AtLeastOneFieldMixin, serializers.Serializer):
         required=False,
         error_messages=_required_messages("sort_order must be an integer"),
     )
+    srs_scheduler = serializers.ChoiceField(
+        choices=SCHEDULER_CHOICES,
+        required=False,
+        allow_blank=True,
+        help_text="Vide pour revenir à l'algorithme de l'utilisateur.",
+    )
 
 
 class DeckCardAddSerializer(serializers.Serializer):
@@ -303,6 +314,50 @@ class CardDecksUpdateSerializer(serializers.Serializer):
     )
 
 
+CARD_DECKS_MAX_IDS = 200
+
+
+class CardDecksBatchSerializer(serializers.Serializer):
+    """POST /cards/decks/ — `validated_data["card_ids"]` est dédoublonné et borné."""
+
+    card_ids = FlatListField(
+        child=serializers.IntegerField(),
+        item_message="card_ids must be a list of integers",
+        error_messages=_list_messages("card_ids is required (list of integers)"),
+    )
+
+    def validate_card_ids(self, value):
+        ids = list(dict.fromkeys(i for i in value if i > 0))
+        if len(ids) > CARD_DECKS_MAX_IDS:
+            raise serializers.ValidationError(f"card_ids must contain at most {CARD_DECKS_MAX_IDS} items")
+        return ids
+
+
+DECK_IMPORT_FORMAT_BY_EXTENSION = {".json": "json", ".csv": "csv", ".txt": "anki"}
+
+
+class DeckImportSerializer(serializers.Serializer):
+    """POST /decks/<id>/import/ — `format` se déduit de l'extension s'il manque."""
+
+    file = serializers.FileField(error_messages={"required": "file is required"})
+    format = serializers.ChoiceField(
+        choices=EXPORT_FORMATS,
+        required=False,
+        error_messages={"invalid_choice": f"format must be one of: {', '.join(EXPORT_FORMATS)}"},
+    )
+
+    def validate(self, attrs):
+        if "format" not in attrs:
+            name = (getattr(attrs["file"], "name", "") or "").lower()
+            ext = name[name.rfind(".") :] if "." in name else ""
+            if ext not in DECK_IMPORT_FORMAT_BY_EXTENSION:
+                raise serializers.ValidationError(
+                    {"format": "format is required when the file extension is not .json, .csv or .txt"}
+                )
+            attrs["format"] = DECK_IMPORT_FORMAT_BY_EXTENSION[ext]
+        return attrs
+
+
 class OfficialDeckProgressSerializer(serializers.Serializer):
     """POST /decks/<id>/progress/ — `context["deck"]` porte le pack ciblé.
 
@@ -333,11 +388,10 @@ class OfficialDeckProgressSerializer(serializers.Serializer):
         if value is None:
             return None
         deck = self.context["deck"]
-        is_available = DeckCard.objects.filter(
-            deck_id=deck.id,
-            microarticle_id=value,
-            microarticle_id__in=MicroArticlePage.objects.live().public().values_list("id", flat=True),
-        ).exists()
+        is_available = (
+            is_live_public(value)
+            and DeckCard.objects.filter(deck_id=deck.id, microarticle_id=value).exists()
+        )
         if not is_available:
             raise serializers.ValidationError("Unknown or unavailable card in this deck")
         return value
@@ -468,6 +522,64 @@ class SubjectCardsReorderSerializer(serializers.Serializer):
     )
 
 
+class CardMoveSerializer(serializers.Serializer):
+    """Base des `cards/move/` : la carte `card_field` va entre `after_id` et `before_id`.
+
+    Une borne nulle ou absente est lue par la vue (voisine de l'autre borne) ;
+    sans aucune des deux, la carte passe en fin de liste. `validated_data`
+    expose les lignes d'ordre résolues : `row`, `after` et `before`.
+    """
+
+    card_field = "card_id"
+    unknown_message = "Unknown card"
+
+    after_id = serializers.IntegerField(
+        required=False,
+        allow_null=True,
+        default=None,
+        error_messages=_required_messages("after_id must be an integer"),
+    )
+    before_id = serializers.IntegerField(
+        required=False,
+        allow_null=True,
+        default=None,
+        error_messages=_required_messages("before_id must be an integer"),
+    )
+
+    def rows_by_id(self, ids: set[int]) -> dict:
+        raise NotImplementedError
+
+    def validate(self, attrs):
+        card_id = attrs[self.card_field]
+        bounds = {"after_id": attrs["after_id"], "before_id": attrs["before_id"]}
+        for field, value in bounds.items():
+            if value == card_id:
+                raise serializers.ValidationError({field: f"{field} must differ from {self.card_field}"})
+        if bounds["after_id"] is not None and bounds["after_id"] == bounds["before_id"]:
+            raise serializers.ValidationError({"before_id": "before_id must differ from after_id"})
+
+        rows = self.rows_by_id({card_id, *bounds.values()} - {None})
+        for field, value in ((self.card_field, card_id), *bounds.items()):
+            if value is not None and value not in rows:
+                raise serializers.ValidationError({field: self.unknown_message})
+        return {
+            "row": rows[card_id],
+            "after": rows.get(bounds["after_id"]),
+            "before": rows.get(bounds["before_id"]),
+        }
+
+
+class SubjectCardMoveSerializer(CardMoveSerializer):
+    """POST /subjects/<slug>/cards/move/ — ids de liens (`SubjectCard`) ; `context["subject"]`."""
+
+    unknown_message = "Unknown card in this subject"
+
+    card_id = serializers.IntegerField(error_messages=_required_messages("card_id must be an integer"))
+
+    def rows_by_id(self, ids):
+        return SubjectCard.objects.filter(subject=self.context["subject"]).in_bulk(ids)
+
+
 # ---------------------------------------------------------------------------
 # Import de fiches
 # ---------------------------------------------------------------------------
@@ -782,6 +894,21 @@ class AdminPackReorderSerializer(serializers.Serializer):
     )
 
 
+class AdminPackMoveCardSerializer(CardMoveSerializer):
+    """POST /admin/packs/<id>/cards/move/ — ids de fiches ; `context["deck"]` porte le pack."""
+
+    card_field = "microarticle_id"
+    unknown_message = "Unknown card in this pack"
+
+    microarticle_id = serializers.IntegerField(
+        error_messages=_required_messages("microarticle_id must be an integer")
+    )
+
+    def rows_by_id(self, ids):
+        rows = DeckCard.objects.filter(deck_id=self.context["deck"].id, microarticle_id__in=ids)
+        return {row.microarticle_id: row for row in rows}
+
+
 class AdminImageUploadSerializer(serializers.Serializer):
     """POST /admin/images/upload/ — le fichier arrive sous `file` ou `image`.
 
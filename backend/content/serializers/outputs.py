@@ -284,6 +284,10 @@ class TagPayloadSerializer(serializers.Serializer):
     slug = serializers.CharField()
 
 
+class TagDirectoryEntrySerializer(TagPayloadSerializer):
+    usage_count = serializers.IntegerField()
+
+
 class ImagePayloadSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     title = serializers.CharField()
@@ -107,6 +107,10 @@ class DeckSummarySerializer(serializers.Serializer):
     sort_order = serializers.IntegerField()
     cards_count = serializers.IntegerField(min_value=0)
     source_pack_id = serializers.IntegerField(allow_null=True)
+    srs_scheduler = serializers.CharField(
+        allow_blank=True,
+        help_text="Algorithme SRS imposé par le deck ; vide : celui de l'utilisateur.",
+    )
 
 
 class DeckMutationResponseSerializer(serializers.Serializer):
@@ -114,6 +118,7 @@ class DeckMutationResponseSerializer(serializers.Serializer):
     name = serializers.CharField()
     is_default = serializers.BooleanField()
     sort_order = serializers.IntegerField()
+    srs_scheduler = serializers.CharField(allow_blank=True)
 
 
 class DeckMembershipSerializer(serializers.Serializer):
@@ -263,6 +268,10 @@ class CardDecksUpdateResponseSerializer(OkResponseSerializer):
     deck_ids = serializers.ListField(child=serializers.IntegerField())
 
 
+class CardDecksMapSerializer(serializers.Serializer):
+    items = serializers.DictField(child=serializers.ListField(child=serializers.IntegerField()))
+
+
 class SubjectListItemSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     name = serializers.CharField()
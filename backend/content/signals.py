@@ -1,12 +1,20 @@
-"""Invalidations de cache déclenchées par les écritures sur le contenu."""
+"""Invalidations de cache et compteurs dénormalisés déclenchés par les écritures sur le contenu."""
 
 from __future__ import annotations
 
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
+from taggit.models import Tag
+from wagtail.models import Page, PageViewRestriction
+from wagtail.signals import page_published, page_unpublished, post_page_move
 
+from .deck_copy import materialize_inherited_decks
+from .deck_counts import decks_containing, page_visibility_changed, sync_deck_card_counts
 from .domains import invalidate_domain_map
-from .models import CategoryMaladies
+from .models import CategoryMaladies, Deck, DeckCard, MicroArticlePage, MicroArticlePageTag, Pack
+from .pack_sync import sync_pending_packs
+from .tags import invalidate_tag_directory
+from .visibility import invalidate_live_public_ids
 
 
 @receiver(post_save, sender=CategoryMaladies)
@@ -16,3 +24,94 @@ def _invalidate_maladies_domain_map(sender, **kwargs) -> None:
     # le `save()` invalide, et la carte est reconstruite après coup, donc sur les
     # chemins déjà à jour.
     invalidate_domain_map()
+
+
+@receiver(post_save, sender=MicroArticlePageTag)
+@receiver(post_delete, sender=MicroArticlePageTag)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(page_published, sender=MicroArticlePage)
+@receiver(page_unpublished, sender=MicroArticlePage)
+@receiver(post_page_move)
+@receiver(post_save, sender=PageViewRestriction)
+@receiver(post_delete, sender=PageViewRestriction)
+def _invalidate_tag_directory(sender, **kwargs) -> None:
+    # Les compteurs ne portent que sur les cartes live et publiques : une
+    # (dé)publication, un déplacement de branche ou une restriction d'accès les
+    # change sans toucher aux lignes `MicroArticlePageTag`.
+    invalidate_tag_directory()
+
+
+@receiver(post_save, sender=DeckCard)
+def _sync_deck_count_on_card_added(sender, instance, created, **kwargs) -> None:
+    # Ajouts unitaires (`create`, `get_or_create`, formulaires d'admin) ; les
+    # `bulk_create` et les suppressions appellent `sync_deck_card_counts` eux-mêmes.
+    if created:
+        sync_deck_card_counts([instance.deck_id])
+
+
+@receiver(page_published, sender=MicroArticlePage)
+@receiver(page_unpublished, sender=MicroArticlePage)
+def _sync_deck_counts_on_publication(sender, instance, **kwargs) -> None:
+    sync_deck_card_counts(decks_containing([instance.pk]))
+
+
+@receiver(pre_delete, sender=MicroArticlePage)
+def _remember_decks_of_deleted_page(sender, instance, **kwargs) -> None:
+    # Les `DeckCard` partent en cascade avec la fiche : les decks touchés ne se
+    # retrouvent plus après coup.
+    instance._deck_ids = list(decks_containing([instance.pk]).values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Deck)
+@receiver(pre_delete, sender=Pack)
+def _materialize_copies_of_deleted_pack(sender, instance, **kwargs) -> None:
+    # Les decks hérités lisent les cartes du pack (`content.deck_overlay`) :
+    # elles leur sont recopiées avant de partir en cascade avec lui, après
+    # propagation des changements encore en file (supprimés avec le pack).
+    if instance.type == Deck.DeckType.OFFICIAL:
+        sync_pending_packs([instance.pk])
+        materialize_inherited_decks(instance.pk)
+
+
+@receiver(post_delete, sender=MicroArticlePage)
+def _sync_deck_counts_on_delete(sender, instance, **kwargs) -> None:
+    sync_deck_card_counts(getattr(instance, "_deck_ids", []))
+
+
+@receiver(post_page_move)
+def _sync_deck_counts_on_move(sender, instance, **kwargs) -> None:
+    # Un déplacement peut faire entrer ou sortir une branche d'une zone restreinte.
+    page_visibility_changed(instance)
+
+
+@receiver(post_save, sender=PageViewRestriction)
+@receiver(post_delete, sender=PageViewRestriction)
+def _sync_deck_counts_on_restriction(sender, instance, **kwargs) -> None:
+    # Supprimée en cascade avec sa page : les fiches partent, et leurs decks
+    # avec `_sync_deck_counts_on_delete`.
+    page = Page.objects.filter(pk=instance.page_id).first()
+    if page is not None:
+        page_visibility_changed(page)
+
+
+@receiver(page_published, sender=MicroArticlePage)
+@receiver(page_unpublished, sender=MicroArticlePage)
+@receiver(post_delete, sender=MicroArticlePage)
+@receiver(post_page_move)
+@receiver(post_save, sender=PageViewRestriction)
+@receiver(post_delete, sender=PageViewRestriction)
+def _invalidate_live_public_ids(sender, **kwargs) -> None:
+    # Brouillons et révisions (`save_revision`) ne changent pas l'ensemble : seuls
+    # la (dé)publication, la suppression, le déplacement d'une branche et les
+    # restrictions d'accès l'invalident.
+    invalidate_live_public_ids()
+
+
+@receiver(post_save, sender=MicroArticlePage)
+def _invalidate_live_public_ids_on_create(sender, instance, created, **kwargs) -> None:
+    # Une fiche créée live (`add_child` sans publication, imports) n'émet pas
+    # `page_published`. Créée non live, elle peut reprendre l'id d'une fiche
+    # live annulée par un rollback (SQLite) : toute création invalide.
+    if created:
+        invalidate_live_public_ids()
@@ -0,0 +1,156 @@
+"""Clés d'ordre espacées des cartes d'un pack (`DeckCard`) et d'un sujet (`SubjectCard`).
+
+Les clés `sort_order` sont écrites de `SORT_GAP` en `SORT_GAP` (0, 1024, 2048…)
+au lieu de 0, 1, 2… : déplacer une carte entre deux voisines (`move_between`)
+lui donne la clé médiane, sans toucher aux autres lignes. Chaque déplacement au
+même endroit divise l'écart par deux ; quand deux voisines n'ont plus de clé
+libre entre elles, la liste est réespacée (`respace`), une fois, dans la même
+requête. Le worker `manage.py respace_sort_keys` réespace en tâche de fond les
+listes dont un écart passe sous `SORT_MIN_GAP` (ou qui ont des clés nulles ou
+contiguës, écrites avant l'espacement ou par l'édition Wagtail du pack), pour
+que ce cas reste l'exception.
+
+L'ordre lu est toujours (`sort_order`, `id`) : une clé n'est pas une position.
+La position d'une carte se compte (`list_position`).
+"""
+
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Q, Subquery, Value, Window
+from django.db.models.functions import Coalesce, Lag
+
+SORT_GAP = 1024
+SORT_MIN_GAP = 8
+
+
+def sort_key(index: int) -> int:
+    """Clé de la `index`-ième ligne d'une liste espacée."""
+    return index * SORT_GAP
+
+
+def next_sort_key(rows) -> int:
+    """Clé d'une ligne ajoutée en fin de `rows` (queryset d'une seule liste)."""
+    top = rows.order_by().aggregate(top=Max("sort_order"))["top"]
+    return 0 if top is None else int(top) + SORT_GAP
+
+
+def _following(rows, row):
+    return rows.filter(Q(sort_order__gt=row.sort_order) | Q(sort_order=row.sort_order, pk__gt=row.pk))
+
+
+def _preceding(rows, row):
+    return rows.filter(Q(sort_order__lt=row.sort_order) | Q(sort_order=row.sort_order, pk__lt=row.pk))
+
+
+def list_position(model, parent: str):
+    """Rang (0 pour la première) de chaque ligne dans sa liste `parent`, à passer à `annotate`."""
+    preceding = (
+        model.objects.filter(**{parent: OuterRef(parent)})
+        .filter(
+            Q(sort_order__lt=OuterRef("sort_order"))
+            | Q(sort_order=OuterRef("sort_order"), pk__lt=OuterRef("pk"))
+        )
+        .order_by()
+        .values(parent)
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    return Coalesce(Subquery(preceding, output_field=IntegerField()), Value(0))
+
+
+def respace(rows) -> dict[int, int]:
+    """Réécrit les clés de `rows` en 0, SORT_GAP, 2·SORT_GAP… sans changer l'ordre.
+
+    Renvoie les nouvelles clés des seules lignes réécrites, par pk.
+    """
+    changed = []
+    for index, obj in enumerate(rows.order_by("sort_order", "id").only("pk", "sort_order")):
+        if obj.sort_order != sort_key(index):
+            obj.sort_order = sort_key(index)
+            changed.append(obj)
+    if changed:
+        rows.model.objects.bulk_update(changed, ["sort_order"])
+    return {obj.pk: obj.sort_order for obj in changed}
+
+
+def _key_between(after, before) -> int | None:
+    if after is None and before is None:
+        return 0
+    if after is None:
+        return before.sort_order - SORT_GAP
+    if before is None:
+        return after.sort_order + SORT_GAP
+    if before.sort_order - after.sort_order < 2:
+        return None
+    return (after.sort_order + before.sort_order) // 2
+
+
+def move_between(rows, row, *, after=None, before=None) -> int:
+    """Range `row` juste après `after` et avant `before` (lignes de `rows`) ; renvoie les lignes écrites.
+
+    `after` ou `before` à None : la voisine manquante est lue dans `rows`, et
+    l'absence des deux envoie `row` en fin de liste. Une seule ligne écrite
+    tant qu'il reste une clé libre entre les voisines. Lève `ValueError` si
+    `after` ne précède pas `before`.
+    """
+    written = 0
+    if any(obj is not None and obj.sort_order is None for obj in (row, after, before)):
+        written += _respace_with(rows, row, after, before)
+
+    others = rows.exclude(pk=row.pk)
+    if after is None and before is None:
+        after = others.order_by("-sort_order", "-id").first()
+    elif before is None:
+        before = _following(others, after).order_by("sort_order", "id").first()
+    elif after is None:
+        after = _preceding(others, before).order_by("-sort_order", "-id").first()
+    if after is not None and before is not None:
+        if (after.sort_order, after.pk) >= (before.sort_order, before.pk):
+            raise ValueError("after must come before before")
+
+    key = _key_between(after, before)
+    if key is None:
+        written += _respace_with(rows, row, after, before)
+        key = _key_between(after, before)
+    if row.sort_order != key:
+        rows.filter(pk=row.pk).update(sort_order=key)
+        row.sort_order = key
+        written += 1
+    return written
+
+
+def _respace_with(rows, *objs) -> int:
+    # Réespace `rows` et reporte les nouvelles clés sur les lignes déjà chargées.
+    keys = respace(rows)
+    for obj in objs:
+        if obj is not None and obj.pk in keys:
+            obj.sort_order = keys[obj.pk]
+    return len(keys)
+
+
+def tight_lists(rows, parent: str, *, min_gap: int = SORT_MIN_GAP) -> set[int]:
+    """Ids (`parent`) des listes de `rows` qui ont une clé nulle ou deux clés à moins de `min_gap`."""
+    previous = Window(
+        Lag("sort_order"),
+        partition_by=[F(parent)],
+        order_by=[F("sort_order").asc(), F("id").asc()],
+    )
+    return set(
+        rows.annotate(previous=previous)
+        .filter(Q(sort_order__isnull=True) | Q(sort_order__lt=F("previous") + min_gap))
+        .values_list(parent, flat=True)
+    )
+
+
+def respace_tight_lists(rows, parent: str, *, min_gap: int = SORT_MIN_GAP) -> tuple[int, int]:
+    """Réespace les listes de `rows` relevées par `tight_lists`, une transaction par liste.
+
+    Renvoie (listes réespacées, lignes écrites).
+    """
+    lists = written = 0
+    for parent_id in sorted(tight_lists(rows, parent, min_gap=min_gap)):
+        with transaction.atomic():
+            written += len(respace(rows.filter(**{parent: parent_id})))
+        lists += 1
+    return lists, written
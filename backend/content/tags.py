@@ -0,0 +1,130 @@
+"""Annuaire des tags : compteurs d'usage et index de préfixes.
+
+`TagListView` filtre la table taggit en `icontains` à chaque frappe, sans notion
+de popularité. L'annuaire précalcule une fois, pour tous les tags portés par au
+moins une carte publiée, le nombre de cartes live et publiques qui les portent,
+ainsi qu'un index trié de clés normalisées (ASCII, minuscules) : chaque mot du
+nom ouvre une entrée, si bien que « type » retrouve « Diabète de type 2 ». Une
+recherche par préfixe devient deux `bisect` sur une liste en mémoire.
+
+Le résultat est mémorisé en cache jusqu'à la prochaine écriture sur les tags, la
+prochaine (dé)publication d'une carte, le prochain déplacement de page ou la
+prochaine restriction d'accès posée ou levée (voir `content.signals`).
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+
+from anyascii import anyascii
+from django.core.cache import cache
+from django.db.models import Count
+
+CACHE_KEY = "content:tag-directory:v1"
+CACHE_TTL = 24 * 3600
+
+SORT_POPULAR = "popular"
+SORT_NAME = "name"
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_tag_query(text: str) -> str:
+    """Clé de comparaison : ASCII, minuscules, mots séparés par une espace."""
+    return " ".join(_WORD_RE.findall(anyascii(text or "").lower()))
+
+
+def _build_tag_directory() -> dict:
+    from .models import MicroArticlePage, MicroArticlePageTag
+
+    usage = (
+        MicroArticlePageTag.objects.filter(
+            content_object__in=MicroArticlePage.objects.live().public().values("id")
+        )
+        .values("tag_id", "tag__name", "tag__slug")
+        .annotate(usage_count=Count("content_object_id", distinct=True))
+    )
+
+    tags = sorted(
+        (
+            (
+                normalize_tag_query(row["tag__name"]),
+                row["tag_id"],
+                row["tag__name"],
+                row["tag__slug"],
+                row["usage_count"],
+            )
+            for row in usage
+        ),
+        key=lambda t: (t[0], t[2], t[1]),
+    )
+    entries = [(tag_id, name, slug, count) for _key, tag_id, name, slug, count in tags]
+
+    # Une clé par suffixe de mots : « diabete de type 2 », « de type 2 », « type 2 »…
+    # Le slug couvre les tags saisis sans espaces (« diabete-type-2 »).
+    index: set[tuple[str, int]] = set()
+    for position, (key, _tag_id, _name, slug, _count) in enumerate(tags):
+        words = key.split(" ") if key else []
+        for start in range(len(words)):
+            index.add((" ".join(words[start:]), position))
+        slug_key = normalize_tag_query(slug)
+        if slug_key:
+            index.add((slug_key, position))
+    ordered = sorted(index)
+
+    popular = sorted(range(len(entries)), key=lambda position: (-entries[position][3], position))
+    return {
+        "entries": entries,
+        "keys": [key for key, _position in ordered],
+        "positions": [position for _key, position in ordered],
+        "popular": popular,
+    }
+
+
+def tag_directory() -> dict:
+    """Structure précalculée de l'annuaire (voir `_build_tag_directory`)."""
+    cached = cache.get(CACHE_KEY)
+    if cached is not None:
+        return cached
+
+    directory = _build_tag_directory()
+    cache.set(CACHE_KEY, directory, CACHE_TTL)
+    return directory
+
+
+def search_tag_directory(q: str | None = None, *, sort: str = SORT_POPULAR, limit: int = 50) -> list[dict]:
+    """Tags dont un mot commence par `q` (insensible aux accents et à la casse).
+
+    Sans `q`, renvoie tout l'annuaire. `sort="popular"` classe par nombre de
+    cartes décroissant (puis par nom), `sort="name"` par nom normalisé.
+    """
+    directory = tag_directory()
+    entries = directory["entries"]
+
+    key = normalize_tag_query(q or "")
+    if key:
+        keys = directory["keys"]
+        lo = bisect_left(keys, key)
+        hi = bisect_left(keys, key + "\x7f", lo)
+        matched = set(directory["positions"][lo:hi])
+        if sort == SORT_NAME:
+            positions = sorted(matched)
+        else:
+            positions = sorted(matched, key=lambda position: (-entries[position][3], position))
+    elif sort == SORT_NAME:
+        positions = range(len(entries))
+    else:
+        positions = directory["popular"]
+
+    out: list[dict] = []
+    for position in positions:
+        if len(out) >= limit:
+            break
+        tag_id, name, slug, usage_count = entries[position]
+        out.append({"id": tag_id, "name": name, "slug": slug, "usage_count": usage_count})
+    return out
+
+
+def invalidate_tag_directory() -> None:
+    cache.delete(CACHE_KEY)
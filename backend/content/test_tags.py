@@ -0,0 +1,115 @@
+"""Annuaire des tags (`GET /api/v1/tags/directory/`)."""
+
+from __future__ import annotations
+
+from rest_framework.test import APITestCase
+from wagtail.models import PageViewRestriction, Site
+
+from .models import MicroArticleIndexPage, MicroArticlePage
+from .tags import invalidate_tag_directory, tag_directory
+
+
+class TagDirectoryTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Site.objects.get(is_default_site=True).root_page
+        cls.index = MicroArticleIndexPage(title="Micro", slug="micro-tags")
+        root.add_child(instance=cls.index)
+
+        cls.metformine = cls._page("Metformine", ["Diabète de type 2", "Antidiabétique"])
+        cls.insuline = cls._page("Insuline", ["Diabète de type 2", "Hypoglycémie"])
+        cls.brouillon = cls._page("Brouillon", ["Brouillon seul"], live=False)
+
+    @classmethod
+    def _page(cls, title: str, tags: list[str], *, live: bool = True) -> MicroArticlePage:
+        page = MicroArticlePage(
+            title=title,
+            slug=title.lower(),
+            answer_express="Réponse.",
+            key_points=[
+                {"type": "point", "value": "Point 1"},
+                {"type": "point", "value": "Point 2"},
+                {"type": "point", "value": "Point 3"},
+            ],
+            live=live,
+        )
+        cls.index.add_child(instance=page)
+        page.tags.add(*tags)
+        page.save()
+        return page
+
+    def setUp(self):
+        invalidate_tag_directory()
+
+    def _directory(self, **params) -> list[dict]:
+        resp = self.client.get("/api/v1/tags/directory/", params, secure=True)
+        self.assertEqual(resp.status_code, 200, resp.content)
+        return resp.json()
+
+    def test_counts_only_live_cards_and_sorts_by_popularity(self):
+        data = self._directory()
+
+        self.assertEqual(
+            [(t["name"], t["usage_count"]) for t in data],
+            [("Diabète de type 2", 2), ("Antidiabétique", 1), ("Hypoglycémie", 1)],
+        )
+
+    def test_sort_by_name_ignores_accents(self):
+        data = self._directory(sort="name")
+
+        self.assertEqual(
+            [t["name"] for t in data],
+            ["Antidiabétique", "Diabète de type 2", "Hypoglycémie"],
+        )
+
+    def test_prefix_matches_any_word_without_accents(self):
+        self.assertEqual([t["name"] for t in self._directory(q="diabe")], ["Diabète de type 2"])
+        self.assertEqual([t["name"] for t in self._directory(q="TYPE 2")], ["Diabète de type 2"])
+        self.assertEqual([t["name"] for t in self._directory(q="hypoglycé")], ["Hypoglycémie"])
+        # Préfixe de mot, pas sous-chaîne : « betique » ne trouve pas « Antidiabétique ».
+        self.assertEqual(self._directory(q="betique"), [])
+
+    def test_limit_and_invalid_sort(self):
+        self.assertEqual(len(self._directory(limit=1)), 1)
+
+        resp = self.client.get("/api/v1/tags/directory/?sort=recent", secure=True)
+        self.assertEqual(resp.status_code, 400)
+
+    def test_directory_is_built_once_then_cached(self):
+        # `public()` lit d'abord les restrictions de vue, puis une seule agrégation.
+        with self.assertNumQueries(2):
+            tag_directory()
+        with self.assertNumQueries(0):
+            self._directory(q="dia")
+
+    def test_tagging_a_card_invalidates_the_directory(self):
+        self.assertEqual(self._directory(q="hypo")[0]["usage_count"], 1)
+
+        self.metformine.tags.add("Hypoglycémie")
+        self.metformine.save()
+
+        self.assertEqual(self._directory(q="hypo")[0]["usage_count"], 2)
+
+    def test_unpublishing_a_card_invalidates_the_directory(self):
+        self.assertEqual(self._directory(q="anti")[0]["usage_count"], 1)
+
+        self.metformine.unpublish()
+
+        self.assertEqual(self._directory(q="anti"), [])
+
+    def test_restricting_or_moving_a_branch_invalidates_the_directory(self):
+        self.assertEqual(self._directory(q="anti")[0]["usage_count"], 1)
+
+        restriction = PageViewRestriction.objects.create(
+            page=self.index, restriction_type=PageViewRestriction.LOGIN
+        )
+        self.assertEqual(self._directory(q="anti"), [])
+        restriction.delete()
+        self.assertEqual(self._directory(q="anti")[0]["usage_count"], 1)
+
+        private = MicroArticleIndexPage(title="Micro privées", slug="micro-tags-privees")
+        self.index.get_parent().add_child(instance=private)
+        PageViewRestriction.objects.create(page=private, restriction_type=PageViewRestriction.LOGIN)
+        self.assertEqual(self._directory(q="anti")[0]["usage_count"], 1)
+        self.metformine.move(private, pos="last-child")
+        self.assertEqual(self._directory(q="anti"), [])
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import csv
+import json
 import shutil
 import tempfile
-from io import BytesIO
+from io import BytesIO, StringIO
 from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.db import connection
 from django.db.models.query import QuerySet
 from django.test import override_settings
@@ -19,8 +23,12 @@ from PIL import Image
 from rest_framework.test import APITestCase
 from taggit.models import Tag
 from wagtail.images import get_image_model
-from wagtail.models import Page, Site
+from wagtail.models import Page, PageViewRestriction, Site
 
+from .deck_copy import adopt_legacy_copies
+from .deck_overlay import deck_card_ids
+from .deck_transfer import import_cards, import_refs
+from .memberships import _card_decks_key, card_deck_ids, deck_cards_changed, invalidate_card_decks
 from .models import (
     CardType,
     CategoryMaladies,
@@ -28,15 +36,20 @@ from .models import (
     CategoryPharmacologie,
     Deck,
     DeckCard,
+    DeckCardExclusion,
     PathologyThumbOverride,
     MicroArticleIndexPage,
     MicroArticlePage,
+    PendingPackChange,
     Subject,
     SubjectCard,
+    UserCardMembership,
     UserDeckProgress,
 )
+from .pack_sync import pack_cards_changed, sync_pending_packs
 from .permissions import IsStaff
 from .serializers import MicroArticleCardSerializer
+from .sort_keys import SORT_GAP, sort_key
 from .serializers.inputs import (
     READ_STATE_MAX_SLUGS,
     SubjectCreateSerializer,
@@ -60,6 +73,7 @@ from .views import (
     SubjectDetailView,
     SubjectListCreateView,
 )
+from .visibility import _VERSION_KEY as VISIBILITY_VERSION_KEY, invalidate_live_public_ids, live_public_ids
 
 
 class DefaultDeckConcurrencyTests(APITestCase):
@@ -622,6 +636,7 @@ class DeckCardQueryCountTests(APITestCase):
             page.save()
             page.save_revision().publish()
             DeckCard.objects.create(deck=self.deck, microarticle=page, sort_order=n)
+            deck_cards_changed(self.user.pk, [page.id])
 
     def _query_count(self, url: str) -> int:
         with CaptureQueriesContext(connection) as ctx:
@@ -840,6 +855,124 @@ class BulkWriteQueryCountTests(APITestCase):
             [ids[1], ids[0]],
         )
 
+    # --- Déplacement unitaire (clés espacées) ------------------------------
+
+    def _subject_order(self, subject: Subject) -> list[int]:
+        return list(subject.subject_cards.order_by("sort_order", "id").values_list("id", flat=True))
+
+    def _move_query_count(self, count: int) -> int:
+        subject = self._subject_with_cards(f"move-{count}", count)
+        for idx, link in enumerate(subject.subject_cards.order_by("id")):
+            SubjectCard.objects.filter(pk=link.pk).update(sort_order=sort_key(idx))
+        ids = self._subject_order(subject)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post(
+                f"/api/v1/content/subjects/{subject.slug}/cards/move/",
+                {"card_id": ids[-1], "after_id": ids[0], "before_id": ids[1]},
+                format="json",
+                secure=True,
+            )
+        self.assertEqual(resp.status_code, 200, resp.data)
+        self.assertEqual(resp.data["updated"], 1)
+        self.assertEqual(self._subject_order(subject), [ids[0], ids[-1], *ids[1:-1]])
+        return len(ctx)
+
+    def test_subject_move_writes_one_row_whatever_the_length(self):
+        with_three = self._move_query_count(3)
+        with_eight = self._move_query_count(8)
+        self.assertEqual(with_three, with_eight)
+
+    def test_pack_move_respaces_once_the_gap_runs_out(self):
+        deck = self._official_pack("pack-move")
+        first, second, third = pages = self._make_pages(3)
+        for idx, page in enumerate(pages):
+            DeckCard.objects.create(deck=deck, microarticle=page, sort_order=sort_key(idx))
+
+        # Toujours juste après `first` : l'écart est divisé par deux à chaque fois.
+        updates = []
+        for n in range(14):
+            moved = third if n % 2 == 0 else second
+            resp = self.client.post(
+                f"/api/v1/content/admin/packs/{deck.id}/cards/move/",
+                {"microarticle_id": moved.id, "after_id": first.id},
+                format="json",
+                secure=True,
+            )
+            self.assertEqual(resp.status_code, 200, resp.data)
+            updates.append(resp.data["updated"])
+
+        self.assertEqual(updates[:10], [1] * 10)
+        self.assertGreater(max(updates), 1)
+        links = list(DeckCard.objects.filter(deck=deck).order_by("sort_order", "id"))
+        self.assertEqual([link.microarticle_id for link in links], [first.id, second.id, third.id])
+
+    def test_pack_move_to_either_end_and_rejects_bad_neighbours(self):
+        deck = self._official_pack("pack-move-bords")
+        pages = self._make_pages(3)
+        for idx, page in enumerate(pages):
+            DeckCard.objects.create(deck=deck, microarticle=page, sort_order=idx)
+        url = f"/api/v1/content/admin/packs/{deck.id}/cards/move/"
+
+        # Clés contiguës (écrites avant l'espacement) : réespacées au premier déplacement.
+        resp = self.client.post(
+            url, {"microarticle_id": pages[2].id, "before_id": pages[0].id}, format="json"
+        )
+        self.assertEqual(resp.status_code, 200, resp.data)
+        resp = self.client.post(url, {"microarticle_id": pages[2].id}, format="json")
+        self.assertEqual(resp.data["updated"], 1)
+        links = DeckCard.objects.filter(deck=deck).order_by("sort_order", "id")
+        self.assertEqual(
+            list(links.values_list("microarticle_id", flat=True)), [pages[0].id, pages[1].id, pages[2].id]
+        )
+
+        outsider = self._make_pages(1)[0]
+        for payload, field in (
+            ({"microarticle_id": pages[0].id, "after_id": outsider.id}, "after_id"),
+            ({"microarticle_id": pages[0].id, "after_id": pages[0].id}, "after_id"),
+            (
+                {"microarticle_id": pages[0].id, "after_id": pages[2].id, "before_id": pages[1].id},
+                "before_id",
+            ),
+        ):
+            resp = self.client.post(url, payload, format="json")
+            self.assertEqual(resp.status_code, 400, payload)
+            self.assertIn(field, resp.data)
+
+    def test_deck_cards_position_is_the_rank_not_the_sort_key(self):
+        deck = self._official_pack("pack-rangs")
+        deck.status = Deck.Status.PUBLISHED
+        deck.save(update_fields=["status"])
+        pages = self._make_pages(3)
+        for idx, page in enumerate(pages):
+            DeckCard.objects.create(deck=deck, microarticle=page, sort_order=sort_key(idx))
+        url = f"/api/v1/content/decks/{deck.id}/cards/"
+
+        results = self.client.get(url, secure=True).data["results"]
+        self.assertEqual([item["position"] for item in results], [0, 1, 2])
+        self.assertEqual([item["sort_order"] for item in results], [sort_key(idx) for idx in range(3)])
+
+        results = self.client.get(url, {"search": pages[2].title}, secure=True).data["results"]
+        self.assertEqual([(item["id"], item["position"]) for item in results], [(pages[2].id, 2)])
+
+    def test_respace_sort_keys_command_spaces_tight_lists(self):
+        deck = self._official_pack("pack-dense")
+        pages = self._make_pages(3)
+        for idx, page in enumerate(pages):
+            DeckCard.objects.create(deck=deck, microarticle=page, sort_order=idx)
+        subject = self._subject_with_cards("respace", 2)
+        order = self._subject_order(subject)
+
+        out = StringIO()
+        call_command("respace_sort_keys", stdout=out)
+        self.assertIn("1 packs (2 cartes) et 1 sujets (2 cartes)", out.getvalue())
+        keys = DeckCard.objects.filter(deck=deck).order_by("sort_order").values_list("sort_order", flat=True)
+        self.assertEqual(list(keys), [0, SORT_GAP, 2 * SORT_GAP])
+        self.assertEqual(self._subject_order(subject), order)
+
+        out = StringIO()
+        call_command("respace_sort_keys", stdout=out)
+        self.assertIn("Aucune liste à réespacer.", out.getvalue())
+
     # --- Pack bulk-add ---------------------------------------------------
 
     def _official_pack(self, name: str) -> Deck:
@@ -891,7 +1024,448 @@ class BulkWriteQueryCountTests(APITestCase):
             [link.microarticle_id for link in links],
             [already.id, by_id.id, by_slug.id],
         )
-        self.assertEqual([link.sort_order for link in links], [0, 1, 2])
+        self.assertEqual([link.sort_order for link in links], [0, SORT_GAP, 2 * SORT_GAP])
+
+    # --- Card decks update -----------------------------------------------
+
+    def _card_decks_query_count(self, count: int) -> int:
+        card = self._make_pages(1)[0]
+        decks = [
+            Deck.objects.create(user=self.user, type=Deck.DeckType.USER, name=f"Deck {count}-{n}")
+            for n in range(count)
+        ]
+        # Un membre retiré, les autres ajoutés : suppression et insertion à la fois.
+        DeckCard.objects.create(deck=decks[0], microarticle=card)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.put(
+                f"/api/v1/content/cards/{card.id}/decks/",
+                {"deck_ids": [deck.id for deck in decks[1:]]},
+                format="json",
+                secure=True,
+            )
+        self.assertEqual(resp.status_code, 200, resp.data)
+        self.assertEqual(DeckCard.objects.filter(microarticle=card).count(), count - 1)
+        return len(ctx)
+
+    def test_card_decks_update_query_count_is_constant(self):
+        self._card_decks_query_count(2)  # Amorce les caches de processus (types de contenu).
+        with_three = self._card_decks_query_count(3)
+        with_twenty = self._card_decks_query_count(20)
+        self.assertEqual(
+            with_three,
+            with_twenty,
+            f"card decks : {with_three} requêtes pour 3 decks vs {with_twenty} pour 20 → boucle",
+        )
+
+    def test_card_decks_update_appends_to_pack_derived_decks(self):
+        pack = self._official_pack("pack-source")
+        first, second, card = self._make_pages(3)
+        copy = Deck.objects.create(
+            user=self.user, type=Deck.DeckType.USER, name="Copie", source_pack=pack
+        )
+        plain = Deck.objects.create(user=self.user, type=Deck.DeckType.USER, name="Libre")
+        DeckCard.objects.create(deck=copy, microarticle=first, sort_order=0)
+        DeckCard.objects.create(deck=copy, microarticle=second, sort_order=1)
+
+        resp = self.client.put(
+            f"/api/v1/content/cards/{card.id}/decks/",
+            {"deck_ids": [copy.id, plain.id]},
+            format="json",
+            secure=True,
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(sorted(resp.data["deck_ids"]), sorted([copy.id, plain.id]))
+        self.assertEqual(DeckCard.objects.get(deck=copy, microarticle=card).sort_order, 2)
+        self.assertTrue(DeckCard.objects.filter(deck=plain, microarticle=card).exists())
+
+
+    # --- Pack copy -------------------------------------------------------
+
+    def _copy_query_count(self, count: int) -> tuple[int, Deck]:
+        pack = Deck.objects.create(
+            type=Deck.DeckType.OFFICIAL, status=Deck.Status.PUBLISHED, name=f"Pack copie {count}"
+        )
+        for n, page in enumerate(self._make_pages(count)):
+            DeckCard.objects.create(deck=pack, microarticle=page, sort_order=10 * (count - n))
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post(f"/api/v1/content/decks/{pack.id}/copy-to-user/", secure=True)
+        self.assertEqual(resp.status_code, 200, resp.data)
+        return len(ctx), Deck.objects.get(pk=resp.data["deck_id"])
+
+    def test_pack_copy_query_count_is_constant_and_keeps_pack_order(self):
+        self._copy_query_count(1)  # Amorce le deck par défaut et les caches de processus.
+        with_two, _ = self._copy_query_count(2)
+        with_six, copy = self._copy_query_count(6)
+        self.assertEqual(
+            with_two,
+            with_six,
+            f"copy-to-user : {with_two} requêtes pour 2 cartes vs {with_six} pour 6 → écriture en boucle",
+        )
+
+        pack_order = list(
+            DeckCard.objects.filter(deck=copy.source_pack)
+            .order_by("sort_order", "id")
+            .values_list("microarticle_id", flat=True)
+        )
+        self.assertTrue(copy.cards_inherited)
+        self.assertFalse(DeckCard.objects.filter(deck=copy).exists())
+        self.assertEqual(deck_card_ids(copy), pack_order)
+        copy.refresh_from_db()
+        self.assertEqual(copy.live_cards_count, 6)
+
+    def test_pack_copy_allocates_the_first_free_name(self):
+        pack = self._official_pack("Pack nom")
+        pack.status = Deck.Status.PUBLISHED
+        pack.save()
+        for name in ("Pack nom", "Pack nom (2)", "Pack nom (4)"):
+            Deck.objects.create(user=self.user, type=Deck.DeckType.USER, name=name)
+
+        names = []
+        for _ in range(2):
+            resp = self.client.post(f"/api/v1/content/decks/{pack.id}/copy-to-user/", secure=True)
+            self.assertEqual(resp.status_code, 200)
+            names.append(Deck.objects.get(pk=resp.data["deck_id"]).name)
+        self.assertEqual(names, ["Pack nom (3)", "Pack nom (5)"])
+
+    # --- Inherited decks -------------------------------------------------
+
+    def _inherited_copy(self, count: int) -> tuple[Deck, Deck, list[MicroArticlePage]]:
+        pack = Deck.objects.create(
+            type=Deck.DeckType.OFFICIAL, status=Deck.Status.PUBLISHED, name=f"Pack hérité {count}"
+        )
+        pages = self._make_pages(count)
+        for n, page in enumerate(pages):
+            DeckCard.objects.create(deck=pack, microarticle=page, sort_order=n)
+        resp = self.client.post(f"/api/v1/content/decks/{pack.id}/copy-to-user/", secure=True)
+        self.assertEqual(resp.status_code, 200, resp.data)
+        return pack, Deck.objects.get(pk=resp.data["deck_id"]), pages
+
+    def _listed_ids(self, deck: Deck) -> list[int]:
+        resp = self.client.get(f"/api/v1/content/decks/{deck.id}/cards/", secure=True)
+        self.assertEqual(resp.status_code, 200)
+        return [item["id"] for item in resp.data["results"]]
+
+    def test_inherited_deck_stores_only_removals_and_additions(self):
+        pack, copy, (first, second, third) = self._inherited_copy(3)
+        extra = self._make_pages(1)[0]
+
+        resp = self.client.delete(f"/api/v1/content/decks/{copy.id}/cards/{second.id}/", secure=True)
+        self.assertEqual(resp.status_code, 204)
+        self.assertTrue(DeckCardExclusion.objects.filter(deck=copy, microarticle=second).exists())
+        resp = self.client.post(
+            f"/api/v1/content/decks/{copy.id}/cards/", {"card_id": extra.id}, format="json", secure=True
+        )
+        self.assertEqual(resp.status_code, 200)
+
+        self.assertEqual(self._listed_ids(copy), [first.id, third.id, extra.id])
+        own_ids = DeckCard.objects.filter(deck=copy).values_list("microarticle_id", flat=True)
+        self.assertEqual(list(own_ids), [extra.id])
+        copy.refresh_from_db()
+        self.assertEqual(copy.live_cards_count, 3)
+        self.assertEqual(
+            set(UserCardMembership.objects.filter(user=self.user).values_list("microarticle_id", flat=True)),
+            {first.id, third.id, extra.id},
+        )
+
+        # Remise d'une carte retirée : l'exclusion disparaît, aucune ligne n'est écrite.
+        resp = self.client.post(
+            f"/api/v1/content/decks/{copy.id}/cards/", {"card_id": second.id}, format="json", secure=True
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(DeckCardExclusion.objects.filter(deck=copy).exists())
+        self.assertEqual(self._listed_ids(copy), [first.id, second.id, third.id, extra.id])
+
+    def test_card_decks_update_toggles_exclusions_of_inherited_decks(self):
+        pack, copy, (first, _second) = self._inherited_copy(2)
+        url = f"/api/v1/content/cards/{first.id}/decks/"
+
+        resp = self.client.put(url, {"deck_ids": []}, format="json", secure=True)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(DeckCardExclusion.objects.filter(deck=copy, microarticle=first).exists())
+        self.assertFalse(self.client.get(url, secure=True).data[-1]["is_member"])
+
+        resp = self.client.put(url, {"deck_ids": [copy.id]}, format="json", secure=True)
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(DeckCardExclusion.objects.filter(deck=copy).exists())
+        self.assertFalse(DeckCard.objects.filter(deck=copy).exists())
+
+    def test_pack_writes_reach_inherited_decks(self):
+        pack, copy, (first,) = self._inherited_copy(1)
+        added, own = self._make_pages(2)
+        self.client.post(
+            f"/api/v1/content/decks/{copy.id}/cards/", {"card_id": own.id}, format="json", secure=True
+        )
+
+        resp = self.client.post(
+            f"/api/v1/content/admin/packs/{pack.id}/bulk-add/",
+            {"items": f"{added.id}\n{own.id}"},
+            format="json",
+            secure=True,
+        )
+        self.assertEqual(resp.status_code, 200, resp.data)
+        # L'ajout propre devenu carte du pack n'est pas doublé, sans attendre le worker.
+        self.assertFalse(DeckCard.objects.filter(deck=copy).exists())
+        self.assertEqual(self._listed_ids(copy), [first.id, added.id, own.id])
+        self.assertEqual(PendingPackChange.objects.filter(pack=pack).count(), 2)
+        sync_pending_packs()
+        self.assertFalse(PendingPackChange.objects.exists())
+        copy.refresh_from_db()
+        self.assertEqual(copy.live_cards_count, 3)
+        self.assertTrue(UserCardMembership.objects.filter(user=self.user, microarticle=added).exists())
+
+        resp = self.client.post(
+            f"/api/v1/content/admin/packs/{pack.id}/cards/{first.id}/remove/", secure=True
+        )
+        self.assertEqual(resp.status_code, 200)
+        sync_pending_packs()
+        copy.refresh_from_db()
+        self.assertEqual(copy.live_cards_count, 2)
+        self.assertFalse(UserCardMembership.objects.filter(user=self.user, microarticle=first).exists())
+
+    def _legacy_copy(self, pack: Deck, user, pages: list[MicroArticlePage]) -> Deck:
+        copy = Deck.objects.create(
+            user=user, type=Deck.DeckType.USER, name="Ancienne copie", source_pack=pack
+        )
+        DeckCard.objects.bulk_create(
+            [DeckCard(deck=copy, microarticle=page, sort_order=n) for n, page in enumerate(pages)]
+        )
+        deck_cards_changed(user.pk, [page.id for page in pages])
+        return copy
+
+    def test_pack_sync_adopts_legacy_copies_and_keeps_user_removals(self):
+        pack, _copy, (first, removed, dropped) = self._inherited_copy(3)
+        added, extra = self._make_pages(2)
+        # Copie d'avant l'héritage : `removed` retiré par l'utilisateur, `extra` ajouté.
+        legacy = self._legacy_copy(pack, self.user, [first, dropped, extra])
+
+        self.client.post(
+            f"/api/v1/content/admin/packs/{pack.id}/bulk-add/",
+            {"items": str(added.id)},
+            format="json",
+            secure=True,
+        )
+        self.client.post(f"/api/v1/content/admin/packs/{pack.id}/cards/{dropped.id}/remove/", secure=True)
+        report = sync_pending_packs()
+
+        self.assertEqual((report.packs, report.decks, report.adopted, report.users), (1, 2, 1, 1))
+        legacy.refresh_from_db()
+        self.assertTrue(legacy.cards_inherited)
+        self.assertEqual(self._listed_ids(legacy), [first.id, added.id, extra.id])
+        self.assertEqual(
+            list(DeckCardExclusion.objects.filter(deck=legacy).values_list("microarticle_id", flat=True)),
+            [removed.id],
+        )
+        self.assertEqual(legacy.live_cards_count, 3)
+        self.assertFalse(UserCardMembership.objects.filter(user=self.user, microarticle=dropped).exists())
+        self.assertEqual(UserCardMembership.objects.get(user=self.user, microarticle=added).deck_count, 2)
+
+    def test_legacy_adoption_does_not_exclude_cards_the_copy_never_received(self):
+        pack = Deck.objects.create(
+            type=Deck.DeckType.OFFICIAL, status=Deck.Status.PUBLISHED, name="Pack ancien"
+        )
+        first, draft, late = self._make_pages(3)
+        for n, page in enumerate((first, draft)):
+            DeckCard.objects.create(deck=pack, microarticle=page, sort_order=n)
+        # `draft` n'était pas encore publiée à la copie, `late` est entrée dans le pack après.
+        legacy = self._legacy_copy(pack, self.user, [first])
+        Page.objects.filter(pk=draft.pk).update(first_published_at=timezone.now())
+        DeckCard.objects.create(deck=pack, microarticle=late, sort_order=2)
+
+        self.assertEqual(adopt_legacy_copies(pack.id, [legacy.id]), 1)
+        self.assertFalse(DeckCardExclusion.objects.filter(deck=legacy).exists())
+        self.assertEqual(self._listed_ids(legacy), [first.id, draft.id, late.id])
+
+    def _pack_sync_query_count(self, count: int) -> int:
+        pack = Deck.objects.create(type=Deck.DeckType.OFFICIAL, name=f"Pack propagé {count}")
+        first, added = self._make_pages(2)
+        DeckCard.objects.create(deck=pack, microarticle=first, sort_order=0)
+        for n in range(count):
+            user = get_user_model().objects.create_user(username=f"copie-{count}-{n}", password="pw")
+            Deck.objects.create(
+                user=user, type=Deck.DeckType.USER, name="Copie", source_pack=pack, cards_inherited=True
+            )
+            self._legacy_copy(pack, user, [first])
+        DeckCard.objects.create(deck=pack, microarticle=added, sort_order=1)
+        pack_cards_changed(pack.id, [added.id])
+
+        with CaptureQueriesContext(connection) as ctx:
+            report = sync_pending_packs()
+        self.assertEqual((report.decks, report.adopted), (2 * count, count))
+        self.assertEqual(
+            UserCardMembership.objects.filter(microarticle=added, deck_count=2).count(), count
+        )
+        return len(ctx)
+
+    def test_pack_sync_query_count_does_not_grow_with_copies(self):
+        with_two = self._pack_sync_query_count(2)
+        with_six = self._pack_sync_query_count(6)
+        self.assertEqual(
+            with_two,
+            with_six,
+            f"sync_pending_packs : {with_two} requêtes pour 2 utilisateurs vs {with_six} pour 6 → boucle",
+        )
+
+    def test_sync_pack_copies_command_reports_throughput(self):
+        pack, copy, _pages = self._inherited_copy(1)
+        added = self._make_pages(1)[0]
+        self.client.post(
+            f"/api/v1/content/admin/packs/{pack.id}/bulk-add/",
+            {"items": str(added.id)},
+            format="json",
+            secure=True,
+        )
+
+        out = StringIO()
+        call_command("sync_pack_copies", "--batch-size", "1", stdout=out)
+
+        self.assertIn("1 packs propagés à 1 decks", out.getvalue())
+        self.assertIn("decks/s", out.getvalue())
+        copy.refresh_from_db()
+        self.assertEqual(copy.live_cards_count, 2)
+        out = StringIO()
+        call_command("sync_pack_copies", stdout=out)
+        self.assertIn("Aucun changement", out.getvalue())
+
+    def test_deleting_a_pack_materializes_inherited_decks(self):
+        pack, copy, (first, second, third) = self._inherited_copy(3)
+        self.client.delete(f"/api/v1/content/decks/{copy.id}/cards/{second.id}/", secure=True)
+
+        pack.delete()
+
+        copy.refresh_from_db()
+        self.assertFalse(copy.cards_inherited)
+        self.assertFalse(DeckCardExclusion.objects.filter(deck=copy).exists())
+        self.assertEqual(sorted(deck_card_ids(copy)), [first.id, third.id])
+        self.assertEqual(copy.live_cards_count, 2)
+
+
+class DeckTransferTests(APITestCase):
+    """Export en flux (JSON, CSV, Anki) et import par tranches des cartes d'un deck."""
+
+    def setUp(self):
+        super().setUp()
+        root = Page.get_first_root_node()
+        if not Site.objects.exists():
+            Site.objects.create(hostname="localhost", root_page=root, is_default_site=True)
+        self.index = MicroArticleIndexPage(title="Micro export", slug="micro-export")
+        root.add_child(instance=self.index)
+        self.index.save_revision().publish()
+
+        self.user = get_user_model().objects.create_user(username="export", password="pharmapocket-test-pwd")
+        self.client.force_authenticate(user=self.user)
+        self.pages = []
+        for n in range(3):
+            page = MicroArticlePage(
+                title=f"Fiche export {n}", slug=f"fiche-export-{n}", answer_express=f"<p>Réponse {n}</p>"
+            )
+            self.index.add_child(instance=page)
+            page.tags.add(f"tag {n}")
+            page.save_revision().publish()
+            self.pages.append(page)
+        self.pack = Deck.objects.create(
+            type=Deck.DeckType.OFFICIAL, status=Deck.Status.PUBLISHED, name="Pack export"
+        )
+        for n, page in enumerate(reversed(self.pages)):
+            DeckCard.objects.create(deck=self.pack, microarticle=page, sort_order=n)
+        self.deck = Deck.objects.create(user=self.user, type=Deck.DeckType.USER, name="Cible")
+
+    def _export(self, deck: Deck, fmt: str):
+        resp = self.client.get(f"/api/v1/content/decks/{deck.id}/export/{fmt}/", secure=True)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        return resp, b"".join(resp.streaming_content).decode()
+
+    def _import(self, name: str, content: str, **extra):
+        upload = SimpleUploadedFile(name, content.encode(), content_type="application/octet-stream")
+        return self.client.post(
+            f"/api/v1/content/decks/{self.deck.id}/import/",
+            {"file": upload, **extra},
+            format="multipart",
+            secure=True,
+        )
+
+    def test_export_formats_follow_the_pack_order(self):
+        expected = [page.id for page in reversed(self.pages)]
+
+        resp, body = self._export(self.pack, "json")
+        self.assertEqual(resp["Content-Type"], "application/json")
+        self.assertIn('filename="pack-export.json"', resp["Content-Disposition"])
+        payload = json.loads(body)
+        self.assertEqual(payload["deck"]["name"], "Pack export")
+        self.assertEqual([card["id"] for card in payload["cards"]], expected)
+        self.assertEqual(payload["cards"][0]["tags"], ["tag 2"])
+
+        _resp, body = self._export(self.pack, "csv")
+        rows = list(csv.DictReader(StringIO(body)))
+        self.assertEqual([int(row["id"]) for row in rows], expected)
+        self.assertEqual(rows[0]["position"], "0")
+
+        _resp, body = self._export(self.pack, "anki")
+        lines = body.splitlines()
+        self.assertIn("#deck:Pack export", lines)
+        self.assertIn("#guid column:1", lines)
+        self.assertEqual(lines[6].split("\t")[0], f"pharmapocket:{expected[0]}")
+        self.assertEqual(lines[6].split("\t")[3], "tag_2")
+
+    def test_export_is_limited_to_visible_decks_and_cards(self):
+        self.pages[0].unpublish()
+        invalidate_live_public_ids()
+        _resp, body = self._export(self.pack, "json")
+        self.assertNotIn(self.pages[0].id, [card["id"] for card in json.loads(body)["cards"]])
+
+        other = get_user_model().objects.create_user(username="export-autre", password="pw")
+        foreign = Deck.objects.create(user=other, type=Deck.DeckType.USER, name="Autre")
+        draft = Deck.objects.create(type=Deck.DeckType.OFFICIAL, name="Brouillon", status=Deck.Status.DRAFT)
+        for url in (
+            f"/api/v1/content/decks/{foreign.id}/export/json/",
+            f"/api/v1/content/decks/{draft.id}/export/json/",
+            f"/api/v1/content/decks/{self.pack.id}/export/apkg/",
+        ):
+            self.assertEqual(self.client.get(url, secure=True).status_code, 404, url)
+
+    def test_exports_import_back_into_a_user_deck(self):
+        for fmt, name in (("json", "pack.json"), ("csv", "pack.csv"), ("anki", "pack.txt")):
+            DeckCard.objects.filter(deck=self.deck).delete()
+            _resp, body = self._export(self.pack, fmt)
+            resp = self._import(name, body)
+            self.assertEqual(resp.status_code, 200, (fmt, resp.data))
+            self.assertEqual(resp.data, {"added": 3, "already_present": 0, "not_found": 0}, fmt)
+
+        self.assertEqual(
+            set(DeckCard.objects.filter(deck=self.deck).values_list("microarticle_id", flat=True)),
+            {page.id for page in self.pages},
+        )
+        self.assertTrue(UserCardMembership.objects.filter(user=self.user, microarticle=self.pages[0]).exists())
+
+    def test_import_resolves_slugs_in_chunks(self):
+        rows = ["id,slug", f",{self.pages[0].slug}", f"{self.pages[1].id},", "999999,", ",inconnue"]
+        rows += [f"{self.pages[1].id},", f",{self.pages[2].slug}"]
+        refs = import_refs(BytesIO(("\n".join(rows) + "\n").encode()), "csv")
+        result = import_cards(self.deck, refs, chunk_size=2)
+        self.assertEqual(result, {"added": 3, "already_present": 1, "not_found": 2})
+        self.assertEqual(self.deck.live_cards_count, 0)
+        self.deck.refresh_from_db()
+        self.assertEqual(self.deck.live_cards_count, 3)
+
+    def test_import_rejects_an_unreadable_json_file(self):
+        ok = f'{{"deck": {{"name": "x"}}, "cards": [{self.pages[0].id}, {{"id": {self.pages[1].id}}}]}}'
+        with mock.patch("content.deck_transfer._JSON_READ_SIZE", 3):
+            refs = list(import_refs(BytesIO(ok.encode()), "json"))
+        self.assertEqual(refs, [self.pages[0].id, self.pages[1].id])
+
+        for content in ('{"cards": [1, 2, {oops}, 3]}', "[1, 2, 3]", "id,slug\n1,\n", '{"cards": [1, 2'):
+            resp = self._import("cartes.json", content, format="json")
+            self.assertEqual(resp.status_code, 400, content)
+            self.assertIn("file", resp.data)
+        self.assertFalse(DeckCard.objects.filter(deck=self.deck).exists())
+
+    def test_import_requires_a_known_format(self):
+        resp = self._import("cartes.xlsx", "id\n1\n")
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("format", resp.data)
+        resp = self._import("cartes.bin", "id\n1\n", format="csv")
+        self.assertEqual(resp.status_code, 200)
 
 
 class OfficialDeckProgressPayloadTests(APITestCase):
@@ -1027,6 +1601,7 @@ class OfficialDeckProgressPayloadTests(APITestCase):
             self.assertEqual(resp.status_code, 200)
             return len(ctx)
 
+        count()  # Amorce l'ensemble mémorisé des fiches visibles (`content.visibility`).
         with_one = count()
 
         other = Deck.objects.create(
@@ -1842,3 +2417,328 @@ class MicroArticleDetailSubjectQueryTests(APITestCase):
         self.assertIsNone(resp.data["subject"])
         self.assertIsNone(resp.data["recap_card"])
         self.assertEqual(resp.data["detail_cards"], [])
+
+
+class UserCardMembershipTests(APITestCase):
+    """`UserCardMembership` suit les écritures de cartes des decks utilisateur."""
+
+    def setUp(self):
+        super().setUp()
+        root = Page.get_first_root_node()
+        if not Site.objects.exists():
+            Site.objects.create(hostname="localhost", root_page=root, is_default_site=True)
+
+        index = MicroArticleIndexPage(title="Micro membership", slug="micro-membership")
+        root.add_child(instance=index)
+        index.save_revision().publish()
+
+        self.pages = []
+        for n in range(1, 4):
+            page = MicroArticlePage(title=f"Carte m{n}", slug=f"carte-m{n}", answer_express="R.")
+            index.add_child(instance=page)
+            page.save_revision().publish()
+            self.pages.append(page)
+
+        self.user = get_user_model().objects.create_user(
+            username="membership",
+            email="membership@example.com",
+            password="pharmapocket-test-pwd",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.deck = _get_or_create_default_deck(self.user)
+
+    def _memberships(self) -> dict[int, int]:
+        return dict(
+            UserCardMembership.objects.filter(user=self.user).values_list(
+                "microarticle_id", "deck_count"
+            )
+        )
+
+    def test_bulk_add_pack_copy_and_deck_deletion_keep_counts_in_sync(self):
+        first, second, third = self.pages
+        resp = self.client.post(
+            f"/api/v1/content/decks/{self.deck.id}/cards/bulk-add/",
+            {"card_ids": [first.id, second.id]},
+            format="json",
+            secure=True,
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._memberships(), {first.id: 1, second.id: 1})
+
+        pack = Deck.objects.create(
+            type=Deck.DeckType.OFFICIAL, status=Deck.Status.PUBLISHED, name="Pack"
+        )
+        DeckCard.objects.create(deck=pack, microarticle=second, sort_order=0)
+        DeckCard.objects.create(deck=pack, microarticle=third, sort_order=1)
+        resp = self.client.post(f"/api/v1/content/decks/{pack.id}/copy-to-user/", secure=True)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._memberships(), {first.id: 1, second.id: 2, third.id: 1})
+
+        resp = self.client.delete(f"/api/v1/content/decks/{resp.data['deck_id']}/", secure=True)
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(self._memberships(), {first.id: 1, second.id: 1})
+
+    def test_card_decks_update_and_single_removal(self):
+        first = self.pages[0]
+        other = Deck.objects.create(user=self.user, type=Deck.DeckType.USER, name="Autre", sort_order=1)
+
+        resp = self.client.put(
+            f"/api/v1/content/cards/{first.id}/decks/",
+            {"deck_ids": [self.deck.id, other.id]},
+            format="json",
+            secure=True,
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._memberships(), {first.id: 2})
+
+        resp = self.client.delete(f"/api/v1/content/decks/{other.id}/cards/{first.id}/", secure=True)
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(self._memberships(), {first.id: 1})
+
+        resp = self.client.put(
+            f"/api/v1/content/cards/{first.id}/decks/", {"deck_ids": []}, format="json", secure=True
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._memberships(), {})
+
+    def test_card_decks_batch_is_cached_until_a_deck_write(self):
+        first, second, third = self.pages
+        invalidate_card_decks(self.user.pk)
+        other = Deck.objects.create(user=self.user, type=Deck.DeckType.USER, name="Autre", sort_order=1)
+        resp = self.client.post(
+            f"/api/v1/content/decks/{other.id}/cards/bulk-add/",
+            {"card_ids": [first.id, second.id]},
+            format="json",
+            secure=True,
+        )
+        self.assertEqual(resp.status_code, 200)
+        DeckCard.objects.create(deck=self.deck, microarticle=first)
+        deck_cards_changed(self.user.pk, [first.id])
+
+        url = "/api/v1/content/cards/decks/"
+        body = {"card_ids": [first.id, second.id, third.id, 999999]}
+        resp = self.client.post(url, body, format="json", secure=True)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            resp.data["items"],
+            {
+                str(first.id): sorted([self.deck.id, other.id]),
+                str(second.id): [other.id],
+                str(third.id): [],
+                "999999": [],
+            },
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post(url, body, format="json", secure=True)
+        self.assertFalse([q["sql"] for q in ctx.captured_queries if "content_deckcard" in q["sql"]])
+
+        resp = self.client.delete(f"/api/v1/content/decks/{other.id}/cards/{second.id}/", secure=True)
+        self.assertEqual(resp.status_code, 204)
+        resp = self.client.post(url, {"card_ids": [second.id]}, format="json", secure=True)
+        self.assertEqual(resp.data["items"], {str(second.id): []})
+
+    def test_card_decks_cache_is_cleared_again_at_commit(self):
+        first = self.pages[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            DeckCard.objects.create(deck=self.deck, microarticle=first)
+            deck_cards_changed(self.user.pk, [first.id])
+            # Lecture d'avant le commit : pour une autre connexion, elle verrait l'ancien état.
+            card_deck_ids(self.user.pk)
+            self.assertIsNotNone(cache.get(_card_decks_key(self.user.pk)))
+        self.assertIsNone(cache.get(_card_decks_key(self.user.pk)))
+
+
+class DeckLiveCardsCountTests(APITestCase):
+    """`Deck.live_cards_count` suit les cartes des decks et la visibilité des fiches."""
+
+    def setUp(self):
+        super().setUp()
+        root = Page.get_first_root_node()
+        if not Site.objects.exists():
+            Site.objects.create(hostname="localhost", root_page=root, is_default_site=True)
+
+        self.index = MicroArticleIndexPage(title="Micro compteurs", slug="micro-compteurs")
+        root.add_child(instance=self.index)
+        self.index.save_revision().publish()
+
+        self.pages = []
+        for n in range(1, 4):
+            page = MicroArticlePage(title=f"Carte c{n}", slug=f"carte-c{n}", answer_express="R.")
+            self.index.add_child(instance=page)
+            page.save_revision().publish()
+            self.pages.append(page)
+
+        self.user = get_user_model().objects.create_user(
+            username="counter",
+            email="counter@example.com",
+            password="pharmapocket-test-pwd",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.deck = _get_or_create_default_deck(self.user)
+        self.pack = Deck.objects.create(
+            type=Deck.DeckType.OFFICIAL, status=Deck.Status.PUBLISHED, name="Pack compteur"
+        )
+        for n, page in enumerate(self.pages):
+            DeckCard.objects.create(deck=self.pack, microarticle=page, sort_order=n)
+
+    def _counts(self) -> tuple[int, int]:
+        self.deck.refresh_from_db()
+        self.pack.refresh_from_db()
+        return self.deck.live_cards_count, self.pack.live_cards_count
+
+    def test_card_writes_and_visibility_changes_keep_counts_in_sync(self):
+        first, second, third = self.pages
+        resp = self.client.post(
+            f"/api/v1/content/decks/{self.deck.id}/cards/bulk-add/",
+            {"card_ids": [first.id, second.id]},
+            format="json",
+            secure=True,
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._counts(), (2, 3))
+
+        first.unpublish()
+        self.assertEqual(self._counts(), (1, 2))
+        first.save_revision().publish()
+        self.assertEqual(self._counts(), (2, 3))
+
+        # Restriction posée sur la section : toute sa descendance sort du compte.
+        restriction = PageViewRestriction.objects.create(
+            page=self.index, restriction_type=PageViewRestriction.LOGIN
+        )
+        self.assertEqual(self._counts(), (0, 0))
+        restriction.delete()
+        self.assertEqual(self._counts(), (2, 3))
+
+        third.delete()
+        self.assertEqual(self._counts(), (2, 2))
+
+        resp = self.client.delete(f"/api/v1/content/decks/{self.deck.id}/cards/{first.id}/", secure=True)
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(self._counts(), (1, 2))
+
+    def test_card_writes_recount_only_the_touched_decks(self):
+        first, second, _third = self.pages
+        other = Deck.objects.create(user=self.user, type=Deck.DeckType.USER, name="Autre")
+        DeckCard.objects.create(deck=other, microarticle=second)
+        # Valeur fausse posée à la main : un recomptage de `other` la corrigerait.
+        Deck.objects.filter(pk=other.pk).update(live_cards_count=99)
+
+        resp = self.client.post(
+            f"/api/v1/content/decks/{self.deck.id}/cards/",
+            {"card_id": first.id},
+            format="json",
+            secure=True,
+        )
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.delete(f"/api/v1/content/decks/{self.deck.id}/cards/{first.id}/", secure=True)
+        self.assertEqual(resp.status_code, 204)
+        other.refresh_from_db()
+        self.assertEqual(other.live_cards_count, 99)
+
+        deck_cards_changed(self.user.pk, [second.id])
+        other.refresh_from_db()
+        self.assertEqual(other.live_cards_count, 1)
+
+    def test_deck_lists_and_progress_read_the_counter(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get("/api/v1/content/decks/?type=official", secure=True)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data[0]["cards_count"], 3)
+        self.assertFalse([q["sql"] for q in ctx.captured_queries if "COUNT(" in q["sql"]])
+
+        resp = self.client.post(f"/api/v1/content/decks/{self.pack.id}/start/", secure=True)
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.post(
+            f"/api/v1/content/decks/{self.pack.id}/progress/",
+            {"cards_done_count": 3},
+            format="json",
+            secure=True,
+        )
+        self.assertEqual(resp.data["progress_pct"], 100)
+
+
+class LivePublicIdsTests(APITestCase):
+    """L'ensemble mémorisé des fiches live et publiques suit leur visibilité."""
+
+    def setUp(self):
+        super().setUp()
+        invalidate_live_public_ids()
+        root = Page.get_first_root_node()
+        if not Site.objects.exists():
+            Site.objects.create(hostname="localhost", root_page=root, is_default_site=True)
+
+        self.index = MicroArticleIndexPage(title="Micro visibles", slug="micro-visibles")
+        root.add_child(instance=self.index)
+        self.index.save_revision().publish()
+        self.private = MicroArticleIndexPage(title="Micro privées", slug="micro-privees")
+        root.add_child(instance=self.private)
+        self.private.save_revision().publish()
+        PageViewRestriction.objects.create(page=self.private, restriction_type=PageViewRestriction.LOGIN)
+
+        self.pages = []
+        for n in range(1, 4):
+            page = MicroArticlePage(title=f"Carte v{n}", slug=f"carte-v{n}", answer_express="R.")
+            self.index.add_child(instance=page)
+            page.save_revision().publish()
+            self.pages.append(page)
+
+        self.user = get_user_model().objects.create_user(
+            username="visibility",
+            email="visibility@example.com",
+            password="pharmapocket-test-pwd",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.deck = _get_or_create_default_deck(self.user)
+        for page in self.pages:
+            DeckCard.objects.create(deck=self.deck, microarticle=page)
+
+    def test_set_is_cached_and_follows_visibility_changes(self):
+        first, second, third = self.pages
+        self.assertEqual(live_public_ids(), {first.id, second.id, third.id})
+        with CaptureQueriesContext(connection) as ctx:
+            live_public_ids()
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        first.unpublish()
+        self.assertEqual(live_public_ids(), {second.id, third.id})
+
+        restriction = PageViewRestriction.objects.create(
+            page=second, restriction_type=PageViewRestriction.LOGIN
+        )
+        self.assertEqual(live_public_ids(), {third.id})
+        restriction.delete()
+        self.assertEqual(live_public_ids(), {second.id, third.id})
+
+        third.move(self.private, pos="last-child")
+        self.assertEqual(live_public_ids(), {second.id})
+
+        second.delete()
+        self.assertEqual(live_public_ids(), set())
+
+    def test_drafts_keep_the_set_and_publication_invalidates_it(self):
+        first = self.pages[0]
+        live_public_ids()
+        version = cache.get(VISIBILITY_VERSION_KEY)
+
+        first.title = "Brouillon"
+        first.save_revision()
+        self.assertEqual(cache.get(VISIBILITY_VERSION_KEY), version)
+
+        first.get_latest_revision().publish()
+        self.assertNotEqual(cache.get(VISIBILITY_VERSION_KEY), version)
+
+    def test_views_filter_against_the_set(self):
+        first, second, _ = self.pages
+        first.unpublish()
+
+        resp = self.client.get(f"/api/v1/content/decks/{self.deck.id}/cards/", secure=True)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["count"], 2)
+        self.assertNotIn(first.id, [item["id"] for item in resp.data["results"]])
+
+        resp = self.client.get(f"/api/v1/content/cards/{first.id}/decks/", secure=True)
+        self.assertEqual(resp.status_code, 404)
+        resp = self.client.get(f"/api/v1/content/cards/{second.id}/decks/", secure=True)
+        self.assertEqual(resp.status_code, 200)
@@ -7,16 +7,20 @@ from .views import (
     AdminPackBulkAddView,
     AdminPackDetailView,
     AdminPackListCreateView,
+    AdminPackMoveCardView,
     AdminPackRemoveCardView,
     AdminPackReorderCardsView,
     AdminTaxonomyNodeCreateView,
     AdminThumbOverrideDetailView,
     AdminThumbOverrideListCreateView,
+    CardDecksBatchView,
     CardDecksView,
     DeckCardDetailView,
     DeckCardsBulkAddView,
     DeckCardsView,
     DeckDetailView,
+    DeckExportView,
+    DeckImportView,
     DeckListCreateView,
     DeckSetDefaultView,
     LandingView,
@@ -30,6 +34,7 @@ from .views import (
     SavedMicroArticleListView,
     SourceSearchView,
     SubjectCardDetailView,
+    SubjectCardMoveView,
     SubjectCardsReorderView,
     SubjectCardsView,
     SubjectDetailView,
@@ -59,6 +64,11 @@ urlpatterns = [
         AdminPackReorderCardsView.as_view(),
         name="admin-pack-reorder",
     ),
+    path(
+        "admin/packs/<int:pack_id>/cards/move/",
+        AdminPackMoveCardView.as_view(),
+        name="admin-pack-move-card",
+    ),
     path(
         "admin/packs/<int:pack_id>/cards/<int:card_id>/remove/",
         AdminPackRemoveCardView.as_view(),
@@ -122,11 +132,18 @@ urlpatterns = [
         DeckCardDetailView.as_view(),
         name="deck-card-detail",
     ),
+    path(
+        "decks/<int:deck_id>/export/<str:fmt>/",
+        DeckExportView.as_view(),
+        name="deck-export",
+    ),
+    path("decks/<int:deck_id>/import/", DeckImportView.as_view(), name="deck-import"),
     path(
         "decks/<int:deck_id>/copy-to-user/",
         OfficialDeckCopyToUserView.as_view(),
         name="official-deck-copy-to-user",
     ),
+    path("cards/decks/", CardDecksBatchView.as_view(), name="card-decks-batch"),
     path("cards/<int:card_id>/decks/", CardDecksView.as_view(), name="card-decks"),
     path("saved/", SavedMicroArticleListView.as_view(), name="saved-microarticle-list"),
     path(
@@ -146,6 +163,11 @@ urlpatterns = [
         SubjectCardsReorderView.as_view(),
         name="subject-cards-reorder",
     ),
+    path(
+        "subjects/<str:slug>/cards/move/",
+        SubjectCardMoveView.as_view(),
+        name="subject-card-move",
+    ),
     path(
         "subjects/<str:slug>/cards/<int:card_id>/",
         SubjectCardDetailView.as_view(),
@@ -6,11 +6,14 @@ Ce module réexporte tout ce que l'ancien `content/views.py` exposait, pour que
 
 from .cards_admin import AdminCardImportView
 from .decks import (
+    CardDecksBatchView,
     CardDecksView,
     DeckCardDetailView,
     DeckCardsBulkAddView,
     DeckCardsView,
     DeckDetailView,
+    DeckExportView,
+    DeckImportView,
     DeckListCreateView,
     DeckListSerializer,
     DeckSetDefaultView,
@@ -52,11 +55,13 @@ from .packs_admin import (
     AdminPackBulkAddView,
     AdminPackDetailView,
     AdminPackListCreateView,
+    AdminPackMoveCardView,
     AdminPackRemoveCardView,
     AdminPackReorderCardsView,
 )
 from .subjects import (
     SubjectCardDetailView,
+    SubjectCardMoveView,
     SubjectCardsReorderView,
     SubjectCardsView,
     SubjectDetailView,
@@ -80,11 +85,14 @@ __all__ = [
     "SourceSearchSerializer",
     "SourceSearchView",
     # decks
+    "CardDecksBatchView",
     "CardDecksView",
     "DeckCardDetailView",
     "DeckCardsBulkAddView",
     "DeckCardsView",
     "DeckDetailView",
+    "DeckExportView",
+    "DeckImportView",
     "DeckListCreateView",
     "DeckListSerializer",
     "DeckSetDefaultView",
@@ -102,10 +110,12 @@ __all__ = [
     "AdminPackBulkAddView",
     "AdminPackDetailView",
     "AdminPackListCreateView",
+    "AdminPackMoveCardView",
     "AdminPackRemoveCardView",
     "AdminPackReorderCardsView",
     # subjects
     "SubjectCardDetailView",
+    "SubjectCardMoveView",
     "SubjectCardsReorderView",
     "SubjectCardsView",
     "SubjectDetailView",
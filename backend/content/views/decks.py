@@ -1,18 +1,31 @@
 """Decks utilisateur et packs officiels côté lecteur : CRUD, cartes, progression."""
 
-from django.db import models
+import csv
+
+from django.db import models, transaction
 from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.text import slugify
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, PolymorphicProxySerializer, extend_schema
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError as DRFValidationError
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ..models import Deck, DeckCard, MicroArticlePage, UserDeckProgress
+from learning.tasks import reschedule_deck_states
+
+from ..deck_copy import free_deck_name
+from ..deck_overlay import add_cards, deck_card_ids, deck_cards, remove_cards
+from ..deck_transfer import CONTENT_TYPES, EXPORT_FORMATS, EXTENSIONS, export_deck, import_cards, import_refs
+from ..memberships import card_deck_ids, deck_cards_changed
+from ..models import Deck, DeckCard, DeckCardExclusion, UserDeckProgress
 from ..serializers import (
     BulkAddResponseSerializer,
+    CardDecksMapSerializer,
     CardDecksUpdateResponseSerializer,
     CopyDeckResponseSerializer,
     DeckCardsResponseSerializer,
@@ -28,13 +41,17 @@ from ..serializers import (
     image_payload,
 )
 from ..serializers.inputs import (
+    CardDecksBatchSerializer,
     CardDecksUpdateSerializer,
     DeckCardAddSerializer,
     DeckCardsBulkAddSerializer,
     DeckCreateSerializer,
+    DeckImportSerializer,
     DeckPatchSerializer,
     OfficialDeckProgressSerializer,
 )
+from ..sort_keys import list_position
+from ..visibility import is_live_public, live_public_ids
 from .helpers import (
     _get_or_create_default_deck,
 )
@@ -43,12 +60,13 @@ _UNSET_POSITION = object()
 
 
 def _last_card_position(deck_id: int, card_id: int | None) -> int | None:
-    """sort_order de `card_id` dans le deck, ou None si absente."""
+    """Rang de `card_id` dans le deck (0 pour la première), ou None si absente."""
     if not card_id:
         return None
     pos = (
         DeckCard.objects.filter(deck_id=deck_id, microarticle_id=card_id)
-        .values_list("sort_order", flat=True)
+        .annotate(position=list_position(DeckCard, "deck"))
+        .values_list("position", flat=True)
         .first()
     )
     return int(pos) if pos is not None else None
@@ -101,6 +119,7 @@ class DeckListSerializer(serializers.Serializer):
     sort_order = serializers.IntegerField()
     cards_count = serializers.IntegerField()
     source_pack_id = serializers.IntegerField(allow_null=True)
+    srs_scheduler = serializers.CharField(allow_blank=True)
 
 
 class DeckListCreateView(APIView):
@@ -130,18 +149,11 @@ class DeckListCreateView(APIView):
     )
     def get(self, request):
         req_type = request.query_params.get("type")
-        public_card_ids = MicroArticlePage.objects.live().public().values_list("id", flat=True)
         if req_type == Deck.DeckType.OFFICIAL:
             qs = (
                 Deck.objects.filter(type=Deck.DeckType.OFFICIAL, status=Deck.Status.PUBLISHED)
                 .select_related("cover_image")
                 .order_by("sort_order", "id")
-                .annotate(
-                    cards_count=models.Count(
-                        "deck_cards",
-                        filter=Q(deck_cards__microarticle_id__in=public_card_ids),
-                    )
-                )
             )
 
             progress_by_deck_id: dict[int, UserDeckProgress] = {}
@@ -160,22 +172,25 @@ class DeckListCreateView(APIView):
             last_positions_by_deck_id: dict[int, int] = {}
             if last_card_by_deck_id:
                 deck_ids = list(last_card_by_deck_id.keys())
-                card_ids = list({cid for cid in last_card_by_deck_id.values() if cid})
-                rows = DeckCard.objects.filter(
-                    deck_id__in=deck_ids,
-                    microarticle_id__in=card_ids,
-                ).filter(microarticle_id__in=public_card_ids).values(
-                    "deck_id", "microarticle_id", "sort_order"
+                visible = live_public_ids()
+                card_ids = [cid for cid in set(last_card_by_deck_id.values()) if cid in visible]
+                rows = (
+                    DeckCard.objects.filter(
+                        deck_id__in=deck_ids,
+                        microarticle_id__in=card_ids,
+                    )
+                    .annotate(position=list_position(DeckCard, "deck"))
+                    .values("deck_id", "microarticle_id", "position")
                 )
                 for r in rows:
                     did = int(r["deck_id"])
                     if last_card_by_deck_id.get(did) == int(r["microarticle_id"]):
-                        last_positions_by_deck_id[did] = int(r["sort_order"])
+                        last_positions_by_deck_id[did] = int(r["position"])
 
             items: list[dict] = []
             for d in qs:
                 p = progress_by_deck_id.get(d.id)
-                cards_count = int(getattr(d, "cards_count", 0) or 0)
+                cards_count = d.live_cards_count
                 progress_payload = build_progress_payload(
                     p,
                     d.id,
@@ -206,12 +221,6 @@ class DeckListCreateView(APIView):
         qs = (
             Deck.objects.filter(user=request.user, type=Deck.DeckType.USER)
             .order_by("sort_order", "id")
-            .annotate(
-                cards_count=models.Count(
-                    "deck_cards",
-                    filter=Q(deck_cards__microarticle_id__in=public_card_ids),
-                )
-            )
         )
         items = [
             {
@@ -219,8 +228,9 @@ class DeckListCreateView(APIView):
                 "name": d.name,
                 "is_default": bool(d.is_default),
                 "sort_order": int(d.sort_order),
-                "cards_count": int(getattr(d, "cards_count", 0) or 0),
+                "cards_count": d.live_cards_count,
                 "source_pack_id": d.source_pack_id,
+                "srs_scheduler": d.srs_scheduler,
             }
             for d in qs
         ]
@@ -249,7 +259,15 @@ class DeckListCreateView(APIView):
             name=serializer.validated_data["name"],
             sort_order=int(sort_order) + 1,
         )
-        return Response({"id": deck.id, "name": deck.name, "is_default": bool(deck.is_default), "sort_order": deck.sort_order})
+        return Response(
+            {
+                "id": deck.id,
+                "name": deck.name,
+                "is_default": bool(deck.is_default),
+                "sort_order": deck.sort_order,
+                "srs_scheduler": deck.srs_scheduler,
+            }
+        )
 
 
 class DeckDetailView(APIView):
@@ -274,22 +292,18 @@ class DeckDetailView(APIView):
                 return Response(status=404)
 
         cards_qs = (
-            DeckCard.objects.filter(
-                deck=deck,
-                microarticle_id__in=MicroArticlePage.objects.live().public().values_list("id", flat=True),
-            )
+            deck_cards(deck)
             .select_related("microarticle", "microarticle__cover_image")
             .prefetch_related("microarticle__tags")
         )
-        if deck.type == Deck.DeckType.OFFICIAL or getattr(deck, "source_pack_id", None):
-            cards_qs = cards_qs.order_by("sort_order", "id")
-        else:
-            cards_qs = cards_qs.order_by("-added_at")
 
+        visible = live_public_ids()
         cards = []
         for r in cards_qs:
+            if r.microarticle_id not in visible:
+                continue
             item = dict(MicroArticleCardSerializer(r.microarticle).data)
-            item["position"] = r.sort_order
+            item["position"] = len(cards)
             item["sort_order"] = r.sort_order
             item["is_optional"] = bool(r.is_optional)
             item["notes"] = r.notes
@@ -332,10 +346,24 @@ class DeckDetailView(APIView):
         serializer = DeckPatchSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
+        reschedule = serializer.validated_data.get("srs_scheduler", deck.srs_scheduler) != deck.srs_scheduler
         for field, value in serializer.validated_data.items():
             setattr(deck, field, value)
-        deck.save(update_fields=[*serializer.validated_data, "updated_at"])
-        return Response({"id": deck.id, "name": deck.name, "is_default": bool(deck.is_default), "sort_order": deck.sort_order})
+        with transaction.atomic():
+            deck.save(update_fields=[*serializer.validated_data, "updated_at"])
+            if reschedule:
+                # Les échéances des cartes du deck ont été calculées par l'ancien
+                # algorithme ; replanifiées en tâche de fond, au commit.
+                reschedule_deck_states.enqueue(deck.id)
+        return Response(
+            {
+                "id": deck.id,
+                "name": deck.name,
+                "is_default": bool(deck.is_default),
+                "sort_order": deck.sort_order,
+                "srs_scheduler": deck.srs_scheduler,
+            }
+        )
 
     @extend_schema(operation_id="deck_delete", responses={204: None})
     def delete(self, request, deck_id: int):
@@ -344,7 +372,9 @@ class DeckDetailView(APIView):
             return Response(status=404)
         if deck.is_default:
             raise DRFValidationError({"detail": ["Default deck cannot be deleted"]})
+        card_ids = deck_card_ids(deck)
         deck.delete()
+        deck_cards_changed(request.user.pk, card_ids, deck_ids=[])
         return Response(status=204)
 
 
@@ -395,41 +425,30 @@ class DeckCardsView(APIView):
 
         search = request.query_params.get("search")
         qs = (
-            DeckCard.objects.filter(
-                deck=deck,
-                microarticle_id__in=MicroArticlePage.objects.live().public().values_list("id", flat=True),
-            )
+            deck_cards(deck)
             .select_related("microarticle", "microarticle__cover_image")
             .prefetch_related("microarticle__tags")
         )
-        if deck.type == Deck.DeckType.OFFICIAL or getattr(deck, "source_pack_id", None):
-            qs = qs.order_by("sort_order", "id")
-        else:
-            qs = qs.order_by("-added_at")
+        visible = live_public_ids()
+        rank_by_card_id = None
         if search and isinstance(search, str) and search.strip():
+            # `position` reste le rang dans le deck entier, pas parmi les résultats.
+            ordered = deck_cards(deck).values_list("microarticle_id", flat=True)
+            rank_by_card_id = {cid: rank for rank, cid in enumerate(c for c in ordered if c in visible)}
             s = search.strip()
             qs = qs.filter(
                 Q(microarticle__title__icontains=s) | Q(microarticle__answer_express__icontains=s)
             )
-        card_ids = list(qs.values_list("microarticle_id", flat=True))
-        deck_counts_by_card_id = {}
-        if request.user.is_authenticated and card_ids:
-            deck_counts_by_card_id = {
-                row["microarticle_id"]: row["decks_count"]
-                for row in DeckCard.objects.filter(
-                    deck__user=request.user,
-                    deck__type=Deck.DeckType.USER,
-                    microarticle_id__in=card_ids,
-                )
-                .values("microarticle_id")
-                .annotate(decks_count=models.Count("deck_id", distinct=True))
-            }
+        rows = [r for r in qs if r.microarticle_id in visible]
+        decks_by_card_id = {}
+        if request.user.is_authenticated and rows:
+            decks_by_card_id = card_deck_ids(request.user.pk)
 
         items: list[dict] = []
-        for r in qs:
+        for rank, r in enumerate(rows):
             item = dict(MicroArticleCardSerializer(r.microarticle).data)
-            item["decks_count"] = int(deck_counts_by_card_id.get(r.microarticle_id, 1))
-            item["position"] = r.sort_order
+            item["decks_count"] = len(decks_by_card_id.get(r.microarticle_id, ())) or 1
+            item["position"] = rank if rank_by_card_id is None else rank_by_card_id[r.microarticle_id]
             item["sort_order"] = r.sort_order
             item["is_optional"] = bool(r.is_optional)
             item["notes"] = r.notes
@@ -454,16 +473,8 @@ class DeckCardsView(APIView):
         serializer.is_valid(raise_exception=True)
         microarticle_id = serializer.validated_data["card"].pk
 
-        obj, created = DeckCard.objects.get_or_create(deck=deck, microarticle_id=microarticle_id)
-        if created and getattr(deck, "source_pack_id", None):
-            max_sort = (
-                DeckCard.objects.filter(deck_id=deck.id)
-                .exclude(id=obj.id)
-                .aggregate(models.Max("sort_order"))
-                .get("sort_order__max")
-            )
-            obj.sort_order = int(max_sort) + 1 if max_sort is not None else 0
-            obj.save(update_fields=["sort_order"])
+        if add_cards(deck, [microarticle_id]):
+            deck_cards_changed(request.user.pk, [microarticle_id], deck_ids=[deck.id])
         return Response({"ok": True})
 
 
@@ -490,42 +501,14 @@ class DeckCardsBulkAddView(APIView):
         if not micro_ids:
             return Response({"added": 0, "already_present": 0})
 
-        public_ids = set(
-            MicroArticlePage.objects.live()
-            .public()
-            .filter(id__in=micro_ids)
-            .values_list("id", flat=True)
-        )
+        public_ids = live_public_ids().intersection(micro_ids)
         if len(public_ids) != len(micro_ids):
             raise DRFValidationError({"card_ids": ["Contains an unknown or unavailable card"]})
 
-        existing = set(
-            DeckCard.objects.filter(deck_id=deck.id, microarticle_id__in=micro_ids).values_list(
-                "microarticle_id", flat=True
-            )
-        )
-
-        to_add = [mid for mid in micro_ids if mid not in existing]
-        if not to_add:
-            return Response({"added": 0, "already_present": len(existing)})
-
-        max_sort = (
-            DeckCard.objects.filter(deck_id=deck.id)
-            .aggregate(models.Max("sort_order"))
-            .get("sort_order__max")
-        )
-        next_sort = int(max_sort) + 1 if max_sort is not None else 0
-
-        objs = []
-        for mid in to_add:
-            obj = DeckCard(deck=deck, microarticle_id=mid)
-            if getattr(deck, "source_pack_id", None):
-                obj.sort_order = next_sort
-                next_sort += 1
-            objs.append(obj)
-
-        DeckCard.objects.bulk_create(objs)
-        return Response({"added": len(objs), "already_present": len(existing)})
+        added = add_cards(deck, micro_ids)
+        if added:
+            deck_cards_changed(request.user.pk, added, deck_ids=[deck.id])
+        return Response({"added": len(added), "already_present": len(micro_ids) - len(added)})
 
 
 class OfficialDeckCopyToUserView(APIView):
@@ -554,30 +537,23 @@ class OfficialDeckCopyToUserView(APIView):
         )
 
         desired = pack.name.strip() if isinstance(pack.name, str) else "Pack"
-        base_name = desired or "Pack"
-        name = base_name
-        idx = 2
-        while Deck.objects.filter(user=request.user, type=Deck.DeckType.USER, name=name).exists():
-            name = f"{base_name} ({idx})"
-            idx += 1
-
-        deck = Deck.objects.create(
-            user=request.user,
-            type=Deck.DeckType.USER,
-            name=name,
-            sort_order=int(sort_order) + 1,
-            source_pack=pack,
-        )
-
-        cards_qs = DeckCard.objects.filter(
-            deck=pack,
-            microarticle_id__in=MicroArticlePage.objects.live().public().values_list("id", flat=True),
-        ).order_by("sort_order", "id")
-        objs = []
-        for i, c in enumerate(cards_qs):
-            objs.append(DeckCard(deck=deck, microarticle_id=c.microarticle_id, sort_order=i))
-        if objs:
-            DeckCard.objects.bulk_create(objs)
+        name = free_deck_name(request.user.pk, desired or "Pack")
+
+        # Le deck hérite des cartes du pack sans les recopier (`content.deck_overlay`).
+        with transaction.atomic():
+            deck = Deck.objects.create(
+                user=request.user,
+                type=Deck.DeckType.USER,
+                name=name,
+                sort_order=int(sort_order) + 1,
+                source_pack=pack,
+                cards_inherited=True,
+            )
+            card_ids = list(
+                DeckCard.objects.filter(deck_id=pack.id).values_list("microarticle_id", flat=True)
+            )
+            if card_ids:
+                deck_cards_changed(request.user.pk, card_ids, deck_ids=[deck.id])
 
         return Response({"deck_id": deck.id})
 
@@ -608,10 +584,7 @@ class OfficialDeckStartView(APIView):
             obj.last_seen_at = timezone.now()
             obj.save(update_fields=["last_seen_at"])
 
-        cards_count = DeckCard.objects.filter(
-            deck_id=deck.id,
-            microarticle_id__in=MicroArticlePage.objects.live().public().values_list("id", flat=True),
-        ).count()
+        cards_count = deck.live_cards_count
         return Response(
             {"deck_id": deck.id, **build_progress_payload(obj, deck.id, cards_count)}
         )
@@ -681,10 +654,7 @@ class OfficialDeckProgressView(APIView):
         # Always persist last_seen_at
         obj.save(update_fields=list(dict.fromkeys(update_fields)))
 
-        cards_count = DeckCard.objects.filter(
-            deck_id=deck.id,
-            microarticle_id__in=MicroArticlePage.objects.live().public().values_list("id", flat=True),
-        ).count()
+        cards_count = deck.live_cards_count
 
         return Response(
             {"deck_id": deck.id, **build_progress_payload(obj, deck.id, cards_count)}
@@ -699,24 +669,80 @@ class DeckCardDetailView(APIView):
         deck = Deck.objects.filter(id=deck_id, user=request.user, type=Deck.DeckType.USER).first()
         if deck is None:
             return Response(status=404)
-        DeckCard.objects.filter(deck=deck, microarticle_id=card_id).delete()
+        if remove_cards(deck, [card_id]):
+            deck_cards_changed(request.user.pk, [card_id], deck_ids=[deck.id])
         return Response(status=204)
 
 
+class DeckExportView(APIView):
+    """Fichier des cartes d'un deck utilisateur ou d'un pack publié, envoyé en flux.
+
+    `fmt` : `json`, `csv` ou `anki` (texte importable par Anki) ; voir
+    `content.deck_transfer`.
+    """
+
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        operation_id="deck_export",
+        parameters=[OpenApiParameter("fmt", str, OpenApiParameter.PATH, enum=list(EXPORT_FORMATS))],
+        responses={200: OpenApiTypes.BINARY},
+    )
+    def get(self, request, deck_id: int, fmt: str):
+        if fmt not in EXPORT_FORMATS:
+            return Response(status=404)
+        deck = Deck.objects.filter(id=deck_id).first()
+        if deck is None:
+            return Response(status=404)
+        if deck.type == Deck.DeckType.OFFICIAL:
+            if deck.status != Deck.Status.PUBLISHED:
+                return Response(status=404)
+        elif not request.user.is_authenticated or deck.user_id != request.user.id:
+            return Response(status=404)
+
+        response = StreamingHttpResponse(export_deck(deck, fmt), content_type=CONTENT_TYPES[fmt])
+        filename = f"{slugify(deck.name) or 'deck'}.{EXTENSIONS[fmt]}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class DeckImportView(APIView):
+    """Ajoute à un deck utilisateur les fiches d'un fichier exporté (JSON, CSV ou Anki).
+
+    Le fichier est lu en flux et les cartes ajoutées par tranches : une erreur
+    de lecture en cours de route laisse en place les tranches déjà ajoutées.
+    """
+
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    @extend_schema(operation_id="deck_import", request=DeckImportSerializer, responses=BulkAddResponseSerializer)
+    def post(self, request, deck_id: int):
+        deck = Deck.objects.filter(id=deck_id, user=request.user, type=Deck.DeckType.USER).first()
+        if deck is None:
+            return Response(status=404)
+
+        serializer = DeckImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        refs = import_refs(serializer.validated_data["file"], serializer.validated_data["format"])
+        try:
+            result = import_cards(deck, refs)
+        except (ValueError, csv.Error) as exc:
+            # `UnicodeDecodeError` et `json.JSONDecodeError` sont des `ValueError`.
+            raise DRFValidationError({"file": "file must be UTF-8 text in the given format"}) from exc
+        return Response(result)
+
+
 class CardDecksView(APIView):
     permission_classes = [IsAuthenticated]
 
     @extend_schema(operation_id="card_deck_list", responses=DeckMembershipSerializer(many=True))
     def get(self, request, card_id: int):
-        if not MicroArticlePage.objects.live().public().filter(id=card_id).exists():
+        if not is_live_public(card_id):
             return Response(status=404)
         _get_or_create_default_deck(request.user)
         decks = list(Deck.objects.filter(user=request.user, type=Deck.DeckType.USER).order_by("sort_order", "id"))
-        member_deck_ids = set(
-            DeckCard.objects.filter(deck__user=request.user, microarticle_id=card_id).values_list(
-                "deck_id", flat=True
-            )
-        )
+        member_deck_ids = set(card_deck_ids(request.user.pk).get(card_id, ()))
         items = [
             {
                 "id": d.id,
@@ -734,25 +760,112 @@ class CardDecksView(APIView):
         responses=CardDecksUpdateResponseSerializer,
     )
     def put(self, request, card_id: int):
-        if not MicroArticlePage.objects.live().public().filter(id=card_id).exists():
+        if not is_live_public(card_id):
             return Response(status=404)
         serializer = CardDecksUpdateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         normalized = serializer.validated_data["deck_ids"]
 
-        allowed_decks = Deck.objects.filter(user=request.user, type=Deck.DeckType.USER, id__in=normalized)
-        allowed_ids = set(allowed_decks.values_list("id", flat=True))
-
-        DeckCard.objects.filter(deck__user=request.user, microarticle_id=card_id).exclude(
-            deck_id__in=list(allowed_ids)
-        ).delete()
-
-        existing = set(
-            DeckCard.objects.filter(deck__user=request.user, microarticle_id=card_id).values_list(
-                "deck_id", flat=True
+        source_pack_by_deck_id = dict(
+            Deck.objects.filter(user=request.user, type=Deck.DeckType.USER, id__in=normalized).values_list(
+                "id", "source_pack_id"
             )
         )
-        for deck_id in allowed_ids - existing:
-            DeckCard.objects.get_or_create(deck_id=deck_id, microarticle_id=card_id)
+        allowed_ids = list(source_pack_by_deck_id)
+        # Comme `DeckCardsView.post` : un deck issu d'un pack garde l'ordre du
+        # pack, la carte ajoutée passe à la fin.
+        ordered_ids = {deck_id for deck_id, pack_id in source_pack_by_deck_id.items() if pack_id}
+
+        with transaction.atomic():
+            # Decks hérités dont le pack contient la carte : seule l'exclusion bouge.
+            inherited_pack_by_deck_id = dict(
+                Deck.objects.filter(user=request.user, type=Deck.DeckType.USER, cards_inherited=True)
+                .exclude(source_pack=None)
+                .values_list("id", "source_pack_id")
+            )
+            holding_pack_ids = set(
+                DeckCard.objects.filter(
+                    deck_id__in=set(inherited_pack_by_deck_id.values()), microarticle_id=card_id
+                ).values_list("deck_id", flat=True)
+            )
+            from_pack_ids = {
+                deck_id
+                for deck_id, pack_id in inherited_pack_by_deck_id.items()
+                if pack_id in holding_pack_ids
+            }
+            dropped = DeckCard.objects.filter(deck__user=request.user, microarticle_id=card_id).exclude(
+                deck_id__in=allowed_ids
+            )
+            dropped_ids = set(dropped.values_list("deck_id", flat=True))
+            dropped.delete()
+            DeckCardExclusion.objects.filter(
+                deck_id__in=from_pack_ids.intersection(allowed_ids), microarticle_id=card_id
+            ).delete()
+            DeckCardExclusion.objects.bulk_create(
+                [
+                    DeckCardExclusion(deck_id=deck_id, microarticle_id=card_id)
+                    for deck_id in from_pack_ids.difference(allowed_ids)
+                ],
+                ignore_conflicts=True,
+            )
+            max_sort_by_deck_id = {}
+            if ordered_ids:
+                # Un ajout à un deck hérité se range aussi après les cartes du pack.
+                pack_of = {
+                    deck_id: inherited_pack_by_deck_id[deck_id]
+                    for deck_id in ordered_ids & inherited_pack_by_deck_id.keys()
+                }
+                max_sort = dict(
+                    DeckCard.objects.filter(deck_id__in=ordered_ids | set(pack_of.values()))
+                    .values("deck_id")
+                    .annotate(max_sort=models.Max("sort_order"))
+                    .values_list("deck_id", "max_sort")
+                    .order_by()
+                )
+                for deck_id in ordered_ids:
+                    values = [max_sort.get(deck_id), max_sort.get(pack_of.get(deck_id))]
+                    values = [v for v in values if v is not None]
+                    if values:
+                        max_sort_by_deck_id[deck_id] = max(values)
+            objs = []
+            for deck_id in allowed_ids:
+                if deck_id in from_pack_ids:
+                    continue
+                obj = DeckCard(deck_id=deck_id, microarticle_id=card_id)
+                if deck_id in ordered_ids:
+                    max_sort = max_sort_by_deck_id.get(deck_id)
+                    obj.sort_order = int(max_sort) + 1 if max_sort is not None else 0
+                objs.append(obj)
+            # Les decks qui contiennent déjà la carte sont ignorés (`uniq_deck_card`).
+            DeckCard.objects.bulk_create(objs, ignore_conflicts=True)
+            deck_cards_changed(
+                request.user.pk, [card_id], deck_ids=dropped_ids | from_pack_ids | set(allowed_ids)
+            )
+
+        return Response({"ok": True, "deck_ids": allowed_ids})
 
-        return Response({"ok": True, "deck_ids": list(allowed_ids)})
+
+class CardDecksBatchView(APIView):
+    """Decks de l'utilisateur contenant chacune des fiches demandées.
+
+    Pendant groupé de `GET cards/<id>/decks/` pour une page de cartes : une
+    fiche inconnue, non publiée ou absente de tout deck vaut une liste vide.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        operation_id="card_deck_batch",
+        request=CardDecksBatchSerializer,
+        responses=CardDecksMapSerializer,
+    )
+    def post(self, request):
+        serializer = CardDecksBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        decks_by_card_id = card_deck_ids(request.user.pk)
+        visible = live_public_ids()
+        items = {
+            str(card_id): decks_by_card_id.get(card_id, []) if card_id in visible else []
+            for card_id in serializer.validated_data["card_ids"]
+        }
+        return Response({"items": items})
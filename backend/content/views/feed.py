@@ -16,6 +16,7 @@ from drf_spectacular.utils import extend_schema
 from learning.models import LessonProgress
 
 from ..html import sanitize_rich_text
+from ..memberships import deck_cards_changed
 from ..models import (
     DeckCard,
     LandingPage,
@@ -33,6 +34,7 @@ from ..serializers import (
     SavedStateSerializer,
 )
 from ..serializers.inputs import ReadStateQuerySerializer, SavedMicroArticleCreateSerializer
+from ..visibility import live_public_ids
 from .helpers import (
     _apply_tree_filter,
     _get_default_deck,
@@ -363,16 +365,16 @@ class SavedMicroArticleListView(APIView):
     def get(self, request):
         default_deck = _get_or_create_default_deck(request.user)
         rows = (
-            DeckCard.objects.filter(
-                deck=default_deck,
-                microarticle_id__in=MicroArticlePage.objects.live().public().values_list("id", flat=True),
-            )
+            DeckCard.objects.filter(deck=default_deck)
             .select_related("microarticle", "microarticle__cover_image")
             .prefetch_related("microarticle__tags")
             .order_by("-added_at")
         )
 
-        items = [MicroArticleCardSerializer(r.microarticle).data for r in rows]
+        visible = live_public_ids()
+        items = [
+            MicroArticleCardSerializer(r.microarticle).data for r in rows if r.microarticle_id in visible
+        ]
         return Response(items)
 
     @extend_schema(
@@ -386,7 +388,9 @@ class SavedMicroArticleListView(APIView):
         page = serializer.validated_data["page"]
 
         default_deck = _get_or_create_default_deck(request.user)
-        DeckCard.objects.get_or_create(deck=default_deck, microarticle=page)
+        _obj, created = DeckCard.objects.get_or_create(deck=default_deck, microarticle=page)
+        if created:
+            deck_cards_changed(request.user.pk, [page.id], deck_ids=[default_deck.id])
         return Response({"saved": True})
 
 
@@ -407,7 +411,9 @@ class SavedMicroArticleDetailView(APIView):
             return Response(status=204)
         default_deck = _get_default_deck(request.user)
         if default_deck is not None:
-            DeckCard.objects.filter(deck=default_deck, microarticle_id=page.id).delete()
+            deleted, _ = DeckCard.objects.filter(deck=default_deck, microarticle_id=page.id).delete()
+            if deleted:
+                deck_cards_changed(request.user.pk, [page.id], deck_ids=[default_deck.id])
         return Response(status=204)
 
 
@@ -1,6 +1,6 @@
 """Back-office des packs officiels : CRUD, recherche de fiches, upload d'images."""
 
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Q
 from django.utils.text import slugify
 from drf_spectacular.utils import OpenApiParameter, extend_schema
@@ -21,6 +21,7 @@ from ..models import (
     DeckCard,
     MicroArticlePage,
 )
+from ..pack_sync import pack_cards_changed
 from ..permissions import IsStaff
 from ..search import filter_microarticles
 from ..serializers import (
@@ -38,9 +39,11 @@ from ..serializers.inputs import (
     AdminImageUploadSerializer,
     AdminPackBulkAddSerializer,
     AdminPackCreateSerializer,
+    AdminPackMoveCardSerializer,
     AdminPackPatchSerializer,
     AdminPackReorderSerializer,
 )
+from ..sort_keys import SORT_GAP, move_between, next_sort_key, sort_key
 
 
 def _admin_pack_qs():
@@ -131,7 +134,7 @@ class AdminPackDetailView(APIView):
             item = dict(MicroArticleCardSerializer(r.microarticle).data)
             item["deck_card_id"] = r.id
             item["sort_order"] = r.sort_order
-            item["position"] = r.sort_order
+            item["position"] = len(cards)
             item["is_optional"] = bool(r.is_optional)
             item["notes"] = r.notes
             cards.append(item)
@@ -387,12 +390,7 @@ class AdminPackBulkAddView(APIView):
             DeckCard.objects.filter(deck_id=deck.id).values_list("microarticle_id", flat=True)
         )
 
-        max_sort = (
-            DeckCard.objects.filter(deck_id=deck.id)
-            .aggregate(models.Max("sort_order"))
-            .get("sort_order__max")
-        )
-        next_sort = int(max_sort) + 1 if max_sort is not None else 0
+        next_sort = next_sort_key(DeckCard.objects.filter(deck_id=deck.id))
 
         # Résolution en 2 requêtes (ids puis slugs) au lieu d'un lookup par token.
         wanted_ids = {int(t) for t in tokens if isinstance(t, str) and t.isdigit()}
@@ -428,13 +426,14 @@ class AdminPackBulkAddView(APIView):
 
             obj = DeckCard(deck=deck, microarticle=page)
             obj.sort_order = next_sort
-            next_sort += 1
+            next_sort += SORT_GAP
             to_create.append(obj)
             existing_ids.add(page.id)
             added += 1
 
         if to_create:
             DeckCard.objects.bulk_create(to_create)
+            pack_cards_changed(deck.id, [obj.microarticle_id for obj in to_create])
 
         return Response({"added": added, "already_present": already, "not_found": not_found})
 
@@ -452,7 +451,9 @@ class AdminPackRemoveCardView(APIView):
         if deck is None:
             return Response(status=404)
 
-        DeckCard.objects.filter(deck_id=deck.id, microarticle_id=card_id).delete()
+        deleted, _ = DeckCard.objects.filter(deck_id=deck.id, microarticle_id=card_id).delete()
+        if deleted:
+            pack_cards_changed(deck.id, [card_id])
         return Response({"ok": True})
 
 
@@ -483,11 +484,47 @@ class AdminPackReorderCardsView(APIView):
         updated = []
         for idx, mid in enumerate(ids):
             c = cards_by_mid[mid]
-            if c.sort_order != idx:
-                c.sort_order = idx
+            if c.sort_order != sort_key(idx):
+                c.sort_order = sort_key(idx)
                 updated.append(c)
 
         if updated:
             DeckCard.objects.bulk_update(updated, ["sort_order"])
 
         return Response({"ok": True, "updated": len(updated)})
+
+
+class AdminPackMoveCardView(APIView):
+    """Déplace une carte du pack entre deux autres, sans réécrire la liste.
+
+    Une seule ligne écrite dans le cas courant ; voir `content.sort_keys`.
+    """
+
+    permission_classes = [IsStaff]
+
+    @extend_schema(
+        operation_id="admin_pack_card_move",
+        request=AdminPackMoveCardSerializer,
+        responses=CountUpdateResponseSerializer,
+    )
+    def post(self, request, pack_id: int):
+        deck = Deck.objects.filter(id=pack_id, type=Deck.DeckType.OFFICIAL).first()
+        if deck is None:
+            return Response(status=404)
+
+        serializer = AdminPackMoveCardSerializer(data=request.data, context={"deck": deck})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        with transaction.atomic():
+            try:
+                updated = move_between(
+                    DeckCard.objects.filter(deck_id=deck.id),
+                    data["row"],
+                    after=data["after"],
+                    before=data["before"],
+                )
+            except ValueError:
+                raise DRFValidationError({"before_id": ["before_id must come after after_id"]})
+
+        return Response({"ok": True, "updated": updated})
@@ -1,8 +1,9 @@
 """API des sujets : liste/détail publics, gestion des cartes réservée au staff."""
 
-from django.db import IntegrityError, models, transaction
+from django.db import IntegrityError, transaction
 from django.db.models import Count, Exists, OuterRef, Q
 from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework.exceptions import ValidationError as DRFValidationError
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -18,11 +19,13 @@ from ..serializers import (
 )
 from ..serializers.inputs import (
     SubjectCardAddSerializer,
+    SubjectCardMoveSerializer,
     SubjectCardPatchSerializer,
     SubjectCardsReorderSerializer,
     SubjectCreateSerializer,
     SubjectPatchSerializer,
 )
+from ..sort_keys import move_between, next_sort_key, sort_key
 from .helpers import _subject_cards_payload
 
 # Le contrôle d'unicité du serializer (SELECT) et l'écriture (INSERT/UPDATE) ne
@@ -223,12 +226,10 @@ class SubjectCardsView(APIView):
         page = serializer.validated_data["card"]
         label = serializer.validated_data["label"]
 
-        max_order = subject.subject_cards.aggregate(m=models.Max("sort_order"))["m"] or 0
-
         link, created = SubjectCard.objects.get_or_create(
             subject=subject,
             microarticle=page,
-            defaults={"label": label, "sort_order": max_order + 1},
+            defaults={"label": label, "sort_order": next_sort_key(subject.subject_cards.all())},
         )
         if not created and label:
             link.label = label
@@ -323,11 +324,41 @@ class SubjectCardsReorderView(APIView):
         updated = []
         for idx, card_id in enumerate(order):
             link = links.get(card_id)
-            if link is not None and link.sort_order != idx:
-                link.sort_order = idx
+            if link is not None and link.sort_order != sort_key(idx):
+                link.sort_order = sort_key(idx)
                 updated.append(link)
 
         if updated:
             SubjectCard.objects.bulk_update(updated, ["sort_order"])
 
         return Response({"ok": True, "updated": len(updated)})
+
+
+class SubjectCardMoveView(APIView):
+    """Move one card between two others within a subject (admin only); see `content.sort_keys`."""
+
+    permission_classes = [IsStaff]
+
+    @extend_schema(
+        operation_id="subject_card_move",
+        request=SubjectCardMoveSerializer,
+        responses=CountUpdateResponseSerializer,
+    )
+    def post(self, request, slug: str):
+        subject = Subject.objects.filter(slug=slug).first()
+        if subject is None:
+            return Response(status=404)
+
+        serializer = SubjectCardMoveSerializer(data=request.data, context={"subject": subject})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        with transaction.atomic():
+            try:
+                updated = move_between(
+                    subject.subject_cards.all(), data["row"], after=data["after"], before=data["before"]
+                )
+            except ValueError:
+                raise DRFValidationError({"before_id": ["before_id must come after after_id"]})
+
+        return Response({"ok": True, "updated": updated})
@@ -0,0 +1,78 @@
+"""Ensemble des fiches live et publiques, mémorisé et versionné.
+
+`MicroArticlePage.objects.live().public()` revenait en sous-requête dans presque
+toutes les vues de decks, de cartes sauvegardées et de progression, et
+`public()` y relit à chaque fois `PageViewRestriction`. Ici l'ensemble des ids
+est calculé une fois, rangé en cache sous un jeton de version, et les vues
+testent l'appartenance en mémoire (`id in live_public_ids()`) ou filtrent les
+quelques lignes qu'elles ont déjà lues.
+
+Invalidation (voir `content.signals`) : la création d'une fiche, sa
+publication, sa dépublication ou sa suppression, tout déplacement de page et
+toute restriction d'accès posée ou levée change le jeton ; un brouillon ou une
+révision non publiée, non. Une écriture de masse qui contourne les signaux
+(`QuerySet.update`) n'est rattrapée qu'à l'expiration (`CACHE_TTL`).
+
+Le jeton est relu à chaque appel (une lecture de cache) ; l'ensemble lui-même
+n'est désérialisé qu'une fois par processus et par version.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+CACHE_KEY_PREFIX = "content:live-public-ids:v1"
+CACHE_TTL = 3600
+
+_VERSION_KEY = f"{CACHE_KEY_PREFIX}:version"
+
+_memo: tuple[str, frozenset[int]] | None = None
+
+
+def _version() -> str:
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        # Jeton neuf plutôt qu'une valeur fixe : un jeton évincé ne ramène pas
+        # un ensemble écrit avant lui.
+        cache.add(_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(_VERSION_KEY)
+    return version
+
+
+def live_public_ids() -> frozenset[int]:
+    """Ids des `MicroArticlePage` live et publiques."""
+    global _memo
+    from .models import MicroArticlePage
+
+    version = _version()
+    if _memo is not None and _memo[0] == version:
+        return _memo[1]
+
+    key = f"{CACHE_KEY_PREFIX}:{version}"
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(MicroArticlePage.objects.live().public().values_list("id", flat=True))
+        cache.set(key, ids, CACHE_TTL)
+    _memo = (version, ids)
+    return ids
+
+
+def is_live_public(page_id: int) -> bool:
+    return page_id in live_public_ids()
+
+
+def invalidate_live_public_ids() -> None:
+    """Change le jeton, puis de nouveau au commit de la transaction en cours.
+
+    Une lecture concurrente d'avant le commit peut ranger sous le premier jeton
+    l'ensemble d'avant l'écriture : le second l'écarte.
+    """
+    def bump():
+        cache.set(_VERSION_KEY, uuid.uuid4().hex, None)
+
+    bump()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(bump)
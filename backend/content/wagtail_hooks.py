@@ -4,6 +4,9 @@ from django.urls import path
 
 from wagtail import hooks
 
+from .deck_counts import sync_deck_card_counts
+from .models import Deck, DeckCard
+from .pack_sync import pack_cards_changed
 from .wagtail_pack_admin import pack_bulk_add
 
 
@@ -32,3 +35,28 @@ def register_pack_admin_urls():
     return [
         path("packs/<int:pack_id>/bulk-add/", pack_bulk_add, name="pack_bulk_add"),
     ]
+
+
+@hooks.register("before_edit_snippet")
+def remember_pack_cards(request, instance):
+    # Cartes du pack avant l'enregistrement : le diff propagé aux copies
+    # (`content.pack_sync`) se calcule après coup contre cet état.
+    if isinstance(instance, Deck) and instance.type == Deck.DeckType.OFFICIAL:
+        request._pack_card_ids = set(
+            DeckCard.objects.filter(deck_id=instance.pk).values_list("microarticle_id", flat=True)
+        )
+
+
+@hooks.register("after_create_snippet")
+@hooks.register("after_edit_snippet")
+def sync_pack_card_count(request, instance):
+    # Les cartes d'un pack s'éditent en ligne (`InlinePanel`) : elles sont
+    # enregistrées avec le snippet, sans passer par `content.deck_counts`.
+    if not isinstance(instance, Deck):
+        return
+    before = getattr(request, "_pack_card_ids", None)
+    if instance.type == Deck.DeckType.OFFICIAL and before is not None:
+        after = set(DeckCard.objects.filter(deck_id=instance.pk).values_list("microarticle_id", flat=True))
+        pack_cards_changed(instance.pk, before ^ after)
+    else:
+        sync_deck_card_counts([instance.pk])
@@ -5,12 +5,13 @@ from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import permission_required
 from django.db import transaction
-from django.db.models import Max
 from django.http import HttpRequest
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 
 from .models import DeckCard, MicroArticlePage, Pack
+from .pack_sync import pack_cards_changed
+from .sort_keys import SORT_GAP, next_sort_key
 
 
 def _extract_page_id(token: str) -> int | None:
@@ -62,12 +63,7 @@ def pack_bulk_add(request: HttpRequest, pack_id: int):
         already_present: list[dict] = []
         not_found: list[str] = []
 
-        max_sort = (
-            DeckCard.objects.filter(deck_id=pack.id)
-            .aggregate(Max("sort_order"))
-            .get("sort_order__max")
-        )
-        next_sort = int(max_sort) + 1 if max_sort is not None else 0
+        next_sort = next_sort_key(DeckCard.objects.filter(deck_id=pack.id))
 
         with transaction.atomic():
             for token in tokens:
@@ -91,10 +87,13 @@ def pack_bulk_add(request: HttpRequest, pack_id: int):
 
                 obj = DeckCard(deck=pack, microarticle=page)
                 obj.sort_order = next_sort
-                next_sort += 1
+                next_sort += SORT_GAP
                 obj.save()
                 added.append({"id": page.id, "title": page.title, "slug": page.slug})
 
+            if added:
+                pack_cards_changed(pack.id, [item["id"] for item in added])
+
         messages.success(
             request,
             f"Ajout terminé : {len(added)} ajoutée(s), {len(already_present)} déjà présente(s), {len(not_found)} introuvable(s).",
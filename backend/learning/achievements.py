@@ -0,0 +1,262 @@
+"""Séries (streaks) et badges, avancés par incréments.
+
+Chaque journée d'activité que `DailyRollup` écrit est aussi passée à
+`record_days` : l'`AchievementState` de l'utilisateur avance d'un pas (série,
+compteurs cumulés) en un `INSERT … ON CONFLICT DO UPDATE`, comme
+`learning.upserts` — sans verrou de ligne, deux appareils concurrents ne
+s'attendent pas. Les badges dont le palier vient d'être franchi sont déduits des
+valeurs renvoyées (`RETURNING`), comparées à la plus longue série lue avant
+l'écriture (une requête par lot), et insérés après le commit. Le travail par
+écriture est constant — aucune lecture de l'historique, aucun agrégat.
+`advance` est la même règle en Python, pour `replay_achievements`.
+
+La série compte les jours consécutifs avec au moins une activité (fuseau du
+serveur). Une journée arrivée en retard (lot hors ligne) qui précède juste la
+série en cours l'allonge ; une journée qui comblerait un trou plus ancien ne la
+recoud pas, faute d'historique : `replay_achievements` la recalcule depuis
+`LearningDay`.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .upserts import quoted_column, typed_param
+
+REPLAY_CHUNK_SIZE = 500
+ONE_DAY = timedelta(days=1)
+_STATE_FIELDS = (
+    "current_streak",
+    "longest_streak",
+    "streak_start",
+    "last_active_day",
+    "cards_read",
+    "reviews_count",
+    "reviews_know",
+    "updated_at",
+)
+
+
+@dataclass(frozen=True)
+class BadgeRule:
+    code: str
+    label: str
+    metric: str
+    threshold: int
+
+
+# Volume, maîtrise, régularité (canevas UX). `metric` : champ d'`AchievementState`.
+BADGES: tuple[BadgeRule, ...] = (
+    BadgeRule("first_card", "Première fiche lue", "cards_read", 1),
+    BadgeRule("cards_100", "100 fiches lues", "cards_read", 100),
+    BadgeRule("cards_1000", "1 000 fiches lues", "cards_read", 1000),
+    BadgeRule("first_review", "Première révision", "reviews_count", 1),
+    BadgeRule("reviews_500", "500 révisions", "reviews_count", 500),
+    BadgeRule("know_100", "100 cartes sues", "reviews_know", 100),
+    BadgeRule("know_1000", "1 000 cartes sues", "reviews_know", 1000),
+    BadgeRule("streak_7", "7 jours d'affilée", "longest_streak", 7),
+    BadgeRule("streak_30", "30 jours d'affilée", "longest_streak", 30),
+    BadgeRule("streak_100", "100 jours d'affilée", "longest_streak", 100),
+)
+_BADGE_METRICS = tuple(dict.fromkeys(rule.metric for rule in BADGES))
+
+
+def advance(state, day: date, counts: Counter) -> list[BadgeRule]:
+    """Applique à `state` une journée d'activité ; renvoie les badges franchis."""
+    before = {rule.metric: getattr(state, rule.metric) for rule in BADGES}
+
+    state.cards_read += counts["cards_read"]
+    state.reviews_know += counts["reviews_know"]
+    state.reviews_count += counts["reviews_know"] + counts["reviews_medium"] + counts["reviews_again"]
+
+    last = state.last_active_day
+    if last is None or day > last + timedelta(days=1):
+        state.current_streak = 1
+        state.streak_start = day
+        state.last_active_day = day
+    elif day == last + timedelta(days=1):
+        state.current_streak += 1
+        state.last_active_day = day
+    elif day == state.streak_start - timedelta(days=1):
+        state.current_streak += 1
+        state.streak_start = day
+    state.longest_streak = max(state.longest_streak, state.current_streak)
+
+    return [
+        rule
+        for rule in BADGES
+        if before[rule.metric] < rule.threshold <= getattr(state, rule.metric)
+    ]
+
+
+def current_streak(state, today: date) -> int:
+    """Série affichée : rompue si ni aujourd'hui ni hier n'ont compté."""
+    if state.last_active_day is None or state.last_active_day < today - timedelta(days=1):
+        return 0
+    return state.current_streak
+
+
+def _upsert_day(
+    cursor, user_id: int, day: date, counts: Counter, now, longest_streak: int
+) -> dict[str, dict[str, int]]:
+    # `advance` traduit en SQL, appliqué par la base à la ligne existante.
+    from .models import AchievementState
+
+    table = connection.ops.quote_name(AchievementState._meta.db_table)
+    col = {name: quoted_column(AchievementState, name) for name in (*_STATE_FIELDS, "user")}
+    old = {name: f"{table}.{column}" for name, column in col.items()}
+    increments = {
+        "cards_read": counts["cards_read"],
+        "reviews_count": counts["reviews_know"] + counts["reviews_medium"] + counts["reviews_again"],
+        "reviews_know": counts["reviews_know"],
+    }
+
+    # Les placeholders sont ajoutés dans l'ordre du texte : les f-strings ci-dessous
+    # appellent `param` de gauche à droite.
+    params = []
+
+    def param(name, value):
+        sql, value = typed_param(AchievementState, name, value)
+        params.append(value)
+        return sql
+
+    def starts_over():
+        last = old["last_active_day"]
+        return f"({last} IS NULL OR {last} < {param('last_active_day', day - ONE_DAY)})"
+
+    def follows():
+        return f"{old['last_active_day']} = {param('last_active_day', day - ONE_DAY)}"
+
+    def precedes():
+        return f"{old['streak_start']} = {param('streak_start', day + ONE_DAY)}"
+
+    def streak():
+        return (
+            f"CASE WHEN {starts_over()} THEN 1 WHEN {follows()} OR {precedes()} "
+            f"THEN {old['current_streak']} + 1 ELSE {old['current_streak']} END"
+        )
+
+    values = {
+        "user": user_id,
+        "current_streak": 1,
+        "longest_streak": 1,
+        "streak_start": day,
+        "last_active_day": day,
+        **increments,
+        "updated_at": now,
+    }
+    insert_sql = ", ".join(param(name, value) for name, value in values.items())
+    assignments = {
+        "current_streak": streak(),
+        "longest_streak": (
+            f"CASE WHEN {streak()} > {old['longest_streak']} THEN {streak()} ELSE {old['longest_streak']} END"
+        ),
+        "streak_start": (
+            f"CASE WHEN {starts_over()} THEN EXCLUDED.{col['streak_start']} "
+            f"WHEN {follows()} THEN {old['streak_start']} "
+            f"WHEN {precedes()} THEN EXCLUDED.{col['streak_start']} ELSE {old['streak_start']} END"
+        ),
+        "last_active_day": (
+            f"CASE WHEN {starts_over()} OR {follows()} THEN EXCLUDED.{col['last_active_day']} "
+            f"ELSE {old['last_active_day']} END"
+        ),
+        **{name: f"{old[name]} + EXCLUDED.{col[name]}" for name in increments},
+        "updated_at": f"EXCLUDED.{col['updated_at']}",
+    }
+    set_sql = ", ".join(f"{col[name]} = {expression}" for name, expression in assignments.items())
+    returned = list(_BADGE_METRICS)
+    cursor.execute(
+        f"INSERT INTO {table} ({', '.join(col[name] for name in values)}) VALUES ({insert_sql}) "
+        f"ON CONFLICT ({col['user']}) DO UPDATE SET {set_sql} "
+        f"RETURNING {', '.join(col[name] for name in returned)}",
+        params,
+    )
+    after = dict(zip(returned, cursor.fetchone()))
+    # Avant l'écriture : compteurs moins l'incrément ; la plus longue série est
+    # celle lue par l'appelant (`RETURNING` ne voit que la ligne écrite).
+    before = {name: after[name] - increments[name] for name in increments}
+    before["longest_streak"] = longest_streak
+    return {"before": before, "after": after}
+
+
+def record_days(deltas: list[tuple[int, date, Counter]]) -> None:
+    """Avance l'état des utilisateurs de `deltas` (triés par utilisateur puis jour).
+
+    Appelé par `DailyRollup.flush`, dans la transaction de l'écriture source :
+    une lecture des plus longues séries du lot, puis une instruction
+    `INSERT … ON CONFLICT DO UPDATE` par journée, sans verrou. Une écriture
+    concurrente entre les deux ne peut que faire relire une valeur plus basse :
+    le badge est alors réinséré, et écarté par la contrainte unique. Les badges
+    franchis sont insérés après le commit.
+    """
+    from .models import AchievementState, EarnedBadge
+
+    now = timezone.now()
+    earned = []
+    longest = dict(
+        AchievementState.objects.filter(user_id__in={user_id for user_id, _day, _counts in deltas})
+        .values_list("user_id", "longest_streak")
+    )
+    with connection.cursor() as cursor:
+        for user_id, day, counts in deltas:
+            metrics = _upsert_day(cursor, user_id, day, counts, now, longest.get(user_id, 0))
+            longest[user_id] = metrics["after"]["longest_streak"]
+            earned.extend(
+                EarnedBadge(user_id=user_id, code=rule.code, earned_on=day)
+                for rule in BADGES
+                if metrics["before"][rule.metric] < rule.threshold <= metrics["after"][rule.metric]
+            )
+    if earned:
+        transaction.on_commit(lambda: EarnedBadge.objects.bulk_create(earned, ignore_conflicts=True))
+
+
+def _replay_chunk(user_ids: list[int]) -> int:
+    from .models import AchievementState, EarnedBadge, LearningDay
+    from .rollups import ROLLUP_FIELDS
+
+    states = {user_id: AchievementState(user_id=user_id) for user_id in user_ids}
+    earned = []
+    for user_id, day, *values in (
+        LearningDay.objects.filter(user_id__in=user_ids)
+        .order_by("user_id", "day")
+        .values_list("user_id", "day", *ROLLUP_FIELDS)
+    ):
+        for rule in advance(states[user_id], day, Counter(dict(zip(ROLLUP_FIELDS, values)))):
+            earned.append(EarnedBadge(user_id=user_id, code=rule.code, earned_on=day))
+
+    with transaction.atomic():
+        AchievementState.objects.filter(user_id__in=user_ids).delete()
+        EarnedBadge.objects.filter(user_id__in=user_ids).delete()
+        AchievementState.objects.bulk_create(
+            [state for state in states.values() if state.last_active_day is not None]
+        )
+        EarnedBadge.objects.bulk_create(earned)
+    return len(earned)
+
+
+def replay_achievements(
+    user_ids: list[int] | None = None, *, chunk_size: int = REPLAY_CHUNK_SIZE, progress=None
+) -> tuple[int, int]:
+    """Recalcule séries et badges de `user_ids` (tous par défaut) depuis `LearningDay`.
+
+    Une transaction par tranche de `chunk_size` utilisateurs ; `progress(users,
+    badges)` est appelé après chaque tranche. Renvoie (utilisateurs, badges).
+    """
+    from django.contrib.auth import get_user_model
+
+    users = get_user_model().objects.order_by("pk")
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    ids = list(users.values_list("pk", flat=True))
+
+    badges = 0
+    for start in range(0, len(ids), chunk_size):
+        badges += _replay_chunk(ids[start : start + chunk_size])
+        if progress is not None:
+            progress(min(start + chunk_size, len(ids)), badges)
+    return len(ids), badges
@@ -0,0 +1,58 @@
+"""Algorithme SRS effectif d'une carte pour un utilisateur.
+
+Une carte suit l'algorithme du premier deck utilisateur (ordre `sort_order`,
+puis id) qui la contient et en impose un (`Deck.srs_scheduler`), sinon celui
+des préférences de l'utilisateur (`User.srs_scheduler`). La règle ne dépend pas
+du deck d'où la carte est révisée : une revue (`srs/review/`, `srs/review/batch/`)
+et une replanification en masse (`learning.rescheduling`) choisissent donc
+toujours le même algorithme pour le même état.
+
+La règle est une sous-requête (`deck_scheduler`) : résolue en SQL pour tout un
+lot de cartes ou d'états, sans lire les decks en Python.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from django.db.models import Exists, OuterRef, Q, Subquery
+
+from .srs import Scheduler, get_scheduler
+
+
+def deck_scheduler(user, card: str) -> Subquery:
+    """Algorithme imposé par le premier deck de `user` qui contient la carte `card`, ou NULL.
+
+    `card` nomme la colonne d'id de fiche de la requête englobante ; `user` est
+    un id, ou une référence à la requête englobante (`OuterRef("user_id")`).
+    """
+    from content.models import Deck, DeckCard, DeckCardExclusion
+
+    card_ref = OuterRef(OuterRef(card))
+    own = DeckCard.objects.filter(deck_id=OuterRef("pk"), microarticle_id=card_ref)
+    from_pack = DeckCard.objects.filter(deck_id=OuterRef("source_pack_id"), microarticle_id=card_ref)
+    excluded = DeckCardExclusion.objects.filter(deck_id=OuterRef("pk"), microarticle_id=card_ref)
+    decks = (
+        Deck.objects.filter(user_id=user, type=Deck.DeckType.USER)
+        .exclude(srs_scheduler="")
+        .filter(Exists(own) | Q(cards_inherited=True) & Exists(from_pack) & ~Exists(excluded))
+        .order_by("sort_order", "id")
+        .values("srs_scheduler")[:1]
+    )
+    return Subquery(decks)
+
+
+def card_schedulers(user, card_ids: Iterable[int]) -> dict[int, Scheduler]:
+    """Algorithme effectif de chaque fiche `card_ids` pour `user`, en une requête."""
+    from content.models import MicroArticlePage
+
+    card_ids = list(card_ids)
+    if not card_ids:
+        return {}
+    imposed = dict(
+        MicroArticlePage.objects.filter(id__in=card_ids)
+        .annotate(deck_scheduler=deck_scheduler(user.pk, "pk"))
+        .values_list("id", "deck_scheduler")
+    )
+    preferred = getattr(user, "srs_scheduler", None)
+    return {card_id: get_scheduler(imposed.get(card_id) or preferred) for card_id in card_ids}
@@ -0,0 +1,179 @@
+"""Compteurs de la file de révision (`srs/counts/`) et prévision de charge (`srs/forecast/`).
+
+Le badge d'onglet appelle ce point d'entrée à chaque navigation. Les trois
+compteurs (dues, vues, total) sortent d'une seule agrégation conditionnelle sur
+le vivier du scope, l'état SRS de l'utilisateur étant joint comme dans
+`srs/queue/`. Le résultat est mémorisé par (utilisateur, signature de scope).
+
+Invalidation : chaque entrée de cache est rangée sous un jeton de version par
+utilisateur (et un jeton global). Une écriture sur `CardSRSState` ou sur les
+`DeckCard` de l'utilisateur change son jeton (voir `learning.signals` et les
+vues de decks) ; une (dé)publication de carte change le jeton global. Une entrée
+expire en outre à la prochaine échéance `due_at` du scope : passé cet instant,
+une carte « à venir » devient « due » sans qu'aucune ligne ne change. La
+prévision, elle, expire au plus tard au minuit local suivant, qui décale ses jours.
+
+Dans une transaction, le jeton change tout de suite puis de nouveau au commit
+(`transaction.on_commit`) : sans ce second changement, une lecture concurrente
+d'avant le commit rangerait sous le nouveau jeton des compteurs calculés sur
+les lignes d'avant l'écriture.
+"""
+
+from __future__ import annotations
+
+import math
+import uuid
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, FilteredRelation, Min, OuterRef, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+CACHE_KEY_PREFIX = "learning:srs-counts:v1"
+CACHE_TTL = 3600
+
+_GLOBAL_VERSION_KEY = f"{CACHE_KEY_PREFIX}:version"
+
+
+def _user_version_key(user_id: int) -> str:
+    return f"{CACHE_KEY_PREFIX}:version:{user_id}"
+
+
+def scope_signature(*, scope: str | None, deck_id: int | None, deck_ids: list[int]) -> str:
+    """Clé stable d'un scope : l'ordre et les doublons de `deck_ids` n'y comptent pas."""
+    scope = scope or "all_decks"
+    if scope == "deck":
+        return f"deck:{deck_id}"
+    if scope == "decks":
+        return "decks:" + ",".join(str(i) for i in sorted(set(deck_ids)))
+    return scope
+
+
+def _versions(user_id: int) -> str:
+    keys = [_GLOBAL_VERSION_KEY, _user_version_key(user_id)]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    for key in missing:
+        # Jeton neuf plutôt qu'une valeur par défaut fixe : si un jeton est
+        # évincé, on ne retombe pas sur des entrées écrites avant lui.
+        cache.add(key, uuid.uuid4().hex, None)
+    if missing:
+        found = cache.get_many(keys)
+    return ".".join(str(found.get(key, "")) for key in keys)
+
+
+def _compute_srs_counts(user, candidates) -> tuple[dict, int]:
+    now = timezone.now()
+    row = candidates.annotate(
+        own_state=FilteredRelation("srs_states", condition=Q(srs_states__user=user)),
+    ).aggregate(
+        total=Count("id"),
+        seen=Count("own_state__id"),
+        due=Count("own_state__id", filter=Q(own_state__due_at__lte=now)),
+        next_due_at=Min("own_state__due_at", filter=Q(own_state__due_at__gt=now)),
+    )
+
+    total, seen, due = row["total"], row["seen"], row["due"]
+    # Une carte jamais notée est servie immédiatement par `srs/next/`, même
+    # en mode « dues » : elle compte donc comme disponible, pas comme future.
+    counts = {
+        "due": due,
+        "new": max(0, total - seen),
+        "later": max(0, seen - due),
+        "total": total,
+    }
+
+    ttl = CACHE_TTL
+    if row["next_due_at"] is not None:
+        ttl = min(ttl, max(1, math.ceil((row["next_due_at"] - now).total_seconds())))
+    return counts, ttl
+
+
+def srs_counts(user, candidates, *, signature: str) -> dict:
+    """Compteurs `due` / `new` / `later` / `total` de `candidates` pour `user`.
+
+    `candidates` est le vivier renvoyé par `_scope_candidates` ; `signature`
+    identifie ce scope dans le cache (voir `scope_signature`).
+    """
+    key = f"{CACHE_KEY_PREFIX}:{user.pk}:{_versions(user.pk)}:{signature}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    counts, ttl = _compute_srs_counts(user, candidates)
+    cache.set(key, counts, ttl)
+    return counts
+
+
+def _compute_srs_forecast(user, candidates, *, tz: ZoneInfo, days: int) -> tuple[dict, int]:
+    from .models import CardSRSState
+
+    now = timezone.now()
+    today = timezone.localdate(now, tz)
+    tomorrow = datetime.combine(today + timedelta(days=1), time.min, tzinfo=tz)
+    end = datetime.combine(today + timedelta(days=days), time.min, tzinfo=tz)
+
+    # Une seule requête groupée par jour local, bornée par l'index (user, due_at, microarticle).
+    rows = (
+        CardSRSState.objects.filter(user=user, due_at__lt=end)
+        .filter(Exists(candidates.filter(pk=OuterRef("microarticle_id"))))
+        .annotate(day=TruncDate("due_at", tzinfo=tz))
+        .values_list("day")
+        .annotate(due=Count("id"))
+        .order_by()
+    )
+
+    by_day: dict = {}
+    overdue = 0
+    for day, due in rows:
+        # Le retard s'ajoute à aujourd'hui : c'est ce que la file servira.
+        if day < today:
+            overdue += due
+            day = today
+        by_day[day] = by_day.get(day, 0) + due
+
+    forecast = {
+        "timezone": tz.key,
+        "overdue": overdue,
+        "days": [
+            {"date": day, "due": by_day.get(day, 0)}
+            for day in (today + timedelta(days=offset) for offset in range(days))
+        ],
+    }
+    ttl = min(CACHE_TTL, max(1, math.ceil((tomorrow - now).total_seconds())))
+    return forecast, ttl
+
+
+def srs_forecast(user, candidates, *, signature: str, tz: ZoneInfo, days: int) -> dict:
+    """Cartes dues par jour local sur `days` jours à partir d'aujourd'hui (retard inclus)."""
+    key = f"{CACHE_KEY_PREFIX}:{user.pk}:{_versions(user.pk)}:forecast:{tz.key}:{days}:{signature}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    forecast, ttl = _compute_srs_forecast(user, candidates, tz=tz, days=days)
+    cache.set(key, forecast, ttl)
+    return forecast
+
+
+def invalidate_srs_counts(*user_ids: int) -> None:
+    """Périme les compteurs des utilisateurs donnés (tous scopes confondus)."""
+    if user_ids:
+        _now_and_on_commit(
+            lambda: cache.set_many(
+                {_user_version_key(user_id): uuid.uuid4().hex for user_id in user_ids}, None
+            )
+        )
+
+
+def invalidate_all_srs_counts() -> None:
+    _now_and_on_commit(lambda: cache.set(_GLOBAL_VERSION_KEY, uuid.uuid4().hex, None))
+
+
+def _now_and_on_commit(bump) -> None:
+    bump()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(bump)
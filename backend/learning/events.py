@@ -0,0 +1,113 @@
+"""Ingestion par lots des événements d'apprentissage (`POST events/`).
+
+Un appareil accumule ses événements hors ligne et les envoie par paquets. Le
+coût d'un lot ne dépend pas de sa taille : une requête pour écarter les
+`client_id` déjà reçus, une pour vérifier les fiches citées, puis un
+`INSERT … ON CONFLICT DO NOTHING RETURNING` par tranche de
+`EVENT_INSERT_BATCH_SIZE`, soit bien moins d'une requête par événement.
+L'unicité `(user, client_id)` tranche entre deux envois simultanés du même
+lot, et `RETURNING` dit quelles lignes ont vraiment été écrites : un événement
+inséré entre-temps par l'autre envoi compte comme doublon, pas comme accepté.
+
+Aucune transaction ni aucun verrou ne touche d'autre table : la table
+d'événements est en ajout seul, et les lectures de progression ou de révision
+ne l'attendent jamais.
+
+Contre-pression : lots bornés (`LEARNING_EVENT_BATCH_MAX`), charge utile bornée
+par événement (`LEARNING_EVENT_PAYLOAD_MAX_BYTES`, voir les serializers), et
+budget de requêtes propre (`LearningEventsThrottle`, portée `learning_events`).
+"""
+
+from __future__ import annotations
+
+from django.db import connection
+from django.utils import timezone
+
+from content.models import MicroArticlePage
+
+from .models import LearningEvent
+from .upserts import quoted_column, typed_param
+
+EVENT_INSERT_BATCH_SIZE = 250
+
+
+def ingest_events(user, events: list[dict], *, device_id: str = "") -> dict:
+    """Enregistre `events` (validés par `LearningEventSerializer`) pour `user`.
+
+    Renvoie `{accepted, duplicates, rejected}` : `accepted` compte les lignes
+    écrites, `rejected` liste les `client_id` des événements qui citent une
+    fiche inconnue.
+    """
+    now = timezone.now()
+
+    unique: dict[str, dict] = {}
+    for event in events:
+        unique.setdefault(event["client_id"], event)
+    duplicates = len(events) - len(unique)
+
+    already = set(
+        LearningEvent.objects.filter(user=user, client_id__in=list(unique)).values_list(
+            "client_id", flat=True
+        )
+    )
+    duplicates += len(already)
+    fresh = [event for client_id, event in unique.items() if client_id not in already]
+
+    # Une fiche dépubliée depuis reste une référence valable pour l'historique.
+    lesson_ids = {event["lesson_id"] for event in fresh if event.get("lesson_id")}
+    known: set[int] = set()
+    if lesson_ids:
+        known = set(MicroArticlePage.objects.filter(id__in=lesson_ids).values_list("id", flat=True))
+
+    accepted, rejected = [], []
+    for event in fresh:
+        if event.get("lesson_id") and event["lesson_id"] not in known:
+            rejected.append(event["client_id"])
+        else:
+            accepted.append(event)
+
+    inserted = _insert_events(
+        [
+            {
+                "user": user.pk,
+                "device_id": device_id,
+                "client_id": event["client_id"],
+                "type": event["type"],
+                "lesson": event.get("lesson_id"),
+                "payload": event.get("payload"),
+                # Horloge d'appareil plafonnée à l'heure serveur, comme la progression.
+                "occurred_at": min(event["occurred_at"], now),
+                "created_at": now,
+            }
+            for event in accepted
+        ]
+    )
+    duplicates += len(accepted) - inserted
+    return {"accepted": inserted, "duplicates": duplicates, "rejected": rejected}
+
+
+def _insert_events(rows: list[dict]) -> int:
+    """Insère `rows` (valeurs par nom de champ) ; renvoie le nombre de lignes réellement écrites."""
+    if not rows:
+        return 0
+    table = connection.ops.quote_name(LearningEvent._meta.db_table)
+    names = list(rows[0])
+    columns = ", ".join(quoted_column(LearningEvent, name) for name in names)
+    inserted = 0
+    for start in range(0, len(rows), EVENT_INSERT_BATCH_SIZE):
+        rows_sql, params = [], []
+        for row in rows[start : start + EVENT_INSERT_BATCH_SIZE]:
+            row_sql = []
+            for name in names:
+                sql, param = typed_param(LearningEvent, name, row[name])
+                row_sql.append(sql)
+                params.append(param)
+            rows_sql.append(f"({', '.join(row_sql)})")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) VALUES {', '.join(rows_sql)} "
+                f"ON CONFLICT DO NOTHING RETURNING {quoted_column(LearningEvent, 'id')}",
+                params,
+            )
+            inserted += len(cursor.fetchall())
+    return inserted
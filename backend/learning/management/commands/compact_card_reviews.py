@@ -0,0 +1,66 @@
+"""Résume les anciennes entrées du journal de revues en agrégats journaliers.
+
+    python manage.py compact_card_reviews
+    python manage.py compact_card_reviews --older-than 90 --chunk-size 10000
+
+Les `CardReview` antérieures au début de la journée (fuseau du serveur) située
+`--older-than` jours avant aujourd'hui sont additionnées dans `CardReviewDaily`
+puis supprimées, une transaction par tranche. Relancer la commande est sans
+risque : une journée déjà résumée est complétée, pas écrasée. Voir
+`learning.review_log`.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from learning.review_log import COMPACTION_CHUNK_SIZE, compact_reviews
+
+DEFAULT_OLDER_THAN_DAYS = 180
+
+
+class Command(BaseCommand):
+    help = "Compacte les revues SRS anciennes en agrégats par carte et par jour."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=DEFAULT_OLDER_THAN_DAYS,
+            help=f"Âge minimal en jours des revues à compacter (défaut {DEFAULT_OLDER_THAN_DAYS}).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=COMPACTION_CHUNK_SIZE,
+            help=f"Revues par transaction (défaut {COMPACTION_CHUNK_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        if options["older_than"] < 1:
+            raise CommandError("--older-than doit être d'au moins 1 jour.")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size doit être positif.")
+
+        # Coupure alignée sur minuit : une journée n'est jamais compactée à moitié.
+        day = timezone.localdate() - timedelta(days=options["older_than"])
+        before = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+        started = time.perf_counter()
+        compacted, written = compact_reviews(
+            before,
+            chunk_size=options["chunk_size"],
+            progress=lambda done, _: self.stdout.write(f"  {done:,} revues compactées…"),
+        )
+        elapsed = time.perf_counter() - started
+        rate = compacted / elapsed if elapsed else 0.0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{compacted:,} revues antérieures au {day.isoformat()} compactées en "
+                f"{written:,} lignes journalières ({elapsed:.1f} s, {rate:,.0f} revues/s)."
+            )
+        )
@@ -0,0 +1,55 @@
+"""Recalcule les agrégats journaliers d'activité depuis les tables sources.
+
+    python manage.py rebuild_learning_days
+    python manage.py rebuild_learning_days --user 42 --user 43
+
+Les `LearningDay` des utilisateurs visés sont supprimés puis réécrits depuis
+`CardReview`, `CardReviewDaily` et `LessonProgress`, une transaction par
+tranche d'utilisateurs. À lancer après la migration qui crée la table, ou pour
+corriger un écart ; voir `learning.rollups` pour ce qui est exact et ce qui est
+approché.
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from learning.rollups import REBUILD_CHUNK_SIZE, rebuild_days
+
+
+class Command(BaseCommand):
+    help = "Reconstruit les agrégats d'activité par utilisateur et par jour."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="users",
+            help="Limite la reconstruction à cet utilisateur (répétable).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=REBUILD_CHUNK_SIZE,
+            help=f"Utilisateurs par transaction (défaut {REBUILD_CHUNK_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size doit être positif.")
+
+        started = time.perf_counter()
+        users, written = rebuild_days(
+            options["users"],
+            chunk_size=options["chunk_size"],
+            progress=lambda done, _: self.stdout.write(f"  {done:,} utilisateurs traités…"),
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{written:,} journées reconstruites pour {users:,} utilisateurs ({elapsed:.1f} s)."
+            )
+        )
@@ -0,0 +1,52 @@
+"""Recalcule séries et badges depuis l'historique d'activité journalier.
+
+    python manage.py replay_achievements
+    python manage.py replay_achievements --user 42
+
+Les `AchievementState` et `EarnedBadge` des utilisateurs visés sont supprimés
+puis rejoués jour par jour depuis `LearningDay`, une transaction par tranche
+d'utilisateurs. Après `rebuild_learning_days`, ou quand une journée arrivée en
+retard a comblé un trou dans une série ; voir `learning.achievements`.
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from learning.achievements import REPLAY_CHUNK_SIZE, replay_achievements
+
+
+class Command(BaseCommand):
+    help = "Rejoue séries et badges depuis les agrégats d'activité journaliers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="users",
+            help="Limite le rejeu à cet utilisateur (répétable).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=REPLAY_CHUNK_SIZE,
+            help=f"Utilisateurs par transaction (défaut {REPLAY_CHUNK_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size doit être positif.")
+
+        started = time.perf_counter()
+        users, badges = replay_achievements(
+            options["users"],
+            chunk_size=options["chunk_size"],
+            progress=lambda done, _: self.stdout.write(f"  {done:,} utilisateurs rejoués…"),
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"{badges:,} badges rejoués pour {users:,} utilisateurs ({elapsed:.1f} s).")
+        )
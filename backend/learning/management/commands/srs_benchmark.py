@@ -0,0 +1,167 @@
+"""Mesure la latence de `srs/next/` quand la table d'états d'un utilisateur grossit.
+
+    python manage.py srs_benchmark
+    python manage.py srs_benchmark --sizes 1000,10000,100000 --repeat 20
+
+Crée des fiches et un utilisateur synthétiques, lui donne N états SRS (moitié
+dus, moitié à venir) plus un réservoir de cartes jamais vues, puis chronomètre
+chaque chemin d'accès de `SRSNextView` sur le scope « tous mes decks » : carte
+due, carte jamais vue (`NOT EXISTS`), prochaine échéance, et pour comparaison
+l'ancien `exclude(srs_states__user=...)` (`NOT IN`). Tout est fait dans une
+transaction annulée à la fin : rien ne reste en base.
+
+À lancer contre une base comparable à la production (Postgres), pas SQLite.
+"""
+
+from __future__ import annotations
+
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from wagtail.models import Page
+
+from content.models import MicroArticleIndexPage, MicroArticlePage, UserCardMembership
+from learning.models import CardSRSState
+from learning.views import _next_due_state, _next_unseen_card, _next_upcoming_state, _scope_candidates
+
+BATCH_SIZE = 2000
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _parse_sizes(value: str) -> list[int]:
+    try:
+        sizes = sorted({int(part) for part in value.split(",") if part.strip()})
+    except ValueError:
+        raise CommandError("--sizes attend une liste d'entiers séparés par des virgules.")
+    if not sizes or sizes[0] < 1:
+        raise CommandError("--sizes attend des tailles positives.")
+    return sizes
+
+
+class Command(BaseCommand):
+    help = "Chronomètre les requêtes de `srs/next/` pour 1k, 10k et 100k états par utilisateur."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1000,10000,100000",
+            help="Nombres d'états SRS de l'utilisateur à mesurer (défaut 1000,10000,100000).",
+        )
+        parser.add_argument("--repeat", type=int, default=10, help="Mesures par chemin (médiane).")
+        parser.add_argument(
+            "--unseen",
+            type=int,
+            default=1000,
+            help="Cartes jamais vues ajoutées au vivier (défaut 1000).",
+        )
+
+    def handle(self, *args, **options):
+        sizes = _parse_sizes(options["sizes"])
+        try:
+            with transaction.atomic():
+                self._run(sizes, max(1, options["repeat"]), max(1, options["unseen"]))
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, sizes: list[int], repeat: int, unseen: int) -> None:
+        token = uuid.uuid4().hex[:8]
+        index = MicroArticleIndexPage(title="SRS benchmark", slug=f"srs-benchmark-{token}")
+        Page.get_first_root_node().add_child(instance=index)
+        user = get_user_model().objects.create_user(username=f"srs-benchmark-{token}")
+
+        started = time.perf_counter()
+        card_ids = self._synthetic_cards(index, sizes[-1] + unseen)
+        UserCardMembership.objects.bulk_create(
+            [UserCardMembership(user=user, microarticle_id=card_id, deck_count=1) for card_id in card_ids],
+            batch_size=BATCH_SIZE,
+        )
+        self.stdout.write(f"{len(card_ids):,} fiches synthétiques en {time.perf_counter() - started:.1f} s.")
+
+        now = timezone.now()
+        seeded = 0
+        for size in sizes:
+            CardSRSState.objects.bulk_create(
+                [
+                    CardSRSState(
+                        user=user,
+                        microarticle_id=card_id,
+                        srs_level=2,
+                        # Un état sur deux dû, l'autre à venir, étalés sur un mois.
+                        due_at=now + timedelta(hours=(n % 720) * (1 if n % 2 else -1)),
+                        last_reviewed_at=now - timedelta(days=3),
+                    )
+                    for n, card_id in enumerate(card_ids[seeded:size], start=seeded)
+                ],
+                batch_size=BATCH_SIZE,
+            )
+            seeded = size
+
+            candidates = _scope_candidates(user, scope="all_decks", deck_id=None, deck_ids=[])
+            paths = {
+                "due": lambda: _next_due_state(user, candidates, now),
+                "jamais vue": lambda: _next_unseen_card(user, candidates),
+                "à venir": lambda: _next_upcoming_state(user, candidates),
+                "ancien NOT IN": lambda: candidates.exclude(srs_states__user=user).order_by("id").first(),
+            }
+            timings = ", ".join(
+                f"{label} {self._median_ms(fetch, repeat):.2f} ms" for label, fetch in paths.items()
+            )
+            self.stdout.write(f"{size:>9,} états : {timings}")
+
+    @staticmethod
+    def _median_ms(fetch, repeat: int) -> float:
+        fetch()  # préchauffe (cache du SGBD, plan)
+        samples = []
+        for _ in range(repeat):
+            tick = time.perf_counter()
+            fetch()
+            samples.append((time.perf_counter() - tick) * 1000)
+        return statistics.median(samples)
+
+    @staticmethod
+    def _synthetic_cards(index: MicroArticleIndexPage, count: int) -> list[int]:
+        """Crée `count` fiches live sous `index` sans passer par `add_child` (une par une, trop lent)."""
+        content_type = ContentType.objects.get_for_model(MicroArticlePage)
+        depth = index.depth + 1
+        pages = Page.objects.bulk_create(
+            [
+                Page(
+                    title=f"Carte {n}",
+                    draft_title=f"Carte {n}",
+                    slug=f"carte-{n}",
+                    content_type=content_type,
+                    path=MicroArticlePage._get_path(index.path, depth, n),
+                    depth=depth,
+                    url_path=f"{index.url_path}carte-{n}/",
+                    locale_id=index.locale_id,
+                    live=True,
+                )
+                for n in range(1, count + 1)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        Page.objects.filter(pk=index.pk).update(numchild=count)
+
+        # Table fille insérée en bloc : `bulk_create` refuse l'héritage multi-table
+        # et `save()` indexerait chaque fiche pour la recherche.
+        fields = MicroArticlePage._meta.local_concrete_fields
+        for start in range(0, len(pages), BATCH_SIZE):
+            MicroArticlePage._base_manager._insert(
+                [
+                    MicroArticlePage(page_ptr_id=page.pk, answer_express="Réponse.")
+                    for page in pages[start : start + BATCH_SIZE]
+                ],
+                fields=fields,
+            )
+        return [page.pk for page in pages]
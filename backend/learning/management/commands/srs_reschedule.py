@@ -0,0 +1,60 @@
+"""Recalcule les échéances SRS après un changement d'algorithme ou d'intervalles.
+
+    python manage.py srs_reschedule
+    python manage.py srs_reschedule --scheduler sm2 --user 42
+
+Sans `--scheduler`, chaque état est replanifié avec son algorithme effectif :
+celui du deck qui en impose un (`Deck.srs_scheduler`), sinon celui des
+préférences de l'utilisateur (`User.srs_scheduler`). Voir `learning.rescheduling`.
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from learning.models import CardSRSState
+from learning.rescheduling import DEFAULT_CHUNK_SIZE, reschedule_states, scheduler_plan
+from learning.srs import SCHEDULERS
+
+
+class Command(BaseCommand):
+    help = "Recalcule `due_at` des états SRS, par paquets et sans boucle par ligne."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scheduler",
+            choices=sorted(SCHEDULERS),
+            help="Impose un algorithme à tous les états au lieu de leur algorithme effectif.",
+        )
+        parser.add_argument("--user", type=int, help="Limite le recalcul à un utilisateur (id).")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f"Nombre d'états lus par paquet (défaut {DEFAULT_CHUNK_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        states = CardSRSState.objects.all()
+        if options["user"] is not None:
+            states = states.filter(user_id=options["user"])
+
+        if options["scheduler"]:
+            plan = [(SCHEDULERS[options["scheduler"]], states)]
+        else:
+            plan = scheduler_plan(states)
+
+        started = time.perf_counter()
+        total = 0
+        for scheduler, queryset in plan:
+            count = reschedule_states(queryset, scheduler, chunk_size=options["chunk_size"])
+            self.stdout.write(f"{scheduler.label} : {count} état(s) replanifié(s).")
+            total += count
+
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(f"{total} état(s) en {elapsed:.2f} s ({rate:,.0f} états/s).")
+        )
@@ -0,0 +1,78 @@
+"""Simule des mois de révisions pour comparer les algorithmes SRS, sans base de données.
+
+    python manage.py srs_simulate
+    python manage.py srs_simulate --scheduler sm2 --users 20000 --days 180
+    python manage.py srs_simulate --users 2000 --min-throughput 1000000   # en CI
+
+Pour chaque algorithme : rétention (revues de cartes déjà vues réussies), charge
+quotidienne moyenne et maximale par utilisateur, débit de `batch_review`. Avec
+`--min-throughput`, la commande échoue si un algorithme passe sous ce débit.
+Voir `learning.simulation`.
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from learning.simulation import SimulationConfig, simulate
+from learning.srs import SCHEDULERS
+
+
+class Command(BaseCommand):
+    help = "Simule des utilisateurs synthétiques pour comparer rétention, charge et débit des algorithmes SRS."
+
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        defaults = SimulationConfig()
+        parser.add_argument(
+            "--scheduler",
+            action="append",
+            choices=sorted(SCHEDULERS),
+            help="Algorithme à simuler (répétable). Par défaut : tous.",
+        )
+        parser.add_argument("--users", type=int, default=defaults.users)
+        parser.add_argument("--cards", type=int, default=defaults.cards_per_user, help="Cartes par utilisateur.")
+        parser.add_argument("--days", type=int, default=defaults.days)
+        parser.add_argument("--new-per-day", type=int, default=defaults.new_cards_per_day)
+        parser.add_argument(
+            "--recall",
+            type=float,
+            default=defaults.recall_mean,
+            help="Probabilité moyenne de rappel à un jour.",
+        )
+        parser.add_argument("--recall-spread", type=float, default=defaults.recall_spread)
+        parser.add_argument("--seed", type=int, default=defaults.seed)
+        parser.add_argument(
+            "--min-throughput",
+            type=float,
+            help="Échoue si un algorithme calcule moins de revues/s que ce seuil.",
+        )
+
+    def handle(self, *args, **options):
+        config = SimulationConfig(
+            users=options["users"],
+            cards_per_user=options["cards"],
+            days=options["days"],
+            new_cards_per_day=options["new_per_day"],
+            recall_mean=options["recall"],
+            recall_spread=options["recall_spread"],
+            seed=options["seed"],
+        )
+        names = options["scheduler"] or list(SCHEDULERS)
+
+        too_slow = []
+        for name in names:
+            result = simulate(SCHEDULERS[name], config)
+            self.stdout.write(
+                f"{SCHEDULERS[name].label} : rétention {result.retention:.1%}, "
+                f"{result.mean_daily_reviews_per_user:.1f} revues/jour/utilisateur "
+                f"(pic {result.peak_daily_reviews_per_user:.1f}), "
+                f"{result.reviews:,} revues, {result.throughput:,.0f} revues/s "
+                f"(simulation {result.elapsed_seconds:.2f} s)"
+            )
+            if options["min_throughput"] and result.throughput < options["min_throughput"]:
+                too_slow.append(f"{name} ({result.throughput:,.0f} revues/s)")
+
+        if too_slow:
+            raise CommandError(f"Débit sous {options['min_throughput']:,.0f} revues/s : {', '.join(too_slow)}")
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-18 23:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0031_alter_pathologythumboverride_accent_and_more'),
+        ('learning', '0004_backfill_read_state_into_lesson_progress'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CardReview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_id', models.CharField(blank=True, max_length=64)),
+                ('device_id', models.CharField(blank=True, max_length=64)),
+                ('rating', models.CharField(max_length=16)),
+                ('srs_level', models.PositiveSmallIntegerField()),
+                ('reviewed_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('microarticle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='content.microarticlepage')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='card_reviews', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'reviewed_at'], name='learning_ca_user_id_376a44_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('client_id', ''), _negated=True), fields=('user', 'client_id'), name='uniq_user_card_review_client_id')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-18 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0005_cardreview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cardsrsstate',
+            name='ease',
+            field=models.FloatField(default=2.5),
+        ),
+        migrations.AddField(
+            model_name='cardsrsstate',
+            name='interval_days',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
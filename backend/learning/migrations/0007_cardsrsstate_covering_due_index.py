@@ -0,0 +1,24 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0034_backfill_usercardmembership'),
+        ('learning', '0006_cardsrsstate_ease_interval_days'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cardsrsstate',
+            index=models.Index(fields=['user', 'due_at', 'microarticle'], name='learn_srs_user_due_card_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='cardsrsstate',
+            name='learning_ca_user_id_7d3825_idx',
+        ),
+    ]
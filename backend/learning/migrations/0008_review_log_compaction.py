@@ -0,0 +1,61 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0034_backfill_usercardmembership'),
+        ('learning', '0007_cardsrsstate_covering_due_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CardReviewDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('know_count', models.PositiveIntegerField(default=0)),
+                ('medium_count', models.PositiveIntegerField(default=0)),
+                ('again_count', models.PositiveIntegerField(default=0)),
+                ('last_srs_level', models.PositiveSmallIntegerField()),
+                ('last_reviewed_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='cardreview',
+            name='ease',
+            field=models.FloatField(default=2.5),
+        ),
+        migrations.AddField(
+            model_name='cardreview',
+            name='interval_days',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='cardreview',
+            index=models.Index(fields=['reviewed_at'], name='learn_review_reviewed_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='cardreviewdaily',
+            name='microarticle',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_days', to='content.microarticlepage'),
+        ),
+        migrations.AddField(
+            model_name='cardreviewdaily',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='card_review_days', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='cardreviewdaily',
+            index=models.Index(fields=['user', 'day'], name='learning_ca_user_id_61d015_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='cardreviewdaily',
+            constraint=models.UniqueConstraint(fields=('user', 'microarticle', 'day'), name='uniq_user_card_review_day'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:51
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0034_backfill_usercardmembership'),
+        ('learning', '0009_progress_sync_token'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learningevent',
+            name='client_id',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='learningevent',
+            name='occurred_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='learningevent',
+            name='type',
+            field=models.CharField(choices=[('card_viewed', 'Fiche consultée'), ('lesson_completed', 'Fiche terminée'), ('quiz_scored', 'Quiz noté'), ('streak_day', 'Jour de série')], max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='learningevent',
+            index=models.Index(fields=['user', 'occurred_at'], name='learning_le_user_id_d1c915_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='learningevent',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_id', ''), _negated=True), fields=('user', 'client_id'), name='uniq_user_learning_event_client_id'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0010_learning_event_ingestion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LearningDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('cards_read', models.PositiveIntegerField(default=0)),
+                ('new_cards', models.PositiveIntegerField(default=0)),
+                ('reviews_know', models.PositiveIntegerField(default=0)),
+                ('reviews_medium', models.PositiveIntegerField(default=0)),
+                ('reviews_again', models.PositiveIntegerField(default=0)),
+                ('time_ms', models.BigIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='learning_days', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'day'), name='uniq_user_learning_day')],
+            },
+        ),
+    ]
@@ -4,6 +4,8 @@ from django.utils import timezone
 
 from content.models import MicroArticlePage
 
+from .srs import DEFAULT_EASE
+
 
 class LessonProgress(models.Model):
     user = models.ForeignKey(
@@ -34,34 +36,59 @@ class LessonProgress(models.Model):
 
     updated_at = models.DateTimeField()
     last_seen_at = models.DateTimeField(null=True, blank=True)
+    # Heure serveur de la dernière écriture, à ne pas confondre avec
+    # `updated_at` (horloge de l'appareil) : curseur de `progress/?since=`.
+    synced_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=["user", "lesson"], name="uniq_user_lesson_progress"),
         ]
+        indexes = [
+            models.Index(fields=["user", "synced_at"]),
+        ]
 
     def __str__(self) -> str:
         return f"{self.user_id}:{self.lesson_id}"
 
 
+class LessonTombstone(models.Model):
+    """Fiche retirée (dépubliée ou supprimée) : à effacer des appareils.
+
+    Une ligne par fiche, écrite par `learning.signals` et supprimée quand la
+    fiche est republiée. Pas de clé étrangère : la fiche peut ne plus exister.
+    """
+
+    lesson_id = models.PositiveIntegerField(unique=True)
+    removed_at = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        return f"{self.lesson_id} ({self.removed_at:%Y-%m-%d})"
+
+
 class LearningEvent(models.Model):
-    """Journal d'événements d'apprentissage — **table créée, jamais écrite**.
-
-    Aucune vue, aucun serializer, aucune URL ne l'alimente ni ne la lit à ce
-    jour : elle est posée pour les évolutions prévues au cadrage (badges
-    déclenchés par événements, `quiz_scored`, `streak_day`, et la persistance
-    des réponses individuelles aux questions). Contrairement à
-    `LessonProgress.score_best/score_last`, dont le transport existe déjà, ces
-    usages demanderont un endpoint d'écriture dédié.
+    """Journal d'événements d'apprentissage envoyés par les appareils.
+
+    Écrit par lots via `POST events/` (`learning.events`) : `client_id` est
+    attribué par l'appareil à chaque événement et l'unicité `(user, client_id)`
+    rend le renvoi d'un lot idempotent. Rien ne lit cette table sur un chemin
+    chaud ; elle alimente les traitements différés (badges, séries, statistiques).
     """
 
+    class Type(models.TextChoices):
+        CARD_VIEWED = "card_viewed", "Fiche consultée"
+        LESSON_COMPLETED = "lesson_completed", "Fiche terminée"
+        QUIZ_SCORED = "quiz_scored", "Quiz noté"
+        STREAK_DAY = "streak_day", "Jour de série"
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="learning_events",
     )
     device_id = models.CharField(max_length=64, blank=True)
-    type = models.CharField(max_length=64)
+    client_id = models.CharField(max_length=64, blank=True, default="")
+    type = models.CharField(max_length=64, choices=Type.choices)
     lesson = models.ForeignKey(
         MicroArticlePage,
         null=True,
@@ -70,8 +97,21 @@ class LearningEvent(models.Model):
         related_name="learning_events",
     )
     payload = models.JSONField(blank=True, null=True)
+    occurred_at = models.DateTimeField(default=timezone.now)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "client_id"],
+                condition=~models.Q(client_id=""),
+                name="uniq_user_learning_event_client_id",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["user", "occurred_at"]),
+        ]
+
     def __str__(self) -> str:
         return self.type
 
@@ -89,6 +129,9 @@ class CardSRSState(models.Model):
     )
 
     srs_level = models.PositiveSmallIntegerField(default=1)
+    # Lus par SM-2 seulement, tenus à jour par tous les algorithmes (`learning.srs`).
+    ease = models.FloatField(default=DEFAULT_EASE)
+    interval_days = models.PositiveIntegerField(default=0)
     due_at = models.DateTimeField(default=timezone.now)
     last_reviewed_at = models.DateTimeField(null=True, blank=True)
     reviews_count = models.PositiveIntegerField(default=0)
@@ -105,9 +148,186 @@ class CardSRSState(models.Model):
             )
         ]
         indexes = [
-            models.Index(fields=["user", "due_at"]),
+            # Couvre la recherche de la prochaine carte due : le `EXISTS` sur le
+            # vivier lit `microarticle_id` dans l'index, sans revenir à la table.
+            models.Index(fields=["user", "due_at", "microarticle"], name="learn_srs_user_due_card_idx"),
             models.Index(fields=["microarticle"]),
         ]
 
     def __str__(self) -> str:
         return f"{self.user_id}:{self.microarticle_id} L{self.srs_level}"
+
+
+class CardReview(models.Model):
+    """Une note SRS, telle que reçue : journal en ajout seul.
+
+    Écrite par `srs/review/` et `srs/review/batch/` via `learning.review_log`,
+    avec l'état qui en résulte (`srs_level`, `ease`, `interval_days`) : de quoi
+    rejouer l'historique pour ajuster un algorithme. Pour les lots hors ligne,
+    `client_id` est l'identifiant que l'appareil attribue à chaque revue, et
+    l'unicité `(user, client_id)` rend le rejeu d'un lot idempotent — un lot
+    renvoyé après une coupure réseau ne note pas deux fois la même carte.
+
+    Les entrées anciennes sont résumées dans `CardReviewDaily` puis supprimées
+    (`manage.py compact_card_reviews`).
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="card_reviews",
+    )
+    microarticle = models.ForeignKey(
+        MicroArticlePage,
+        on_delete=models.CASCADE,
+        related_name="reviews",
+    )
+    client_id = models.CharField(max_length=64, blank=True)
+    device_id = models.CharField(max_length=64, blank=True)
+    rating = models.CharField(max_length=16)
+    srs_level = models.PositiveSmallIntegerField()
+    ease = models.FloatField(default=DEFAULT_EASE)
+    interval_days = models.PositiveIntegerField(default=0)
+    reviewed_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "client_id"],
+                condition=~models.Q(client_id=""),
+                name="uniq_user_card_review_client_id",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["user", "reviewed_at"]),
+            # Balayage par tranche de temps (compaction, partitionnement par mois).
+            models.Index(fields=["reviewed_at"], name="learn_review_reviewed_at_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id}:{self.microarticle_id} {self.rating}"
+
+
+class CardReviewDaily(models.Model):
+    """Revues d'une carte par un utilisateur sur une journée (fuseau du serveur).
+
+    Résumé des `CardReview` compactées : le détail horaire est perdu, les
+    volumes par note et le dernier niveau atteint restent.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="card_review_days",
+    )
+    microarticle = models.ForeignKey(
+        MicroArticlePage,
+        on_delete=models.CASCADE,
+        related_name="review_days",
+    )
+    day = models.DateField()
+    know_count = models.PositiveIntegerField(default=0)
+    medium_count = models.PositiveIntegerField(default=0)
+    again_count = models.PositiveIntegerField(default=0)
+    last_srs_level = models.PositiveSmallIntegerField()
+    last_reviewed_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "microarticle", "day"],
+                name="uniq_user_card_review_day",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["user", "day"]),
+        ]
+
+    @property
+    def reviews_count(self) -> int:
+        return self.know_count + self.medium_count + self.again_count
+
+    def __str__(self) -> str:
+        return f"{self.user_id}:{self.microarticle_id} {self.day}"
+
+
+class LearningDay(models.Model):
+    """Activité d'un utilisateur sur une journée (fuseau du serveur), pré-agrégée.
+
+    Tenue à jour par incréments à chaque écriture de progression ou de revue
+    (`learning.rollups`) : un an d'historique se lit en au plus 366 lignes.
+    Reconstructible depuis les sources (`manage.py rebuild_learning_days`).
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="learning_days",
+    )
+    day = models.DateField()
+    cards_read = models.PositiveIntegerField(default=0)
+    new_cards = models.PositiveIntegerField(default=0)
+    reviews_know = models.PositiveIntegerField(default=0)
+    reviews_medium = models.PositiveIntegerField(default=0)
+    reviews_again = models.PositiveIntegerField(default=0)
+    time_ms = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Sert aussi l'index des lectures par période (`user`, `day`).
+            models.UniqueConstraint(fields=["user", "day"], name="uniq_user_learning_day"),
+        ]
+
+    @property
+    def reviews_count(self) -> int:
+        return self.reviews_know + self.reviews_medium + self.reviews_again
+
+    def __str__(self) -> str:
+        return f"{self.user_id} {self.day}"
+
+
+class AchievementState(models.Model):
+    """Compteurs de série et de badges d'un utilisateur, tenus à jour par incréments.
+
+    Avancés à chaque journée d'activité écrite (`learning.achievements`) : lire
+    la série ou vérifier un palier ne demande jamais d'agréger l'historique.
+    Reconstructible depuis `LearningDay` (`manage.py replay_achievements`).
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="achievement_state",
+    )
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    streak_start = models.DateField(null=True, blank=True)
+    last_active_day = models.DateField(null=True, blank=True)
+    cards_read = models.PositiveIntegerField(default=0)
+    reviews_count = models.PositiveIntegerField(default=0)
+    reviews_know = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.user_id} série {self.current_streak}"
+
+
+class EarnedBadge(models.Model):
+    """Badge obtenu, au jour de l'activité qui a franchi son palier."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="earned_badges",
+    )
+    code = models.CharField(max_length=32)
+    earned_on = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "code"], name="uniq_user_badge"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id}:{self.code}"
@@ -0,0 +1,100 @@
+"""Synchronisation différentielle de la progression (`GET progress/?since=`).
+
+Le serveur renvoie avec chaque réponse un jeton opaque : l'heure serveur de la
+requête. Rappelé avec ce jeton, il ne renvoie que les lignes écrites depuis
+(`LessonProgress.synced_at`, index `(user, synced_at)`) et les lignes des
+fiches republiées depuis, plus la liste des fiches retirées (`LessonTombstone`)
+à effacer de l'appareil. Les pierres tombales sont globales : seules celles des
+fiches où l'utilisateur a une progression lui sont renvoyées. Le volume suit
+l'activité récente de l'utilisateur, pas l'historique ni les retraits du site.
+
+Une transaction peut valider une ligne datée d'un peu avant le jeton émis
+pendant qu'elle tournait : la fenêtre est donc relue avec `SYNC_OVERLAP` de
+recouvrement. Une ligne renvoyée deux fois est sans effet côté client (le merge
+garde le `updated_at` le plus récent).
+
+Une restriction d'accès posée ou levée (`PageViewRestriction`) invalide le cache
+des fiches visibles (`content.visibility`) mais ne laisse pas de pierre tombale :
+une fiche restreinte n'arrive dans `removed` que si sa ligne est dans la fenêtre,
+sinon elle disparaît à la synchro complète suivante.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+from django.utils import timezone
+
+from content.models import MicroArticlePage
+from content.visibility import live_public_ids
+
+SYNC_TOKEN_VERSION = "v1"
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class InvalidSyncToken(ValueError):
+    pass
+
+
+def encode_sync_token(at: datetime) -> str:
+    micros = int(at.timestamp() * 1_000_000)
+    raw = f"{SYNC_TOKEN_VERSION}:{micros}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> datetime:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        version, micros = raw.split(":", 1)
+        if version != SYNC_TOKEN_VERSION:
+            raise InvalidSyncToken(token)
+        return datetime.fromtimestamp(int(micros) / 1_000_000, tz=dt_timezone.utc)
+    except (binascii.Error, UnicodeDecodeError, ValueError, OverflowError, OSError):
+        raise InvalidSyncToken(token)
+
+
+def progress_changes(user, since: datetime | None) -> dict:
+    """Lignes de progression de `user` à transmettre, et fiches à effacer.
+
+    Sans `since`, synchro complète : toutes les lignes des fiches publiques,
+    aucune suppression (`full` vrai, l'appareil remplace son miroir).
+    """
+    from .models import LessonProgress, LessonTombstone
+
+    now = timezone.now()
+    rows = LessonProgress.objects.filter(user=user)
+    removed: set[int] = set()
+
+    if since is None:
+        visible = live_public_ids()
+        lessons = [row for row in rows.order_by("lesson_id") if row.lesson_id in visible]
+    else:
+        cutoff = since - SYNC_OVERLAP
+        rows = rows.filter(
+            Q(synced_at__gte=cutoff)
+            | Q(lesson_id__in=MicroArticlePage.objects.filter(last_published_at__gte=cutoff).values("id"))
+        )
+        visible = live_public_ids()
+        lessons = []
+        for row in rows.order_by("lesson_id"):
+            if row.lesson_id in visible:
+                lessons.append(row)
+            else:
+                removed.add(row.lesson_id)
+        removed.update(
+            LessonTombstone.objects.filter(
+                removed_at__gte=cutoff,
+                lesson_id__in=LessonProgress.objects.filter(user=user).values("lesson_id"),
+            ).values_list("lesson_id", flat=True)
+        )
+        removed.difference_update(row.lesson_id for row in lessons)
+
+    return {
+        "sync_token": encode_sync_token(now),
+        "full": since is None,
+        "lessons": lessons,
+        "removed": sorted(removed),
+    }
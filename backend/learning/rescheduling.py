@@ -0,0 +1,104 @@
+"""Recalcul en masse des échéances SRS.
+
+Après un changement d'algorithme ou un réglage des intervalles, chaque
+`CardSRSState` doit repartir de `last_reviewed_at + intervalle`. Les états sont
+lus par paquets (pagination par id), l'intervalle de tout le paquet est calculé
+d'un coup par `Scheduler.batch_intervals` (NumPy), puis les ids sont regroupés
+par intervalle : un `UPDATE` par intervalle distinct, soit une poignée de
+requêtes par paquet quel que soit le nombre de lignes — jamais une par ligne.
+
+L'algorithme d'un état est celui que choisit une revue de sa carte
+(`learning.card_schedulers`) : `scheduler_plan` répartit les états en conséquence.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, OuterRef
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .card_schedulers import deck_scheduler
+from .counts import invalidate_srs_counts
+from .models import CardSRSState
+from .srs import SCHEDULERS, Scheduler
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def reschedule_states(queryset, scheduler: Scheduler, *, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Replanifie les états de `queryset` selon `scheduler`. Renvoie le nombre d'états traités.
+
+    Les états jamais revus (`last_reviewed_at` nul) gardent leur échéance : ils
+    n'ont pas d'intervalle dont repartir.
+    """
+
+    import numpy as np
+
+    states = queryset.filter(last_reviewed_at__isnull=False).order_by("id")
+    last_id = 0
+    total = 0
+    user_ids: set[int] = set()
+
+    while True:
+        rows = list(
+            states.filter(id__gt=last_id).values_list(
+                "id", "srs_level", "ease", "interval_days", "user_id"
+            )[:chunk_size]
+        )
+        if not rows:
+            break
+
+        table = np.array(rows, dtype=np.float64)
+        ids = table[:, 0].astype(np.int64)
+        intervals = scheduler.batch_intervals(
+            table[:, 1].astype(np.int64), table[:, 2], table[:, 3].astype(np.int64)
+        )
+
+        # Ids regroupés par intervalle : `values[i]` ↔ `groups[i]`.
+        values, inverse = np.unique(intervals, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        groups = np.split(ids[order], np.cumsum(np.bincount(inverse))[:-1])
+
+        now = timezone.now()
+        with transaction.atomic():
+            for interval, group in zip(values.tolist(), groups):
+                CardSRSState.objects.filter(id__in=group.tolist()).update(
+                    due_at=F("last_reviewed_at") + timedelta(days=int(interval)),
+                    interval_days=int(interval),
+                    updated_at=now,
+                )
+
+        total += len(rows)
+        last_id = int(ids[-1])
+        user_ids.update(table[:, 4].astype(np.int64).tolist())
+
+    # `update()` n'émet pas `post_save` : les compteurs mis en cache sont périmés ici.
+    invalidate_srs_counts(*user_ids)
+    return total
+
+
+def scheduler_plan(states) -> list[tuple[Scheduler, object]]:
+    """Couples (algorithme, états de `states` qui le suivent), un par algorithme connu.
+
+    L'algorithme effectif est celui de `learning.card_schedulers`, résolu en SQL
+    pour chaque état : pas de lecture des decks en Python.
+    """
+    states = states.alias(
+        effective_scheduler=Coalesce(
+            deck_scheduler(OuterRef("user_id"), "microarticle_id"), F("user__srs_scheduler")
+        )
+    )
+    return [
+        (scheduler, states.filter(effective_scheduler=name)) for name, scheduler in SCHEDULERS.items()
+    ]
+
+
+def reschedule_effective(states, *, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Replanifie `states`, chacun selon son algorithme effectif (`scheduler_plan`)."""
+    return sum(
+        reschedule_states(queryset, scheduler, chunk_size=chunk_size)
+        for scheduler, queryset in scheduler_plan(states)
+    )
@@ -0,0 +1,178 @@
+"""Journal des revues SRS (`CardReview`) : écriture groupée et compaction.
+
+`CardSRSState` ne garde que le dernier état d'une carte ; le journal garde
+chaque note et l'état qui en résulte. Les vues de revue l'alimentent via
+`ReviewLogBuffer`, dans la même transaction que l'état : une revue appliquée est
+toujours journalisée, et les `client_id` d'un lot rejoué se retrouvent. Le
+même tampon alimente les agrégats journaliers (`learning.rollups`).
+
+Le journal ne fait que grossir. `compact_reviews` résume les entrées plus
+anciennes qu'une date en lignes `CardReviewDaily` (une par utilisateur, carte et
+jour), par tranches parcourues dans l'ordre de `reviewed_at` puis supprimées.
+Une fois compactée, une revue hors ligne ne peut plus être reconnue comme
+doublon : la fenêtre gardée doit rester bien plus longue que le délai de
+synchronisation d'un appareil.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .rollups import DailyRollup
+from .srs import RATING_AGAIN, RATING_CODES, RATING_KNOW, RATING_MEDIUM
+
+REVIEW_LOG_BATCH_SIZE = 500
+COMPACTION_CHUNK_SIZE = 5000
+
+_COUNT_FIELDS = {
+    RATING_KNOW: "know_count",
+    RATING_MEDIUM: "medium_count",
+    RATING_AGAIN: "again_count",
+}
+
+
+class ReviewLogBuffer:
+    """Accumule des `CardReview` et les insère par paquets de `batch_size`.
+
+    S'utilise comme gestionnaire de contexte, à l'intérieur de la transaction
+    qui écrit les états : le reliquat est inséré à la sortie (sauf exception).
+    """
+
+    def __init__(self, *, batch_size: int = REVIEW_LOG_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._pending: list = []
+        self._added = 0
+        self._rollup = DailyRollup()
+
+    def __enter__(self) -> ReviewLogBuffer:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
+
+    def __len__(self) -> int:
+        return self._added
+
+    def add(
+        self,
+        state,
+        *,
+        rating: str,
+        reviewed_at: datetime,
+        client_id: str = "",
+        device_id: str = "",
+    ) -> None:
+        """Journalise une revue de `state`, dont les champs SRS sont déjà à jour."""
+        from .models import CardReview
+
+        self._pending.append(
+            CardReview(
+                user_id=state.user_id,
+                microarticle_id=state.microarticle_id,
+                client_id=client_id,
+                device_id=device_id,
+                rating=rating,
+                srs_level=state.srs_level,
+                ease=state.ease,
+                interval_days=state.interval_days,
+                reviewed_at=reviewed_at,
+            )
+        )
+        self._rollup.add_review(state, rating=rating, reviewed_at=reviewed_at)
+        self._added += 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        from .models import CardReview
+
+        if self._pending:
+            CardReview.objects.bulk_create(self._pending)
+            self._pending = []
+        self._rollup.flush()
+
+
+def _compact_chunk(before: datetime, chunk_size: int) -> tuple[int, int]:
+    from .models import CardReview, CardReviewDaily
+
+    with transaction.atomic():
+        rows = list(
+            CardReview.objects.select_for_update()
+            .filter(reviewed_at__lt=before)
+            .order_by("reviewed_at", "id")
+            .values_list("id", "user_id", "microarticle_id", "rating", "srs_level", "reviewed_at")[
+                :chunk_size
+            ]
+        )
+        if not rows:
+            return 0, 0
+
+        days: dict[tuple[int, int, object], CardReviewDaily] = {}
+        for _, user_id, microarticle_id, rating, srs_level, reviewed_at in rows:
+            key = (user_id, microarticle_id, timezone.localdate(reviewed_at))
+            daily = days.get(key)
+            if daily is None:
+                daily = days[key] = CardReviewDaily(
+                    user_id=user_id,
+                    microarticle_id=microarticle_id,
+                    day=key[2],
+                    last_srs_level=srs_level,
+                    last_reviewed_at=reviewed_at,
+                )
+            field = _COUNT_FIELDS[RATING_CODES.get(rating, RATING_AGAIN)]
+            setattr(daily, field, getattr(daily, field) + 1)
+            # Lignes triées par `reviewed_at` : la dernière vue est la plus récente.
+            daily.last_srs_level = srs_level
+            daily.last_reviewed_at = reviewed_at
+
+        # Une journée à cheval sur deux tranches (ou deux exécutions) s'ajoute
+        # à la ligne existante au lieu de l'écraser.
+        existing = CardReviewDaily.objects.select_for_update().filter(
+            Q(user_id__in={key[0] for key in days})
+            & Q(microarticle_id__in={key[1] for key in days})
+            & Q(day__in={key[2] for key in days})
+        )
+        for previous in existing:
+            daily = days.get((previous.user_id, previous.microarticle_id, previous.day))
+            if daily is None:
+                continue
+            for field in _COUNT_FIELDS.values():
+                setattr(daily, field, getattr(daily, field) + getattr(previous, field))
+            if previous.last_reviewed_at > daily.last_reviewed_at:
+                daily.last_srs_level = previous.last_srs_level
+                daily.last_reviewed_at = previous.last_reviewed_at
+
+        CardReviewDaily.objects.bulk_create(
+            days.values(),
+            update_conflicts=True,
+            unique_fields=["user", "microarticle", "day"],
+            update_fields=[*_COUNT_FIELDS.values(), "last_srs_level", "last_reviewed_at"],
+        )
+        CardReview.objects.filter(id__in=[row[0] for row in rows]).delete()
+    return len(rows), len(days)
+
+
+def compact_reviews(
+    before: datetime, *, chunk_size: int = COMPACTION_CHUNK_SIZE, progress=None
+) -> tuple[int, int]:
+    """Résume dans `CardReviewDaily` puis supprime les revues antérieures à `before`.
+
+    Une transaction par tranche de `chunk_size` revues : une interruption ne
+    perd ni ne compte deux fois aucune revue. `progress(compacted, daily)` est
+    appelé après chaque tranche. Renvoie (revues compactées, lignes journalières
+    écrites).
+    """
+    compacted = written = 0
+    while True:
+        reviews, days = _compact_chunk(before, chunk_size)
+        if not reviews:
+            return compacted, written
+        compacted += reviews
+        written += days
+        if progress is not None:
+            progress(compacted, written)
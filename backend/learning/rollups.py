@@ -0,0 +1,216 @@
+"""Agrégats journaliers d'activité (`LearningDay`) : incréments et reconstruction.
+
+Un écran de statistiques n'agrège jamais les tables sources à la lecture : chaque
+écriture de progression ou de revue ajoute sa contribution à la ligne
+`(utilisateur, jour)` concernée, dans la transaction qui écrit la source.
+`DailyRollup` cumule ces incréments en mémoire et les applique en un
+`INSERT … ON CONFLICT DO UPDATE SET x = x + EXCLUDED.x` par paquet : deux
+écritures concurrentes s'additionnent sans verrou intermédiaire.
+
+- revues par note et cartes nouvelles (première revue) : alimentées par
+  `ReviewLogBuffer`, au jour de `reviewed_at` ;
+- fiches lues (passage à `seen`) et temps passé (hausse de `time_ms`) : par
+  les vues de progression, au jour du `updated_at` envoyé (plafonné).
+
+Les mêmes journées avancent séries et badges (`learning.achievements`).
+
+`rebuild_days` recalcule tout depuis les sources. Les revues (`CardReview` et
+`CardReviewDaily`) y sont exactes ; `LessonProgress` ne garde que des totaux
+par fiche, dont la lecture et le temps sont rattachés au jour de la dernière
+consultation (`last_seen_at`, à défaut `updated_at`).
+"""
+
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from datetime import date, datetime
+
+from django.db import connection, transaction
+from django.db.models import Count, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .achievements import record_days
+from .srs import RATING_AGAIN, RATING_CODES, RATING_KNOW, RATING_MEDIUM
+from .upserts import quoted_column, typed_param
+
+ROLLUP_FIELDS = ("cards_read", "new_cards", "reviews_know", "reviews_medium", "reviews_again", "time_ms")
+ROLLUP_BATCH_SIZE = 100
+REBUILD_CHUNK_SIZE = 200
+
+_REVIEW_FIELDS = {
+    RATING_KNOW: "reviews_know",
+    RATING_MEDIUM: "reviews_medium",
+    RATING_AGAIN: "reviews_again",
+}
+
+
+def _review_field(rating: str) -> str:
+    return _REVIEW_FIELDS[RATING_CODES.get(rating, RATING_AGAIN)]
+
+
+def _apply(deltas: list[tuple[int, date, Counter]]) -> None:
+    from .models import LearningDay
+
+    table = connection.ops.quote_name(LearningDay._meta.db_table)
+    columns = [quoted_column(LearningDay, name) for name in ("user", "day", *ROLLUP_FIELDS)]
+    assignments = ", ".join(
+        f"{quoted_column(LearningDay, name)} = {table}.{quoted_column(LearningDay, name)} "
+        f"+ EXCLUDED.{quoted_column(LearningDay, name)}"
+        for name in ROLLUP_FIELDS
+    )
+    for start in range(0, len(deltas), ROLLUP_BATCH_SIZE):
+        rows_sql, params = [], []
+        for user_id, day, counts in deltas[start : start + ROLLUP_BATCH_SIZE]:
+            values = [("user", user_id), ("day", day), *((name, counts[name]) for name in ROLLUP_FIELDS)]
+            row_sql = []
+            for name, value in values:
+                sql, param = typed_param(LearningDay, name, value)
+                row_sql.append(sql)
+                params.append(param)
+            rows_sql.append(f"({', '.join(row_sql)})")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join(rows_sql)} "
+                f"ON CONFLICT ({columns[0]}, {columns[1]}) DO UPDATE SET {assignments}",
+                params,
+            )
+
+
+class DailyRollup:
+    """Cumule des incréments par `(utilisateur, jour)` et les applique en bloc.
+
+    S'utilise comme gestionnaire de contexte, dans la transaction qui écrit
+    les sources : les incréments sont appliqués à la sortie (sauf exception).
+    """
+
+    def __init__(self):
+        self._pending: dict[tuple[int, date], Counter] = defaultdict(Counter)
+
+    def __enter__(self) -> DailyRollup:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
+
+    def add(self, user_id: int, at: datetime, **counts: int) -> None:
+        self._pending[(user_id, timezone.localdate(at))].update(counts)
+
+    def add_review(self, state, *, rating: str, reviewed_at: datetime) -> None:
+        """Compte une revue de `state`, dont les champs SRS sont déjà à jour."""
+        counts = {_review_field(rating): 1}
+        # Première revue appliquée de la carte (une revue périmée ne modifie pas l'état).
+        if state.reviews_count == 1 and state.last_reviewed_at == reviewed_at:
+            counts["new_cards"] = 1
+        self.add(state.user_id, reviewed_at, **counts)
+
+    def add_progress(self, merged, *, before: tuple[bool, int] | None, at: datetime) -> None:
+        """Compte l'écart entre `before` (`seen`, `time_ms` d'avant, ou rien) et `merged`."""
+        seen, time_ms = before or (False, 0)
+        counts = {}
+        if merged.seen and not seen:
+            counts["cards_read"] = 1
+        if merged.time_ms > time_ms:
+            counts["time_ms"] = merged.time_ms - time_ms
+        if counts:
+            self.add(merged.user_id, at, **counts)
+
+    def flush(self) -> None:
+        # Ordre fixe des lignes : deux lots concurrents ne s'interbloquent pas.
+        deltas = [
+            (user_id, day, counts)
+            for (user_id, day), counts in sorted(self._pending.items())
+            if any(counts.values())
+        ]
+        self._pending.clear()
+        if deltas:
+            _apply(deltas)
+            record_days(deltas)
+
+
+def _rebuild_chunk(user_ids: list[int]) -> int:
+    from .models import CardReview, CardReviewDaily, LearningDay, LessonProgress
+
+    days: dict[tuple[int, date], Counter] = defaultdict(Counter)
+
+    reviews = (
+        CardReview.objects.filter(user_id__in=user_ids)
+        .annotate(day=TruncDate("reviewed_at"))
+        .values("user_id", "day", "rating")
+        .annotate(count=Count("id"))
+    )
+    for row in reviews:
+        days[(row["user_id"], row["day"])][_review_field(row["rating"])] += row["count"]
+
+    compacted = (
+        CardReviewDaily.objects.filter(user_id__in=user_ids)
+        .values("user_id", "day")
+        .annotate(know=Sum("know_count"), medium=Sum("medium_count"), again=Sum("again_count"))
+    )
+    for row in compacted:
+        counts = days[(row["user_id"], row["day"])]
+        counts["reviews_know"] += row["know"]
+        counts["reviews_medium"] += row["medium"]
+        counts["reviews_again"] += row["again"]
+
+    # Jour de la première revue de chaque carte, journal et résumés confondus.
+    first_reviews: dict[tuple[int, int], date] = {}
+    for user_id, card_id, day in (
+        CardReviewDaily.objects.filter(user_id__in=user_ids)
+        .values("user_id", "microarticle_id")
+        .annotate(first=Min("day"))
+        .values_list("user_id", "microarticle_id", "first")
+    ):
+        first_reviews[(user_id, card_id)] = day
+    for user_id, card_id, first in (
+        CardReview.objects.filter(user_id__in=user_ids)
+        .values("user_id", "microarticle_id")
+        .annotate(first=Min("reviewed_at"))
+        .values_list("user_id", "microarticle_id", "first")
+    ):
+        day = timezone.localdate(first)
+        key = (user_id, card_id)
+        first_reviews[key] = min(first_reviews.get(key, day), day)
+    for (user_id, _), day in first_reviews.items():
+        days[(user_id, day)]["new_cards"] += 1
+
+    for user_id, seen, time_ms, last_seen_at, updated_at in LessonProgress.objects.filter(
+        user_id__in=user_ids
+    ).values_list("user_id", "seen", "time_ms", "last_seen_at", "updated_at"):
+        counts = days[(user_id, timezone.localdate(last_seen_at or updated_at))]
+        counts["cards_read"] += int(seen)
+        counts["time_ms"] += time_ms
+
+    rows = [
+        LearningDay(user_id=user_id, day=day, **{name: counts[name] for name in ROLLUP_FIELDS})
+        for (user_id, day), counts in sorted(days.items())
+        if any(counts.values())
+    ]
+    with transaction.atomic():
+        LearningDay.objects.filter(user_id__in=user_ids).delete()
+        LearningDay.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def rebuild_days(
+    user_ids: list[int] | None = None, *, chunk_size: int = REBUILD_CHUNK_SIZE, progress=None
+) -> tuple[int, int]:
+    """Recalcule depuis les sources les `LearningDay` de `user_ids` (tous par défaut).
+
+    Une transaction par tranche de `chunk_size` utilisateurs ; `progress(users,
+    days)` est appelé après chaque tranche. Renvoie (utilisateurs, lignes écrites).
+    """
+    from django.contrib.auth import get_user_model
+
+    users = get_user_model().objects.order_by("pk")
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    ids = list(users.values_list("pk", flat=True))
+
+    written = 0
+    for start in range(0, len(ids), chunk_size):
+        written += _rebuild_chunk(ids[start : start + chunk_size])
+        if progress is not None:
+            progress(min(start + chunk_size, len(ids)), written)
+    return len(ids), written
@@ -1,8 +1,12 @@
+import json
+
 from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
 
 from content.serializers import MicroArticleListSerializer
 
+from .models import LearningEvent
+
 
 @extend_schema_field(MicroArticleListSerializer)
 class SRSCardField(serializers.DictField):
@@ -32,6 +36,23 @@ class LessonProgressSerializer(serializers.Serializer):
     last_seen_at = serializers.DateTimeField(allow_null=True)
 
 
+class LessonProgressQuerySerializer(serializers.Serializer):
+    since = serializers.CharField(
+        required=False,
+        help_text=(
+            "Jeton `sync_token` d'une réponse précédente : ne renvoie que ce qui a "
+            "changé depuis. Absent, ou refusé (400), synchro complète."
+        ),
+    )
+
+
+class LessonProgressChangesSerializer(serializers.Serializer):
+    sync_token = serializers.CharField()
+    full = serializers.BooleanField()
+    lessons = LessonProgressSerializer(many=True)
+    removed = serializers.ListField(child=serializers.IntegerField())
+
+
 class ProgressImportSerializer(serializers.Serializer):
     device_id = serializers.CharField(required=False, allow_blank=True)
     lessons = serializers.DictField(child=LessonProgressUpdateSerializer())
@@ -61,6 +82,25 @@ class SRSNextQuerySerializer(serializers.Serializer):
     )
 
 
+class SRSQueueQuerySerializer(serializers.Serializer):
+    scope = serializers.ChoiceField(
+        choices=["all_decks", "deck", "decks", "all_cards"],
+        required=False,
+        default="all_decks",
+    )
+    deck_id = serializers.IntegerField(min_value=1, required=False)
+    deck_ids = serializers.CharField(required=False)
+    only_due = serializers.BooleanField(required=False, default=True)
+    limit = serializers.IntegerField(min_value=1, max_value=100, required=False, default=20)
+    session = serializers.CharField(
+        required=False,
+        help_text=(
+            "Jeton renvoyé par l'appel précédent de la même session. Les cartes "
+            "déjà servies dans la session ne sont pas reproposées."
+        ),
+    )
+
+
 class SRSCountsQuerySerializer(serializers.Serializer):
     scope = serializers.ChoiceField(
         choices=["all_decks", "deck", "decks", "all_cards"],
@@ -78,9 +118,183 @@ class SRSCountsSerializer(serializers.Serializer):
     total = serializers.IntegerField(min_value=0)
 
 
+SRS_FORECAST_DEFAULT_DAYS = 30
+SRS_FORECAST_MAX_DAYS = 365
+
+
+class SRSForecastQuerySerializer(SRSCountsQuerySerializer):
+    days = serializers.IntegerField(
+        min_value=1,
+        max_value=SRS_FORECAST_MAX_DAYS,
+        required=False,
+        default=SRS_FORECAST_DEFAULT_DAYS,
+    )
+    tz = serializers.CharField(
+        required=False,
+        help_text="Fuseau IANA des jours du graphique (ex. `Europe/Paris`). Défaut : fuseau du serveur.",
+    )
+
+
+class SRSForecastDaySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    due = serializers.IntegerField(min_value=0)
+
+
+class SRSForecastSerializer(serializers.Serializer):
+    timezone = serializers.CharField()
+    overdue = serializers.IntegerField(
+        min_value=0,
+        help_text="Cartes déjà en retard, comptées aussi dans le premier jour.",
+    )
+    days = SRSForecastDaySerializer(many=True)
+
+
+SRS_REVIEW_DECK_ID_HELP = (
+    "Deck depuis lequel la carte est révisée. Sans effet sur l'algorithme : c'est "
+    "celui du premier deck qui contient la carte et en impose un (`srs_scheduler`), "
+    "sinon celui de l'utilisateur."
+)
+
+
 class SRSReviewSerializer(serializers.Serializer):
     card_id = serializers.IntegerField(min_value=1)
     rating = serializers.ChoiceField(choices=["know", "medium", "again"])
+    deck_id = serializers.IntegerField(min_value=1, required=False, help_text=SRS_REVIEW_DECK_ID_HELP)
+
+
+SRS_REVIEW_BATCH_MAX = 500
+
+
+class SRSReviewBatchItemSerializer(serializers.Serializer):
+    client_id = serializers.CharField(max_length=64)
+    card_id = serializers.IntegerField(min_value=1)
+    rating = serializers.ChoiceField(choices=["know", "medium", "again"])
+    reviewed_at = serializers.DateTimeField()
+
+
+class SRSReviewBatchSerializer(serializers.Serializer):
+    device_id = serializers.CharField(max_length=64, required=False, allow_blank=True)
+    deck_id = serializers.IntegerField(min_value=1, required=False, help_text=SRS_REVIEW_DECK_ID_HELP)
+    reviews = serializers.ListField(
+        child=SRSReviewBatchItemSerializer(),
+        min_length=1,
+        max_length=SRS_REVIEW_BATCH_MAX,
+    )
+
+
+LEARNING_EVENT_BATCH_MAX = 500
+LEARNING_EVENT_PAYLOAD_MAX_BYTES = 2048
+
+
+class LearningEventSerializer(serializers.Serializer):
+    client_id = serializers.CharField(max_length=64)
+    type = serializers.ChoiceField(choices=LearningEvent.Type.choices)
+    lesson_id = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    occurred_at = serializers.DateTimeField()
+    payload = serializers.DictField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        payload = attrs.get("payload")
+        if payload is not None:
+            size = len(json.dumps(payload, separators=(",", ":")).encode())
+            if size > LEARNING_EVENT_PAYLOAD_MAX_BYTES:
+                raise serializers.ValidationError(
+                    {"payload": f"Payload too large ({size} > {LEARNING_EVENT_PAYLOAD_MAX_BYTES} bytes)."}
+                )
+
+        event_type = attrs["type"]
+        if event_type in (LearningEvent.Type.CARD_VIEWED, LearningEvent.Type.LESSON_COMPLETED):
+            if not attrs.get("lesson_id"):
+                raise serializers.ValidationError({"lesson_id": "Required for this event type."})
+        elif event_type == LearningEvent.Type.QUIZ_SCORED:
+            score = (payload or {}).get("score")
+            if not isinstance(score, int) or isinstance(score, bool) or not 0 <= score <= 100:
+                raise serializers.ValidationError(
+                    {"payload": "`score` must be an integer between 0 and 100."}
+                )
+        return attrs
+
+
+class LearningEventBatchSerializer(serializers.Serializer):
+    device_id = serializers.CharField(max_length=64, required=False, allow_blank=True)
+    events = serializers.ListField(
+        child=LearningEventSerializer(),
+        min_length=1,
+        max_length=LEARNING_EVENT_BATCH_MAX,
+    )
+
+
+class LearningEventBatchResponseSerializer(serializers.Serializer):
+    accepted = serializers.IntegerField(min_value=0)
+    duplicates = serializers.IntegerField(min_value=0)
+    rejected = serializers.ListField(
+        child=serializers.CharField(),
+        help_text="`client_id` des événements portant sur une fiche inconnue.",
+    )
+
+
+LEARNING_STATS_DEFAULT_DAYS = 30
+LEARNING_STATS_MAX_DAYS = 366
+
+
+class LearningStatsQuerySerializer(serializers.Serializer):
+    days = serializers.IntegerField(
+        min_value=1,
+        max_value=LEARNING_STATS_MAX_DAYS,
+        required=False,
+        default=LEARNING_STATS_DEFAULT_DAYS,
+        help_text="Nombre de jours jusqu'à aujourd'hui inclus (fuseau du serveur).",
+    )
+
+
+class LearningDaySerializer(serializers.Serializer):
+    day = serializers.DateField()
+    cards_read = serializers.IntegerField(min_value=0)
+    new_cards = serializers.IntegerField(min_value=0)
+    reviews_know = serializers.IntegerField(min_value=0)
+    reviews_medium = serializers.IntegerField(min_value=0)
+    reviews_again = serializers.IntegerField(min_value=0)
+    time_ms = serializers.IntegerField(min_value=0)
+
+
+class LearningStatsTotalsSerializer(serializers.Serializer):
+    cards_read = serializers.IntegerField(min_value=0)
+    new_cards = serializers.IntegerField(min_value=0)
+    reviews_know = serializers.IntegerField(min_value=0)
+    reviews_medium = serializers.IntegerField(min_value=0)
+    reviews_again = serializers.IntegerField(min_value=0)
+    time_ms = serializers.IntegerField(min_value=0)
+    active_days = serializers.IntegerField(min_value=0)
+
+
+class LearningStatsSerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    days = LearningDaySerializer(
+        many=True,
+        help_text="Jours avec activité seulement, du plus ancien au plus récent.",
+    )
+    totals = LearningStatsTotalsSerializer()
+
+
+class BadgeSerializer(serializers.Serializer):
+    code = serializers.CharField()
+    label = serializers.CharField()
+    threshold = serializers.IntegerField(min_value=1)
+    earned_on = serializers.DateField(allow_null=True, help_text="Vide tant que le badge n'est pas obtenu.")
+
+
+class AchievementsSerializer(serializers.Serializer):
+    current_streak = serializers.IntegerField(
+        min_value=0,
+        help_text="Jours consécutifs d'activité jusqu'à aujourd'hui ou hier ; 0 si la série est rompue.",
+    )
+    longest_streak = serializers.IntegerField(min_value=0)
+    last_active_day = serializers.DateField(allow_null=True)
+    cards_read = serializers.IntegerField(min_value=0)
+    reviews_count = serializers.IntegerField(min_value=0)
+    reviews_know = serializers.IntegerField(min_value=0)
+    badges = BadgeSerializer(many=True, help_text="Catalogue complet, obtenus ou non.")
 
 
 class SRSStateSerializer(serializers.Serializer):
@@ -94,3 +308,28 @@ class SRSStateSerializer(serializers.Serializer):
 class SRSNextSerializer(serializers.Serializer):
     card = SRSCardField(allow_null=True)
     srs = SRSStateSerializer(allow_null=True)
+
+
+class SRSQueueItemSerializer(serializers.Serializer):
+    card = SRSCardField()
+    srs = SRSStateSerializer()
+
+
+class SRSQueueSerializer(serializers.Serializer):
+    session = serializers.CharField()
+    items = SRSQueueItemSerializer(many=True)
+
+
+class SRSCardStateSerializer(serializers.Serializer):
+    card_id = serializers.IntegerField()
+    srs = SRSStateSerializer()
+
+
+class SRSReviewBatchResponseSerializer(serializers.Serializer):
+    applied = serializers.IntegerField(min_value=0)
+    duplicates = serializers.IntegerField(min_value=0)
+    rejected = serializers.ListField(
+        child=serializers.CharField(),
+        help_text="`client_id` des revues portant sur une fiche inconnue ou dépubliée.",
+    )
+    states = SRSCardStateSerializer(many=True)
@@ -0,0 +1,50 @@
+"""Invalidations de cache et pierres tombales déclenchées par les écritures d'apprentissage."""
+
+from __future__ import annotations
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from wagtail.models import PageViewRestriction
+from wagtail.signals import page_published, page_unpublished, post_page_move
+
+from content.models import MicroArticlePage
+
+from .counts import invalidate_all_srs_counts, invalidate_srs_counts
+from .models import CardSRSState, LessonTombstone
+
+
+@receiver(post_save, sender=CardSRSState)
+@receiver(post_delete, sender=CardSRSState)
+def _invalidate_user_srs_counts(sender, instance, **kwargs) -> None:
+    # Les écritures en masse (`bulk_update`, `update()`) n'arrivent pas ici :
+    # leurs appelants invalident eux-mêmes.
+    invalidate_srs_counts(instance.user_id)
+
+
+@receiver(page_published, sender=MicroArticlePage)
+@receiver(page_unpublished, sender=MicroArticlePage)
+@receiver(post_page_move)
+@receiver(post_save, sender=PageViewRestriction)
+@receiver(post_delete, sender=PageViewRestriction)
+def _invalidate_all_srs_counts(sender, **kwargs) -> None:
+    # Le vivier ne compte que les cartes live et publiques : une (dé)publication,
+    # un déplacement de branche ou une restriction d'accès change le total de
+    # tous les utilisateurs qui les ont dans un deck.
+    invalidate_all_srs_counts()
+
+
+@receiver(page_unpublished, sender=MicroArticlePage)
+@receiver(post_delete, sender=MicroArticlePage)
+def _record_lesson_tombstone(sender, instance, **kwargs) -> None:
+    # Les appareils en synchro différentielle effacent la fiche au prochain
+    # `progress/?since=` (voir `learning.progress_sync`).
+    LessonTombstone.objects.update_or_create(
+        lesson_id=instance.pk, defaults={"removed_at": timezone.now()}
+    )
+
+
+@receiver(page_published, sender=MicroArticlePage)
+def _clear_lesson_tombstone(sender, instance, **kwargs) -> None:
+    # La fiche revient : ses lignes repartent via `last_published_at`.
+    LessonTombstone.objects.filter(lesson_id=instance.pk).delete()
@@ -0,0 +1,158 @@
+"""Simulation hors base des algorithmes SRS.
+
+On règle les intervalles à l'aveugle : ce module fait réviser des utilisateurs
+synthétiques pendant des mois, entièrement en mémoire, pour comparer rétention
+et charge quotidienne d'un `Scheduler` à l'autre (ou d'un réglage à l'autre) et
+mesurer son débit. L'état de toutes les cartes de tous les utilisateurs tient
+dans quelques tableaux NumPy ; chaque jour simulé est un appel à
+`Scheduler.batch_review` sur l'ensemble des cartes dues.
+
+Modèle de mémoire (indépendant de l'algorithme testé) : chaque carte a une
+stabilité S en jours, et la probabilité de s'en souvenir t jours après la
+dernière revue vaut exp(-t / S). S part de la probabilité de rappel à un jour
+propre à chaque utilisateur, est multipliée par `stability_growth` à chaque
+réussite et par `lapse_factor` à chaque oubli. Un algorithme qui espace trop
+fait donc baisser la rétention ; un algorithme trop prudent fait monter la charge.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .srs import DEFAULT_EASE, MIN_LEVEL, RATING_AGAIN, RATING_KNOW, RATING_MEDIUM, Scheduler
+
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    users: int = 10_000
+    cards_per_user: int = 200
+    days: int = 90
+    new_cards_per_day: int = 10
+    # Probabilité moyenne de se souvenir d'une carte un jour après l'avoir vue,
+    # et son écart-type d'un utilisateur à l'autre.
+    recall_mean: float = 0.85
+    recall_spread: float = 0.05
+    # Réussite à la toute première présentation d'une carte.
+    first_recall: float = 0.6
+    # Part des réussites notées « medium » plutôt que « know ».
+    medium_share: float = 0.3
+    stability_growth: float = 2.5
+    lapse_factor: float = 0.5
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    scheduler: str
+    config: SimulationConfig
+    reviews: int
+    # Revues de cartes déjà vues, et parmi elles celles réussies.
+    repeat_reviews: int
+    recalled: int
+    # Nombre de revues par jour simulé, tous utilisateurs confondus.
+    workload: np.ndarray
+    scheduler_seconds: float
+    elapsed_seconds: float
+
+    @property
+    def retention(self) -> float:
+        return self.recalled / self.repeat_reviews if self.repeat_reviews else 0.0
+
+    @property
+    def mean_daily_reviews_per_user(self) -> float:
+        return float(self.workload.mean()) / self.config.users
+
+    @property
+    def peak_daily_reviews_per_user(self) -> float:
+        return float(self.workload.max()) / self.config.users
+
+    @property
+    def throughput(self) -> float:
+        """Revues calculées par seconde par `batch_review` (débit de l'algorithme seul)."""
+        return self.reviews / self.scheduler_seconds if self.scheduler_seconds else 0.0
+
+
+def simulate(scheduler: Scheduler, config: SimulationConfig | None = None) -> SimulationResult:
+    """Fait réviser `config.users` utilisateurs synthétiques avec `scheduler`.
+
+    Chaque utilisateur découvre `new_cards_per_day` cartes par jour et révise
+    chaque jour tout ce qui est dû. Aucune requête en base.
+    """
+    config = config or SimulationConfig()
+    rng = np.random.default_rng(config.seed)
+    started = time.perf_counter()
+
+    size = config.users * config.cards_per_user
+    owner = np.repeat(np.arange(config.users), config.cards_per_user)
+    introduced_on = np.tile(
+        np.arange(config.cards_per_user) // max(1, config.new_cards_per_day), config.users
+    )
+
+    user_recall = np.clip(
+        rng.normal(config.recall_mean, config.recall_spread, config.users), 0.05, 0.995
+    )
+    initial_stability = (-1.0 / np.log(user_recall))[owner]
+
+    levels = np.full(size, MIN_LEVEL, dtype=np.int64)
+    eases = np.full(size, DEFAULT_EASE, dtype=np.float64)
+    intervals = np.zeros(size, dtype=np.int64)
+    stability = initial_stability.copy()
+    due_day = introduced_on.copy()
+    last_day = np.full(size, -1, dtype=np.int64)
+
+    workload = np.zeros(config.days, dtype=np.int64)
+    reviews = repeat_reviews = recalled_total = 0
+    scheduler_seconds = 0.0
+
+    for day in range(config.days):
+        idx = np.flatnonzero(due_day <= day)
+        if idx.size == 0:
+            continue
+
+        first = last_day[idx] < 0
+        elapsed = day - last_day[idx]
+        probability = np.where(first, config.first_recall, np.exp(-elapsed / stability[idx]))
+        recalled = rng.random(idx.size) < probability
+        ratings = np.where(
+            ~recalled,
+            RATING_AGAIN,
+            np.where(rng.random(idx.size) < config.medium_share, RATING_MEDIUM, RATING_KNOW),
+        )
+
+        tick = time.perf_counter()
+        levels[idx], eases[idx], intervals[idx] = scheduler.batch_review(
+            levels[idx], eases[idx], intervals[idx], ratings
+        )
+        scheduler_seconds += time.perf_counter() - tick
+
+        repeat = ~first
+        stability[idx] = np.where(
+            repeat & recalled,
+            stability[idx] * config.stability_growth,
+            np.where(
+                repeat,
+                np.maximum(initial_stability[idx], stability[idx] * config.lapse_factor),
+                stability[idx],
+            ),
+        )
+        due_day[idx] = day + np.maximum(1, intervals[idx])
+        last_day[idx] = day
+
+        workload[day] = idx.size
+        reviews += int(idx.size)
+        repeat_reviews += int(repeat.sum())
+        recalled_total += int((repeat & recalled).sum())
+
+    return SimulationResult(
+        scheduler=scheduler.name,
+        config=config,
+        reviews=reviews,
+        repeat_reviews=repeat_reviews,
+        recalled=recalled_total,
+        workload=workload,
+        scheduler_seconds=scheduler_seconds,
+        elapsed_seconds=time.perf_counter() - started,
+    )
@@ -1,19 +1,50 @@
+"""Algorithmes de planification SRS.
+
+Un `Scheduler` calcule le prochain état d'une carte après une note
+(`next_state`) et, pour les traitements de masse, l'intervalle courant de
+milliers d'états d'un coup (`batch_intervals`, vectorisé avec NumPy). NumPy
+n'est importé que par ces méthodes de masse : le chemin d'une revue (et
+l'import de ce module par les modèles) n'en dépend pas. Leitner
+reste l'algorithme par défaut ; SM-2 (facteur de facilité à la Anki) se choisit
+par utilisateur (`User.srs_scheduler`) ou par deck (`Deck.srs_scheduler`).
+
+Les deux partagent les champs de `CardSRSState` : `srs_level` (1..5) est la
+boîte Leitner, ou pour SM-2 le nombre de réussites consécutives + 1 plafonné à
+5 (seuls 1, 2 et « plus » comptent dans la formule) ; `ease` et `interval_days`
+ne sont lus que par SM-2 mais sont tenus à jour par les deux, pour qu'un
+changement d'algorithme reparte d'un état cohérent.
+"""
+
 from __future__ import annotations
 
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
 from django.utils import timezone
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 Rating = Literal["know", "medium", "again"]
 
+# Codes entiers des notes pour les traitements vectorisés (`batch_review`).
+RATING_AGAIN, RATING_MEDIUM, RATING_KNOW = 0, 1, 2
+RATING_CODES: dict[str, int] = {"again": RATING_AGAIN, "medium": RATING_MEDIUM, "know": RATING_KNOW}
+
+MIN_LEVEL = 1
+MAX_LEVEL = 5
+DEFAULT_EASE = 2.5
+
 
 @dataclass(frozen=True)
 class SRSUpdate:
     level: int
     due_at: datetime
+    ease: float = DEFAULT_EASE
+    interval_days: int = 0
 
 
 LEITNER_INTERVAL_DAYS_BY_LEVEL: dict[int, int] = {
@@ -25,19 +56,212 @@ LEITNER_INTERVAL_DAYS_BY_LEVEL: dict[int, int] = {
 }
 
 
-def next_leitner_state(*, level: int, rating: Rating, now=None) -> SRSUpdate:
-    if now is None:
-        now = timezone.now()
+def _clamp_level(level: int) -> int:
+    return max(MIN_LEVEL, min(MAX_LEVEL, int(level)))
+
+
+class Scheduler(ABC):
+    name: str = ""
+    label: str = ""
+    # Vrai si `next_state` ne dépend que du niveau (et rend `ease` inchangé) :
+    # `srs/review/` peut alors tabuler les transitions en SQL (`learning.upserts`).
+    level_only: bool = False
+
+    @abstractmethod
+    def next_state(
+        self,
+        *,
+        level: int,
+        rating: Rating,
+        now: datetime | None = None,
+        ease: float = DEFAULT_EASE,
+        interval_days: int = 0,
+    ) -> SRSUpdate:
+        """Prochain état d'une carte notée `rating` à `now`."""
+
+    @abstractmethod
+    def batch_intervals(
+        self, levels: np.ndarray, eases: np.ndarray, intervals: np.ndarray
+    ) -> np.ndarray:
+        """Intervalle (jours entiers) de chaque état, compté depuis sa dernière revue.
+
+        Sert à recalculer `due_at` en masse après un changement d'algorithme ou un
+        réglage des intervalles, sans boucle Python par ligne.
+        """
+
+    def batch_review(
+        self, levels: np.ndarray, eases: np.ndarray, intervals: np.ndarray, ratings: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Version vectorisée de `next_state` : (niveaux, facilités, intervalles) après les notes.
+
+        `ratings` contient des codes `RATING_*`. Par défaut, boucle sur
+        `next_state` : un nouvel algorithme fonctionne tout de suite et ne
+        surcharge cette méthode que pour aller plus vite (simulation).
+        """
+        import numpy as np
+
+        names = {code: name for name, code in RATING_CODES.items()}
+        out = [
+            self.next_state(
+                level=int(level),
+                rating=names[int(rating)],
+                ease=float(ease),
+                interval_days=int(interval),
+            )
+            for level, ease, interval, rating in zip(levels, eases, intervals, ratings)
+        ]
+        return (
+            np.array([u.level for u in out], dtype=np.int64),
+            np.array([u.ease for u in out], dtype=np.float64),
+            np.array([u.interval_days for u in out], dtype=np.int64),
+        )
+
+
+class LeitnerScheduler(Scheduler):
+    """Cinq boîtes : « know » monte d'une boîte, « again » descend d'une."""
+
+    name = "leitner"
+    label = "Leitner"
+    level_only = True
+
+    def __init__(self, interval_days_by_level: dict[int, int] | None = None):
+        self.interval_days_by_level = dict(interval_days_by_level or LEITNER_INTERVAL_DAYS_BY_LEVEL)
+
+    def _table(self) -> np.ndarray:
+        # Table indexée par niveau (l'indice 0 n'est jamais lu après clamp).
+        import numpy as np
+
+        return np.array(
+            [1] + [self.interval_days_by_level.get(level, 1) for level in range(1, MAX_LEVEL + 1)],
+            dtype=np.int64,
+        )
+
+    def next_state(self, *, level, rating, now=None, ease=DEFAULT_EASE, interval_days=0):
+        if now is None:
+            now = timezone.now()
+
+        current = _clamp_level(level)
+
+        if rating == "know":
+            next_level = min(MAX_LEVEL, current + 1)
+        elif rating == "again":
+            next_level = max(MIN_LEVEL, current - 1)
+        else:
+            next_level = current
+
+        interval = int(self.interval_days_by_level.get(next_level, 1))
+        return SRSUpdate(
+            level=next_level,
+            due_at=now + timedelta(days=interval),
+            ease=ease,
+            interval_days=interval,
+        )
+
+    def batch_intervals(self, levels, eases, intervals):
+        import numpy as np
 
-    current = max(1, min(5, int(level)))
+        return self._table()[np.clip(levels, MIN_LEVEL, MAX_LEVEL)]
 
-    if rating == "know":
-        next_level = min(5, current + 1)
-    elif rating == "again":
-        next_level = max(1, current - 1)
-    else:
-        next_level = current
+    def batch_review(self, levels, eases, intervals, ratings):
+        import numpy as np
 
-    interval_days = LEITNER_INTERVAL_DAYS_BY_LEVEL.get(next_level, 1)
-    due_at = now + timedelta(days=int(interval_days))
-    return SRSUpdate(level=next_level, due_at=due_at)
+        step = (ratings == RATING_KNOW).astype(np.int64) - (ratings == RATING_AGAIN)
+        next_levels = np.clip(np.clip(levels, MIN_LEVEL, MAX_LEVEL) + step, MIN_LEVEL, MAX_LEVEL)
+        return next_levels, np.asarray(eases, dtype=np.float64), self._table()[next_levels]
+
+
+class SM2Scheduler(Scheduler):
+    """SM-2 (SuperMemo 2, base d'Anki) avec trois notes.
+
+    « know » vaut une qualité 5, « medium » 3 (réussie mais laborieuse, la
+    facilité baisse), « again » 1 (échec : la série repart de zéro).
+    """
+
+    name = "sm2"
+    label = "SM-2"
+
+    QUALITY_BY_RATING = {"know": 5, "medium": 3, "again": 1}
+    MIN_EASE = 1.3
+
+    def next_state(self, *, level, rating, now=None, ease=DEFAULT_EASE, interval_days=0):
+        if now is None:
+            now = timezone.now()
+
+        quality = self.QUALITY_BY_RATING.get(rating, 3)
+        current = _clamp_level(level)
+        ease = float(ease or DEFAULT_EASE)
+
+        if quality < 3:
+            next_level = MIN_LEVEL
+            interval = 1
+        else:
+            next_level = min(MAX_LEVEL, current + 1)
+            successes = next_level - 1
+            if successes <= 1:
+                interval = 1
+            elif successes == 2:
+                interval = 6
+            else:
+                # Un état venu de Leitner n'a pas d'intervalle SM-2 : on part de sa boîte.
+                previous = int(interval_days) or LEITNER_INTERVAL_DAYS_BY_LEVEL.get(current, 1)
+                interval = max(1, round(previous * ease))
+
+        ease = max(self.MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        return SRSUpdate(
+            level=next_level,
+            due_at=now + timedelta(days=interval),
+            ease=round(ease, 4),
+            interval_days=interval,
+        )
+
+    def batch_intervals(self, levels, eases, intervals):
+        import numpy as np
+
+        # Un état jamais planifié par SM-2 (venant de Leitner) garde l'intervalle
+        # de sa boîte : c'est le dernier intervalle réellement appliqué.
+        leitner = LeitnerScheduler().batch_intervals(levels, eases, intervals)
+        return np.where(intervals > 0, intervals, leitner).astype(np.int64)
+
+    def batch_review(self, levels, eases, intervals, ratings):
+        import numpy as np
+
+        quality = np.array([self.QUALITY_BY_RATING[name] for name in ("again", "medium", "know")])[
+            ratings
+        ]
+        eases = np.where(eases > 0, eases, DEFAULT_EASE)
+        current = np.clip(levels, MIN_LEVEL, MAX_LEVEL)
+        failed = quality < 3
+
+        next_levels = np.where(failed, MIN_LEVEL, np.minimum(MAX_LEVEL, current + 1))
+        successes = next_levels - 1
+        previous = np.where(
+            intervals > 0, intervals, LeitnerScheduler().batch_intervals(current, eases, intervals)
+        )
+        grown = np.maximum(1, np.round(previous * eases)).astype(np.int64)
+        next_intervals = np.where(
+            failed | (successes <= 1), 1, np.where(successes == 2, 6, grown)
+        ).astype(np.int64)
+
+        lapse = 5 - quality
+        next_eases = np.round(
+            np.maximum(self.MIN_EASE, eases + 0.1 - lapse * (0.08 + lapse * 0.02)), 4
+        )
+        return next_levels.astype(np.int64), next_eases, next_intervals
+
+
+DEFAULT_SCHEDULER = LeitnerScheduler.name
+
+SCHEDULERS: dict[str, Scheduler] = {
+    scheduler.name: scheduler for scheduler in (LeitnerScheduler(), SM2Scheduler())
+}
+
+SCHEDULER_CHOICES = [(name, scheduler.label) for name, scheduler in SCHEDULERS.items()]
+
+
+def get_scheduler(name: str | None) -> Scheduler:
+    """Algorithme enregistré sous `name`, Leitner si vide ou inconnu."""
+    return SCHEDULERS.get(name or "", SCHEDULERS[DEFAULT_SCHEDULER])
+
+
+def next_leitner_state(*, level: int, rating: Rating, now=None) -> SRSUpdate:
+    return SCHEDULERS[LeitnerScheduler.name].next_state(level=level, rating=rating, now=now)
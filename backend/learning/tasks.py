@@ -0,0 +1,38 @@
+"""Tâches de fond (`django_tasks`) de la révision.
+
+Une replanification peut toucher tout l'historique d'un utilisateur : la vue
+qui la motive (changement d'algorithme) ne la fait pas dans sa requête, elle
+la met en file au commit de sa transaction (`enqueue`). Le backend configuré
+par `TASKS` décide où elle tourne ; celui par défaut (`ImmediateBackend`)
+l'exécute juste après le commit, hors de la transaction de la vue. Chaque
+paquet d'états est écrit dans sa propre transaction (`learning.rescheduling`).
+"""
+
+from __future__ import annotations
+
+from django_tasks import task
+
+from .models import CardSRSState
+from .rescheduling import reschedule_effective
+
+
+@task()
+def reschedule_user_states(user_id: int) -> int:
+    """Replanifie tous les états revus de `user_id` (changement de préférence)."""
+    return reschedule_effective(CardSRSState.objects.filter(user_id=user_id))
+
+
+@task()
+def reschedule_deck_states(deck_id: int) -> int:
+    """Replanifie les états du propriétaire de `deck_id` pour les cartes du deck."""
+    from content.deck_overlay import deck_cards
+    from content.models import Deck
+
+    deck = Deck.objects.filter(pk=deck_id).first()
+    if deck is None or deck.user_id is None:
+        return 0
+    return reschedule_effective(
+        CardSRSState.objects.filter(
+            user_id=deck.user_id, microarticle_id__in=deck_cards(deck).values("microarticle_id")
+        )
+    )
@@ -1,15 +1,43 @@
 from __future__ import annotations
 
+import importlib.util
+import random
+import sys
+import threading
 from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipIf
 
+import numpy as np
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
-from rest_framework.test import APITestCase
-from wagtail.models import Page, Site
+from rest_framework.test import APIClient, APITestCase
+from wagtail.models import Page, PageViewRestriction, Site
 
-from content.models import Deck, DeckCard, MicroArticleIndexPage, MicroArticlePage
+from content.memberships import deck_cards_changed
+from content.models import Deck, DeckCard, DeckCardExclusion, MicroArticleIndexPage, MicroArticlePage
 from content.serializers import MicroArticleCardSerializer
-from learning.models import LessonProgress
+from learning.counts import invalidate_all_srs_counts
+from learning.models import CardSRSState, LessonProgress
+from learning.rescheduling import reschedule_states
+from learning.simulation import SimulationConfig, simulate
+from learning.upserts import upsert_lesson_progress, upsert_srs_review
+from learning.views import _apply_review, _merge_progress
+from learning.srs import (
+    LEITNER_INTERVAL_DAYS_BY_LEVEL,
+    RATING_AGAIN,
+    RATING_CODES,
+    RATING_KNOW,
+    RATING_MEDIUM,
+    LeitnerScheduler,
+    Scheduler,
+    get_scheduler,
+    next_leitner_state,
+)
 
 
 class SrsApiTests(APITestCase):
@@ -37,6 +65,8 @@ class SrsApiTests(APITestCase):
         page.save_revision().publish()
 
     def setUp(self):
+        invalidate_all_srs_counts()
+
         User = get_user_model()
         self.user = User.objects.create_user(username="u1", email="u1@example.com", password="pw")
         self.client.force_login(self.user)
@@ -46,6 +76,7 @@ class SrsApiTests(APITestCase):
 
         self.deck = Deck.objects.create(user=self.user, name="Test", is_default=True, sort_order=0)
         DeckCard.objects.get_or_create(deck=self.deck, microarticle_id=self.card.id)
+        deck_cards_changed(self.user.pk, [self.card.id])
 
     def test_srs_next_returns_unseen_due_card(self):
         resp = self.client.get(
@@ -104,6 +135,7 @@ class SrsApiTests(APITestCase):
         index.add_child(instance=page)
         page.save_revision().publish()
         DeckCard.objects.get_or_create(deck=self.deck, microarticle_id=page.id)
+        deck_cards_changed(self.user.pk, [page.id])
         return page
 
     def test_srs_next_skips_excluded_cards(self):
@@ -130,6 +162,22 @@ class SrsApiTests(APITestCase):
         self.assertEqual(empty.status_code, 200)
         self.assertIsNone(empty.data.get("card"))
 
+    def test_srs_next_reads_cards_inherited_from_a_pack(self):
+        pack = Deck.objects.create(type=Deck.DeckType.OFFICIAL, name="Pack SRS")
+        DeckCard.objects.create(deck=pack, microarticle=self.card)
+        copy = Deck.objects.create(
+            user=self.user, name="Copie", sort_order=1, source_pack=pack, cards_inherited=True
+        )
+        url = f"/api/v1/learning/srs/next/?scope=deck&deck_id={copy.id}"
+
+        resp = self.client.get(url, secure=True)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["card"]["id"], self.card.id)
+
+        DeckCardExclusion.objects.create(deck=copy, microarticle=self.card)
+        resp = self.client.get(url, secure=True)
+        self.assertIsNone(resp.data.get("card"))
+
     def test_srs_next_excludes_apply_to_future_due_cards(self):
         """Même en mode « tout », la carte passée ne doit pas revenir."""
         other = self._add_card(title="Ibuprofene", slug="ibuprofene")
@@ -149,6 +197,395 @@ class SrsApiTests(APITestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.data["card"]["id"], other.id)
 
+    def test_srs_next_uses_anti_joins_on_the_state_table(self):
+        seen = self._add_card(title="Ibuprofene", slug="ibuprofene")
+        CardSRSState.objects.create(
+            user=self.user,
+            microarticle=seen,
+            due_at=timezone.now() + timedelta(days=3),
+            last_reviewed_at=timezone.now(),
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get("/api/v1/learning/srs/next/", secure=True)
+        self.assertEqual(resp.data["card"]["id"], self.card.id)
+
+        state_queries = [q["sql"] for q in ctx.captured_queries if "learning_cardsrsstate" in q["sql"]]
+        self.assertTrue(state_queries)
+        for sql in state_queries:
+            self.assertIn("EXISTS", sql)
+            self.assertNotIn("NOT IN", sql.upper())
+
+    def _queue(self, query: str = ""):
+        resp = self.client.get(
+            f"/api/v1/learning/srs/queue/?scope=deck&deck_id={self.deck.id}{query}",
+            secure=True,
+        )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        return resp.data
+
+    def test_srs_queue_serves_due_then_new_then_later(self):
+        from learning.models import CardSRSState
+
+        new = self._add_card(title="Aspirine", slug="aspirine")
+        later = self._add_card(title="Ibuprofene", slug="ibuprofene")
+        now = timezone.now()
+        CardSRSState.objects.create(
+            user=self.user, microarticle=self.card, srs_level=3, due_at=now - timedelta(days=1)
+        )
+        CardSRSState.objects.create(
+            user=self.user, microarticle=later, srs_level=2, due_at=now + timedelta(days=2)
+        )
+
+        data = self._queue()
+        self.assertEqual([item["card"]["id"] for item in data["items"]], [self.card.id, new.id])
+        self.assertEqual(data["items"][0]["srs"]["level"], 3)
+        self.assertEqual(data["items"][0]["card"], MicroArticleCardSerializer(self.card).data)
+        self.assertEqual(data["items"][1]["srs"]["reviews_count"], 0)
+
+        data = self._queue("&only_due=false&limit=10")
+        self.assertEqual(
+            [item["card"]["id"] for item in data["items"]], [self.card.id, new.id, later.id]
+        )
+
+    def test_srs_queue_session_skips_cards_already_served(self):
+        others = [self._add_card(title=f"Carte {n}", slug=f"carte-{n}") for n in range(3)]
+        expected = [self.card.id] + [page.id for page in others]
+
+        first = self._queue("&limit=2")
+        second = self._queue(f"&limit=2&session={first['session']}")
+        third = self._queue(f"&limit=2&session={second['session']}")
+
+        served = [item["card"]["id"] for item in first["items"] + second["items"]]
+        self.assertEqual(served, expected)
+        self.assertEqual(third["items"], [])
+
+    def test_srs_queue_session_token_stays_bounded_and_skips_reviewed_cards(self):
+        others = [self._add_card(title=f"Carte {n}", slug=f"carte-{n}") for n in range(4)]
+
+        first = self._queue("&limit=2&only_due=false")
+        # Revue de la première carte servie : elle passe « à venir » et ne doit pas revenir.
+        resp = self.client.post(
+            "/api/v1/learning/srs/review/",
+            {"card_id": first["items"][0]["card"]["id"], "rating": "know"},
+            format="json",
+            secure=True,
+        )
+        self.assertEqual(resp.status_code, 200)
+        second = self._queue(f"&limit=2&only_due=false&session={first['session']}")
+        third = self._queue(f"&limit=2&only_due=false&session={second['session']}")
+
+        served = [item["card"]["id"] for item in first["items"] + second["items"] + third["items"]]
+        self.assertEqual(served, [self.card.id] + [page.id for page in others])
+        self.assertLessEqual(abs(len(third["session"]) - len(first["session"])), 8)
+
+    def test_srs_queue_rejects_a_tampered_session(self):
+        resp = self.client.get("/api/v1/learning/srs/queue/?session=forged", secure=True)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("session", resp.data)
+
+        token = self._queue()["session"]
+        User = get_user_model()
+        other = User.objects.create_user(username="u2", email="u2@example.com", password="pw")
+        self.client.force_login(other)
+        resp = self.client.get(f"/api/v1/learning/srs/queue/?session={token}", secure=True)
+        self.assertEqual(resp.status_code, 400)
+
+    def test_srs_queue_query_count_does_not_grow_with_the_batch(self):
+        for n in range(5):
+            self._add_card(title=f"Carte {n}", slug=f"carte-{n}")
+
+        with CaptureQueriesContext(connection) as small:
+            self._queue("&limit=1")
+        with CaptureQueriesContext(connection) as large:
+            self.assertEqual(len(self._queue("&limit=6")["items"]), 6)
+        self.assertEqual(len(small), len(large))
+
+    @staticmethod
+    def _review(client_id: str, card_id: int, rating: str, reviewed_at) -> dict:
+        return {
+            "client_id": client_id,
+            "card_id": card_id,
+            "rating": rating,
+            "reviewed_at": reviewed_at.isoformat(),
+        }
+
+    def _review_batch(self, reviews: list[dict]):
+        resp = self.client.post(
+            "/api/v1/learning/srs/review/batch/",
+            {"device_id": "dev-1", "reviews": reviews},
+            format="json",
+            secure=True,
+        )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        return resp.data
+
+    def test_srs_review_batch_replays_in_timestamp_order(self):
+        from learning.models import CardReview, CardSRSState
+
+        t0 = timezone.now() - timedelta(hours=3)
+        data = self._review_batch(
+            [
+                # Envoyées dans le désordre : « again » est la plus récente.
+                self._review("r2", self.card.id, "again", t0 + timedelta(hours=1)),
+                self._review("r1", self.card.id, "know", t0),
+            ]
+        )
+
+        self.assertEqual((data["applied"], data["duplicates"], data["rejected"]), (2, 0, []))
+        state = CardSRSState.objects.get(user=self.user, microarticle=self.card)
+        self.assertEqual((state.srs_level, state.reviews_count, state.last_rating), (1, 2, "again"))
+        self.assertEqual(state.due_at, t0 + timedelta(hours=1, days=1))
+        self.assertEqual(data["states"][0]["card_id"], self.card.id)
+        self.assertEqual(
+            list(CardReview.objects.order_by("reviewed_at").values_list("rating", "srs_level")),
+            [("know", 2), ("again", 1)],
+        )
+
+    def test_srs_review_batch_is_idempotent_on_client_ids(self):
+        from learning.models import CardReview, CardSRSState
+
+        review = self._review("r1", self.card.id, "know", timezone.now())
+        self._review_batch([review])
+
+        data = self._review_batch([review, review])
+        self.assertEqual((data["applied"], data["duplicates"]), (0, 2))
+        self.assertEqual(CardReview.objects.count(), 1)
+        self.assertEqual(
+            CardSRSState.objects.get(user=self.user, microarticle=self.card).reviews_count, 1
+        )
+
+    def test_srs_review_batch_rejects_unknown_cards_and_ignores_stale_reviews(self):
+        from learning.models import CardReview, CardSRSState
+
+        now = timezone.now()
+        self._review_batch([self._review("recent", self.card.id, "know", now)])
+
+        data = self._review_batch(
+            [
+                self._review("old", self.card.id, "again", now - timedelta(days=1)),
+                self._review("ghost", 999999, "know", now),
+            ]
+        )
+
+        # La révision périmée est journalisée mais n'est pas appliquée.
+        self.assertEqual((data["applied"], data["rejected"]), (0, ["ghost"]))
+        state = CardSRSState.objects.get(user=self.user, microarticle=self.card)
+        self.assertEqual((state.srs_level, state.last_rating), (2, "know"))
+        self.assertTrue(CardReview.objects.filter(client_id="old").exists())
+
+    def test_srs_review_appends_to_the_review_log(self):
+        from learning.models import CardReview, CardSRSState
+
+        for rating in ("know", "again"):
+            resp = self.client.post(
+                "/api/v1/learning/srs/review/",
+                {"card_id": self.card.id, "rating": rating},
+                format="json",
+                secure=True,
+            )
+            self.assertEqual(resp.status_code, 200)
+
+        state = CardSRSState.objects.get(user=self.user, microarticle=self.card)
+        self.assertEqual(
+            list(CardReview.objects.order_by("id").values_list("rating", "srs_level")),
+            [("know", 2), ("again", 1)],
+        )
+        last = CardReview.objects.order_by("id").last()
+        self.assertEqual((last.ease, last.interval_days), (state.ease, state.interval_days))
+
+    def test_compact_card_reviews_rolls_old_reviews_into_daily_rows(self):
+        from learning.models import CardReview, CardReviewDaily
+
+        old = timezone.localtime() - timedelta(days=40)
+        day = old.date()
+        old = old.replace(hour=10)
+
+        def log(rating: str, srs_level: int, reviewed_at):
+            CardReview.objects.create(
+                user=self.user,
+                microarticle=self.card,
+                rating=rating,
+                srs_level=srs_level,
+                reviewed_at=reviewed_at,
+            )
+
+        log("know", 2, old)
+        log("again", 1, old + timedelta(hours=2))
+        log("know", 2, old + timedelta(hours=1))
+        log("know", 3, timezone.now())
+
+        call_command("compact_card_reviews", "--older-than", "30", "--chunk-size", "2", stdout=StringIO())
+
+        self.assertEqual(CardReview.objects.count(), 1)
+        daily = CardReviewDaily.objects.get(user=self.user, microarticle=self.card)
+        self.assertEqual(daily.day, day)
+        self.assertEqual((daily.know_count, daily.medium_count, daily.again_count), (2, 0, 1))
+        self.assertEqual(daily.last_srs_level, 1)
+
+        # Une revue du même jour arrivée plus tard complète la ligne existante.
+        log("medium", 2, old - timedelta(hours=1))
+        call_command("compact_card_reviews", "--older-than", "30", stdout=StringIO())
+
+        daily.refresh_from_db()
+        self.assertEqual((daily.reviews_count, daily.medium_count, daily.last_srs_level), (4, 1, 1))
+        self.assertEqual(CardReviewDaily.objects.count(), 1)
+
+    def test_srs_review_batch_query_count_does_not_grow_with_the_batch(self):
+        cards = [self._add_card(title=f"Carte {n}", slug=f"carte-{n}") for n in range(6)]
+        now = timezone.now()
+
+        def batch(prefix: str, pages):
+            return [self._review(f"{prefix}-{page.id}", page.id, "know", now) for page in pages]
+
+        # Un premier passage crée les états, le second les met à jour.
+        self._review_batch(batch("a", cards))
+        with CaptureQueriesContext(connection) as small:
+            self._review_batch(batch("b", cards[:1]))
+        with CaptureQueriesContext(connection) as large:
+            self._review_batch(batch("c", cards))
+        self.assertEqual(len(small), len(large))
+
+    def _review_with_scheduler(self, **extra):
+        resp = self.client.post(
+            "/api/v1/learning/srs/review/",
+            {"card_id": self.card.id, "rating": "know", **extra},
+            format="json",
+            secure=True,
+        )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        return CardSRSState.objects.get(user=self.user, microarticle=self.card)
+
+    def test_user_preference_selects_the_scheduler(self):
+        resp = self.client.patch(
+            "/api/v1/auth/preferences/", {"srs_scheduler": "sm2"}, format="json", secure=True
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["srs_scheduler"], "sm2")
+
+        state = self._review_with_scheduler()
+        # SM-2 : première réussite à 1 jour (Leitner aurait donné 3 jours en boîte 2).
+        self.assertEqual((state.srs_level, state.interval_days), (2, 1))
+
+    def test_deck_scheduler_overrides_the_user_preference(self):
+        self.deck.srs_scheduler = "sm2"
+        self.deck.save(update_fields=["srs_scheduler"])
+
+        # La carte suit son deck, qu'elle soit révisée depuis lui ou depuis « tous mes decks ».
+        self.assertEqual(self._review_with_scheduler().interval_days, 1)
+        CardSRSState.objects.all().delete()
+        self.assertEqual(self._review_with_scheduler(deck_id=self.deck.id).interval_days, 1)
+
+    def test_review_batch_applies_each_card_its_own_scheduler(self):
+        leitner_deck = Deck.objects.create(user=self.user, name="Leitner", sort_order=1)
+        other = self._add_card(title="Aspirine", slug="aspirine")
+        DeckCard.objects.filter(deck=self.deck, microarticle=other).update(deck=leitner_deck)
+        self.deck.srs_scheduler = "sm2"
+        self.deck.save(update_fields=["srs_scheduler"])
+
+        now = timezone.now()
+        self._review_batch(
+            [self._review("a", self.card.id, "know", now), self._review("b", other.id, "know", now)]
+        )
+        intervals = dict(
+            CardSRSState.objects.filter(user=self.user).values_list("microarticle_id", "interval_days")
+        )
+        # SM-2 : première réussite à 1 jour ; Leitner : boîte 2, 3 jours.
+        self.assertEqual(intervals, {self.card.id: 1, other.id: 3})
+
+    def test_switching_scheduler_reschedules_reviewed_cards(self):
+        reviewed_at = timezone.now() - timedelta(days=2)
+        CardSRSState.objects.create(
+            user=self.user,
+            microarticle=self.card,
+            srs_level=3,
+            interval_days=7,
+            last_reviewed_at=reviewed_at,
+            due_at=reviewed_at + timedelta(days=7),
+        )
+
+        with mock.patch.dict(LEITNER_INTERVAL_DAYS_BY_LEVEL, {3: 10}):
+            count = reschedule_states(
+                CardSRSState.objects.filter(user=self.user), LeitnerScheduler()
+            )
+
+        state = CardSRSState.objects.get(user=self.user, microarticle=self.card)
+        self.assertEqual(count, 1)
+        self.assertEqual((state.interval_days, state.due_at), (10, reviewed_at + timedelta(days=10)))
+
+    def _reviewed_state(self, page) -> CardSRSState:
+        # Intervalle hors de la table de Leitner (boîte 3 : 7 jours), que SM-2 conserve.
+        reviewed_at = timezone.now() - timedelta(days=2)
+        return CardSRSState.objects.create(
+            user=self.user,
+            microarticle=page,
+            srs_level=3,
+            interval_days=20,
+            last_reviewed_at=reviewed_at,
+            due_at=reviewed_at + timedelta(days=20),
+        )
+
+    def test_reschedule_command_follows_the_deck_scheduler(self):
+        other = self._add_card(title="Aspirine", slug="aspirine")
+        in_deck, outside = self._reviewed_state(self.card), self._reviewed_state(other)
+        # `other` passe dans un deck sans algorithme propre : celui de l'utilisateur s'applique.
+        DeckCard.objects.filter(deck=self.deck, microarticle=other).update(
+            deck=Deck.objects.create(user=self.user, name="Sans algorithme", sort_order=1)
+        )
+        self.deck.srs_scheduler = "sm2"
+        self.deck.save(update_fields=["srs_scheduler"])
+
+        call_command("srs_reschedule", stdout=StringIO())
+
+        in_deck.refresh_from_db()
+        outside.refresh_from_db()
+        self.assertEqual((in_deck.interval_days, outside.interval_days), (20, 7))
+
+    def test_changing_the_deck_scheduler_reschedules_its_cards(self):
+        self.user.srs_scheduler = "sm2"
+        self.user.save(update_fields=["srs_scheduler"])
+        state = self._reviewed_state(self.card)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            resp = self.client.patch(
+                f"/api/v1/content/decks/{self.deck.id}/",
+                {"srs_scheduler": "leitner"},
+                format="json",
+                secure=True,
+            )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        # Rien n'est replanifié dans la requête : la tâche part au commit.
+        state.refresh_from_db()
+        self.assertEqual(state.interval_days, 20)
+        for callback in callbacks:
+            callback()
+        state.refresh_from_db()
+        self.assertEqual((state.interval_days, state.due_at), (7, state.last_reviewed_at + timedelta(days=7)))
+
+    def test_reschedule_issues_one_update_per_distinct_interval(self):
+        cards = [self._add_card(title=f"Carte {n}", slug=f"carte-{n}") for n in range(6)]
+        reviewed_at = timezone.now()
+        CardSRSState.objects.bulk_create(
+            CardSRSState(
+                user=self.user,
+                microarticle=page,
+                srs_level=1 + n % 2,
+                last_reviewed_at=reviewed_at,
+                due_at=reviewed_at,
+            )
+            for n, page in enumerate(cards)
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            reschedule_states(CardSRSState.objects.all(), LeitnerScheduler())
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        # Deux niveaux donc deux intervalles : deux UPDATE pour six lignes.
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(
+            sorted(set(CardSRSState.objects.values_list("srs_level", "interval_days"))),
+            [(1, 1), (2, 3)],
+        )
+
     def _counts(self, query: str = ""):
         resp = self.client.get(f"/api/v1/learning/srs/counts/{query}", secure=True)
         self.assertEqual(resp.status_code, 200)
@@ -173,14 +610,131 @@ class SrsApiTests(APITestCase):
         self.assertEqual((data["due"], data["new"], data["later"]), (0, 0, 1))
 
         # …et y revient dès que l'échéance est passée.
-        from learning.models import CardSRSState
-
-        CardSRSState.objects.filter(user=self.user, microarticle_id=self.card.id).update(
-            due_at=timezone.now() - timedelta(days=1)
-        )
+        state = CardSRSState.objects.get(user=self.user, microarticle_id=self.card.id)
+        state.due_at = timezone.now() - timedelta(days=1)
+        state.save()
         data = self._counts(f"?scope=deck&deck_id={self.deck.id}")
         self.assertEqual((data["due"], data["new"], data["later"]), (1, 0, 0))
 
+    def test_srs_counts_run_one_aggregate_then_come_from_the_cache(self):
+        self._add_card(title="Insuline", slug="insuline-counts")
+        query = f"?scope=deck&deck_id={self.deck.id}"
+
+        # `public()` lit d'abord les restrictions de vue, puis une seule agrégation.
+        with CaptureQueriesContext(connection) as ctx:
+            data = self._counts(query)
+        aggregates = [q["sql"] for q in ctx.captured_queries if "COUNT" in q["sql"].upper()]
+        self.assertEqual(len(aggregates), 1)
+        self.assertEqual((data["total"], data["new"]), (2, 2))
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._counts(query), data)
+        self.assertFalse(any("COUNT" in q["sql"].upper() for q in ctx.captured_queries))
+
+    def test_srs_counts_cache_follows_view_restrictions(self):
+        second = self._add_card(title="Insuline", slug="insuline-restreinte")
+        self.assertEqual(self._counts()["total"], 2)
+
+        restriction = PageViewRestriction.objects.create(
+            page=second, restriction_type=PageViewRestriction.LOGIN
+        )
+        self.assertEqual(self._counts()["total"], 1)
+        restriction.delete()
+        self.assertEqual(self._counts()["total"], 2)
+
+    def test_srs_counts_cache_follows_deck_and_batch_writes(self):
+        second = self._add_card(title="Insuline", slug="insuline-counts")
+        self.assertEqual(self._counts()["total"], 2)
+
+        resp = self.client.delete(f"/api/v1/content/decks/{self.deck.id}/cards/{second.id}/", secure=True)
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(self._counts()["total"], 1)
+
+        resp = self.client.post(
+            f"/api/v1/content/decks/{self.deck.id}/cards/bulk-add/",
+            {"card_ids": [second.id]},
+            format="json",
+            secure=True,
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._counts()["total"], 2)
+
+        self._review_batch([self._review("c1", second.id, "know", timezone.now())])
+        data = self._counts()
+        self.assertEqual((data["new"], data["later"]), (1, 1))
+
+    def test_srs_counts_all_decks_scope_joins_the_membership_table(self):
+        other = Deck.objects.create(user=self.user, name="Autre", sort_order=1)
+        DeckCard.objects.create(deck=other, microarticle=self.card)
+        deck_cards_changed(self.user.pk, [self.card.id])
+
+        with CaptureQueriesContext(connection) as ctx:
+            data = self._counts()
+        # Carte présente dans deux decks : comptée une fois, sans remonter les DeckCard.
+        self.assertEqual(data["total"], 1)
+        self.assertFalse(any("content_deckcard" in q["sql"] for q in ctx.captured_queries))
+
+    def _forecast(self, query: str = ""):
+        resp = self.client.get(f"/api/v1/learning/srs/forecast/{query}", secure=True)
+        self.assertEqual(resp.status_code, 200, resp.content)
+        return resp.data
+
+    def test_srs_forecast_groups_due_cards_by_local_day(self):
+        second = self._add_card(title="Insuline", slug="insuline-forecast")
+        third = self._add_card(title="Glinide", slug="glinide-forecast")
+        now = timezone.now()
+        for card, due_at in (
+            (self.card, now - timedelta(days=3)),
+            (second, now + timedelta(days=2)),
+            (third, now + timedelta(days=40)),
+        ):
+            CardSRSState.objects.create(
+                user=self.user, microarticle=card, srs_level=2, due_at=due_at, last_reviewed_at=now
+            )
+
+        data = self._forecast("?days=7&tz=Pacific/Auckland")
+        self.assertEqual(data["timezone"], "Pacific/Auckland")
+        self.assertEqual(data["overdue"], 1)
+        self.assertEqual(len(data["days"]), 7)
+        # Le retard compte dans aujourd'hui ; la carte à J+40 sort de l'horizon.
+        self.assertEqual(data["days"][0]["due"], 1)
+        self.assertEqual(sum(day["due"] for day in data["days"]), 2)
+
+    def test_srs_forecast_is_cached_until_the_next_review(self):
+        query = "?days=7"
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._forecast(query)["days"][0]["due"], 0)
+        self.assertEqual(
+            len([q for q in ctx.captured_queries if "learning_cardsrsstate" in q["sql"]]), 1
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            self._forecast(query)
+        self.assertFalse(any("learning_cardsrsstate" in q["sql"] for q in ctx.captured_queries))
+
+        self._review_batch([self._review("f1", self.card.id, "know", timezone.now())])
+        self.assertEqual(sum(day["due"] for day in self._forecast(query)["days"]), 1)
+
+    def test_srs_forecast_rejects_unknown_time_zones(self):
+        resp = self.client.get("/api/v1/learning/srs/forecast/?tz=Mars/Olympus", secure=True)
+        self.assertEqual(resp.status_code, 400)
+
+    def test_srs_counts_cache_expires_at_the_next_due_date(self):
+        from learning.counts import _compute_srs_counts
+        from learning.views import _scope_candidates
+
+        CardSRSState.objects.create(
+            user=self.user,
+            microarticle=self.card,
+            srs_level=2,
+            due_at=timezone.now() + timedelta(minutes=5),
+            last_reviewed_at=timezone.now(),
+        )
+        candidates = _scope_candidates(self.user, scope=None, deck_id=None, deck_ids=[])
+
+        counts, ttl = _compute_srs_counts(self.user, candidates)
+        self.assertEqual(counts["later"], 1)
+        self.assertLessEqual(ttl, 300)
+
     def test_srs_counts_reject_deck_scope_without_deck_id(self):
         resp = self.client.get("/api/v1/learning/srs/counts/?scope=deck", secure=True)
         self.assertEqual(resp.status_code, 400)
@@ -213,7 +767,7 @@ class SrsApiTests(APITestCase):
     def _server_time_ms(self) -> int:
         resp = self.client.get("/api/v1/learning/progress/", secure=True)
         self.assertEqual(resp.status_code, 200)
-        row = next(r for r in resp.data if r["lesson_id"] == self.card.id)
+        row = next(r for r in resp.data["lessons"] if r["lesson_id"] == self.card.id)
         return row["time_ms"]
 
     def test_import_does_not_double_count_cumulative_time(self):
@@ -241,6 +795,110 @@ class SrsApiTests(APITestCase):
         self._import_progress(time_ms=60_000, updated_at=now + timedelta(minutes=1))
         self.assertEqual(self._server_time_ms(), 90_000)
 
+    def test_import_query_count_does_not_grow_with_the_payload(self):
+        cards = [self._add_card(title=f"Leçon {n}", slug=f"lecon-{n}") for n in range(6)]
+        now = timezone.now()
+
+        def import_(pages, *, percent: int, updated_at):
+            lessons = {
+                str(page.id): {"seen": True, "percent": percent, "updated_at": updated_at.isoformat()}
+                for page in pages
+            }
+            # Fiche inconnue et id illisible : ignorées, comme avant.
+            lessons["999999"] = lessons["abc"] = {"seen": True, "updated_at": updated_at.isoformat()}
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.post(
+                    "/api/v1/learning/progress/import/",
+                    {"device_id": "dev-1", "lessons": lessons},
+                    format="json",
+                    secure=True,
+                )
+            self.assertEqual(resp.status_code, 200, resp.content)
+            return resp.data, len(ctx.captured_queries)
+
+        small, small_queries = import_(cards[:2], percent=10, updated_at=now)
+        self.assertEqual((small["imported"], small["updated"]), (2, 2))
+
+        # Deux lignes existantes inchangées (même `updated_at`), quatre créées.
+        mixed, mixed_queries = import_(cards, percent=10, updated_at=now)
+        self.assertEqual((mixed["imported"], mixed["updated"]), (6, 4))
+
+        later, later_queries = import_(cards, percent=50, updated_at=now + timedelta(minutes=1))
+        self.assertEqual((later["imported"], later["updated"]), (6, 6))
+        self.assertEqual(
+            set(LessonProgress.objects.filter(user=self.user).values_list("percent", flat=True)), {50}
+        )
+        self.assertLessEqual(max(mixed_queries, later_queries), small_queries + 1)
+
+    def _progress(self, since: str | None = None) -> dict:
+        url = "/api/v1/learning/progress/"
+        resp = self.client.get(f"{url}?since={since}" if since else url, secure=True)
+        self.assertEqual(resp.status_code, 200, resp.content)
+        return resp.data
+
+    def _age_progress(self) -> None:
+        """Recule écritures et publications hors de la fenêtre de recouvrement."""
+        hour_ago = timezone.now() - timedelta(hours=1)
+        LessonProgress.objects.filter(user=self.user).update(synced_at=hour_ago)
+        Page.objects.filter(live=True).update(last_published_at=hour_ago)
+
+    def test_progress_since_token_returns_only_recent_changes(self):
+        other = self._add_card(title="Aspirine", slug="aspirine")
+        now = timezone.now()
+        self._import_progress(time_ms=1_000, updated_at=now)
+        self.client.patch(
+            f"/api/v1/learning/progress/{other.id}/",
+            {"seen": True, "updated_at": now.isoformat()},
+            format="json",
+            secure=True,
+        )
+
+        full = self._progress()
+        self.assertTrue(full["full"])
+        self.assertEqual({r["lesson_id"] for r in full["lessons"]}, {self.card.id, other.id})
+
+        self._age_progress()
+        token = self._progress()["sync_token"]
+        quiet = self._progress(token)
+        self.assertEqual((quiet["lessons"], quiet["removed"]), ([], []))
+
+        self._import_progress(time_ms=2_000, updated_at=now + timedelta(minutes=1))
+        delta = self._progress(token)
+        self.assertFalse(delta["full"])
+        self.assertEqual([(r["lesson_id"], r["time_ms"]) for r in delta["lessons"]], [(self.card.id, 2_000)])
+
+    def test_progress_since_token_lists_unpublished_lessons(self):
+        other = self._add_card(title="Aspirine", slug="aspirine")
+        untouched = self._add_card(title="Codéine", slug="codeine")
+        now = timezone.now()
+        self._import_progress(time_ms=1_000, updated_at=now)
+        self.client.patch(
+            f"/api/v1/learning/progress/{other.id}/",
+            {"seen": True, "updated_at": now.isoformat()},
+            format="json",
+            secure=True,
+        )
+        self._age_progress()
+        token = self._progress()["sync_token"]
+
+        other.unpublish()
+        self.card.specific.unpublish()
+        # Sans progression de l'utilisateur, sa pierre tombale ne le concerne pas.
+        untouched.unpublish()
+        delta = self._progress(token)
+        self.assertEqual(delta["lessons"], [])
+        self.assertEqual(delta["removed"], sorted([self.card.id, other.id]))
+
+        # Republiée, la fiche revient avec sa progression.
+        self.card.save_revision().publish()
+        delta = self._progress(token)
+        self.assertEqual([r["lesson_id"] for r in delta["lessons"]], [self.card.id])
+        self.assertEqual(delta["removed"], [other.id])
+
+    def test_progress_rejects_malformed_sync_tokens(self):
+        resp = self.client.get("/api/v1/learning/progress/?since=not-a-token", secure=True)
+        self.assertEqual(resp.status_code, 400)
+
     def _patch_progress(self, *, updated_at, **fields):
         return self.client.patch(
             f"/api/v1/learning/progress/{self.card.id}/",
@@ -330,3 +988,662 @@ class SrsApiTests(APITestCase):
             secure=True,
         )
         self.assertEqual(progress.status_code, 404)
+
+
+def _publish_card(slug: str) -> MicroArticlePage:
+    root = Page.get_first_root_node()
+    index = MicroArticleIndexPage.objects.first()
+    if index is None:
+        index = MicroArticleIndexPage(title="Micro", slug="micro")
+        root.add_child(instance=index)
+        index.save_revision().publish()
+    page = MicroArticlePage(title=slug, slug=slug, answer_express="Réponse.", takeaway="À retenir.")
+    index.add_child(instance=page)
+    page.save_revision().publish()
+    return page
+
+
+_PROGRESS_COMPARED = (
+    "seen",
+    "completed",
+    "percent",
+    "time_ms",
+    "score_best",
+    "score_last",
+    "updated_at",
+    "last_seen_at",
+)
+
+
+def _progress_payloads(now, *, count: int, seed: int, partial: bool = True) -> list[dict]:
+    """Charges de synchro variées : champs partiels, horloges en avance, scores nuls."""
+    rng = random.Random(seed)
+    payloads = []
+    for n in range(count):
+        payload = {"updated_at": now + timedelta(minutes=rng.randint(-120, 60), seconds=n)}
+        candidates = {
+            "seen": rng.random() < 0.5,
+            "completed": rng.random() < 0.5,
+            "percent": rng.randint(0, 100),
+            "time_ms": rng.randint(0, 600_000),
+            "score_best": rng.choice([None, rng.randint(0, 100)]),
+            "score_last": rng.choice([None, rng.randint(0, 100)]),
+            "last_seen_at": now + timedelta(minutes=rng.randint(-120, 60)),
+        }
+        for name, value in candidates.items():
+            if not partial or rng.random() < 0.6:
+                payload[name] = value
+        payloads.append(payload)
+    return payloads
+
+
+def _clamped(payload: dict, now) -> dict:
+    # Ce que `ProgressUpsertView` passe à l'upsert.
+    incoming = {**payload, "updated_at": min(payload["updated_at"], now)}
+    if "last_seen_at" in payload:
+        incoming["last_seen_at"] = min(payload["last_seen_at"], now)
+    return incoming
+
+
+class LearningEventTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.card = _publish_card("evenements")
+        cls.user = get_user_model().objects.create_user(username="events", password="pw")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _event(self, client_id: str, type_: str = "card_viewed", **fields) -> dict:
+        event = {"client_id": client_id, "type": type_, "occurred_at": timezone.now().isoformat()}
+        if type_ in ("card_viewed", "lesson_completed"):
+            event["lesson_id"] = self.card.id
+        return {**event, **fields}
+
+    def _post(self, events: list[dict]):
+        return self.client.post(
+            "/api/v1/learning/events/",
+            {"device_id": "dev-1", "events": events},
+            format="json",
+            secure=True,
+        )
+
+    def test_events_are_ingested_once_per_client_id(self):
+        from learning.models import LearningEvent
+
+        events = [
+            self._event("e1"),
+            self._event("e2", "quiz_scored", payload={"score": 80}),
+            self._event("e3", "streak_day"),
+            self._event("e4", lesson_id=999999),
+        ]
+        resp = self._post(events + [events[0]])
+        self.assertEqual(resp.status_code, 202, resp.content)
+        self.assertEqual((resp.data["accepted"], resp.data["duplicates"]), (3, 1))
+        self.assertEqual(resp.data["rejected"], ["e4"])
+
+        replay = self._post(events[:3])
+        self.assertEqual((replay.data["accepted"], replay.data["duplicates"]), (0, 3))
+        self.assertEqual(
+            sorted(LearningEvent.objects.filter(user=self.user).values_list("client_id", "type")),
+            [("e1", "card_viewed"), ("e2", "quiz_scored"), ("e3", "streak_day")],
+        )
+
+    def test_event_batch_cost_does_not_grow_with_its_size(self):
+        def queries(count: int, prefix: str) -> int:
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self._post([self._event(f"{prefix}-{n}") for n in range(count)])
+            self.assertEqual(resp.status_code, 202)
+            return len(ctx.captured_queries)
+
+        # Dédoublonnage, fiches, puis un INSERT par tranche (SQLite en fait de plus
+        # petites, limité en paramètres) : loin d'une requête par événement.
+        self.assertLessEqual(queries(3, "small"), 5)
+        self.assertLessEqual(queries(300, "large"), 10)
+
+    def test_events_written_concurrently_count_as_duplicates(self):
+        from learning.models import LearningEvent
+
+        lookup = MicroArticlePage.objects.filter
+
+        def concurrent_insert(*args, **kwargs):
+            # L'autre envoi du lot écrit `e1` après la lecture des `client_id` connus.
+            LearningEvent.objects.get_or_create(
+                user=self.user, client_id="e1", defaults={"type": "card_viewed"}
+            )
+            return lookup(*args, **kwargs)
+
+        with mock.patch.object(MicroArticlePage.objects, "filter", side_effect=concurrent_insert):
+            resp = self._post([self._event("e1"), self._event("e2")])
+        self.assertEqual(resp.status_code, 202, resp.content)
+        self.assertEqual((resp.data["accepted"], resp.data["duplicates"]), (1, 1))
+        self.assertIsNone(LearningEvent.objects.get(user=self.user, client_id="e2").payload)
+
+    def test_events_are_validated_and_bounded(self):
+        quiz = self._event("q", "quiz_scored", payload={"score": 140})
+        self.assertEqual(self._post([quiz]).status_code, 400)
+        self.assertEqual(self._post([self._event("v", "card_viewed", lesson_id=None)]).status_code, 400)
+        self.assertEqual(
+            self._post([self._event("p", "streak_day", payload={"blob": "x" * 4096})]).status_code, 400
+        )
+        too_many = [self._event(f"n{n}", "streak_day") for n in range(501)]
+        self.assertEqual(self._post(too_many).status_code, 400)
+
+
+class LearningDayTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cards = [_publish_card(f"journee-{n}") for n in range(2)]
+        cls.user = get_user_model().objects.create_user(username="days", password="pw")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _post(self, path: str, payload: dict):
+        return self.client.post(f"/api/v1/learning/{path}", payload, format="json", secure=True)
+
+    def _days(self) -> list[tuple]:
+        from learning.models import LearningDay
+
+        return list(
+            LearningDay.objects.filter(user=self.user)
+            .order_by("day")
+            .values_list(
+                "day", "cards_read", "new_cards", "reviews_know", "reviews_medium", "reviews_again", "time_ms"
+            )
+        )
+
+    def _write_activity(self):
+        now = timezone.now()
+        yesterday = now - timedelta(days=1)
+        first, second = self.cards
+        for fields in ({"seen": True, "time_ms": 1000}, {"seen": True, "time_ms": 4000}):
+            resp = self.client.patch(
+                f"/api/v1/learning/progress/{first.id}/",
+                {**fields, "updated_at": now.isoformat()},
+                format="json",
+                secure=True,
+            )
+            self.assertEqual(resp.status_code, 200)
+        offline = {"seen": True, "time_ms": 500, "updated_at": yesterday.isoformat()}
+        self._post("progress/import/", {"lessons": {str(second.id): offline}})
+        self._post("srs/review/", {"card_id": first.id, "rating": "know"})
+        self._post("srs/review/", {"card_id": first.id, "rating": "again"})
+        self._post(
+            "srs/review/batch/",
+            {
+                "reviews": [
+                    {"client_id": "d1", "card_id": second.id, "rating": "medium", "reviewed_at": yesterday},
+                    {"client_id": "d2", "card_id": second.id, "rating": "know", "reviewed_at": now},
+                ]
+            },
+        )
+        return timezone.localdate(yesterday), timezone.localdate(now)
+
+    def test_writes_maintain_daily_rollups(self):
+        yesterday, today = self._write_activity()
+        self.assertEqual(
+            self._days(),
+            [(yesterday, 1, 1, 0, 1, 0, 500), (today, 1, 1, 2, 0, 1, 4000)],
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get("/api/v1/learning/stats/daily/?days=366", secure=True)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(sum("learning_learningday" in query["sql"] for query in ctx.captured_queries), 1)
+        self.assertEqual(
+            [row["day"] for row in resp.data["days"]], [yesterday.isoformat(), today.isoformat()]
+        )
+        self.assertEqual(resp.data["totals"]["time_ms"], 4500)
+        self.assertEqual(resp.data["totals"]["active_days"], 2)
+
+        recent = self.client.get("/api/v1/learning/stats/daily/?days=1", secure=True)
+        self.assertEqual([row["day"] for row in recent.data["days"]], [today.isoformat()])
+
+    def test_rebuild_recomputes_reviews_from_the_log(self):
+        from learning.models import LearningDay
+
+        self._write_activity()
+        incremental = self._days()
+        LearningDay.objects.filter(user=self.user).update(reviews_know=0, new_cards=99)
+
+        out = StringIO()
+        call_command("rebuild_learning_days", "--user", str(self.user.pk), stdout=out)
+        self.assertIn("journées reconstruites", out.getvalue())
+        # Revues exactes ; temps et lecture des fiches rattachés au jour de leur
+        # dernière consultation, ici le même.
+        self.assertEqual(self._days(), incremental)
+
+
+class AchievementTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.card = _publish_card("badges")
+        cls.user = get_user_model().objects.create_user(username="badges", password="pw")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_streak_advances_one_day_at_a_time(self):
+        from collections import Counter
+
+        from learning.achievements import advance, current_streak
+        from learning.models import AchievementState
+
+        state = AchievementState()
+        start = timezone.localdate()
+        for offset in (0, 1, 2, 2):
+            advance(state, start + timedelta(days=offset), Counter(reviews_know=1))
+        self.assertEqual((state.current_streak, state.longest_streak), (3, 3))
+
+        # Une journée arrivée en retard juste avant la série l'allonge.
+        advance(state, start - timedelta(days=1), Counter(cards_read=1))
+        self.assertEqual(state.current_streak, 4)
+
+        earned = advance(state, start + timedelta(days=5), Counter(cards_read=1))
+        self.assertEqual((state.current_streak, state.longest_streak), (1, 4))
+        self.assertEqual([rule.code for rule in earned], [])
+        self.assertEqual(current_streak(state, start + timedelta(days=6)), 1)
+        self.assertEqual(current_streak(state, start + timedelta(days=7)), 0)
+
+    def test_reviews_update_streak_and_badges_without_aggregates(self):
+        # Les badges franchis sont insérés après le commit de la revue.
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                "/api/v1/learning/srs/review/",
+                {"card_id": self.card.id, "rating": "know"},
+                format="json",
+                secure=True,
+            )
+        self.assertEqual(resp.status_code, 200)
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get("/api/v1/learning/achievements/", secure=True)
+        self.assertEqual(resp.status_code, 200)
+        aggregates = [q["sql"] for q in ctx.captured_queries if "COUNT(" in q["sql"] or "SUM(" in q["sql"]]
+        self.assertEqual(aggregates, [])
+        self.assertEqual((resp.data["current_streak"], resp.data["reviews_count"]), (1, 1))
+        earned = {badge["code"]: badge["earned_on"] for badge in resp.data["badges"]}
+        self.assertEqual(earned["first_review"], timezone.localdate().isoformat())
+        self.assertIsNone(earned["streak_7"])
+
+    def test_record_days_upsert_matches_advance_in_one_statement_per_day(self):
+        from collections import Counter
+
+        from learning.achievements import advance, record_days
+        from learning.models import AchievementState, EarnedBadge
+
+        start = timezone.localdate()
+        expected, earned = AchievementState(), {}
+        for n, offset in enumerate((0, 1, 1, 2, -1, 5, 4, 6, 7, 8, 9, 10, 11, 30, 29)):
+            day = start + timedelta(days=offset)
+            counts = Counter(reviews_know=1 + n % 2, reviews_again=n % 3, cards_read=n)
+            for rule in advance(expected, day, counts):
+                earned.setdefault(rule.code, day)
+            with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as ctx:
+                record_days([(self.user.pk, day, counts)])
+            # Lecture des plus longues séries du lot, puis l'upsert de la journée.
+            self.assertEqual(len(ctx), 2, [q["sql"] for q in ctx.captured_queries])
+
+        state = AchievementState.objects.get(user=self.user)
+        fields = (
+            "current_streak",
+            "longest_streak",
+            "streak_start",
+            "last_active_day",
+            "cards_read",
+            "reviews_count",
+            "reviews_know",
+        )
+        self.assertEqual(
+            {name: getattr(state, name) for name in fields},
+            {name: getattr(expected, name) for name in fields},
+        )
+        badges = EarnedBadge.objects.filter(user=self.user).values_list("code", "earned_on")
+        self.assertEqual(dict(badges), earned)
+
+    def test_activity_at_a_streak_threshold_does_not_requeue_the_badge(self):
+        from collections import Counter
+
+        from learning.achievements import record_days
+        from learning.models import AchievementState
+
+        today = timezone.localdate()
+        AchievementState.objects.create(
+            user=self.user,
+            current_streak=7,
+            longest_streak=7,
+            streak_start=today - timedelta(days=6),
+            last_active_day=today,
+            cards_read=10,
+            reviews_count=10,
+            reviews_know=10,
+        )
+        # La série ne grandit ni le même jour ni le lendemain d'un palier déjà atteint.
+        for day in (today, today, today + timedelta(days=1)):
+            with self.captureOnCommitCallbacks() as callbacks:
+                record_days([(self.user.pk, day, Counter(reviews_again=1))])
+            self.assertEqual(callbacks, [], day)
+        self.assertEqual(AchievementState.objects.get(user=self.user).longest_streak, 8)
+
+    def test_replay_rebuilds_streaks_and_badges_from_daily_rollups(self):
+        from learning.models import AchievementState, EarnedBadge, LearningDay
+
+        today = timezone.localdate()
+        LearningDay.objects.bulk_create(
+            [
+                LearningDay(user=self.user, day=today - timedelta(days=offset), reviews_again=1)
+                for offset in range(8)
+            ]
+        )
+        out = StringIO()
+        call_command("replay_achievements", "--user", str(self.user.pk), stdout=out)
+        self.assertIn("badges rejoués", out.getvalue())
+
+        state = AchievementState.objects.get(user=self.user)
+        self.assertEqual((state.current_streak, state.longest_streak, state.reviews_count), (8, 8, 8))
+        self.assertEqual(
+            dict(EarnedBadge.objects.filter(user=self.user).values_list("code", "earned_on")),
+            {"first_review": today - timedelta(days=7), "streak_7": today - timedelta(days=1)},
+        )
+
+
+class UpsertTests(TestCase):
+    """L'upsert en une instruction donne le même résultat que le merge Python."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.card = _publish_card("upsert")
+        cls.user = get_user_model().objects.create_user(username="upsert", password="pw")
+
+    def test_progress_upsert_matches_merge_progress(self):
+        now = timezone.now()
+        expected = None
+        for payload in _progress_payloads(now, count=60, seed=1):
+            expected = _merge_progress(existing=expected, incoming=payload, now=now)
+            row = upsert_lesson_progress(self.user.pk, self.card.id, _clamped(payload, now), now=now)
+            self.assertEqual(
+                {name: getattr(row, name) for name in _PROGRESS_COMPARED},
+                {name: getattr(expected, name) for name in _PROGRESS_COMPARED},
+            )
+        self.assertEqual(LessonProgress.objects.count(), 1)
+
+    def test_progress_upsert_ignores_unpublished_lessons(self):
+        now = timezone.now()
+        self.card.unpublish()
+        row = upsert_lesson_progress(
+            self.user.pk, self.card.id, {"seen": True, "updated_at": now}, now=now
+        )
+        self.assertIsNone(row)
+        self.assertFalse(LessonProgress.objects.exists())
+
+    def test_srs_upsert_matches_apply_review(self):
+        scheduler = LeitnerScheduler()
+        now = timezone.now()
+        for level in range(1, 6):
+            for rating in RATING_CODES:
+                CardSRSState.objects.all().delete()
+                state = CardSRSState.objects.create(
+                    user=self.user,
+                    microarticle=self.card,
+                    srs_level=level,
+                    ease=2.1,
+                    interval_days=9,
+                    reviews_count=4,
+                )
+                _apply_review(state, rating=rating, reviewed_at=now, scheduler=scheduler)
+
+                row = upsert_srs_review(
+                    self.user.pk, self.card.id, rating=rating, scheduler=scheduler, now=now
+                )
+                fields = (
+                    "srs_level",
+                    "ease",
+                    "interval_days",
+                    "due_at",
+                    "last_reviewed_at",
+                    "reviews_count",
+                    "last_rating",
+                )
+                self.assertEqual(
+                    {name: getattr(row, name) for name in fields},
+                    {name: getattr(state, name) for name in fields},
+                    (level, rating),
+                )
+
+        CardSRSState.objects.all().delete()
+        fresh = CardSRSState(user=self.user, microarticle=self.card, srs_level=1, due_at=now)
+        _apply_review(fresh, rating="again", reviewed_at=now, scheduler=scheduler)
+        row = upsert_srs_review(
+            self.user.pk, self.card.id, rating="again", scheduler=scheduler, now=now
+        )
+        self.assertEqual((row.srs_level, row.due_at, row.reviews_count), (fresh.srs_level, fresh.due_at, 1))
+
+    def test_srs_upsert_refuses_schedulers_that_read_ease(self):
+        with self.assertRaises(ValueError):
+            upsert_srs_review(
+                self.user.pk,
+                self.card.id,
+                rating="know",
+                scheduler=get_scheduler("sm2"),
+                now=timezone.now(),
+            )
+
+
+@skipIf(connection.vendor == "sqlite", "SQLite sérialise les écritures : pas de concurrence réelle.")
+class ConcurrentUpsertTests(TransactionTestCase):
+    """Écritures simultanées de plusieurs appareils sur la même ligne."""
+
+    serialized_rollback = True
+
+    def setUp(self):
+        self.card = _publish_card("concurrent")
+        self.user = get_user_model().objects.create_user(username="concurrent", password="pw")
+
+    def _run_concurrently(self, writes) -> None:
+        barrier = threading.Barrier(len(writes))
+        errors = []
+
+        def run(write):
+            try:
+                barrier.wait()
+                write()
+            except Exception as exc:  # remonté au thread de test
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(write,)) for write in writes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_concurrent_progress_upserts_match_sequential_merges(self):
+        # Charges complètes, `updated_at` distincts et tous passés (aucun plafonnement
+        # à `now` ne crée d'égalité) : le merge ne dépend alors pas de l'ordre
+        # d'arrivée, que les threads ne garantissent pas.
+        payloads = _progress_payloads(timezone.now(), count=12, seed=2, partial=False)
+        now = timezone.now() + timedelta(hours=2)
+        self._run_concurrently(
+            [
+                lambda payload=payload: upsert_lesson_progress(
+                    self.user.pk, self.card.id, _clamped(payload, now), now=now
+                )
+                for payload in payloads
+            ]
+        )
+
+        expected = None
+        for payload in payloads:
+            expected = _merge_progress(existing=expected, incoming=payload, now=now)
+        row = LessonProgress.objects.get(user=self.user, lesson=self.card)
+        self.assertEqual(
+            {name: getattr(row, name) for name in _PROGRESS_COMPARED},
+            {name: getattr(expected, name) for name in _PROGRESS_COMPARED},
+        )
+
+    def test_concurrent_srs_reviews_are_all_counted(self):
+        now = timezone.now()
+        scheduler = LeitnerScheduler()
+        self._run_concurrently(
+            [
+                lambda: upsert_srs_review(
+                    self.user.pk, self.card.id, rating="know", scheduler=scheduler, now=now
+                )
+                for _ in range(8)
+            ]
+        )
+
+        state = CardSRSState.objects.get(user=self.user, microarticle=self.card)
+        self.assertEqual((state.reviews_count, state.srs_level), (8, 5))
+
+    def test_concurrent_review_batches_on_a_new_card_do_not_collide(self):
+        now = timezone.now()
+
+        def post_batch(device: str) -> None:
+            client = APIClient()
+            client.force_authenticate(self.user)
+            resp = client.post(
+                "/api/v1/learning/srs/review/batch/",
+                {
+                    "device_id": device,
+                    "reviews": [
+                        {
+                            "client_id": device,
+                            "card_id": self.card.id,
+                            "rating": "know",
+                            "reviewed_at": now.isoformat(),
+                        }
+                    ],
+                },
+                format="json",
+                secure=True,
+            )
+            self.assertEqual(resp.status_code, 200, resp.content)
+
+        self._run_concurrently([lambda device=f"dev-{n}": post_batch(device) for n in range(4)])
+
+        self.assertEqual(CardSRSState.objects.get(user=self.user, microarticle=self.card).reviews_count, 4)
+
+
+class SchedulerTests(TestCase):
+    def test_leitner_is_the_default_and_keeps_its_boxes(self):
+        now = timezone.now()
+        update = get_scheduler(None).next_state(level=2, rating="know", now=now)
+
+        self.assertEqual((update.level, update.interval_days), (3, 7))
+        self.assertEqual(update.due_at, now + timedelta(days=7))
+        self.assertEqual(next_leitner_state(level=5, rating="know", now=now).level, 5)
+
+    def test_sm2_grows_intervals_with_ease_and_resets_on_failure(self):
+        sm2 = get_scheduler("sm2")
+        now = timezone.now()
+
+        first = sm2.next_state(level=1, rating="know", now=now)
+        second = sm2.next_state(
+            level=first.level, rating="know", now=now, ease=first.ease, interval_days=first.interval_days
+        )
+        third = sm2.next_state(
+            level=second.level, rating="know", now=now, ease=second.ease, interval_days=second.interval_days
+        )
+        self.assertEqual([first.interval_days, second.interval_days], [1, 6])
+        self.assertEqual(third.interval_days, round(6 * second.ease))
+        self.assertAlmostEqual(third.ease, 2.8)
+
+        hard = sm2.next_state(level=third.level, rating="medium", now=now, ease=2.5, interval_days=10)
+        self.assertAlmostEqual(hard.ease, 2.36)
+
+        failed = sm2.next_state(level=third.level, rating="again", now=now, ease=2.5, interval_days=10)
+        self.assertEqual((failed.level, failed.interval_days), (1, 1))
+        self.assertAlmostEqual(failed.ease, 1.96)
+
+    def test_batch_intervals_are_vectorised(self):
+        levels = np.array([1, 3, 5, 9])
+        intervals = np.array([0, 0, 40, 0])
+        eases = np.full(4, 2.5)
+
+        leitner = get_scheduler("leitner").batch_intervals(levels, eases, intervals)
+        sm2 = get_scheduler("sm2").batch_intervals(levels, eases, intervals)
+
+        self.assertEqual(leitner.tolist(), [1, 7, 30, 30])
+        self.assertEqual(sm2.tolist(), [1, 7, 40, 30])
+
+    def test_batch_review_matches_next_state(self):
+        levels, eases, intervals, ratings = (
+            np.array(column)
+            for column in zip(
+                *[
+                    (level, ease, interval, rating)
+                    for level in range(1, 6)
+                    for ease in (1.3, 2.5, 2.9)
+                    for interval in (0, 1, 6, 17)
+                    for rating in (RATING_AGAIN, RATING_MEDIUM, RATING_KNOW)
+                ]
+            )
+        )
+        names = {code: name for name, code in RATING_CODES.items()}
+
+        for name in ("leitner", "sm2"):
+            scheduler = get_scheduler(name)
+            batch = scheduler.batch_review(levels, eases, intervals, ratings)
+            for i in range(len(levels)):
+                update = scheduler.next_state(
+                    level=int(levels[i]),
+                    rating=names[int(ratings[i])],
+                    ease=float(eases[i]),
+                    interval_days=int(intervals[i]),
+                )
+                self.assertEqual(
+                    (int(batch[0][i]), round(float(batch[1][i]), 4), int(batch[2][i])),
+                    (update.level, round(update.ease, 4), update.interval_days),
+                    f"{name} #{i}",
+                )
+
+    def test_an_incomplete_scheduler_cannot_be_instantiated(self):
+        class Partial(Scheduler):
+            name = "partial"
+
+            def next_state(self, *, level, rating, now=None, ease=2.5, interval_days=0):
+                return next_leitner_state(level=level, rating=rating, now=now)
+
+        with self.assertRaises(TypeError):
+            Partial()
+
+    def test_review_path_does_not_need_numpy(self):
+        # Module rechargé sous un autre nom, NumPy masqué : les modèles qui
+        # importent `learning.srs` et `next_state` doivent marcher sans lui.
+        spec = importlib.util.find_spec("learning.srs")
+        with mock.patch.dict(sys.modules, {"numpy": None}):
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            update = module.get_scheduler("sm2").next_state(level=1, rating="know")
+        self.assertEqual(update.level, 2)
+
+
+class SimulationTests(TestCase):
+    def test_simulation_runs_without_the_database_and_is_reproducible(self):
+        config = SimulationConfig(users=50, cards_per_user=30, days=40, new_cards_per_day=5, seed=7)
+
+        with self.assertNumQueries(0):
+            leitner = simulate(get_scheduler("leitner"), config)
+            again = simulate(get_scheduler("leitner"), config)
+            sm2 = simulate(get_scheduler("sm2"), config)
+
+        self.assertEqual(leitner.workload.tolist(), again.workload.tolist())
+        self.assertEqual(len(leitner.workload), 40)
+        # Jour 0 : chaque utilisateur découvre ses 5 premières cartes.
+        self.assertEqual(leitner.workload[0], 50 * 5)
+        for result in (leitner, sm2):
+            self.assertGreater(result.retention, 0.5)
+            self.assertLess(result.retention, 1.0)
+            self.assertGreater(result.throughput, 0)
+
+    def test_less_recall_means_more_work(self):
+        scheduler = get_scheduler("leitner")
+        good = simulate(scheduler, SimulationConfig(users=100, cards_per_user=40, days=60, recall_mean=0.95))
+        poor = simulate(scheduler, SimulationConfig(users=100, cards_per_user=40, days=60, recall_mean=0.6))
+
+        self.assertGreater(good.retention, poor.retention)
+        self.assertGreater(poor.reviews, good.reviews)
@@ -0,0 +1,235 @@
+"""Écritures unitaires en une seule instruction `INSERT … ON CONFLICT DO UPDATE`.
+
+`PATCH progress/<id>/` et `srs/review/` faisaient lecture verrouillée, merge en
+Python puis `save()` : trois allers-retours et un verrou de ligne tenu entre
+eux, sur lequel s'empilent les appareils qui synchronisent en même temps. Ici la
+règle de merge est traduite en SQL et appliquée par la base à la ligne
+existante, dans l'instruction qui l'insère si elle manque. Deux écritures
+concurrentes se sérialisent sur l'index unique sans aller-retour intermédiaire,
+et donnent le même résultat que `_merge_progress` / `Scheduler.next_state`
+appliqués l'un après l'autre.
+
+Le SQL (CASE, ON CONFLICT, RETURNING) est commun à Postgres et SQLite (3.35+).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.db import connection
+
+from content.models import MicroArticlePage
+
+from .models import CardSRSState, LessonProgress
+from .srs import MAX_LEVEL, MIN_LEVEL, Scheduler
+
+_PROGRESS_FIELDS = (
+    "seen",
+    "completed",
+    "percent",
+    "time_ms",
+    "score_best",
+    "score_last",
+    "updated_at",
+    "last_seen_at",
+    "synced_at",
+)
+# Champs « le plus récent gagne » : recopiés seulement s'ils sont envoyés.
+_PROGRESS_LWW_FIELDS = ("seen", "completed", "percent", "score_last", "last_seen_at")
+
+_SRS_FIELDS = (
+    "srs_level",
+    "ease",
+    "interval_days",
+    "due_at",
+    "last_reviewed_at",
+    "reviews_count",
+    "last_rating",
+    "created_at",
+    "updated_at",
+)
+
+
+def _placeholder(field) -> str:
+    # Postgres ne déduit pas le type d'un paramètre placé dans une liste SELECT
+    # ou un CASE : sans transtypage, il le lit comme du texte.
+    if connection.vendor == "postgresql":
+        return f"CAST(%s AS {field.cast_db_type(connection)})"
+    return "%s"
+
+
+def typed_param(model, name: str, value) -> tuple[str, object]:
+    """Placeholder et valeur préparée pour le champ `name` de `model`, à placer dans du SQL brut.
+
+    Partagé avec les autres écritures en SQL brut (`learning.rollups`,
+    `content.deck_copy`).
+    """
+    field = model._meta.get_field(name)
+    # `get_db_prep_save` : un `None` de `JSONField` devient NULL, comme avec l'ORM.
+    return _placeholder(field), field.get_db_prep_save(value, connection)
+
+
+def quoted_column(model, name: str) -> str:
+    """Nom de colonne du champ `name` de `model`, entre guillemets."""
+    return connection.ops.quote_name(model._meta.get_field(name).column)
+
+
+def upsert_lesson_progress(user_id: int, lesson_id: int, incoming: dict, *, now: datetime):
+    """Merge `incoming` dans la progression de `lesson_id`, en une instruction.
+
+    `incoming` est la charge validée, `updated_at` et `last_seen_at` déjà
+    plafonnés à `now`. Renvoie la ligne résultante, ou `None` si la fiche
+    n'est pas publique (rien n'est alors écrit).
+    """
+    table = connection.ops.quote_name(LessonProgress._meta.db_table)
+
+    # Valeurs d'une ligne neuve : mêmes défauts que `_merge_progress(existing=None)`.
+    values = {
+        "seen": incoming.get("seen", False),
+        "completed": incoming.get("completed", False),
+        "percent": incoming.get("percent", 0),
+        "time_ms": incoming.get("time_ms", 0),
+        "score_best": incoming.get("score_best"),
+        "score_last": incoming.get("score_last"),
+        "updated_at": incoming["updated_at"],
+        "last_seen_at": incoming.get("last_seen_at"),
+        "synced_at": now,
+    }
+    select_sql, params = [], []
+    for name in ("user", *_PROGRESS_FIELDS):
+        sql, param = typed_param(LessonProgress, name, user_id if name == "user" else values[name])
+        select_sql.append(sql)
+        params.append(param)
+
+    public = MicroArticlePage.objects.live().public().filter(id=lesson_id).values("id")
+    public_sql, public_params = public.query.sql_with_params()
+
+    def old(name: str) -> str:
+        return f"{table}.{quoted_column(LessonProgress, name)}"
+
+    def new(name: str) -> str:
+        return f"EXCLUDED.{quoted_column(LessonProgress, name)}"
+
+    # Une ligne polluée par une horloge en avance est ramenée à `now`
+    # (`EXCLUDED.synced_at` vaut `now`), comme dans `_merge_progress`.
+    existing_updated_at = (
+        f"(CASE WHEN {old('updated_at')} > {new('synced_at')} "
+        f"THEN {new('synced_at')} ELSE {old('updated_at')} END)"
+    )
+    newer = f"{new('updated_at')} > {existing_updated_at}"
+
+    assignments = [
+        f"{quoted_column(LessonProgress, name)} = CASE WHEN {newer} THEN {new(name)} ELSE {old(name)} END"
+        for name in _PROGRESS_LWW_FIELDS
+        if name in incoming
+    ]
+    if incoming.get("time_ms") is not None:
+        assignments.append(
+            f"{quoted_column(LessonProgress, 'time_ms')} = CASE WHEN {new('time_ms')} > {old('time_ms')} "
+            f"THEN {new('time_ms')} ELSE {old('time_ms')} END"
+        )
+    if incoming.get("score_best") is not None:
+        assignments.append(
+            f"{quoted_column(LessonProgress, 'score_best')} = CASE WHEN {old('score_best')} IS NULL "
+            f"OR {new('score_best')} > {old('score_best')} THEN {new('score_best')} "
+            f"ELSE {old('score_best')} END"
+        )
+    assignments += [
+        f"{quoted_column(LessonProgress, 'updated_at')} = CASE WHEN {newer} "
+        f"THEN {new('updated_at')} ELSE {existing_updated_at} END",
+        f"{quoted_column(LessonProgress, 'synced_at')} = {new('synced_at')}",
+    ]
+
+    columns = ", ".join(quoted_column(LessonProgress, name) for name in ("user", "lesson", *_PROGRESS_FIELDS))
+    returning = ", ".join(old(name) for name in ("id", "user", "lesson", *_PROGRESS_FIELDS))
+    # `WHERE true` : sans clause WHERE, SQLite lirait `ON CONFLICT` comme une jointure.
+    sql = (
+        f"INSERT INTO {table} ({columns}) "
+        f"SELECT {select_sql[0]}, live_lesson.id, {', '.join(select_sql[1:])} "
+        f"FROM ({public_sql}) AS live_lesson WHERE true "
+        f"ON CONFLICT ({quoted_column(LessonProgress, 'user')}, {quoted_column(LessonProgress, 'lesson')}) "
+        f"DO UPDATE SET {', '.join(assignments)} "
+        f"RETURNING {returning}"
+    )
+    return next(iter(LessonProgress.objects.raw(sql, [*params, *public_params])), None)
+
+
+def upsert_srs_review(
+    user_id: int, card_id: int, *, rating: str, scheduler: Scheduler, now: datetime
+) -> CardSRSState:
+    """Applique une note à l'état SRS de `card_id`, créé s'il manque, en une instruction.
+
+    Réservé aux algorithmes dont le prochain état ne dépend que du niveau
+    (`Scheduler.level_only`) : la transition de chaque niveau est calculée en
+    Python par `next_state` puis posée en `CASE srs_level`.
+    """
+    if not scheduler.level_only:
+        raise ValueError(f"{scheduler.name} ne se tabule pas par niveau.")
+
+    table = connection.ops.quote_name(CardSRSState._meta.db_table)
+    transitions = {
+        level: scheduler.next_state(level=level, rating=rating, now=now)
+        for level in range(MIN_LEVEL, MAX_LEVEL + 1)
+    }
+
+    # Ligne neuve : un état de niveau 1 qui reçoit sa première note.
+    first = transitions[MIN_LEVEL]
+    values = {
+        "srs_level": first.level,
+        "ease": first.ease,
+        "interval_days": first.interval_days,
+        "due_at": first.due_at,
+        "last_reviewed_at": now,
+        "reviews_count": 1,
+        "last_rating": rating,
+        "created_at": now,
+        "updated_at": now,
+    }
+    insert_sql, params = [], []
+    for name, value in (("user", user_id), ("microarticle", card_id), *values.items()):
+        sql, param = typed_param(CardSRSState, name, value)
+        insert_sql.append(sql)
+        params.append(param)
+
+    def old(name: str) -> str:
+        return f"{table}.{quoted_column(CardSRSState, name)}"
+
+    def copy(name: str) -> str:
+        return f"{quoted_column(CardSRSState, name)} = EXCLUDED.{quoted_column(CardSRSState, name)}"
+
+    def by_level(name: str, attr: str) -> str:
+        # Niveaux hors bornes ramenés à 1..5, comme `_clamp_level`.
+        level = old("srs_level")
+        branches = []
+        for current, update in transitions.items():
+            sql, param = typed_param(CardSRSState, name, getattr(update, attr))
+            params.append(param)
+            if current == MIN_LEVEL:
+                branches.append(f"WHEN {level} <= {current} THEN {sql}")
+            elif current == MAX_LEVEL:
+                branches.append(f"ELSE {sql}")
+            else:
+                branches.append(f"WHEN {level} = {current} THEN {sql}")
+        return f"{quoted_column(CardSRSState, name)} = CASE {' '.join(branches)} END"
+
+    # Toutes les expressions d'un SET lisent la ligne d'avant la mise à jour :
+    # les trois CASE partent bien de l'ancien niveau.
+    assignments = [
+        by_level("interval_days", "interval_days"),
+        by_level("due_at", "due_at"),
+        by_level("srs_level", "level"),
+        copy("last_reviewed_at"),
+        f"{quoted_column(CardSRSState, 'reviews_count')} = {old('reviews_count')} + 1",
+        copy("last_rating"),
+        copy("updated_at"),
+    ]
+
+    columns = ", ".join(quoted_column(CardSRSState, name) for name in ("user", "microarticle", *_SRS_FIELDS))
+    returning = ", ".join(old(name) for name in ("id", "user", "microarticle", *_SRS_FIELDS))
+    sql = (
+        f"INSERT INTO {table} ({columns}) VALUES ({', '.join(insert_sql)}) "
+        f"ON CONFLICT ({quoted_column(CardSRSState, 'user')}, {quoted_column(CardSRSState, 'microarticle')}) "
+        f"DO UPDATE SET {', '.join(assignments)} "
+        f"RETURNING {returning}"
+    )
+    return next(iter(CardSRSState.objects.raw(sql, params)))
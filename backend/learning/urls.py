@@ -1,19 +1,31 @@
 from django.urls import path
 
 from .views import (
+    AchievementsView,
+    LearningEventBatchView,
+    LearningStatsView,
     ProgressImportView,
     ProgressListView,
     ProgressUpsertView,
     SRSCountsView,
+    SRSForecastView,
     SRSNextView,
+    SRSQueueView,
+    SRSReviewBatchView,
     SRSReviewView,
 )
 
 urlpatterns = [
+    path("achievements/", AchievementsView.as_view(), name="learning-achievements"),
+    path("events/", LearningEventBatchView.as_view(), name="learning-events"),
     path("progress/", ProgressListView.as_view(), name="progress-list"),
     path("progress/import/", ProgressImportView.as_view(), name="progress-import"),
     path("progress/<int:lesson_id>/", ProgressUpsertView.as_view(), name="progress-upsert"),
     path("srs/counts/", SRSCountsView.as_view(), name="srs-counts"),
+    path("srs/forecast/", SRSForecastView.as_view(), name="srs-forecast"),
     path("srs/next/", SRSNextView.as_view(), name="srs-next"),
+    path("srs/queue/", SRSQueueView.as_view(), name="srs-queue"),
     path("srs/review/", SRSReviewView.as_view(), name="srs-review"),
+    path("srs/review/batch/", SRSReviewBatchView.as_view(), name="srs-review-batch"),
+    path("stats/daily/", LearningStatsView.as_view(), name="learning-stats-daily"),
 ]
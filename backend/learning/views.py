@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+from django.core import signing
 from django.db import transaction
+from django.db.models import Case, Exists, F, FilteredRelation, IntegerField, OuterRef, Q, Value, When
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema
 from rest_framework.permissions import IsAuthenticated
@@ -10,23 +13,51 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.exceptions import ValidationError as DRFValidationError
 
-from content.models import Deck, DeckCard, MicroArticlePage
+from content.deck_overlay import cards_of_decks
+from content.models import Deck, MicroArticlePage
 from content.serializers import MicroArticleCardSerializer
-
-from .models import CardSRSState, LessonProgress
+from content.visibility import is_live_public, live_public_ids
+from pharmapocket.throttling import LearningEventsThrottle, UserThrottle
+
+from .counts import invalidate_srs_counts, scope_signature, srs_counts, srs_forecast
+from .events import ingest_events
+from .achievements import BADGES, current_streak
+from .card_schedulers import card_schedulers
+from .models import AchievementState, CardReview, CardSRSState, EarnedBadge, LearningDay, LessonProgress
+from .progress_sync import InvalidSyncToken, decode_sync_token, progress_changes
+from .review_log import ReviewLogBuffer
+from .rollups import ROLLUP_FIELDS, DailyRollup
 from .serializers import (
+    AchievementsSerializer,
+    LearningEventBatchResponseSerializer,
+    LearningEventBatchSerializer,
+    LearningStatsQuerySerializer,
+    LearningStatsSerializer,
+    LessonProgressChangesSerializer,
+    LessonProgressQuerySerializer,
     LessonProgressSerializer,
     LessonProgressUpdateSerializer,
     ProgressImportSerializer,
     ProgressImportResponseSerializer,
     SRSCountsQuerySerializer,
     SRSCountsSerializer,
+    SRSForecastQuerySerializer,
+    SRSForecastSerializer,
     SRSNextQuerySerializer,
     SRSNextSerializer,
+    SRSQueueQuerySerializer,
+    SRSQueueSerializer,
+    SRSReviewBatchResponseSerializer,
+    SRSReviewBatchSerializer,
     SRSReviewSerializer,
+    SRS_FORECAST_DEFAULT_DAYS,
+    SRS_FORECAST_MAX_DAYS,
+    LEARNING_STATS_DEFAULT_DAYS,
+    LEARNING_STATS_MAX_DAYS,
 )
 
-from .srs import next_leitner_state
+from .srs import Scheduler
+from .upserts import upsert_lesson_progress, upsert_srs_review
 
 
 def _clamp_to_now(value: datetime | None, now: datetime) -> datetime | None:
@@ -100,44 +131,67 @@ def _merge_progress(
     return existing
 
 
+def _apply_review(
+    state: CardSRSState, *, rating: str, reviewed_at: datetime, scheduler: Scheduler
+) -> None:
+    update = scheduler.next_state(
+        level=state.srs_level,
+        rating=rating,
+        now=reviewed_at,
+        ease=state.ease,
+        interval_days=state.interval_days,
+    )
+    state.srs_level = update.level
+    state.ease = update.ease
+    state.interval_days = update.interval_days
+    state.due_at = update.due_at
+    state.last_reviewed_at = reviewed_at
+    state.reviews_count = int(state.reviews_count or 0) + 1
+    state.last_rating = rating
+
+
+def _srs_state_payload(state: CardSRSState) -> dict:
+    return {
+        "level": state.srs_level,
+        "due_at": state.due_at,
+        "last_reviewed_at": state.last_reviewed_at,
+        "reviews_count": state.reviews_count,
+        "last_rating": state.last_rating,
+    }
+
+
 def _public_microarticle_by_id(microarticle_id: int, *, select_cover: bool = False):
-    queryset = MicroArticlePage.objects.live().public().filter(id=microarticle_id)
+    if not is_live_public(microarticle_id):
+        return None
+    queryset = MicroArticlePage.objects.filter(id=microarticle_id)
     if select_cover:
         queryset = queryset.select_related("cover_image")
     return queryset.specific().first()
 
 
 class ProgressListView(APIView):
+    """Miroir serveur de la progression, complet ou différentiel (`since`).
+
+    Voir `learning.progress_sync`.
+    """
+
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
         operation_id="learning_progress_list",
-        responses=LessonProgressSerializer(many=True),
+        parameters=[LessonProgressQuerySerializer],
+        responses=LessonProgressChangesSerializer,
     )
     def get(self, request):
-        rows = (
-            LessonProgress.objects.filter(
-                user=request.user,
-                lesson_id__in=MicroArticlePage.objects.live().public().values_list("id", flat=True),
-            )
-            .select_related("lesson")
-            .order_by("lesson_id")
-        )
-        data = [
-            {
-                "lesson_id": r.lesson_id,
-                "seen": r.seen,
-                "completed": r.completed,
-                "percent": r.percent,
-                "time_ms": r.time_ms,
-                "score_best": r.score_best,
-                "score_last": r.score_last,
-                "updated_at": r.updated_at,
-                "last_seen_at": r.last_seen_at,
-            }
-            for r in rows
-        ]
-        serializer = LessonProgressSerializer(data, many=True)
+        since = None
+        token = request.query_params.get("since")
+        if token:
+            try:
+                since = decode_sync_token(token)
+            except InvalidSyncToken:
+                raise DRFValidationError({"since": "Invalid sync token."})
+
+        serializer = LessonProgressChangesSerializer(progress_changes(request.user, since))
         return Response(serializer.data)
 
 
@@ -153,22 +207,27 @@ class ProgressUpsertView(APIView):
         serializer = LessonProgressUpdateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        lesson = _public_microarticle_by_id(lesson_id)
-        if lesson is None:
-            return Response({"detail": "Lesson not found."}, status=404)
-
         payload = serializer.validated_data
         now = timezone.now()
 
-        with transaction.atomic():
-            existing = LessonProgress.objects.select_for_update().filter(
-                user=request.user, lesson_id=lesson_id
-            ).first()
-
-            merged = _merge_progress(existing=existing, incoming=payload, now=now)
-            merged.user = request.user
-            merged.lesson = lesson
-            merged.save()
+        # Verification de publication, lecture et merge en une seule instruction :
+        # meme resultat que `_merge_progress`, sans verrou tenu entre deux requetes.
+        incoming = {**payload, "updated_at": _clamp_to_now(payload["updated_at"], now)}
+        if "last_seen_at" in payload:
+            incoming["last_seen_at"] = _clamp_to_now(payload["last_seen_at"], now)
+        # Etat d avant, pour l agregat du jour : lu sans verrou, un ecart sous
+        # ecritures concurrentes de la meme fiche se corrige par reconstruction.
+        before = (
+            LessonProgress.objects.filter(user=request.user, lesson_id=lesson_id)
+            .values_list("seen", "time_ms")
+            .first()
+        )
+        with transaction.atomic(), DailyRollup() as rollup:
+            merged = upsert_lesson_progress(request.user.pk, lesson_id, incoming, now=now)
+            if merged is not None:
+                rollup.add_progress(merged, before=before, at=incoming["updated_at"])
+        if merged is None:
+            return Response({"detail": "Lesson not found."}, status=404)
 
         return Response(
             {
@@ -186,6 +245,13 @@ class ProgressUpsertView(APIView):
 
 
 class ProgressImportView(APIView):
+    """Importe la progression accumulee hors ligne, en un nombre fixe de requetes.
+
+    Meme merge que le PATCH unitaire (`_merge_progress`), applique en memoire
+    contre les lignes verrouillees en une requete, puis ecrit en un
+    `bulk_create` / `bulk_update`.
+    """
+
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
@@ -199,37 +265,74 @@ class ProgressImportView(APIView):
 
         lessons: dict[str, dict] = serializer.validated_data["lessons"]
 
+        incoming_by_id: list[tuple[int, dict]] = []
+        for lesson_id_str, incoming in lessons.items():
+            try:
+                incoming_by_id.append((int(lesson_id_str), incoming))
+            except ValueError:
+                continue
+
+        public_ids = live_public_ids().intersection(lesson_id for lesson_id, _ in incoming_by_id)
+
         imported = 0
         updated = 0
         # Un seul `now` pour tout le lot : les fiches d un meme import sont
         # plafonnees de facon coherente entre elles.
         now = timezone.now()
 
-        with transaction.atomic():
-            for lesson_id_str, incoming in lessons.items():
-                try:
-                    lesson_id = int(lesson_id_str)
-                except ValueError:
-                    continue
+        with transaction.atomic(), DailyRollup() as rollup:
+            # Un seul verrou, dans l ordre des ids : deux imports concurrents
+            # du meme utilisateur ne peuvent pas s interbloquer.
+            rows = {
+                row.lesson_id: row
+                for row in LessonProgress.objects.select_for_update()
+                .filter(user=request.user, lesson_id__in=public_ids)
+                .order_by("lesson_id")
+            }
+            created: dict[int, LessonProgress] = {}
+            changed: dict[int, LessonProgress] = {}
 
-                lesson = _public_microarticle_by_id(lesson_id)
-                if lesson is None:
+            for lesson_id, incoming in incoming_by_id:
+                if lesson_id not in public_ids:
                     continue
 
-                existing = LessonProgress.objects.select_for_update().filter(
-                    user=request.user, lesson_id=lesson_id
-                ).first()
-
+                existing = rows.get(lesson_id)
                 before_updated_at = existing.updated_at if existing else None
+                before = (existing.seen, existing.time_ms) if existing else None
                 merged = _merge_progress(existing=existing, incoming=incoming, now=now)
-                merged.user = request.user
-                merged.lesson = lesson
-                merged.save()
+                if existing is None:
+                    merged.user = request.user
+                    merged.lesson_id = lesson_id
+                    rows[lesson_id] = created[lesson_id] = merged
+                elif lesson_id not in created:
+                    changed[lesson_id] = merged
+                rollup.add_progress(
+                    merged, before=before, at=_clamp_to_now(incoming["updated_at"], now)
+                )
 
                 imported += 1
                 if before_updated_at is None or merged.updated_at > before_updated_at:
                     updated += 1
 
+            LessonProgress.objects.bulk_create(created.values())
+            # `bulk_update` ne passe pas par `save()` : `auto_now` est posé à la main.
+            for row in changed.values():
+                row.synced_at = now
+            LessonProgress.objects.bulk_update(
+                changed.values(),
+                [
+                    "seen",
+                    "completed",
+                    "percent",
+                    "time_ms",
+                    "score_best",
+                    "score_last",
+                    "updated_at",
+                    "last_seen_at",
+                    "synced_at",
+                ],
+            )
+
         return Response({"imported": imported, "updated": updated})
 
 
@@ -282,6 +385,16 @@ def _scope_candidates(user, *, scope: str | None, deck_id: int | None, deck_ids:
     if scope == "all_cards":
         return MicroArticlePage.objects.live().public().select_related("cover_image")
 
+    if scope == "all_decks":
+        # Une jointure sur l'appartenance dénormalisée (unique par carte) plutôt
+        # que Deck → DeckCard → distinct : autant de decks qu'on veut, même coût.
+        return (
+            MicroArticlePage.objects.live()
+            .public()
+            .filter(user_memberships__user=user)
+            .select_related("cover_image")
+        )
+
     decks_qs = Deck.objects.filter(user=user, type=Deck.DeckType.USER)
     if scope == "deck":
         if deck_id is None:
@@ -291,13 +404,13 @@ def _scope_candidates(user, *, scope: str | None, deck_id: int | None, deck_ids:
         if not deck_ids:
             raise DRFValidationError({"deck_ids": "deck_ids is required when scope=decks"})
         decks_qs = decks_qs.filter(id__in=deck_ids)
-    elif scope != "all_decks":
+    else:
         raise DRFValidationError(
             {"scope": "scope must be one of: all_decks, deck, decks, all_cards"}
         )
 
     card_ids_qs = (
-        DeckCard.objects.filter(deck__in=decks_qs)
+        cards_of_decks(decks_qs)
         .values_list("microarticle_id", flat=True)
         .distinct()
     )
@@ -309,6 +422,49 @@ def _scope_candidates(user, *, scope: str | None, deck_id: int | None, deck_ids:
     )
 
 
+def _next_due_state(user, candidates, now: datetime):
+    """État dû le plus ancien parmi `candidates`.
+
+    `EXISTS` corrélé plutôt que `microarticle_id IN (sous-requête)` : le parcours
+    part de l'index (user, due_at, microarticle), dans l'ordre de service, et
+    s'arrête à la première carte du vivier.
+    """
+    return (
+        CardSRSState.objects.filter(user=user, due_at__lte=now)
+        .filter(Exists(candidates.filter(pk=OuterRef("microarticle_id"))))
+        .select_related("microarticle", "microarticle__cover_image")
+        .order_by("due_at", "id")
+        .first()
+    )
+
+
+def _next_upcoming_state(user, candidates):
+    """État à l'échéance la plus proche parmi `candidates`, due ou non."""
+    return (
+        CardSRSState.objects.filter(user=user)
+        .filter(Exists(candidates.filter(pk=OuterRef("microarticle_id"))))
+        .select_related("microarticle", "microarticle__cover_image")
+        .order_by("due_at", "id")
+        .first()
+    )
+
+
+def _next_unseen_card(user, candidates):
+    """Première carte du vivier sans état SRS pour `user`.
+
+    `NOT EXISTS` (anti-jointure sur l'unicité user + microarticle) au lieu du
+    `NOT IN` que produit `exclude(srs_states__user=...)`, dont le coût suit la
+    taille de la table d'états de l'utilisateur.
+    """
+    return (
+        candidates.filter(
+            ~Exists(CardSRSState.objects.filter(user=user, microarticle_id=OuterRef("pk")))
+        )
+        .order_by("id")
+        .first()
+    )
+
+
 class SRSNextView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -336,19 +492,9 @@ class SRSNextView(APIView):
         if exclude_ids:
             candidates = candidates.exclude(id__in=exclude_ids)
 
-        candidate_ids_qs = candidates.values_list("id", flat=True)
         now = timezone.now()
 
-        due_state = (
-            CardSRSState.objects.filter(
-                user=request.user,
-                microarticle_id__in=candidate_ids_qs,
-                due_at__lte=now,
-            )
-            .select_related("microarticle", "microarticle__cover_image")
-            .order_by("due_at", "id")
-            .first()
-        )
+        due_state = _next_due_state(request.user, candidates, now)
 
         if due_state is not None:
             payload = {
@@ -364,11 +510,7 @@ class SRSNextView(APIView):
             serializer = SRSNextSerializer(payload)
             return Response(serializer.data)
 
-        unseen = (
-            candidates.exclude(srs_states__user=request.user)
-            .order_by("id")
-            .first()
-        )
+        unseen = _next_unseen_card(request.user, candidates)
         if unseen is not None:
             payload = {
                 "card": MicroArticleCardSerializer(unseen).data,
@@ -387,15 +529,7 @@ class SRSNextView(APIView):
             serializer = SRSNextSerializer({"card": None, "srs": None})
             return Response(serializer.data)
 
-        next_state = (
-            CardSRSState.objects.filter(
-                user=request.user,
-                microarticle_id__in=candidate_ids_qs,
-            )
-            .select_related("microarticle", "microarticle__cover_image")
-            .order_by("due_at", "id")
-            .first()
-        )
+        next_state = _next_upcoming_state(request.user, candidates)
         if next_state is None:
             serializer = SRSNextSerializer({"card": None, "srs": None})
             return Response(serializer.data)
@@ -414,6 +548,163 @@ class SRSNextView(APIView):
         return Response(serializer.data)
 
 
+SRS_QUEUE_SESSION_SALT = "learning.srs.queue"
+SRS_QUEUE_SESSION_MAX_AGE = 24 * 3600
+SRS_QUEUE_DEFAULT_LIMIT = 20
+SRS_QUEUE_MAX_LIMIT = 100
+
+# Rang d'une carte dans la file : dues, puis jamais vues, puis à venir.
+_QUEUE_DUE, _QUEUE_NEW, _QUEUE_LATER = 0, 1, 2
+
+
+def _load_queue_session(token: str | None, user) -> tuple[datetime, tuple | None]:
+    """Début de la session décrite par `token` et clé de tri de la dernière carte servie.
+
+    Sans jeton, la session commence maintenant et rien n'a encore été servi.
+    """
+
+    if not token:
+        return timezone.now(), None
+    try:
+        data = signing.loads(token, salt=SRS_QUEUE_SESSION_SALT, max_age=SRS_QUEUE_SESSION_MAX_AGE)
+        if not isinstance(data, dict) or data.get("user") != user.pk:
+            raise ValueError
+        started_at = datetime.fromisoformat(data["started_at"])
+        after = data.get("after")
+        if after is not None:
+            rank, due_at, state_id, card_id = after
+            after = (
+                int(rank),
+                datetime.fromisoformat(due_at) if due_at is not None else None,
+                int(state_id) if state_id is not None else None,
+                int(card_id),
+            )
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise DRFValidationError({"session": "Invalid or expired session token."})
+    return started_at, after
+
+
+def _dump_queue_session(user, started_at: datetime, after: tuple | None) -> str:
+    if after is not None:
+        rank, due_at, state_id, card_id = after
+        after = [rank, due_at.isoformat() if due_at is not None else None, state_id, card_id]
+    return signing.dumps(
+        {"user": user.pk, "started_at": started_at.isoformat(), "after": after},
+        salt=SRS_QUEUE_SESSION_SALT,
+    )
+
+
+def _queue_after(after: tuple) -> Q:
+    """Cartes rangées après `after` dans l'ordre (rang, échéance, état, id) de la file."""
+
+    rank, due_at, state_id, card_id = after
+    later = Q(srs_rank__gt=rank)
+    if rank == _QUEUE_NEW:
+        # Cartes jamais vues : ni échéance ni état, l'id seul départage.
+        return later | Q(srs_rank=rank, id__gt=card_id)
+    return (
+        later
+        | Q(srs_rank=rank, srs_due_at__gt=due_at)
+        | Q(srs_rank=rank, srs_due_at=due_at, srs_state_id__gt=state_id)
+        | Q(srs_rank=rank, srs_due_at=due_at, srs_state_id=state_id, id__gt=card_id)
+    )
+
+
+class SRSQueueView(APIView):
+    """Les N prochaines cartes de révision, dans l'ordre de `srs/next/`.
+
+    Une seule requête classe tout le vivier : l'état SRS de l'utilisateur est
+    joint par `FilteredRelation`, puis un rang (due / jamais vue / à venir) sert
+    de première clé de tri. Le jeton `session` est signé, sans état serveur, et
+    de taille fixe : il porte l'heure de début de la session, qui fige les rangs,
+    et la clé de tri de la dernière carte servie, d'où repart l'appel suivant.
+    Une carte revue depuis le début de la session change de clé : elle est
+    écartée pour ne pas revenir plus loin dans la file. Une carte qui devient
+    due en cours de session attend la session suivante.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        operation_id="learning_srs_queue",
+        parameters=[SRSQueueQuerySerializer],
+        responses=SRSQueueSerializer,
+    )
+    def get(self, request):
+        only_due = _parse_bool(request.query_params.get("only_due"), default=True)
+        limit = _parse_int(request.query_params.get("limit")) or SRS_QUEUE_DEFAULT_LIMIT
+        limit = max(1, min(limit, SRS_QUEUE_MAX_LIMIT))
+        token = request.query_params.get("session")
+        started_at, after = _load_queue_session(token, request.user)
+
+        candidates = _scope_candidates(
+            request.user,
+            scope=request.query_params.get("scope"),
+            deck_id=_parse_int(request.query_params.get("deck_id")),
+            deck_ids=_parse_int_list(request.query_params.get("deck_ids")),
+        )
+
+        now = started_at
+        queue = candidates.annotate(
+            own_state=FilteredRelation("srs_states", condition=Q(srs_states__user=request.user)),
+        ).annotate(
+            srs_rank=Case(
+                When(own_state__id__isnull=True, then=Value(_QUEUE_NEW)),
+                When(own_state__due_at__lte=now, then=Value(_QUEUE_DUE)),
+                default=Value(_QUEUE_LATER),
+                output_field=IntegerField(),
+            ),
+            srs_state_id=F("own_state__id"),
+            srs_level=F("own_state__srs_level"),
+            srs_due_at=F("own_state__due_at"),
+            srs_last_reviewed_at=F("own_state__last_reviewed_at"),
+            srs_reviews_count=F("own_state__reviews_count"),
+            srs_last_rating=F("own_state__last_rating"),
+        )
+        if only_due:
+            queue = queue.filter(srs_rank__lt=_QUEUE_LATER)
+        if token:
+            queue = queue.filter(
+                Q(srs_last_reviewed_at__isnull=True) | Q(srs_last_reviewed_at__lt=started_at)
+            )
+        if after is not None:
+            queue = queue.filter(_queue_after(after))
+
+        pages = list(
+            queue.prefetch_related("tags").order_by("srs_rank", "srs_due_at", "srs_state_id", "id")[
+                :limit
+            ]
+        )
+        cards = MicroArticleCardSerializer(pages, many=True).data
+
+        items = []
+        for page, card in zip(pages, cards):
+            if page.srs_state_id is None:
+                srs = {
+                    "level": 1,
+                    "due_at": now,
+                    "last_reviewed_at": None,
+                    "reviews_count": 0,
+                    "last_rating": "",
+                }
+            else:
+                srs = {
+                    "level": page.srs_level,
+                    "due_at": page.srs_due_at,
+                    "last_reviewed_at": page.srs_last_reviewed_at,
+                    "reviews_count": page.srs_reviews_count,
+                    "last_rating": page.srs_last_rating,
+                }
+            items.append({"card": card, "srs": srs})
+
+        if pages:
+            last = pages[-1]
+            after = (last.srs_rank, last.srs_due_at, last.srs_state_id, last.id)
+        session = _dump_queue_session(request.user, started_at, after)
+        serializer = SRSQueueSerializer({"session": session, "items": items})
+        return Response(serializer.data)
+
+
 class SRSCountsView(APIView):
     """Compteurs de la file de révision pour un scope donné.
 
@@ -431,34 +722,55 @@ class SRSCountsView(APIView):
         responses=SRSCountsSerializer,
     )
     def get(self, request):
-        candidates = _scope_candidates(
+        scope = request.query_params.get("scope")
+        deck_id = _parse_int(request.query_params.get("deck_id"))
+        deck_ids = _parse_int_list(request.query_params.get("deck_ids"))
+        candidates = _scope_candidates(request.user, scope=scope, deck_id=deck_id, deck_ids=deck_ids)
+
+        counts = srs_counts(
             request.user,
-            scope=request.query_params.get("scope"),
-            deck_id=_parse_int(request.query_params.get("deck_id")),
-            deck_ids=_parse_int_list(request.query_params.get("deck_ids")),
+            candidates,
+            signature=scope_signature(scope=scope, deck_id=deck_id, deck_ids=deck_ids),
         )
+        serializer = SRSCountsSerializer(counts)
+        return Response(serializer.data)
 
-        candidate_ids_qs = candidates.values_list("id", flat=True)
-        now = timezone.now()
 
-        states = CardSRSState.objects.filter(
-            user=request.user, microarticle_id__in=candidate_ids_qs
-        )
-        due = states.filter(due_at__lte=now).count()
-        seen = states.count()
-        total = candidates.count()
-        # Une carte jamais notée est servie immédiatement par `srs/next/`, même
-        # en mode « dues » : elle compte donc comme disponible, pas comme future.
-        new = max(0, total - seen)
-
-        serializer = SRSCountsSerializer(
-            {
-                "due": due,
-                "new": new,
-                "later": max(0, seen - due),
-                "total": total,
-            }
+class SRSForecastView(APIView):
+    """Charge de révision à venir : cartes dues par jour, dans le fuseau demandé.
+
+    Une requête groupée par jour local sur `CardSRSState.due_at`, mise en cache
+    comme `srs/counts/` (jusqu'à la prochaine revue ou au minuit suivant).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        operation_id="learning_srs_forecast",
+        parameters=[SRSForecastQuerySerializer],
+        responses=SRSForecastSerializer,
+    )
+    def get(self, request):
+        scope = request.query_params.get("scope")
+        deck_id = _parse_int(request.query_params.get("deck_id"))
+        deck_ids = _parse_int_list(request.query_params.get("deck_ids"))
+        candidates = _scope_candidates(request.user, scope=scope, deck_id=deck_id, deck_ids=deck_ids)
+
+        days = _parse_int(request.query_params.get("days")) or SRS_FORECAST_DEFAULT_DAYS
+        days = max(1, min(days, SRS_FORECAST_MAX_DAYS))
+        try:
+            tz = ZoneInfo(request.query_params.get("tz") or timezone.get_default_timezone_name())
+        except (ZoneInfoNotFoundError, ValueError, OSError):
+            raise DRFValidationError({"tz": "Unknown time zone."})
+
+        forecast = srs_forecast(
+            request.user,
+            candidates,
+            signature=scope_signature(scope=scope, deck_id=deck_id, deck_ids=deck_ids),
+            tz=tz,
+            days=days,
         )
+        serializer = SRSForecastSerializer(forecast)
         return Response(serializer.data)
 
 
@@ -480,40 +792,299 @@ class SRSReviewView(APIView):
         page = _public_microarticle_by_id(card_id, select_cover=True)
         if page is None:
             return Response({"detail": "Card not found."}, status=404)
+        scheduler = card_schedulers(request.user, [card_id])[card_id]
 
         now = timezone.now()
 
-        with transaction.atomic():
-            state = (
-                CardSRSState.objects.select_for_update()
-                .filter(user=request.user, microarticle_id=card_id)
-                .first()
-            )
-            if state is None:
-                state = CardSRSState(
-                    user=request.user,
-                    microarticle_id=card_id,
-                    srs_level=1,
-                    due_at=now,
+        if scheduler.level_only:
+            # Lecture, transition et écriture en une instruction (`learning.upserts`).
+            with transaction.atomic(), ReviewLogBuffer() as log:
+                state = upsert_srs_review(
+                    request.user.pk, card_id, rating=rating, scheduler=scheduler, now=now
                 )
-
-            update = next_leitner_state(level=state.srs_level, rating=rating, now=now)
-            state.srs_level = update.level
-            state.due_at = update.due_at
-            state.last_reviewed_at = now
-            state.reviews_count = int(state.reviews_count or 0) + 1
-            state.last_rating = rating
-            state.save()
+                log.add(state, rating=rating, reviewed_at=now)
+            # L'upsert ne passe pas par `save()` : pas de `post_save`.
+            invalidate_srs_counts(request.user.pk)
+        else:
+            with transaction.atomic(), ReviewLogBuffer() as log:
+                state = (
+                    CardSRSState.objects.select_for_update()
+                    .filter(user=request.user, microarticle_id=card_id)
+                    .first()
+                )
+                if state is None:
+                    state = CardSRSState(
+                        user=request.user,
+                        microarticle_id=card_id,
+                        srs_level=1,
+                        due_at=now,
+                    )
+
+                _apply_review(state, rating=rating, reviewed_at=now, scheduler=scheduler)
+                state.save()
+                log.add(state, rating=rating, reviewed_at=now)
 
         payload = {
             "card": MicroArticleCardSerializer(page).data,
-            "srs": {
-                "level": state.srs_level,
-                "due_at": state.due_at,
-                "last_reviewed_at": state.last_reviewed_at,
-                "reviews_count": state.reviews_count,
-                "last_rating": state.last_rating,
-            },
+            "srs": _srs_state_payload(state),
         }
         out = SRSNextSerializer(payload)
         return Response(out.data)
+
+
+class SRSReviewBatchView(APIView):
+    """Rejoue un lot de revues faites hors ligne par un appareil.
+
+    Les revues sont rejouées dans l'ordre de `reviewed_at` (plafonné à l'heure
+    serveur, comme la progression), contre les états verrouillés en une seule
+    requête, puis écrites en un `bulk_create` / `bulk_update`. Chaque revue est
+    journalisée dans `CardReview` avec son `client_id` : un lot renvoyé compte
+    ses revues déjà vues comme `duplicates` sans les réappliquer.
+
+    Une revue plus ancienne que la dernière revue connue de la carte (un autre
+    appareil a synchronisé entre-temps) est journalisée mais ne replanifie pas :
+    la réappliquer ferait reculer l'état sur une information périmée.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        operation_id="learning_srs_review_batch",
+        request=SRSReviewBatchSerializer,
+        responses=SRSReviewBatchResponseSerializer,
+    )
+    def post(self, request):
+        serializer = SRSReviewBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        device_id: str = serializer.validated_data.get("device_id", "")
+        now = timezone.now()
+
+        reviews: list[dict] = []
+        client_ids: set[str] = set()
+        for review in serializer.validated_data["reviews"]:
+            if review["client_id"] in client_ids:
+                continue
+            client_ids.add(review["client_id"])
+            reviews.append({**review, "reviewed_at": _clamp_to_now(review["reviewed_at"], now)})
+        duplicates = len(serializer.validated_data["reviews"]) - len(reviews)
+
+        public_ids = live_public_ids().intersection(review["card_id"] for review in reviews)
+        rejected = [review["client_id"] for review in reviews if review["card_id"] not in public_ids]
+        reviews = [review for review in reviews if review["card_id"] in public_ids]
+        reviews.sort(key=lambda review: review["reviewed_at"])
+
+        first_review_at: dict[int, datetime] = {}
+        for review in reviews:
+            first_review_at.setdefault(review["card_id"], review["reviewed_at"])
+        # Un lot mêle des cartes de decks différents : chacune garde son algorithme.
+        schedulers = card_schedulers(request.user, first_review_at)
+
+        applied = 0
+        with transaction.atomic(), ReviewLogBuffer() as log:
+            # Les états manquants sont créés d'abord (`ON CONFLICT DO NOTHING`,
+            # dans l'ordre des cartes) : `select_for_update` ne verrouille que des
+            # lignes existantes. Deux lots parallèles qui révisent une carte neuve
+            # se sérialisent ainsi sur l'index unique au lieu de lever une
+            # IntegrityError au second `bulk_create`.
+            missing = set(first_review_at) - set(
+                CardSRSState.objects.filter(
+                    user=request.user, microarticle_id__in=list(first_review_at)
+                ).values_list("microarticle_id", flat=True)
+            )
+            CardSRSState.objects.bulk_create(
+                [
+                    CardSRSState(
+                        user=request.user,
+                        microarticle_id=card_id,
+                        srs_level=1,
+                        due_at=first_review_at[card_id],
+                    )
+                    for card_id in sorted(missing)
+                ],
+                ignore_conflicts=True,
+            )
+            # Verrou pris avant de relire les `client_id` : un même lot envoyé
+            # deux fois en parallèle attend ici, puis voit les revues du premier.
+            states = {
+                state.microarticle_id: state
+                for state in CardSRSState.objects.select_for_update()
+                .filter(user=request.user, microarticle_id__in=list(first_review_at))
+                .order_by("id")
+            }
+            already_applied = set(
+                CardReview.objects.filter(
+                    user=request.user, client_id__in=[review["client_id"] for review in reviews]
+                ).values_list("client_id", flat=True)
+            )
+
+            updated: dict[int, CardSRSState] = {}
+            for review in reviews:
+                if review["client_id"] in already_applied:
+                    duplicates += 1
+                    continue
+
+                card_id = review["card_id"]
+                state = states[card_id]
+                stale = (
+                    state.last_reviewed_at is not None
+                    and review["reviewed_at"] < state.last_reviewed_at
+                )
+                if not stale:
+                    _apply_review(
+                        state,
+                        rating=review["rating"],
+                        reviewed_at=review["reviewed_at"],
+                        scheduler=schedulers[card_id],
+                    )
+                    updated[card_id] = state
+                    applied += 1
+
+                log.add(
+                    state,
+                    rating=review["rating"],
+                    reviewed_at=review["reviewed_at"],
+                    client_id=review["client_id"],
+                    device_id=device_id,
+                )
+
+            # Carte dont toutes les revues étaient des doublons : l'état créé
+            # plus haut n'a jamais été révisé, il est retiré.
+            unused = [
+                states[card_id].pk
+                for card_id in missing
+                if states[card_id].last_reviewed_at is None
+            ]
+            if unused:
+                CardSRSState.objects.filter(pk__in=unused).delete()
+
+            # `bulk_update` ne passe pas par `save()` : `auto_now` est posé à la main.
+            for state in updated.values():
+                state.updated_at = now
+            CardSRSState.objects.bulk_update(
+                updated.values(),
+                [
+                    "srs_level",
+                    "ease",
+                    "interval_days",
+                    "due_at",
+                    "last_reviewed_at",
+                    "reviews_count",
+                    "last_rating",
+                    "updated_at",
+                ],
+            )
+
+        # `bulk_create` / `bulk_update` n'émettent pas `post_save`.
+        invalidate_srs_counts(request.user.pk)
+
+        out = SRSReviewBatchResponseSerializer(
+            {
+                "applied": applied,
+                "duplicates": duplicates,
+                "rejected": rejected,
+                "states": [
+                    {"card_id": card_id, "srs": _srs_state_payload(updated[card_id])}
+                    for card_id in sorted(updated)
+                ],
+            }
+        )
+        return Response(out.data)
+
+
+class LearningEventBatchView(APIView):
+    """Reçoit un lot d'événements d'apprentissage d'un appareil (voir `learning.events`).
+
+    Idempotent par `client_id` : un lot renvoyé compte ses événements déjà reçus
+    comme `duplicates`. Réponse 202 : les événements sont enregistrés, mais
+    rien de ce que lit l'application n'en dépend encore.
+    """
+
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [UserThrottle, LearningEventsThrottle]
+
+    @extend_schema(
+        operation_id="learning_events_batch",
+        request=LearningEventBatchSerializer,
+        responses={202: LearningEventBatchResponseSerializer},
+    )
+    def post(self, request):
+        serializer = LearningEventBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = ingest_events(
+            request.user,
+            serializer.validated_data["events"],
+            device_id=serializer.validated_data.get("device_id", ""),
+        )
+        return Response(LearningEventBatchResponseSerializer(result).data, status=202)
+
+
+class LearningStatsView(APIView):
+    """Activité jour par jour sur une période, lue dans les agrégats `LearningDay`.
+
+    Une requête sur l'index `(user, day)`, au plus une ligne par jour : un an
+    d'historique coûte quelques centaines de lignes, quel que soit le volume de
+    revues ou de fiches derrière. Jours du fuseau du serveur (voir
+    `learning.rollups`).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        operation_id="learning_stats_daily",
+        parameters=[LearningStatsQuerySerializer],
+        responses=LearningStatsSerializer,
+    )
+    def get(self, request):
+        days = _parse_int(request.query_params.get("days")) or LEARNING_STATS_DEFAULT_DAYS
+        days = max(1, min(days, LEARNING_STATS_MAX_DAYS))
+        end = timezone.localdate()
+        start = end - timedelta(days=days - 1)
+
+        rows = list(
+            LearningDay.objects.filter(user=request.user, day__range=(start, end))
+            .order_by("day")
+            .values("day", *ROLLUP_FIELDS)
+        )
+        totals = {name: sum(row[name] for row in rows) for name in ROLLUP_FIELDS}
+        totals["active_days"] = len(rows)
+
+        serializer = LearningStatsSerializer({"start": start, "end": end, "days": rows, "totals": totals})
+        return Response(serializer.data)
+
+
+class AchievementsView(APIView):
+    """Série en cours et badges, lus dans l'état tenu à jour par incréments.
+
+    Deux lectures par clé (`AchievementState`, `EarnedBadge`), aucun agrégat :
+    voir `learning.achievements`.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(operation_id="learning_achievements", responses=AchievementsSerializer)
+    def get(self, request):
+        state = AchievementState.objects.filter(user=request.user).first() or AchievementState()
+        earned = dict(EarnedBadge.objects.filter(user=request.user).values_list("code", "earned_on"))
+
+        serializer = AchievementsSerializer(
+            {
+                "current_streak": current_streak(state, timezone.localdate()),
+                "longest_streak": state.longest_streak,
+                "last_active_day": state.last_active_day,
+                "cards_read": state.cards_read,
+                "reviews_count": state.reviews_count,
+                "reviews_know": state.reviews_know,
+                "badges": [
+                    {
+                        "code": rule.code,
+                        "label": rule.label,
+                        "threshold": rule.threshold,
+                        "earned_on": earned.get(rule.code),
+                    }
+                    for rule in BADGES
+                ],
+            }
+        )
+        return Response(serializer.data)
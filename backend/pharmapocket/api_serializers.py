@@ -2,8 +2,10 @@
 
 from rest_framework import serializers
 
+from learning.srs import SCHEDULERS
 
 LANDING_TARGETS = ["start", "discover", "cards", "review", "quiz"]
+SRS_SCHEDULERS = list(SCHEDULERS)
 
 
 class DetailResponseSerializer(serializers.Serializer):
@@ -40,6 +42,7 @@ class DeleteAccountSerializer(serializers.Serializer):
 class UserPreferencesSerializer(serializers.Serializer):
     landing_redirect_enabled = serializers.BooleanField()
     landing_redirect_target = serializers.ChoiceField(choices=LANDING_TARGETS)
+    srs_scheduler = serializers.ChoiceField(choices=SRS_SCHEDULERS)
 
 
 class UserPreferencesUpdateSerializer(serializers.Serializer):
@@ -48,3 +51,8 @@ class UserPreferencesUpdateSerializer(serializers.Serializer):
         choices=LANDING_TARGETS,
         required=False,
     )
+    srs_scheduler = serializers.ChoiceField(
+        choices=SRS_SCHEDULERS,
+        required=False,
+        help_text="Changer d'algorithme replanifie aussitôt les cartes déjà revues.",
+    )
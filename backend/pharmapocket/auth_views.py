@@ -8,6 +8,8 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from learning.tasks import reschedule_user_states
+from learning.srs import SCHEDULERS
 from pharmapocket.throttling import SensitiveBurstThrottle, SensitiveSustainedThrottle
 from pharmapocket.api_serializers import (
     AccountSummarySerializer,
@@ -173,6 +175,7 @@ class PreferencesView(APIView):
             {
                 "landing_redirect_enabled": bool(getattr(user, "landing_redirect_enabled", False)),
                 "landing_redirect_target": getattr(user, "landing_redirect_target", "start"),
+                "srs_scheduler": user.srs_scheduler,
             }
         )
 
@@ -205,14 +208,33 @@ class PreferencesView(APIView):
             user.landing_redirect_target = target
             update_fields.append("landing_redirect_target")
 
+        reschedule = False
+        if "srs_scheduler" in payload:
+            scheduler = payload.get("srs_scheduler")
+            if not isinstance(scheduler, str) or scheduler not in SCHEDULERS:
+                return Response(
+                    {"srs_scheduler": f"Must be one of: {', '.join(sorted(SCHEDULERS))}"},
+                    status=400,
+                )
+            reschedule = scheduler != user.srs_scheduler
+            user.srs_scheduler = scheduler
+            update_fields.append("srs_scheduler")
+
         if not update_fields:
             return Response({"detail": "No fields to update"}, status=400)
 
-        user.save(update_fields=update_fields)
+        with transaction.atomic():
+            user.save(update_fields=update_fields)
+            if reschedule:
+                # Les échéances en cours ont été calculées par l'ancien algorithme ;
+                # les cartes d'un deck qui impose le sien n'en changent pas. En tâche
+                # de fond, mise en file au commit : l'historique peut être long.
+                reschedule_user_states.enqueue(user.pk)
 
         return Response(
             {
                 "landing_redirect_enabled": bool(user.landing_redirect_enabled),
                 "landing_redirect_target": user.landing_redirect_target,
+                "srs_scheduler": user.srs_scheduler,
             }
         )
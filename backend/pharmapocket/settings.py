@@ -318,6 +318,7 @@ REST_FRAMEWORK = {
         "sensitive_sustained": _throttle_rate(
             "DJANGO_THROTTLE_RATE_SENSITIVE_SUSTAINED", default="30/hour"
         ),
+        "learning_events": _throttle_rate("DJANGO_THROTTLE_RATE_LEARNING_EVENTS", default="60/min"),
     },
 }
 
@@ -330,6 +331,7 @@ SPECTACULAR_SETTINGS = {
         "CardType": ["standard", "recap", "detail"],
         "SrsRating": ["know", "medium", "again"],
         "SrsScope": ["all_decks", "deck", "decks", "all_cards"],
+        "SrsScheduler": ["leitner", "sm2"],
     },
 }
 
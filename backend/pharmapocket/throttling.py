@@ -101,3 +101,9 @@ class SensitiveSustainedThrottle(_ProxyAwareThrottleMixin, UserRateThrottle):
     """Long-window budget, so a slow brute-force cannot ride under the burst limit."""
 
     scope = "sensitive_sustained"
+
+
+class LearningEventsThrottle(_ProxyAwareThrottleMixin, UserRateThrottle):
+    """Per-account budget for event batches, so a retry loop cannot flood the event table."""
+
+    scope = "learning_events"
@@ -1,6 +1,11 @@
 from django.urls import include, path
 
-from content.public_views import TagListView, TaxonomyResolveView, TaxonomyTreeView
+from content.public_views import (
+    TagDirectoryView,
+    TagListView,
+    TaxonomyResolveView,
+    TaxonomyTreeView,
+)
 from pharmapocket.auth_views import AccountView, CsrfView, DeleteAccountView, MeView, PreferencesView
 
 urlpatterns = [
@@ -16,6 +21,7 @@ urlpatterns = [
         name="taxonomy-resolve",
     ),
     path("tags/", TagListView.as_view(), name="tag-list"),
+    path("tags/directory/", TagDirectoryView.as_view(), name="tag-directory"),
     path("content/", include("content.urls")),
     path("learning/", include("learning.urls")),
     path("", include("product.urls")),
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_alter_user_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='srs_scheduler',
+            field=models.CharField(choices=[('leitner', 'Leitner'), ('sm2', 'SM-2')], default='leitner', max_length=16),
+        ),
+    ]
@@ -3,6 +3,8 @@ from django.db import models
 from django.db.models import Q
 from django.db.models.functions import Lower
 
+from learning.srs import DEFAULT_SCHEDULER, SCHEDULER_CHOICES
+
 
 class User(AbstractUser):
     class HomeRedirectTarget(models.TextChoices):
@@ -21,6 +23,14 @@ class User(AbstractUser):
 
     pseudo = models.CharField(max_length=60, blank=True, default="")
 
+    # Algorithme de révision espacée (`learning.srs.SCHEDULERS`) ; un deck peut
+    # le surcharger via `Deck.srs_scheduler`.
+    srs_scheduler = models.CharField(
+        max_length=16,
+        choices=SCHEDULER_CHOICES,
+        default=DEFAULT_SCHEDULER,
+    )
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
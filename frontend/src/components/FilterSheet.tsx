@@ -17,7 +17,7 @@ import {
 import { ScrollArea } from "@/components/ui/scroll-area";
 import { Separator } from "@/components/ui/separator";
 import { Badge } from "@/components/ui/badge";
-import { useTags, useTaxonomyTree } from "@/lib/queries";
+import { useTagDirectory, useTaxonomyTree } from "@/lib/queries";
 import { TaxonomyNode } from "@/lib/types";
 
 type Taxonomy = "pharmacologie" | "maladies" | "classes" | "theme" | "medicament";
@@ -110,7 +110,7 @@ export function FilterSheet({ basePath = "/discover" }: { basePath?: string }) {
   const currentQ = sp.get("q") ?? "";
 
   const [tagQuery, setTagQuery] = useState("");
-  const { data: tags = [], isPending: loadingTags } = useTags(tagQuery, 200);
+  const { data: tags = [], isPending: loadingTags } = useTagDirectory(tagQuery, 200);
 
   const [taxonomy, setTaxonomy] = useState<Taxonomy>(currentTaxonomy ?? "pharmacologie");
   const { data: tree, isPending: loadingTree } = useTaxonomyTree(taxonomy);
@@ -188,7 +188,7 @@ export function FilterSheet({ basePath = "/discover" }: { basePath?: string }) {
                     onCheckedChange={() => toggleTag(t.slug)}
                   />
                   <span className="truncate">{t.name}</span>
-                  <span className="ml-auto text-xs text-muted-foreground">{t.slug}</span>
+                  <span className="ml-auto text-xs text-muted-foreground">{t.usage_count}</span>
                 </label>
               ))}
             </div>
@@ -72,6 +72,22 @@ export async function adminPackReorder(
   );
 }
 
+/** Place une carte du pack entre `afterId` et `beforeId` (ids de fiches, null = bord de liste). */
+export async function adminPackMoveCard(
+  packId: number,
+  microarticleId: number,
+  neighbours: { afterId?: number | null; beforeId?: number | null }
+): Promise<{ ok: boolean; updated: number }> {
+  return apiJson<{ ok: boolean; updated: number }>(
+    adminPackPath(packId, "cards/move/"),
+    jsonBody("POST", {
+      microarticle_id: microarticleId,
+      after_id: neighbours.afterId ?? null,
+      before_id: neighbours.beforeId ?? null,
+    })
+  );
+}
+
 export async function adminPackRemoveCard(
   packId: number,
   cardId: number
@@ -1,5 +1,6 @@
-import { apiGet, apiJson, jsonBody } from "@/lib/api/client";
+import { apiGet, apiJson, getApiBaseUrl, jsonBody } from "@/lib/api/client";
 import type {
+  CardDecksMap,
   DeckCardsResponse,
   DeckMembership,
   DeckSummary,
@@ -80,12 +81,60 @@ export async function bulkAddCardsToDeck(
   );
 }
 
+export type DeckExportFormat = "json" | "csv" | "anki";
+
+/** URL du fichier exporté (téléchargement direct, la réponse est envoyée en flux). */
+export function deckExportUrl(deckId: number, format: DeckExportFormat): string {
+  return `${getApiBaseUrl()}${deckPath(deckId, `export/${format}/`)}`;
+}
+
+/** Ajoute au deck les fiches d'un fichier exporté (.json, .csv ou .txt Anki). */
+export async function importDeckFile(
+  deckId: number,
+  file: File,
+  format?: DeckExportFormat
+): Promise<{ added: number; already_present: number; not_found: number }> {
+  const fd = new FormData();
+  fd.append("file", file);
+  if (format) fd.append("format", format);
+
+  // FormData : pas de Content-Type explicite, le navigateur pose la boundary.
+  return apiJson<{ added: number; already_present: number; not_found: number }>(
+    deckPath(deckId, "import/"),
+    { method: "POST", body: fd }
+  );
+}
+
 export async function fetchCardDecks(cardId: number): Promise<DeckMembership[]> {
   return apiGet<DeckMembership[]>(
     `/api/v1/content/cards/${encodeURIComponent(String(cardId))}/decks/`
   );
 }
 
+/** Taille de lot acceptée par `POST /cards/decks/` : au-delà, l'API renvoie 400. */
+const CARD_DECKS_MAX_IDS = 200;
+
+/** Decks de l'utilisateur contenant chaque carte, en un appel par lot de 200.
+ *  Une carte absente de tout deck (ou non publiée) vaut une liste vide. */
+export async function fetchCardDecksBatch(cardIds: number[]): Promise<CardDecksMap> {
+  const cleaned = [...new Set(cardIds)];
+
+  const batches: number[][] = [];
+  for (let i = 0; i < cleaned.length; i += CARD_DECKS_MAX_IDS) {
+    batches.push(cleaned.slice(i, i + CARD_DECKS_MAX_IDS));
+  }
+  if (batches.length === 0) return { items: {} };
+
+  const responses = await Promise.all(
+    batches.map((batch) =>
+      apiJson<CardDecksMap>("/api/v1/content/cards/decks/", jsonBody("POST", { card_ids: batch }))
+    )
+  );
+  const items: CardDecksMap["items"] = {};
+  for (const response of responses) Object.assign(items, response.items);
+  return { items };
+}
+
 export async function updateCardDecks(
   cardId: number,
   deckIds: number[]
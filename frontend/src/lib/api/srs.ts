@@ -1,10 +1,17 @@
 import { apiGet, apiJson, buildQuery, jsonBody } from "@/lib/api/client";
 import type {
+  LearningEventBatch,
+  LearningEventBatchResponse,
   LessonProgress,
+  LessonProgressChanges,
   LessonProgressUpdate,
   SrsCounts,
+  SrsForecast,
   SrsNext,
+  SrsQueue,
   SrsRating,
+  SrsReviewBatch,
+  SrsReviewBatchResponse,
   operations,
 } from "@/lib/types";
 
@@ -41,6 +48,27 @@ export async function fetchSrsNext(query: SrsNextQuery): Promise<SrsNext> {
   );
 }
 
+export type SrsQueueQuery = Omit<SrsNextQuery, "exclude_ids"> & {
+  limit?: number;
+  /** Jeton renvoyé par le lot précédent : le serveur ne resservira pas ses cartes. */
+  session?: string | null;
+};
+
+export async function fetchSrsQueue(query: SrsQueueQuery): Promise<SrsQueue> {
+  const deckIdsValue = query.deck_ids?.length ? query.deck_ids.join(",") : undefined;
+
+  return apiGet<SrsQueue>(
+    `/api/v1/learning/srs/queue/${buildQuery({
+      scope: query.scope,
+      deck_id: query.deck_id != null ? String(query.deck_id) : undefined,
+      deck_ids: deckIdsValue,
+      only_due: query.only_due === false ? "false" : "true",
+      limit: query.limit != null ? String(query.limit) : undefined,
+      session: query.session ?? undefined,
+    })}`
+  );
+}
+
 /**
  * Portée d'un comptage : les mêmes cartes que `fetchSrsNext`, sans `only_due`.
  * Les exclusions n'en font pas partie non plus — elles décrivent une session en
@@ -60,6 +88,27 @@ export async function fetchSrsCounts(query: SrsCountsQuery): Promise<SrsCounts>
   );
 }
 
+export type SrsForecastQuery = SrsCountsQuery & {
+  days?: number;
+  /** Fuseau IANA des jours renvoyés ; par défaut celui du navigateur. */
+  tz?: string;
+};
+
+/** Cartes dues par jour (retard compris dans le premier), pour le graphique de charge. */
+export async function fetchSrsForecast(query: SrsForecastQuery): Promise<SrsForecast> {
+  const deckIdsValue = query.deck_ids?.length ? query.deck_ids.join(",") : undefined;
+
+  return apiGet<SrsForecast>(
+    `/api/v1/learning/srs/forecast/${buildQuery({
+      scope: query.scope,
+      deck_id: query.deck_id != null ? String(query.deck_id) : undefined,
+      deck_ids: deckIdsValue,
+      days: query.days != null ? String(query.days) : undefined,
+      tz: query.tz ?? Intl.DateTimeFormat().resolvedOptions().timeZone,
+    })}`
+  );
+}
+
 export async function postSrsReview(input: {
   card_id: number;
   rating: SrsRating;
@@ -67,12 +116,30 @@ export async function postSrsReview(input: {
   return apiJson<SrsNext>(`/api/v1/learning/srs/review/`, jsonBody("POST", input));
 }
 
+/**
+ * Rejoue des revues faites hors ligne. Chaque revue porte un `client_id` stable :
+ * renvoyer le même lot après une coupure est sans effet (`duplicates`).
+ */
+export async function postSrsReviewBatch(input: SrsReviewBatch): Promise<SrsReviewBatchResponse> {
+  return apiJson<SrsReviewBatchResponse>(
+    "/api/v1/learning/srs/review/batch/",
+    jsonBody("POST", input)
+  );
+}
+
 // -----------------------------------------------------------------------------
 // Progression des leçons (miroir serveur du store local)
 // -----------------------------------------------------------------------------
 
-export async function fetchLessonProgress(): Promise<LessonProgress[]> {
-  return apiGet<LessonProgress[]>("/api/v1/learning/progress/");
+/**
+ * Sans `since`, toute la progression (`full`). Avec le `sync_token` d'une
+ * réponse précédente, seulement ce qui a changé depuis, plus les fiches
+ * retirées (`removed`) à effacer localement.
+ */
+export async function fetchLessonProgress(since?: string | null): Promise<LessonProgressChanges> {
+  return apiGet<LessonProgressChanges>(
+    `/api/v1/learning/progress/${buildQuery({ since: since ?? undefined })}`
+  );
 }
 
 export async function patchLessonProgress(
@@ -94,3 +161,11 @@ export async function importLessonProgress(input: {
     jsonBody("POST", input)
   );
 }
+
+// -----------------------------------------------------------------------------
+// Événements d'apprentissage (journal côté serveur)
+// -----------------------------------------------------------------------------
+
+export async function postLearningEvents(input: LearningEventBatch): Promise<LearningEventBatchResponse> {
+  return apiJson<LearningEventBatchResponse>("/api/v1/learning/events/", jsonBody("POST", input));
+}
@@ -103,3 +103,19 @@ export async function reorderSubjectCards(
 ): Promise<{ ok: boolean }> {
   return apiJson(subjectPath(subjectSlug, "cards/reorder/"), jsonBody("POST", { order: cardIds }));
 }
+
+/** Place une carte entre `afterId` et `beforeId` (null = bord de liste) sans renvoyer toute la liste. */
+export async function moveSubjectCard(
+  subjectSlug: string,
+  cardId: number,
+  neighbours: { afterId?: number | null; beforeId?: number | null }
+): Promise<{ ok: boolean; updated: number }> {
+  return apiJson<{ ok: boolean; updated: number }>(
+    subjectPath(subjectSlug, "cards/move/"),
+    jsonBody("POST", {
+      card_id: cardId,
+      after_id: neighbours.afterId ?? null,
+      before_id: neighbours.beforeId ?? null,
+    })
+  );
+}
@@ -1,5 +1,5 @@
 import { apiGet, buildQuery } from "@/lib/api/client";
-import type { TagPayload, TaxonomyTreeResponse } from "@/lib/types";
+import type { TagDirectoryEntry, TagPayload, TaxonomyTreeResponse } from "@/lib/types";
 
 export type TaxonomyName = "pharmacologie" | "maladies" | "classes" | "theme" | "medicament";
 
@@ -12,3 +12,15 @@ export async function fetchTags(q?: string, limit = 200): Promise<TagPayload[]>
     `/api/v1/tags/${buildQuery({ q: q?.trim() ? q.trim() : undefined, limit: String(limit) })}`
   );
 }
+
+export type TagDirectorySort = "popular" | "name";
+
+export async function fetchTagDirectory(
+  q?: string,
+  limit = 50,
+  sort: TagDirectorySort = "popular"
+): Promise<TagDirectoryEntry[]> {
+  return apiGet<TagDirectoryEntry[]>(
+    `/api/v1/tags/directory/${buildQuery({ q: q?.trim() ? q.trim() : undefined, sort, limit: String(limit) })}`
+  );
+}
@@ -27,6 +27,8 @@ type LocalProgressState = {
   lessons: Record<string, LocalLessonProgress>;
   pending: string[];
   last_sync_at: string | null;
+  /** Jeton opaque du serveur : la prochaine synchro ne rapatrie que le delta. */
+  sync_token: string | null;
 };
 
 const STORAGE_KEY = "pp_progress_v1";
@@ -68,6 +70,7 @@ function defaultState(): LocalProgressState {
     lessons: {},
     pending: [],
     last_sync_at: null,
+    sync_token: null,
   };
 }
 
@@ -103,6 +106,7 @@ function normalizeState(raw: Partial<LocalProgressState> | null): LocalProgressS
     lessons,
     pending: Array.isArray(raw.pending) ? Array.from(new Set(raw.pending.map(String))) : [],
     last_sync_at: raw.last_sync_at ?? null,
+    sync_token: raw.sync_token ?? null,
   };
 }
 
@@ -355,9 +359,28 @@ export function mergeServerLessons(rows: LessonProgress[]): void {
   }
 }
 
-export function setLastSyncAt(value: string | null): void {
+/** Fiches dépubliées ou supprimées côté serveur, sauf modification locale en attente. */
+export function removeServerLessons(lessonIds: number[]): void {
+  const state = readState();
+  let changed = false;
+
+  for (const lessonId of lessonIds) {
+    const id = String(lessonId);
+    if (id in state.lessons && !state.pending.includes(id)) {
+      delete state.lessons[id];
+      changed = true;
+    }
+  }
+
+  if (changed) {
+    writeState(state);
+  }
+}
+
+export function setLastSyncAt(value: string | null, syncToken: string | null = null): void {
   const state = readState();
   state.last_sync_at = value;
+  state.sync_token = syncToken;
   writeState(state);
 }
 
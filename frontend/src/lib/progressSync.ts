@@ -1,9 +1,11 @@
+import { isApiError } from "@/lib/api/client";
 import { fetchLessonProgress, importLessonProgress } from "@/lib/api/srs";
 import {
   clearPendingIfUnchanged,
   exportProgressPayload,
   getLocalProgressState,
   mergeServerLessons,
+  removeServerLessons,
   setLastSyncAt,
 } from "@/lib/progressStore";
 
@@ -48,9 +50,14 @@ export async function syncProgress(reason: string): Promise<void> {
       clearPendingIfUnchanged(payload.lessons);
     }
 
-    const serverRows = await fetchLessonProgress();
-    mergeServerLessons(serverRows);
-    setLastSyncAt(new Date().toISOString());
+    const changes = await fetchLessonProgress(getLocalProgressState().sync_token).catch((e) => {
+      // Jeton refusé (format périmé, autre serveur) : on repart d'une synchro complète.
+      if (isApiError(e) && e.status === 400) return fetchLessonProgress();
+      throw e;
+    });
+    mergeServerLessons(changes.lessons);
+    removeServerLessons(changes.removed);
+    setLastSyncAt(new Date().toISOString(), changes.sync_token);
   } catch {
     // keep pending entries for next sync attempt
   } finally {
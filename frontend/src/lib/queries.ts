@@ -74,7 +74,13 @@ import {
   type SrsCountsQuery,
   type SrsNextQuery,
 } from "@/lib/api/srs";
-import { fetchTags, fetchTaxonomyTree, type TaxonomyName } from "@/lib/api/taxonomies";
+import {
+  fetchTagDirectory,
+  fetchTags,
+  fetchTaxonomyTree,
+  type TagDirectorySort,
+  type TaxonomyName,
+} from "@/lib/api/taxonomies";
 import { thumbOverridesQueryKey, thumbOverridesQueryOptions } from "@/lib/thumbOverridesQuery";
 import type {
   AccountSummary,
@@ -112,6 +118,8 @@ export const queryKeys = {
 
   taxonomyTree: (taxonomy: Taxonomy) => ["taxonomy-tree", taxonomy] as const,
   tags: (q: string | undefined, limit: number) => ["tags", q?.trim() || "", limit] as const,
+  tagDirectory: (q: string | undefined, limit: number, sort: TagDirectorySort) =>
+    ["tag-directory", q?.trim() || "", limit, sort] as const,
 
   srsNext: (query: SrsNextQuery) => ["srs-next", query] as const,
   srsCounts: (query: SrsCountsQuery) =>
@@ -275,6 +283,14 @@ export function useTags(q?: string, limit = 200) {
   });
 }
 
+export function useTagDirectory(q?: string, limit = 50, sort: TagDirectorySort = "popular") {
+  return useQuery({
+    queryKey: queryKeys.tagDirectory(q, limit, sort),
+    queryFn: () => fetchTagDirectory(q, limit, sort),
+    staleTime: 5 * 60_000,
+  });
+}
+
 export function useFeed(source: FeedSource, query: FeedQuery) {
   return useInfiniteQuery<PaginatedMicroArticleListItemList>({
     queryKey: queryKeys.feed(source, query),
@@ -219,6 +219,27 @@ export interface paths {
         patch?: never;
         trace?: never;
     };
+    "/api/v1/content/admin/packs/{pack_id}/cards/move/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        get?: never;
+        put?: never;
+        /**
+         * @description Déplace une carte du pack entre deux autres, sans réécrire la liste.
+         *
+         *     Une seule ligne écrite dans le cas courant ; voir `content.sort_keys`.
+         */
+        post: operations["admin_pack_card_move"];
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/v1/content/admin/packs/{pack_id}/cards/reorder/": {
         parameters: {
             query?: never;
@@ -305,6 +326,28 @@ export interface paths {
         patch?: never;
         trace?: never;
     };
+    "/api/v1/content/cards/decks/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        get?: never;
+        put?: never;
+        /**
+         * @description Decks de l'utilisateur contenant chacune des fiches demandées.
+         *
+         *     Pendant groupé de `GET cards/<id>/decks/` pour une page de cartes : une
+         *     fiche inconnue, non publiée ou absente de tout deck vaut une liste vide.
+         */
+        post: operations["card_deck_batch"];
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/v1/content/decks/": {
         parameters: {
             query?: never;
@@ -401,6 +444,50 @@ export interface paths {
         patch?: never;
         trace?: never;
     };
+    "/api/v1/content/decks/{deck_id}/export/{fmt}/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        /**
+         * @description Fichier des cartes d'un deck utilisateur ou d'un pack publié, envoyé en flux.
+         *
+         *     `fmt` : `json`, `csv` ou `anki` (texte importable par Anki) ; voir
+         *     `content.deck_transfer`.
+         */
+        get: operations["deck_export"];
+        put?: never;
+        post?: never;
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
+    "/api/v1/content/decks/{deck_id}/import/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        get?: never;
+        put?: never;
+        /**
+         * @description Ajoute à un deck utilisateur les fiches d'un fichier exporté (JSON, CSV ou Anki).
+         *
+         *     Le fichier est lu en flux et les cartes ajoutées par tranches : une erreur
+         *     de lecture en cours de route laisse en place les tranches déjà ajoutées.
+         */
+        post: operations["deck_import"];
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/v1/content/decks/{deck_id}/progress/": {
         parameters: {
             query?: never;
@@ -646,6 +733,23 @@ export interface paths {
         patch: operations["subject_card_update"];
         trace?: never;
     };
+    "/api/v1/content/subjects/{slug}/cards/move/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        get?: never;
+        put?: never;
+        /** @description Move one card between two others within a subject (admin only); see `content.sort_keys`. */
+        post: operations["subject_card_move"];
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/v1/content/subjects/{slug}/cards/reorder/": {
         parameters: {
             query?: never;
@@ -695,6 +799,51 @@ export interface paths {
         patch?: never;
         trace?: never;
     };
+    "/api/v1/learning/achievements/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        /**
+         * @description Série en cours et badges, lus dans l'état tenu à jour par incréments.
+         *
+         *     Deux lectures par clé (`AchievementState`, `EarnedBadge`), aucun agrégat :
+         *     voir `learning.achievements`.
+         */
+        get: operations["learning_achievements"];
+        put?: never;
+        post?: never;
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
+    "/api/v1/learning/events/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        get?: never;
+        put?: never;
+        /**
+         * @description Reçoit un lot d'événements d'apprentissage d'un appareil (voir `learning.events`).
+         *
+         *     Idempotent par `client_id` : un lot renvoyé compte ses événements déjà reçus
+         *     comme `duplicates`. Réponse 202 : les événements sont enregistrés, mais
+         *     rien de ce que lit l'application n'en dépend encore.
+         */
+        post: operations["learning_events_batch"];
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/v1/learning/progress/": {
         parameters: {
             query?: never;
@@ -702,6 +851,11 @@ export interface paths {
             path?: never;
             cookie?: never;
         };
+        /**
+         * @description Miroir serveur de la progression, complet ou différentiel (`since`).
+         *
+         *     Voir `learning.progress_sync`.
+         */
         get: operations["learning_progress_list"];
         put?: never;
         post?: never;
@@ -736,6 +890,13 @@ export interface paths {
         };
         get?: never;
         put?: never;
+        /**
+         * @description Importe la progression accumulee hors ligne, en un nombre fixe de requetes.
+         *
+         *     Meme merge que le PATCH unitaire (`_merge_progress`), applique en memoire
+         *     contre les lignes verrouillees en une requete, puis ecrit en un
+         *     `bulk_create` / `bulk_update`.
+         */
         post: operations["learning_progress_import"];
         delete?: never;
         options?: never;
@@ -767,6 +928,28 @@ export interface paths {
         patch?: never;
         trace?: never;
     };
+    "/api/v1/learning/srs/forecast/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        /**
+         * @description Charge de révision à venir : cartes dues par jour, dans le fuseau demandé.
+         *
+         *     Une requête groupée par jour local sur `CardSRSState.due_at`, mise en cache
+         *     comme `srs/counts/` (jusqu'à la prochaine revue ou au minuit suivant).
+         */
+        get: operations["learning_srs_forecast"];
+        put?: never;
+        post?: never;
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/v1/learning/srs/next/": {
         parameters: {
             query?: never;
@@ -783,6 +966,34 @@ export interface paths {
         patch?: never;
         trace?: never;
     };
+    "/api/v1/learning/srs/queue/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        /**
+         * @description Les N prochaines cartes de révision, dans l'ordre de `srs/next/`.
+         *
+         *     Une seule requête classe tout le vivier : l'état SRS de l'utilisateur est
+         *     joint par `FilteredRelation`, puis un rang (due / jamais vue / à venir) sert
+         *     de première clé de tri. Le jeton `session` est signé, sans état serveur, et
+         *     de taille fixe : il porte l'heure de début de la session, qui fige les rangs,
+         *     et la clé de tri de la dernière carte servie, d'où repart l'appel suivant.
+         *     Une carte revue depuis le début de la session change de clé : elle est
+         *     écartée pour ne pas revenir plus loin dans la file. Une carte qui devient
+         *     due en cours de session attend la session suivante.
+         */
+        get: operations["learning_srs_queue"];
+        put?: never;
+        post?: never;
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/v1/learning/srs/review/": {
         parameters: {
             query?: never;
@@ -799,6 +1010,59 @@ export interface paths {
         patch?: never;
         trace?: never;
     };
+    "/api/v1/learning/srs/review/batch/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        get?: never;
+        put?: never;
+        /**
+         * @description Rejoue un lot de revues faites hors ligne par un appareil.
+         *
+         *     Les revues sont rejouées dans l'ordre de `reviewed_at` (plafonné à l'heure
+         *     serveur, comme la progression), contre les états verrouillés en une seule
+         *     requête, puis écrites en un `bulk_create` / `bulk_update`. Chaque revue est
+         *     journalisée dans `CardReview` avec son `client_id` : un lot renvoyé compte
+         *     ses revues déjà vues comme `duplicates` sans les réappliquer.
+         *
+         *     Une revue plus ancienne que la dernière revue connue de la carte (un autre
+         *     appareil a synchronisé entre-temps) est journalisée mais ne replanifie pas :
+         *     la réappliquer ferait reculer l'état sur une information périmée.
+         */
+        post: operations["learning_srs_review_batch"];
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
+    "/api/v1/learning/stats/daily/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        /**
+         * @description Activité jour par jour sur une période, lue dans les agrégats `LearningDay`.
+         *
+         *     Une requête sur l'index `(user, day)`, au plus une ligne par jour : un an
+         *     d'historique coûte quelques centaines de lignes, quel que soit le volume de
+         *     revues ou de fiches derrière. Jours du fuseau du serveur (voir
+         *     `learning.rollups`).
+         */
+        get: operations["learning_stats_daily"];
+        put?: never;
+        post?: never;
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/v1/micro/{slug}/": {
         parameters: {
             query?: never;
@@ -847,6 +1111,28 @@ export interface paths {
         patch?: never;
         trace?: never;
     };
+    "/api/v1/tags/directory/": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        /**
+         * @description Tags utilisés par les cartes publiées, avec leur nombre de cartes.
+         *
+         *     Servi depuis l'annuaire en cache (`content.tags`) : la recherche est un
+         *     préfixe de mot, insensible aux accents (`?q=diab` trouve « Diabète »).
+         */
+        get: operations["tag_directory"];
+        put?: never;
+        post?: never;
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/v1/taxonomies/{taxonomy}/resolve/": {
         parameters: {
             query?: never;
@@ -889,6 +1175,18 @@ export interface components {
             pseudo: string;
             has_usable_password: boolean;
         };
+        Achievements: {
+            /** @description Jours consécutifs d'activité jusqu'à aujourd'hui ou hier ; 0 si la série est rompue. */
+            current_streak: number;
+            longest_streak: number;
+            /** Format: date */
+            last_active_day: string | null;
+            cards_read: number;
+            reviews_count: number;
+            reviews_know: number;
+            /** @description Catalogue complet, obtenus ou non. */
+            badges: components["schemas"]["Badge"][];
+        };
         /**
          * @description * `created` - created
          *     * `updated` - updated
@@ -1007,6 +1305,12 @@ export interface components {
             cover_image?: components["schemas"]["ImagePayload"] | null;
             cards: components["schemas"]["DeckCardItem"][];
         };
+        /** @description POST /admin/packs/<id>/cards/move/ — ids de fiches ; `context["deck"]` porte le pack. */
+        AdminPackMoveCard: {
+            after_id?: number | null;
+            before_id?: number | null;
+            microarticle_id: number;
+        };
         /** @description POST /admin/packs/<id>/cards/reorder/ */
         AdminPackReorder: {
             microarticle_ids: number[];
@@ -1054,11 +1358,32 @@ export interface components {
             /** Format: date-time */
             updated_at: string;
         };
+        Badge: {
+            code: string;
+            label: string;
+            threshold: number;
+            /**
+             * Format: date
+             * @description Vide tant que le badge n'est pas obtenu.
+             */
+            earned_on: string | null;
+        };
+        /** @enum {unknown} */
+        BlankEnum: "";
         BulkAddResponse: {
             added: number;
             already_present: number;
             not_found?: number;
         };
+        /** @description POST /cards/decks/ — `validated_data["card_ids"]` est dédoublonné et borné. */
+        CardDecksBatch: {
+            card_ids: number[];
+        };
+        CardDecksMap: {
+            items: {
+                [key: string]: number[];
+            };
+        };
         /** @description PUT /cards/<id>/decks/ */
         CardDecksUpdate: {
             deck_ids: number[];
@@ -1147,6 +1472,12 @@ export interface components {
         DeckCreate: {
             name: string;
         };
+        /** @description POST /decks/<id>/import/ — `format` se déduit de l'extension s'il manque. */
+        DeckImport: {
+            /** Format: uri */
+            file: string;
+            format?: components["schemas"]["FormatEnum"];
+        };
         DeckListItem: components["schemas"]["DeckSummary"] | components["schemas"]["OfficialPackSummary"];
         DeckMembership: {
             id: number;
@@ -1159,7 +1490,14 @@ export interface components {
             name: string;
             is_default: boolean;
             sort_order: number;
+            srs_scheduler: string;
         };
+        /**
+         * @description * `leitner` - Leitner
+         *     * `sm2` - SM-2
+         * @enum {string}
+         */
+        DeckPatchSrsSchedulerEnum: "leitner" | "sm2";
         DeckSummary: {
             id: number;
             name: string;
@@ -1167,6 +1505,8 @@ export interface components {
             sort_order: number;
             cards_count: number;
             source_pack_id: number | null;
+            /** @description Algorithme SRS imposé par le deck ; vide : celui de l'utilisateur. */
+            srs_scheduler: string;
         };
         DefaultDeckResponse: {
             ok: boolean;
@@ -1196,6 +1536,13 @@ export interface components {
             published_at: string | null;
             progress?: components["schemas"]["Progress"] | null;
         };
+        /**
+         * @description * `json` - json
+         *     * `csv` - csv
+         *     * `anki` - anki
+         * @enum {string}
+         */
+        FormatEnum: "json" | "csv" | "anki";
         ImagePayload: {
             id: number;
             title: string;
@@ -1238,6 +1585,54 @@ export interface components {
             title: string;
             detail: string;
         };
+        LearningDay: {
+            /** Format: date */
+            day: string;
+            cards_read: number;
+            new_cards: number;
+            reviews_know: number;
+            reviews_medium: number;
+            reviews_again: number;
+            time_ms: number;
+        };
+        LearningEvent: {
+            client_id: string;
+            type: components["schemas"]["TypeEnum"];
+            lesson_id?: number | null;
+            /** Format: date-time */
+            occurred_at: string;
+            payload?: {
+                [key: string]: unknown;
+            } | null;
+        };
+        LearningEventBatch: {
+            device_id?: string;
+            events: components["schemas"]["LearningEvent"][];
+        };
+        LearningEventBatchResponse: {
+            accepted: number;
+            duplicates: number;
+            /** @description `client_id` des événements portant sur une fiche inconnue. */
+            rejected: string[];
+        };
+        LearningStats: {
+            /** Format: date */
+            start: string;
+            /** Format: date */
+            end: string;
+            /** @description Jours avec activité seulement, du plus ancien au plus récent. */
+            days: components["schemas"]["LearningDay"][];
+            totals: components["schemas"]["LearningStatsTotals"];
+        };
+        LearningStatsTotals: {
+            cards_read: number;
+            new_cards: number;
+            reviews_know: number;
+            reviews_medium: number;
+            reviews_again: number;
+            time_ms: number;
+            active_days: number;
+        };
         LessonProgress: {
             lesson_id: number;
             seen: boolean;
@@ -1251,6 +1646,12 @@ export interface components {
             /** Format: date-time */
             last_seen_at: string | null;
         };
+        LessonProgressChanges: {
+            sync_token: string;
+            full: boolean;
+            lessons: components["schemas"]["LessonProgress"][];
+            removed: number[];
+        };
         LessonProgressUpdate: {
             seen?: boolean;
             completed?: boolean;
@@ -1466,6 +1867,13 @@ export interface components {
         PatchedDeckPatch: {
             name?: string;
             sort_order?: number;
+            /**
+             * @description Vide pour revenir à l'algorithme de l'utilisateur.
+             *
+             *     * `leitner` - Leitner
+             *     * `sm2` - SM-2
+             */
+            srs_scheduler?: components["schemas"]["DeckPatchSrsSchedulerEnum"] | components["schemas"]["BlankEnum"];
         };
         PatchedLessonProgressUpdate: {
             seen?: boolean;
@@ -1500,6 +1908,13 @@ export interface components {
         PatchedUserPreferencesUpdate: {
             landing_redirect_enabled?: boolean;
             landing_redirect_target?: components["schemas"]["LandingRedirectTargetEnum"];
+            /**
+             * @description Changer d'algorithme replanifie aussitôt les cartes déjà revues.
+             *
+             *     * `leitner` - leitner
+             *     * `sm2` - sm2
+             */
+            srs_scheduler?: components["schemas"]["SrsScheduler"];
         };
         /**
          * @description * `waves` - waves
@@ -1562,19 +1977,64 @@ export interface components {
             sort_order: number;
             detail_card: components["schemas"]["SubjectRecapCard"] | null;
         };
+        SRSCardState: {
+            card_id: number;
+            srs: components["schemas"]["SRSState"];
+        };
         SRSCounts: {
             due: number;
             new: number;
             later: number;
             total: number;
         };
+        SRSForecast: {
+            timezone: string;
+            /** @description Cartes déjà en retard, comptées aussi dans le premier jour. */
+            overdue: number;
+            days: components["schemas"]["SRSForecastDay"][];
+        };
+        SRSForecastDay: {
+            /** Format: date */
+            date: string;
+            due: number;
+        };
         SRSNext: {
             card: components["schemas"]["MicroArticleListItem"] | null;
             srs: components["schemas"]["SRSState"] | null;
         };
+        SRSQueue: {
+            session: string;
+            items: components["schemas"]["SRSQueueItem"][];
+        };
+        SRSQueueItem: {
+            card: components["schemas"]["MicroArticleListItem"];
+            srs: components["schemas"]["SRSState"];
+        };
         SRSReview: {
             card_id: number;
             rating: components["schemas"]["SrsRating"];
+            /** @description Deck depuis lequel la carte est révisée. Sans effet sur l'algorithme : c'est celui du premier deck qui contient la carte et en impose un (`srs_scheduler`), sinon celui de l'utilisateur. */
+            deck_id?: number;
+        };
+        SRSReviewBatch: {
+            device_id?: string;
+            /** @description Deck depuis lequel la carte est révisée. Sans effet sur l'algorithme : c'est celui du premier deck qui contient la carte et en impose un (`srs_scheduler`), sinon celui de l'utilisateur. */
+            deck_id?: number;
+            reviews: components["schemas"]["SRSReviewBatchItem"][];
+        };
+        SRSReviewBatchItem: {
+            client_id: string;
+            card_id: number;
+            rating: components["schemas"]["SrsRating"];
+            /** Format: date-time */
+            reviewed_at: string;
+        };
+        SRSReviewBatchResponse: {
+            applied: number;
+            duplicates: number;
+            /** @description `client_id` des revues portant sur une fiche inconnue ou dépubliée. */
+            rejected: string[];
+            states: components["schemas"]["SRSCardState"][];
         };
         SRSState: {
             level: number;
@@ -1612,6 +2072,12 @@ export interface components {
          * @enum {string}
          */
         SrsRating: "know" | "medium" | "again";
+        /**
+         * @description * `leitner` - leitner
+         *     * `sm2` - sm2
+         * @enum {string}
+         */
+        SrsScheduler: "leitner" | "sm2";
         /**
          * @description * `draft` - Draft
          *     * `published` - Published
@@ -1642,6 +2108,12 @@ export interface components {
             /** @default  */
             label: string | null;
         };
+        /** @description POST /subjects/<slug>/cards/move/ — ids de liens (`SubjectCard`) ; `context["subject"]`. */
+        SubjectCardMove: {
+            after_id?: number | null;
+            before_id?: number | null;
+            card_id: number;
+        };
         /** @description POST /subjects/<slug>/cards/reorder/ — les ids inconnus sont ignorés par la vue. */
         SubjectCardsReorder: {
             order: number[];
@@ -1693,6 +2165,12 @@ export interface components {
             slug: string;
             description: string;
         };
+        TagDirectoryEntry: {
+            id: number;
+            name: string;
+            slug: string;
+            usage_count: number;
+        };
         TagPayload: {
             id: number;
             name: string;
@@ -1734,6 +2212,14 @@ export interface components {
             accent: string;
             pattern: string;
         };
+        /**
+         * @description * `card_viewed` - Fiche consultée
+         *     * `lesson_completed` - Fiche terminée
+         *     * `quiz_scored` - Quiz noté
+         *     * `streak_day` - Jour de série
+         * @enum {string}
+         */
+        TypeEnum: "card_viewed" | "lesson_completed" | "quiz_scored" | "streak_day";
         /** @description Catégorie citée par le JSON et absente de l'arbre, prête à être créée. */
         UnknownCategory: {
             field: string;
@@ -1745,6 +2231,7 @@ export interface components {
         UserPreferences: {
             landing_redirect_enabled: boolean;
             landing_redirect_target: components["schemas"]["LandingRedirectTargetEnum"];
+            srs_scheduler: components["schemas"]["SrsScheduler"];
         };
     };
     responses: never;
@@ -1754,6 +2241,7 @@ export interface components {
     pathItems: never;
 }
 export type AccountSummary = components['schemas']['AccountSummary'];
+export type Achievements = components['schemas']['Achievements'];
 export type ActionEnum = components['schemas']['ActionEnum'];
 export type AdminCardImport = components['schemas']['AdminCardImport'];
 export type AdminCardImportReport = components['schemas']['AdminCardImportReport'];
@@ -1763,12 +2251,17 @@ export type AdminMicroArticleSearchResult = components['schemas']['AdminMicroArt
 export type AdminPackBulkAdd = components['schemas']['AdminPackBulkAdd'];
 export type AdminPackCreate = components['schemas']['AdminPackCreate'];
 export type AdminPackDetail = components['schemas']['AdminPackDetail'];
+export type AdminPackMoveCard = components['schemas']['AdminPackMoveCard'];
 export type AdminPackReorder = components['schemas']['AdminPackReorder'];
 export type AdminPackSummary = components['schemas']['AdminPackSummary'];
 export type AdminTaxonomyNode = components['schemas']['AdminTaxonomyNode'];
 export type AdminTaxonomyNodeCreate = components['schemas']['AdminTaxonomyNodeCreate'];
 export type AdminThumbOverride = components['schemas']['AdminThumbOverride'];
+export type Badge = components['schemas']['Badge'];
+export type BlankEnum = components['schemas']['BlankEnum'];
 export type BulkAddResponse = components['schemas']['BulkAddResponse'];
+export type CardDecksBatch = components['schemas']['CardDecksBatch'];
+export type CardDecksMap = components['schemas']['CardDecksMap'];
 export type CardDecksUpdate = components['schemas']['CardDecksUpdate'];
 export type CardDecksUpdateResponse = components['schemas']['CardDecksUpdateResponse'];
 export type CardType = components['schemas']['CardType'];
@@ -1781,20 +2274,30 @@ export type DeckCardItem = components['schemas']['DeckCardItem'];
 export type DeckCardsBulkAdd = components['schemas']['DeckCardsBulkAdd'];
 export type DeckCardsResponse = components['schemas']['DeckCardsResponse'];
 export type DeckCreate = components['schemas']['DeckCreate'];
+export type DeckImport = components['schemas']['DeckImport'];
 export type DeckListItem = components['schemas']['DeckListItem'];
 export type DeckMembership = components['schemas']['DeckMembership'];
 export type DeckMutationResponse = components['schemas']['DeckMutationResponse'];
+export type DeckPatchSrsSchedulerEnum = components['schemas']['DeckPatchSrsSchedulerEnum'];
 export type DeckSummary = components['schemas']['DeckSummary'];
 export type DefaultDeckResponse = components['schemas']['DefaultDeckResponse'];
 export type DeleteAccount = components['schemas']['DeleteAccount'];
 export type DetailResponse = components['schemas']['DetailResponse'];
 export type FeedItem = components['schemas']['FeedItem'];
+export type FormatEnum = components['schemas']['FormatEnum'];
 export type ImagePayload = components['schemas']['ImagePayload'];
 export type LandingCard = components['schemas']['LandingCard'];
 export type LandingPayload = components['schemas']['LandingPayload'];
 export type LandingRedirectTargetEnum = components['schemas']['LandingRedirectTargetEnum'];
 export type LandingStep = components['schemas']['LandingStep'];
+export type LearningDay = components['schemas']['LearningDay'];
+export type LearningEvent = components['schemas']['LearningEvent'];
+export type LearningEventBatch = components['schemas']['LearningEventBatch'];
+export type LearningEventBatchResponse = components['schemas']['LearningEventBatchResponse'];
+export type LearningStats = components['schemas']['LearningStats'];
+export type LearningStatsTotals = components['schemas']['LearningStatsTotals'];
 export type LessonProgress = components['schemas']['LessonProgress'];
+export type LessonProgressChanges = components['schemas']['LessonProgressChanges'];
 export type LessonProgressUpdate = components['schemas']['LessonProgressUpdate'];
 export type MicroArticleDetail = components['schemas']['MicroArticleDetail'];
 export type MicroArticleListItem = components['schemas']['MicroArticleListItem'];
@@ -1826,18 +2329,28 @@ export type QuestionPayload = components['schemas']['QuestionPayload'];
 export type ReadStateMap = components['schemas']['ReadStateMap'];
 export type ReadStateQuery = components['schemas']['ReadStateQuery'];
 export type RecapPoint = components['schemas']['RecapPoint'];
+export type SrsCardState = components['schemas']['SRSCardState'];
 export type SrsCounts = components['schemas']['SRSCounts'];
+export type SrsForecast = components['schemas']['SRSForecast'];
+export type SrsForecastDay = components['schemas']['SRSForecastDay'];
 export type SrsNext = components['schemas']['SRSNext'];
+export type SrsQueue = components['schemas']['SRSQueue'];
+export type SrsQueueItem = components['schemas']['SRSQueueItem'];
 export type SrsReview = components['schemas']['SRSReview'];
+export type SrsReviewBatch = components['schemas']['SRSReviewBatch'];
+export type SrsReviewBatchItem = components['schemas']['SRSReviewBatchItem'];
+export type SrsReviewBatchResponse = components['schemas']['SRSReviewBatchResponse'];
 export type SrsState = components['schemas']['SRSState'];
 export type SavedMicroArticleCreate = components['schemas']['SavedMicroArticleCreate'];
 export type SavedState = components['schemas']['SavedState'];
 export type SourceSearch = components['schemas']['SourceSearch'];
 export type SrsRating = components['schemas']['SrsRating'];
+export type SrsScheduler = components['schemas']['SrsScheduler'];
 export type StatusEnum = components['schemas']['StatusEnum'];
 export type StreamBlock = components['schemas']['StreamBlock'];
 export type SubjectCard = components['schemas']['SubjectCard'];
 export type SubjectCardAdd = components['schemas']['SubjectCardAdd'];
+export type SubjectCardMove = components['schemas']['SubjectCardMove'];
 export type SubjectCardsReorder = components['schemas']['SubjectCardsReorder'];
 export type SubjectCreate = components['schemas']['SubjectCreate'];
 export type SubjectDetailCard = components['schemas']['SubjectDetailCard'];
@@ -1846,6 +2359,7 @@ export type SubjectListItem = components['schemas']['SubjectListItem'];
 export type SubjectMutationResponse = components['schemas']['SubjectMutationResponse'];
 export type SubjectRecapCard = components['schemas']['SubjectRecapCard'];
 export type SubjectSummary = components['schemas']['SubjectSummary'];
+export type TagDirectoryEntry = components['schemas']['TagDirectoryEntry'];
 export type TagPayload = components['schemas']['TagPayload'];
 export type TaxonomyBreadcrumb = components['schemas']['TaxonomyBreadcrumb'];
 export type TaxonomyNode = components['schemas']['TaxonomyNode'];
@@ -1853,6 +2367,7 @@ export type TaxonomyResolveResponse = components['schemas']['TaxonomyResolveResp
 export type TaxonomyTreeResponse = components['schemas']['TaxonomyTreeResponse'];
 export type ThumbOverrideCreate = components['schemas']['ThumbOverrideCreate'];
 export type ThumbOverridePublic = components['schemas']['ThumbOverridePublic'];
+export type TypeEnum = components['schemas']['TypeEnum'];
 export type UnknownCategory = components['schemas']['UnknownCategory'];
 export type UserPreferences = components['schemas']['UserPreferences'];
 export type $defs = Record<string, never>;
@@ -2274,6 +2789,33 @@ export interface operations {
             };
         };
     };
+    admin_pack_card_move: {
+        parameters: {
+            query?: never;
+            header?: never;
+            path: {
+                pack_id: number;
+            };
+            cookie?: never;
+        };
+        requestBody: {
+            content: {
+                "application/json": components["schemas"]["AdminPackMoveCard"];
+                "application/x-www-form-urlencoded": components["schemas"]["AdminPackMoveCard"];
+                "multipart/form-data": components["schemas"]["AdminPackMoveCard"];
+            };
+        };
+        responses: {
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["CountUpdateResponse"];
+                };
+            };
+        };
+    };
     admin_pack_card_reorder: {
         parameters: {
             query?: never;
@@ -2488,6 +3030,31 @@ export interface operations {
             };
         };
     };
+    card_deck_batch: {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        requestBody: {
+            content: {
+                "application/json": components["schemas"]["CardDecksBatch"];
+                "application/x-www-form-urlencoded": components["schemas"]["CardDecksBatch"];
+                "multipart/form-data": components["schemas"]["CardDecksBatch"];
+            };
+        };
+        responses: {
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["CardDecksMap"];
+                };
+            };
+        };
+    };
     deck_list: {
         parameters: {
             query?: {
@@ -2722,6 +3289,54 @@ export interface operations {
             };
         };
     };
+    deck_export: {
+        parameters: {
+            query?: never;
+            header?: never;
+            path: {
+                deck_id: number;
+                fmt: "anki" | "csv" | "json";
+            };
+            cookie?: never;
+        };
+        requestBody?: never;
+        responses: {
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": string;
+                };
+            };
+        };
+    };
+    deck_import: {
+        parameters: {
+            query?: never;
+            header?: never;
+            path: {
+                deck_id: number;
+            };
+            cookie?: never;
+        };
+        requestBody: {
+            content: {
+                "multipart/form-data": components["schemas"]["DeckImport"];
+                "application/x-www-form-urlencoded": components["schemas"]["DeckImport"];
+            };
+        };
+        responses: {
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["BulkAddResponse"];
+                };
+            };
+        };
+    };
     official_pack_progress_update: {
         parameters: {
             query?: never;
@@ -3201,6 +3816,33 @@ export interface operations {
             };
         };
     };
+    subject_card_move: {
+        parameters: {
+            query?: never;
+            header?: never;
+            path: {
+                slug: string;
+            };
+            cookie?: never;
+        };
+        requestBody: {
+            content: {
+                "application/json": components["schemas"]["SubjectCardMove"];
+                "application/x-www-form-urlencoded": components["schemas"]["SubjectCardMove"];
+                "multipart/form-data": components["schemas"]["SubjectCardMove"];
+            };
+        };
+        responses: {
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["CountUpdateResponse"];
+                };
+            };
+        };
+    };
     subject_card_reorder: {
         parameters: {
             query?: never;
@@ -3269,13 +3911,60 @@ export interface operations {
             };
         };
     };
-    learning_progress_list: {
+    learning_achievements: {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        requestBody?: never;
+        responses: {
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["Achievements"];
+                };
+            };
+        };
+    };
+    learning_events_batch: {
         parameters: {
             query?: never;
             header?: never;
             path?: never;
             cookie?: never;
         };
+        requestBody: {
+            content: {
+                "application/json": components["schemas"]["LearningEventBatch"];
+                "application/x-www-form-urlencoded": components["schemas"]["LearningEventBatch"];
+                "multipart/form-data": components["schemas"]["LearningEventBatch"];
+            };
+        };
+        responses: {
+            202: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["LearningEventBatchResponse"];
+                };
+            };
+        };
+    };
+    learning_progress_list: {
+        parameters: {
+            query?: {
+                /** @description Jeton `sync_token` d'une réponse précédente : ne renvoie que ce qui a changé depuis. Absent, ou refusé (400), synchro complète. */
+                since?: string;
+            };
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
         requestBody?: never;
         responses: {
             200: {
@@ -3283,7 +3972,7 @@ export interface operations {
                     [name: string]: unknown;
                 };
                 content: {
-                    "application/json": components["schemas"]["LessonProgress"][];
+                    "application/json": components["schemas"]["LessonProgressChanges"];
                 };
             };
         };
@@ -3369,6 +4058,38 @@ export interface operations {
             };
         };
     };
+    learning_srs_forecast: {
+        parameters: {
+            query?: {
+                days?: number;
+                deck_id?: number;
+                deck_ids?: string;
+                /**
+                 * @description * `all_decks` - all_decks
+                 *     * `deck` - deck
+                 *     * `decks` - decks
+                 *     * `all_cards` - all_cards
+                 */
+                scope?: "all_decks" | "deck" | "decks" | "all_cards";
+                /** @description Fuseau IANA des jours du graphique (ex. `Europe/Paris`). Défaut : fuseau du serveur. */
+                tz?: string;
+            };
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        requestBody?: never;
+        responses: {
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["SRSForecast"];
+                };
+            };
+        };
+    };
     learning_srs_next: {
         parameters: {
             query?: {
@@ -3401,6 +4122,39 @@ export interface operations {
             };
         };
     };
+    learning_srs_queue: {
+        parameters: {
+            query?: {
+                deck_id?: number;
+                deck_ids?: string;
+                limit?: number;
+                only_due?: boolean;
+                /**
+                 * @description * `all_decks` - all_decks
+                 *     * `deck` - deck
+                 *     * `decks` - decks
+                 *     * `all_cards` - all_cards
+                 */
+                scope?: "all_decks" | "deck" | "decks" | "all_cards";
+                /** @description Jeton renvoyé par l'appel précédent de la même session. Les cartes déjà servies dans la session ne sont pas reproposées. */
+                session?: string;
+            };
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        requestBody?: never;
+        responses: {
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["SRSQueue"];
+                };
+            };
+        };
+    };
     learning_srs_review: {
         parameters: {
             query?: never;
@@ -3426,6 +4180,53 @@ export interface operations {
             };
         };
     };
+    learning_srs_review_batch: {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        requestBody: {
+            content: {
+                "application/json": components["schemas"]["SRSReviewBatch"];
+                "application/x-www-form-urlencoded": components["schemas"]["SRSReviewBatch"];
+                "multipart/form-data": components["schemas"]["SRSReviewBatch"];
+            };
+        };
+        responses: {
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["SRSReviewBatchResponse"];
+                };
+            };
+        };
+    };
+    learning_stats_daily: {
+        parameters: {
+            query?: {
+                /** @description Nombre de jours jusqu'à aujourd'hui inclus (fuseau du serveur). */
+                days?: number;
+            };
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        requestBody?: never;
+        responses: {
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["LearningStats"];
+                };
+            };
+        };
+    };
     micro_retrieve: {
         parameters: {
             query?: never;
@@ -3490,6 +4291,29 @@ export interface operations {
             };
         };
     };
+    tag_directory: {
+        parameters: {
+            query?: {
+                limit?: number;
+                q?: string;
+                sort?: "name" | "popular";
+            };
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        requestBody?: never;
+        responses: {
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["TagDirectoryEntry"][];
+                };
+            };
+        };
+    };
     taxonomy_resolve: {
         parameters: {
             query: {